@@ -0,0 +1,217 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       ace_fluence.py: incremental ace fluence with a saved accumulator state      #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the fluence is the running sum of (sample time x estimated flux (ipol)) since the
+#   last fluence reset (the nadir of the orbit). instead of recomputing it over the
+#   whole data set every run, the running sums of the orbit are saved with the time
+#   of the last good data (checkpoint) and only the data after the checkpoint are
+#   added in the next run. the estimated flux of bad data depends on the next good
+#   data, so the data after the last good one are recomputed in the next run.
+#
+#   the data are the list of lists used by update_ace_data_files.py:
+#       [atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, ipol, fluen]
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/ACE/Scripts/')
+#       import ace_fluence
+#       acc   = ace_fluence.FluenceAccumulator(reset_time, store.get_meta('fluence'))
+#       start = acc.since(<first time of the new data>)     #--- read the data from here
+#       data  = acc.update(data)
+#       store.set_meta('fluence', acc.dumps())
+#
+
+import sys
+import json
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_index as tix
+
+#
+#--- ACE sample time (seconds)
+#
+SAMPL    = 300
+#
+#--- a reset time found later than the saved one by more than this (seconds) starts
+#--- a new orbit. the reset times are the perigees of the predicted ephemeris, which
+#--- is regenerated with every new prediction; the same perigee can move by a sample
+#--- or two (the ephemeris step is 5 - 10 min), while the next one is ~64 hrs later
+#
+RESET_TOL = 3600.0
+#
+#--- the position of the columns in the data
+#
+ATIME    = 0
+ECHK     = 2
+PCHK     = 5
+IPOL     = 12
+FLUEN    = 13
+#
+#--- the channels of the latest fluence: ech1, ech2, pch1, pch2, pch3, pch4, pch5
+#
+CHANNELS = [3, 4, 6, 7, 8, 9, 10]
+
+#---------------------------------------------------------------------------------------
+#-- FluenceAccumulator: running fluence of the current orbit                          --
+#---------------------------------------------------------------------------------------
+
+class FluenceAccumulator():
+    """
+    running fluence of the current orbit, updated with the new data only
+
+        reset_time  --- a list of fluence reset times in seconds from 1998.1.1
+                        (sorted in the increasing order)
+        state       --- the saved state (a json string from dumps); if None,
+                        the fluence is computed from the start of the orbit
+        tolerance   --- a new orbit starts only when the reset time of the data
+                        is later than the saved one by more than this (seconds)
+    """
+    def __init__(self, reset_time, state=None, tolerance=RESET_TOL):
+
+        self.reset_time = list(reset_time)
+        self.tolerance  = tolerance
+#
+#--- checkpoint: the last good data of the previous run
+#---     time    --- the time of the last good data
+#---     reset   --- the reset time of the orbit
+#---     fluence --- the fluence (ipol) at the time
+#---     sums    --- the fluence of each channel (good data only)
+#
+        self.ckpt = None
+        if state:
+            self.ckpt = json.loads(state)
+#
+#--- the values at the last data added
+#
+        self.last = None
+
+    def orbit_start(self, atime):
+        """
+        give the reset time of the orbit which contains the time
+        input:  atime   --- time in seconds from 1998.1.1
+        output: the reset time (None if there is no reset before the time)
+        """
+        k = tix.find_previous(self.reset_time, atime)
+        if k < 0:
+            return None
+
+        return self.reset_time[k]
+
+    def since(self, atime):
+        """
+        give the time from which the data must be read for the update
+        input:  atime   --- the first time of the new data
+        output: the checkpoint time or, if there is no checkpoint, the orbit start
+                (the time itself if no reset comes before it)
+        """
+        if self.ckpt is None:
+            start = self.orbit_start(atime)
+            return atime if start is None else start
+
+        return min(self.ckpt['time'], atime)
+
+    def checkpoint(self):
+        """
+        give the time of the saved checkpoint
+        input:  none
+        output: the time of the last good data of the previous run (None if no state)
+        """
+        if self.ckpt is None:
+            return None
+
+        return self.ckpt['time']
+
+    def update(self, data):
+        """
+        compute the fluence of the data after the checkpoint
+        input:  data    --- a list of lists of data (ipol is already estimated);
+                            it must start at or before the checkpoint
+        output: data    --- the data with the fluence list updated. the fluence of the
+                            data at/before the checkpoint are not changed (merge_ace_data
+                            keeps the stored ones)
+        """
+        if self.ckpt is None:
+            ckpt = {'time': None, 'reset': None, 'fluence': 0.0, 'sums': [0.0] * len(CHANNELS)}
+        else:
+            ckpt = dict(self.ckpt)
+
+        reset   = ckpt['reset']
+        fluence = ckpt['fluence']
+        sums    = list(ckpt['sums'])
+
+        fluen   = list(data[FLUEN])
+        for k in range(0, len(data[ATIME])):
+#
+#--- the data can be numpy arrays; keep the saved state in python numbers for json
+#
+            atime = int(data[ATIME][k])
+            if ckpt['time'] is not None and atime <= ckpt['time']:
+                continue
+#
+#--- a new orbit starts; a reset time which is not clearly later than the saved one
+#--- (the same perigee in a new ephemeris or no perigee in the ephemeris) keeps it.
+#--- if no reset comes before the first data, the orbit starts at the first data
+#
+            start = self.orbit_start(atime)
+            if start is None:
+                start = reset if reset is not None else float(atime)
+
+            if reset is None or start > reset + self.tolerance:
+                reset   = float(start)
+                fluence = 0.0
+                sums    = [0.0] * len(CHANNELS)
+
+            fluence += SAMPL * float(data[IPOL][k])
+            fluen[k] = fluence
+#
+#--- the fluence of each channel uses only good data
+#
+            if data[ECHK][k] == 0 and data[PCHK][k] == 0:
+                vals = [data[n][k] for n in range(3, 11)]
+                if min(vals) >= 0.0:
+                    for m in range(0, len(CHANNELS)):
+                        sums[m] += float(data[CHANNELS[m]][k]) * SAMPL
+
+            self.last = {'time': atime, 'reset': reset, 'fluence': fluence, 'sums': list(sums)}
+#
+#--- the estimate of the bad data changes when the next good data come in;
+#--- keep the last good data as the next checkpoint
+#
+            if data[PCHK][k] == 0:
+                self.ckpt = dict(self.last)
+
+        data[FLUEN] = fluen
+
+        return data
+
+    def latest(self):
+        """
+        give the fluence of each channel of the current orbit
+        input:  none
+        output: [fech1, fech2, fpch1, fpch2, fpch3, fpch4, fpch5, tacc]
+                tacc    --- the integration time in seconds
+        """
+        if self.last is None:
+            last = self.ckpt
+        else:
+            last = self.last
+
+        if last is None:
+            return [0.0] * len(CHANNELS) + [0]
+
+        return list(last['sums']) + [last['time'] - last['reset']]
+
+    def dumps(self):
+        """
+        give the state to be saved
+        input:  none
+        output: a json string of the checkpoint
+        """
+        return json.dumps(self.ckpt)
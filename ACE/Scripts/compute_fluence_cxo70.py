@@ -14,9 +14,11 @@
 import os
 import sys
 import re
-import time
 import Chandra.Time
 import argparse
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_convert as tcv
+import orbit_events as oev
 #
 #--- Define Directory Pathing
 #
@@ -38,38 +40,20 @@ def compute_fluence_cxo70():
     """
     create a html page displaying ace fluence when cxo is above 70km
     input:  none but read from:
-            <ephem_dir>/Data/PE.EPH.gsme_spherical
+            <ephem_dir>/Data/PE.EPH.gsme_spherical (through its orbit event index)
             <ace_dir>/Data/ace_7day_archive
     output: <html_dir>/ACE/ace_flux_dat.html
     """
 #
-#--- read orbital info
+#--- find the latest time span when cxo is above 70kkm (before the current time)
+#--- from the orbit event index
 #
-    with open(f"{EPHEM_DIR}/Data/PE.EPH.gsme_spherical") as f:
-        data = [line.strip() for line in f.readlines()]
-    data  = data[::-1]
-    start = 0
-#
-#--- find the latest time span when cxo is above 70kkm
-#
-    stop  = 0
-    for ent in data:
-        atemp = re.split(r'\s+', ent)
-        stime = float(atemp[0])
-#
-#--- make sure that the span is before the curren time
-#
-        if stime > CURRENT_CHANDRA_TIME:
-            continue
-
-        alt   = float(atemp[1])
-        if stop == 0:
-            if alt > 70.0:
-                stop = stime
-        else:
-            if alt < 70.0:
-                start = stime
-                break
+    events = oev.get_events(f"{EPHEM_DIR}/Data/PE.EPH.gsme_spherical", levels=[70.0])
+    span   = events.last_above(70.0, CURRENT_CHANDRA_TIME)
+    if span is None:
+        [start, stop] = [0, 0]
+    else:
+        [start, stop] = span
 #
 #--- read ace data
 #
@@ -84,15 +68,18 @@ def compute_fluence_cxo70():
     p5     = 0.0
     cstart = 0.0
     cstop  = 0.0
-    for ent in data:
-        atemp = re.split(r'\s+', ent)
-#
-#--- convert time in Chandra Time
 #
-        ltime = atemp[0] + ':' + atemp[1] + ':' + atemp[2] + ':' + atemp[3][0] + atemp[3][1] + ':'
-        ltime = ltime    + atemp[3][2] + atemp[3][3] + ':00'
-        ltime = time.strftime('%Y:%j:%H:%M:%S', time.strptime(ltime, '%Y:%m:%d:%H:%M:%S'))
-        stime = int(Chandra.Time.DateTime(ltime).secs)
+#--- convert time in Chandra Time; <yyyy> <mm> <dd> <hhmm> of all rows at once
+#
+    rows   = [re.split(r'\s+', ent) for ent in data]
+    t_list = tcv.calendar_to_secs([int(atemp[0]) for atemp in rows],\
+                                  [int(atemp[1]) for atemp in rows],\
+                                  [int(atemp[2]) for atemp in rows],\
+                                  [int(atemp[3][:2]) for atemp in rows],\
+                                  [int(atemp[3][2:4]) for atemp in rows])
+    for k in range(0, len(rows)):
+        atemp = rows[k]
+        stime = int(t_list[k])
 #
 #--- compute fluence between the span
 #
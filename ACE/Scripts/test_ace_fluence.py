@@ -0,0 +1,129 @@
+#####################################################################################
+#                                                                                   #
+#       test_ace_fluence.py: test the ace fluence accumulator with the merged data  #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import json
+import pytest
+
+pytest.importorskip('numpy')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '..', 'Common', 'Scripts'))
+sys.path.insert(0, SCRIPT_DIR)
+
+import ace_fluence
+
+#
+#--- two orbits: the reset times in seconds from 1998.1.1
+#
+RESET = [1000.0, 200000.0]
+
+def make_data(times, fluen=-999, ipol=-999):
+    """
+    create a list of 14 lists of ace data (all good data)
+    input:  times   --- a list of times in seconds from 1998.1.1
+            fluen   --- the fluence to be put in
+            ipol    --- the estimated flux to be put in (-999: not estimated yet)
+    output: a list of 14 lists of data
+    """
+    n = len(times)
+    return [list(times), ['t%d' % t for t in times], [0] * n, [1.0] * n, [2.0] * n,\
+            [0] * n, [3.0] * n, [4.0] * n, [5.0] * n, [6.0] * n, [7.0] * n,\
+            [-1.0] * n, [ipol] * n, [fluen] * n]
+
+def load_uadf():
+    """
+    import update_ace_data_files (merge_ace_data); it needs Chandra.Time
+    """
+    pytest.importorskip('Chandra.Time')
+    import update_ace_data_files
+
+    return update_ace_data_files
+
+#-----------------------------------------------------------------------------
+
+def test_dumps_after_merge():
+    """
+    the state saved after the merged (numpy) data must go through json
+    """
+    uadf    = load_uadf()
+    current = make_data([2000 + 300 * k for k in range(5)])
+    past    = make_data([])
+    data    = uadf.merge_ace_data(current, past)
+
+    acc     = ace_fluence.FluenceAccumulator(RESET)
+    acc.update(data)
+    state   = acc.dumps()
+
+    ckpt    = json.loads(state)
+    assert ckpt['time'] == 2000 + 300 * 4
+    assert ckpt['reset'] == 1000.0
+    assert ckpt['fluence'] == pytest.approx(5 * 300 * 4.0)
+#
+#--- the next run continues from the saved state
+#
+    acc2    = ace_fluence.FluenceAccumulator(RESET, state)
+    assert acc2.dumps() == state
+    assert acc2.latest() == acc.latest()
+
+#-----------------------------------------------------------------------------
+
+def test_overlap_keeps_stored_fluence():
+    """
+    the current data which overlap the saved data at/before the checkpoint
+    must not replace the stored ipol and fluence
+    """
+    uadf    = load_uadf()
+    first   = uadf.merge_ace_data(make_data([2000 + 300 * k for k in range(5)]), make_data([]))
+    acc     = ace_fluence.FluenceAccumulator(RESET)
+    first   = acc.update(first)
+    past    = [list(col) for col in first]
+#
+#--- the next feed starts two samples before the checkpoint (3200)
+#
+    acc2    = ace_fluence.FluenceAccumulator(RESET, acc.dumps())
+    current = make_data([2000 + 300 * k for k in range(2, 8)])
+    data    = uadf.merge_ace_data(current, past, acc2.checkpoint())
+    data    = acc2.update(data)
+
+    assert list(data[0]) == [2000 + 300 * k for k in range(8)]
+    assert list(data[13]) == pytest.approx([1200.0 * (k + 1) for k in range(8)])
+    assert json.loads(acc2.dumps())['time'] == 2000 + 300 * 7
+
+#-----------------------------------------------------------------------------
+
+def test_new_orbit_resets_fluence():
+    """
+    the data after the next reset time start a new orbit
+    """
+    times = [199400 + 300 * k for k in range(5)]
+    acc   = ace_fluence.FluenceAccumulator(RESET)
+    data  = acc.update(make_data(times, ipol=4.0))
+
+    assert data[13] == pytest.approx([1200.0, 2400.0, 1200.0, 2400.0, 3600.0])
+    assert acc.latest()[-1] == 200600 - 200000.0
+
+#-----------------------------------------------------------------------------
+
+def test_no_reset_before_data():
+    """
+    without a reset time before the data, the orbit starts at the first data
+    (not at 1998.1.1)
+    """
+    times = [2000 + 300 * k for k in range(5)]
+    acc   = ace_fluence.FluenceAccumulator([500000.0])
+
+    assert acc.since(times[0]) == times[0]
+
+    acc.update(make_data(times, ipol=4.0))
+    latest = acc.latest()
+
+    assert latest[-1] == 300 * 4
+    assert latest[2] == pytest.approx(5 * 300 * 3.0)
+    assert json.loads(acc.dumps())['reset'] == times[0]
@@ -16,10 +16,17 @@ import re
 import time
 from datetime import datetime
 import Chandra.Time
-import copy 
+import numpy
 import subprocess
-import urllib.request
 import argparse
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import ts_store
+import fetch_cache as fc
+import orbit_events as oev
+import month_archive as mar
+import rad_rollups as rrl
+sys.path.append('/data/mta4/Space_Weather/ACE/Scripts/')
+import ace_fluence
 #
 #--- Define Directory Pathing
 #
@@ -42,8 +49,14 @@ year_start           = Chandra.Time.DateTime(str(this_year) + ':001:00:00:00').s
 #
 #--- other consts
 #
-ace_delt = 3 * 86400    #--- the depth of ACE archive in seconds
-sampl    = 300          #--- ACE sample time (seconds)
+sampl    = ace_fluence.SAMPL    #--- ACE sample time (seconds)
+#
+#--- columns of ace.archive kept in the store (with time in seconds from 1998.1.1)
+#
+ace_cols = [['jtime', 'text'], ['echk', 'integer'], ['ech1', 'real'], ['ech2', 'real'],\
+            ['pchk',  'integer'], ['pch1', 'real'], ['pch2', 'real'], ['pch3', 'real'],\
+            ['pch4',  'real'], ['pch5', 'real'], ['anis', 'real'], ['ipol', 'real'],\
+            ['fluen', 'real']]
 
 #-----------------------------------------------------------------------------
 #-- update_ace_data_files: update ace related data files                    --
@@ -57,9 +70,10 @@ def update_ace_data_files():
             <ephem_dir>/Data/PE.EPH.gsme_spherical
             <kp_dir>/Data/k_index_data_past
     output: <ace_data_dir>/ace.archive
+            <ace_data_dir>/ace_archive.db   (with the fluence accumulator state)
             <ace_data_dir>/ace_12h_archive
             <ace_data_dir>/ace_7day_archive
-            <ace_data_dir>/longterm/ace_data.txt
+            <ace_data_dir>/longterm/ace_data.txt   (and the monthly files in longterm/Monthly/)
             <ace_data_dir>/fluace.dat
             <ace_data_dir>/kp.dat
     """
@@ -69,27 +83,29 @@ def update_ace_data_files():
 #--- the last two of current_ace_data are dummy lists
 #
     [current_ace_data, chead] = read_current_ace_data()
-    [past_ace_data,    head]  = read_past_ace_data()
 #
-#--- create one continuous data set
+#--- fluence accumulator; the fluence periods start at the nadirs of the orbit
 #
-    combined_data             = combine_data(current_ace_data, past_ace_data)
+    store = open_ace_store()
+    acc   = ace_fluence.FluenceAccumulator(find_reset_time(), store.get_meta('fluence'))
 #
-#--- estimate bad data part and replace ipol data list. ipol data is based on pch2
+#--- read only the past data after the last fluence checkpoint
 #
-    filled_data               = fill_missing_data(combined_data)
+    [past_ace_data,    head]  = read_past_ace_data(store, acc, current_ace_data)
 #
-#--- fluence data collection time spans based on orbital period (at nadirs the periods start)
+#--- create one continuous data set; the bad data part of ipol is estimated from pch2
 #
-    [collection_start, collection_stop] = set_fluence_collection_span()
+    combined_data             = merge_ace_data(current_ace_data, past_ace_data, acc.checkpoint())
 #
-#--- compute fluence and update fluence list
+#--- add the new data to the fluence
 #
-    updated_data  = compute_fluence(filled_data, collection_start, collection_stop)
+    updated_data  = acc.update(combined_data)
 #
 #--- update ace.archive file
 #
-    update_ace_archive(updated_data, head)
+    update_ace_archive(store, updated_data, head)
+    store.set_meta('fluence', acc.dumps())
+    store.close()
 #
 #--- update ace_12h_archive and ace_7day_archive data file
 #
@@ -101,7 +117,7 @@ def update_ace_data_files():
 #
 #---- update fluace.dat
 #
-    updat_fluace_data_file(combined_data, chead, collection_start)
+    updat_fluace_data_file(combined_data, chead, acc)
 #
 #--- update kp.dat
 #
@@ -136,9 +152,8 @@ def read_current_ace_data():
 #
 #--- read the current data file
 #
-    with urllib.request.urlopen(NOAA_LINK) as url:
-        filestring = url.read().decode()
-        data = [line.strip() for line in filestring.split("\n") if line != '']
+    filestring = fc.fetch_text(NOAA_LINK)
+    data = [line.strip() for line in filestring.split("\n") if line != '']
 #
 #--- [atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, fluen, head]
 #
@@ -152,10 +167,12 @@ def read_current_ace_data():
 #-- read_past_ace_data: read the past ace data                             ---
 #-----------------------------------------------------------------------------
 
-def read_past_ace_data():
+def read_past_ace_data(store, acc, current_ace_data):
     """
-    read the past ace data
-    input:  none, but read from <ace_data_dir>/ace.archive
+    read the past ace data after the last fluence checkpoint
+    input:  store               --- the store of ace.archive data
+            acc                 --- ace_fluence.FluenceAccumulator
+            current_ace_data    --- the list of lists of the current data
     output: a list of lists of:
             atime   --- a time in seconds from 1998.1.1
             jtime   --- a string time
@@ -173,25 +190,48 @@ def read_past_ace_data():
             fluen   --- fluence
             head    --- a list of header part
     """
+    if len(current_ace_data[0]) > 0:
+        start = acc.since(current_ace_data[0][0])
+    else:
+        start = acc.since(store.last_time() or 0)
+#
+#--- [atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, ipol,fluen]
+#--- in the order of the oldest to the newest
+#
+    save  = store.range(start)
+
+    head  = store.get_meta('head', '').split('\n')
+    head  = [ent for ent in head if ent != '']
+
+    return [save, head]
+
+#-----------------------------------------------------------------------------
+#-- open_ace_store: open the store of ace.archive data                      --
+#-----------------------------------------------------------------------------
+
+def open_ace_store():
+    """
+    open the store of ace.archive data. when the store is new, it is filled 
+    from ace.archive
+    input:  none, but read from <ace_data_dir>/ace.archive (only the first time)
+    output: store   --- ts_store.TimeSeriesStore of 
+                        [atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, ipol,fluen]
+    """
+    store = ts_store.TimeSeriesStore(f"{OUT_ACE_DATA_DIR}/ace_archive.db", ace_cols,\
+                                     time_type='integer')
+    if store.last_time() is not None:
+        return store
+
     ifile = f"{ACE_DATA_DIR}/ace.archive"
     with open(ifile) as f:
         data = [line.strip() for line in f.readlines()]
-#
-#--- [atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, ipol,fluen, head]
-#
+
     out   = read_ace_table_data(data)
-#
-#--- reverse the data order to the oldest to the newest
-#
-    save  = []
-    dlen  = len(out[:-1])
-    for k in range(0, dlen):
-        dtemp = out[k][::-1]
-        save.append(dtemp)
-#
-#--- the last list contains the header lines
-#
-    return [save, out[-1]]
+
+    store.append(zip(*out[:-1]))
+    store.set_meta('head', '\n'.join(out[-1]))
+
+    return store
 
 #-----------------------------------------------------------------------------
 #-- read_ace_table_data: read  data into a list of lists                    --
@@ -281,29 +321,6 @@ def read_ace_table_data(data):
 
     return [atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, ipol, fluen, head]
 
-#-----------------------------------------------------------------------------
-#-- set_fluence_collection_span: set fluence data collection span           --
-#-----------------------------------------------------------------------------
-
-def set_fluence_collection_span():
-    """
-    set fluence data collection span
-    input: none
-    output: start   --- a list of fluence data collection starting time in seconds from 1998.1.1
-            stop    --- a list of fluence data collection stopping time in seconds from 1998.1.1
-    """
-    reset_time = find_reset_time()
-
-    start = [0.0]
-    stop  = []
-    for ent in reset_time:
-        start.append(ent)
-        stop.append(ent)
-
-    stop.append(6374591994.0)            #--- 2200:001:00:00
-    
-    return [start, stop]
-
 #-----------------------------------------------------------------------------
 #-- find_reset_time: find fluence reset time (at the nadir of the orbit)    --
 #-----------------------------------------------------------------------------
@@ -312,36 +329,25 @@ def find_reset_time():
     """
     find fluence reset time (at the nadir of the orbit)
     input: none but read from:
-            <ephem_dir>/Data/PE.EPH.gsme_spherical
+            <ephem_dir>/Data/PE.EPH.gsme_spherical (through its orbit event index)
     output: reset_time  --- a list of reset times in seconds from 1998.1.1
     """
-    ifile = f"{EPHEM_DIR}/Data/PE.EPH.gsme_spherical"
-    with open(ifile) as f:
-        data = [line.strip() for line in f.readlines()]
-    stime = []
-    alt   = []
-    for ent in data:
-        atemp = re.split(r'\s+', ent)
-        stime.append(float(atemp[0]))
-        alt.append(float(atemp[1]))
+    events = oev.get_events(f"{EPHEM_DIR}/Data/PE.EPH.gsme_spherical")
 
-    alen = len(alt)
-    reset_time = []
-    for k in range(0, alen-2):
-        if (alt[k] >= alt[k+1]) and (alt[k+1] <= alt[k+2]):
-            reset_time.append(stime[k+1])
-
-    return reset_time
+    return events.perigees()
 
 #-----------------------------------------------------------------------------
-#-- combine_data: combine two data set                                      --
+#-- merge_ace_data: merge two data set by time and estimate the bad data    --
 #-----------------------------------------------------------------------------
 
-def combine_data(current_ace_data, past_ace_data):
+def merge_ace_data(current_ace_data, past_ace_data, keep_before=None):
     """
-    combine two data set
-    input:  current_ace_data    --- the list of 15 lists of data
-            past_ace_data       --- the list of 15 lists of data
+    merge two data set by time and estimate the bad data of proton flux (ipol)
+    input:  current_ace_data    --- the list of 14 lists of data
+            past_ace_data       --- the list of 14 lists of data
+            keep_before         --- the past data at/before this time (the fluence
+                                    checkpoint) are kept as they are; if None, the
+                                    current data replace all the past data
                 atime   --- a time in seconds from 1998.1.1
                 jtime   --- a string time
                 echk    --- data quality of electron data
@@ -356,204 +362,141 @@ def combine_data(current_ace_data, past_ace_data):
                 anis    --- anti-iso index (inactive and all of them are -1.0)
                 ipol    --- estimated good data (112-187)
                 fluen   --- fluence (if flu > 0)
-    output: ndata       --- combined data set
+    output: ndata       --- a list of 14 arrays of the merged data in the time order;
+                            the current data replace the past data of the same time
+                            after keep_before and ipol is replaced with a new estimate
+                            there
     """
-    dlen   = len(current_ace_data)
-    clen   = len(current_ace_data[0])
-    plen   = len(past_ace_data[0])
-#
-#--- there is no new data; return past data
+    dlen  = len(current_ace_data)
+    clen  = len(current_ace_data[0])
+    plen  = len(past_ace_data[0])
 #
-    if clen < 1:
-        return past_ace_data
-
-    nstart = current_ace_data[0][0]
-#
-#--- initialize a list of lists
+#--- put the past data first so that the current data come last for the same time
 #
-    ndata  = []
+    ndata = []
     for k in range(0, dlen):
-        ndata.append([])
-#
-#--- the past data; stop at nstart (when the new data starts)
-#
-    for m in range(0, plen):
-        if past_ace_data[0][m] >= nstart:
-            break
-
-        for k in range(0, dlen):
-            ndata[k].append(past_ace_data[k][m])
-#
-#--- the current data
-#
-    for m in range(0, clen):
-        for k in range(0, dlen):
-            ndata[k].append(current_ace_data[k][m])
+        col = list(past_ace_data[k]) + list(current_ace_data[k])
+        if k == 1:
+            ndata.append(numpy.array(col, dtype=object))
+        else:
+            ndata.append(numpy.array(col))
+
+    if clen + plen == 0:
+        return ndata
+#
+#--- keep the last row of each time (the newest one); at/before keep_before, keep
+#--- the first one (the past data which already have ipol and fluence)
+#
+    atime = ndata[0]
+    order = numpy.argsort(atime, kind='stable')
+    stime = atime[order]
+    step  = stime[1:] != stime[:-1]
+    last  = numpy.append(step, True)
+    if keep_before is not None:
+        first = numpy.insert(step, 0, True)
+        last  = numpy.where(stime <= keep_before, first, last)
+    order = order[last]
+
+    ndata = [col[order] for col in ndata]
+    est   = estimate_ipol(ndata[5], ndata[7])
+    if keep_before is not None:
+        keep  = (order < plen) & (ndata[0] <= keep_before)
+        est   = numpy.where(keep, ndata[12], est)
+    ndata[12] = est
 
     return ndata
 
 #-----------------------------------------------------------------------------
-#-- fill_missing_data: update missing data proton flux list with interporation 
+#-- estimate_ipol: estimate the proton flux of the bad data                 --
 #-----------------------------------------------------------------------------
 
-def fill_missing_data(combined_data):
+def estimate_ipol(pchk, pch2):
     """
-    update missing data proton flux list with interporation
-    input:  combined_data   --- a list of lists of data. 7th list will be used for estimate
-    output: combined_data   --- a list of lists of dta. 12th list will be replaced with a new estimate
+    estimate the proton flux of the bad data from the good data around it
+    input:  pchk    --- an array of data quality of proton (0: good)
+            pch2    --- an array of proton 115-195
+    output: est     --- an array of estimated proton flux (pch2 for the good data)
     """
+    pch2  = numpy.asarray(pch2, dtype=float)
+    good  = numpy.asarray(pchk) == 0
+    dlen  = len(pch2)
+    if dlen == 0 or good.all() or not good.any():
+        return pch2.copy()
+
+    index = numpy.arange(dlen)
 #
-#--- set a list of estimated proton flux
-#
-    dlen = len(combined_data[0])
-    est  = copy.deepcopy(combined_data[7])
-    for k in range(0, dlen):
-#
-#--- find bad data
-#
-        if combined_data[5][k] != 0:
-#
-#--- find the most recent good data
-#
-            m = k -1
-            while combined_data[5][m] != 0:
-                m -= 1
-#
-#--- find the next good data
-#
-            n   = k + 1
-            chk = 0
-#
-#--- if there is no good data after the current spot, use the last good data
+#--- the most recent good data (m) and the next good data (n) of each entry
 #
-            if n >= dlen:
-                est[k] = est[m]
-                chk = 1
-            else:    
-                while combined_data[5][n] != 0:
-                    n += 1
-                    if n >= dlen:
-                        est[k] = est[m]
-                        chk = 1
-                        break
-            if chk == 1:
-                continue
+    m = numpy.maximum.accumulate(numpy.where(good, index, -1))
+    n = numpy.minimum.accumulate(numpy.where(good, index, dlen)[::-1])[::-1]
 #
-#--- extrapolate linierly
+#--- before the first good data, the last good data of the list are used 
+#--- (counted backward from the top as before)
 #
-            est[k] = est[m] + (est[m] - est[n]) * (k - m) / (n - m)
+    lgood = index[good][-1]
+    m     = numpy.where(m < 0, lgood - dlen, m)
+    vm    = pch2[m]
+    vn    = pch2[numpy.minimum(n, dlen - 1)]
 #
-#--- replace the old one with the new estimate
+#--- extrapolate linierly; if there is no good data after, use the last good data
 #
-    combined_data[12] = est
+    est   = vm + (vm - vn) * (index - m) / numpy.where(n - m == 0, 1, n - m)
+    est   = numpy.where(n >= dlen, vm, est)
 
-    return combined_data
+    return numpy.where(good, pch2, est)
 
 #-----------------------------------------------------------------------------
-#-- compute_fluence: upate fluence data list                                --
+#-- update_ace_archive: update ace.archive data file                        --
 #-----------------------------------------------------------------------------
 
-def compute_fluence(data, collection_start, collection_stop):
+def update_ace_archive(store, updated_data, head):
     """
-    upate fluence data list
-    input:  data                --- a list of lists of data 
-                                    data[0] ---time/data[17] --- fluence
-            collection_start    --- a list of fluence collection starting time
-            collection_stop     --- a list of fluence collection stopping time
-    output: data                --- fluence updated data
+    update ace.archive data file
+    input:  store               --- the store of ace.archive data
+            updated_data        --- a list of lists of data
+            head                --- a list of header lines
+    output: <ace_data_dir>/ace_archive.db
+            <ace_data_dir>/ace.archive
     """
 #
-#--- start from the last estimated fluence value at the beginning
-#
-    fluence = [data[-1][0]]
-    dlen    = len(data[0])
-    clen    = len(collection_start)
+#-- atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, ipol, fluen
+#--- the rows at/before the fluence checkpoint keep their stored ipol and fluence
+#--- (see merge_ace_data); write them back as they are
 #
-#--- find which orbital period the first data set is in
+    store.append(zip(*[numpy.asarray(col).tolist() for col in updated_data]))
+    store.set_meta('head', '\n'.join(head))
 #
-    for n in range(0, clen):
-        if (collection_start[n] <= data[0][0]) and (collection_stop[n] > data[0][0]):
-            nperiod = n+1
-            break
-#
-#--- fill the fluence based previously computed fluence between the first data and
-#--- the new orbital period starts
-#
-    for k in range(0, dlen):
-        if data[0][k] < collection_start[nperiod]:
-            fluence.append(fluence[-1] + sampl * data[-2][k])
-        else:
-            fluence.append(sampl * data[-2][k-1])
-            kstart = k
-            break
-
-    for k in range(kstart, dlen):
-#
-#--- compute the current fluence by adding the estimated flux to the previous fluence
+#--- recreate the table: newest to oldeest
 #
-        if (data[0][k] >= collection_start[nperiod]) and (data[0][k] < collection_stop[nperiod]):
-                fluence.append(fluence[-1] + sampl * data[-2][k])
-#
-#--- new period starts
-#
-        else:
-            nperiod += 1
-            fluence.append(sampl * data[-2][k])
-#
-#--- replace the fluence list
-#
-    data[-1] = fluence
-    
-    return data
+    ofile = f"{OUT_ACE_DATA_DIR}/ace.archive"
+    store.export_text(ofile, format_ace_archive_row, header=head, reverse=True)
 
 #-----------------------------------------------------------------------------
-#-- update_ace_archive: update ace.archive data file                        --
+#-- format_ace_archive_row: create a line of ace.archive                    --
 #-----------------------------------------------------------------------------
 
-def update_ace_archive(updated_data, head):
+def format_ace_archive_row(row):
     """
-    update ace.archive data file
-    input:  updated_data    --- a list of lists of data
-            head            --- a list of header lines
-    output: <ace_data_dir>/ace.archive
+    create a line of ace.archive
+    input:  row     --- [atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, ipol, fluen]
+    output: line    --- data line
     """
-#
-#--- prep to update the table
-#
-    line = ''
-    for ent in head: 
-        line = line + ent + '\n'
-#
-#--- cutting time 
-#
-    cut = updated_data[0][0] - ace_delt
-#
-#--- reverse the line: newest to oldeest
-#-- atime, jtime, echk, ech1, ech2, pchk, pch1, pch2, pch3, pch4, pch5, anis, fluen
-#
-    dlen = len(updated_data[0])
-    for k in range(0, dlen):
-        m = dlen - k -1
-        if updated_data[0][m] > cut:
-            line = line + updated_data[1][m]
-            line = line + '%3d'   % updated_data[2][m]
-            line = line + line_adjust(updated_data[3][m])
-            line = line + line_adjust(updated_data[4][m])
-            line = line + '%3d'   % updated_data[5][m]
-            line = line + line_adjust(updated_data[6][m])
-            line = line + line_adjust(updated_data[7][m])
-            line = line + line_adjust(updated_data[8][m])
-            line = line + line_adjust(updated_data[9][m])
-            line = line + line_adjust(updated_data[10][m])
-            line = line + '%7.2f' % updated_data[11][m]
-            line = line + line_adjust(updated_data[12][m])
-            line = line + line_adjust(updated_data[13][m])
-            line = line + '\n'
+    line = row[1]
+    line = line + '%3d'   % row[2]
+    line = line + line_adjust(row[3])
+    line = line + line_adjust(row[4])
+    line = line + '%3d'   % row[5]
+    line = line + line_adjust(row[6])
+    line = line + line_adjust(row[7])
+    line = line + line_adjust(row[8])
+    line = line + line_adjust(row[9])
+    line = line + line_adjust(row[10])
+    line = line + '%7.2f' % row[11]
+    line = line + line_adjust(row[12])
+    line = line + line_adjust(row[13])
+    line = line + '\n'
 
-    ofile = f"{OUT_ACE_DATA_DIR}/ace.archive"
-    
-    with open(ofile, 'w') as fo:
-        fo.write(line)
+    return line
 
 #-----------------------------------------------------------------------------
 #-- update_secondary_archive_files: update ace_12h_archive, ace_7day_archive and long tem data files
@@ -593,6 +536,7 @@ def update_long_term_data(ndata):
     update long term data
     input:  ndata   --- a list of lists of new data
     output: <ace_data_dir>/longterm/ace_data.txt
+            <ace_data_dir>/longterm/Monthly/ace_data_<yyyy>_<mm>.txt
     """
     dfile = f"{ACE_DATA_DIR}/longterm/ace_data.txt"
     last_line = subprocess.check_output(f"tail -n 1 {dfile}", shell=True, executable='/bin/csh').decode()
@@ -628,8 +572,17 @@ def update_long_term_data(ndata):
             line = line + '%7.2f' % ndata[11][m]
             line = line + '\n'
     
-    with open(f"{OUT_ACE_DATA_DIR}/longterm/ace_data.txt", 'a') as fo:
+    ofile = f"{OUT_ACE_DATA_DIR}/longterm/ace_data.txt"
+    with open(ofile, 'a') as fo:
         fo.write(line)
+#
+#--- copy the new lines into the monthly files
+#
+    mar.sync(ofile, f"{OUT_ACE_DATA_DIR}/longterm/Monthly", 'ace_data', mar.calendar_line_time)
+#
+#--- and add them to the hourly/daily rollups of the radiation plots
+#
+    rrl.update('ace', f"{OUT_ACE_DATA_DIR}/longterm/Monthly")
 
 #-----------------------------------------------------------------------------
 #-- create_new_table: update the data table file with the newest data       --
@@ -697,82 +650,22 @@ def line_adjust(ent):
         line = '  %.2e' % ent
     return line
 
-#-----------------------------------------------------------------------------
-#-- compute_latest_fluence: compute the fluence of the last period         ---
-#-----------------------------------------------------------------------------
-
-def compute_latest_fluence(data_set, c_start):
-    """
-    compute the fluence of the last period
-    input:  data_set---  a list of lists of data
-            c_start --- a list of fluence reset time
-    output: a list of fluence of each channel and integreation time in seconds
-    """
-#
-#--- find the fluence period starting time
-#
-    r_start = c_start[::-1]
-    for ent in r_start:
-        if data_set[0][-1] > ent:
-            f_start = ent
-            break
-
-    fech1 = 0.0
-    fech2 = 0.0
-    fpch1 = 0.0
-    fpch2 = 0.0
-    fpch3 = 0.0
-    fpch4 = 0.0
-    fpch5 = 0.0
-    dlen  = len(data_set[0])
-    for k in range(0, dlen):
-#
-#--- drop bad data
-#
-        if (data_set[2][k] != 0) or (data_set[5][k] != 0):
-            continue
-     
-        if data_set[0][k] < f_start:
-            continue
-#
-#--- drop all negative values
-#
-        chk = 0
-        for n in range(3, 11):
-            if data_set[n][k] < 0.0:
-                chk = 1
-                continue
-        if chk  > 0:
-            continue
-
-        fech1 += data_set[3][k]  * sampl
-        fech2 += data_set[4][k]  * sampl
-        fpch1 += data_set[6][k]  * sampl
-        fpch2 += data_set[7][k]  * sampl
-        fpch3 += data_set[8][k]  * sampl
-        fpch4 += data_set[9][k]  * sampl
-        fpch5 += data_set[10][k] * sampl
-    
-    tacc = data_set[0][-1] - f_start
-
-    return [fech1, fech2, fpch1, fpch2, fpch3, fpch4, fpch5, tacc]
-
 #-----------------------------------------------------------------------------
 #-- updat_fluace_data_file: fluace data file                                --
 #-----------------------------------------------------------------------------
 
-def updat_fluace_data_file(data_set, header,  c_start):
+def updat_fluace_data_file(data_set, header,  acc):
     """
     update fluace data file
     input:  data_set---  a list of lists of data
             header  --- a list of header lines
-            c_start --- a list of fluence reset time
+            acc     --- ace_fluence.FluenceAccumulator which has the latest fluence
     output: <ace_data_dir>/fluace.dat
     """
 #
-#--- compute the latest fluence
+#--- the latest fluence of the current orbit
 #
-    [fech1, fech2, fpch1, fpch2, fpch3, fpch4, fpch5, tacc] = compute_latest_fluence(data_set, c_start)
+    [fech1, fech2, fpch1, fpch2, fpch3, fpch4, fpch5, tacc] = acc.latest()
 #
 #--- start writing data table --- the header part first
 # 
@@ -59,6 +59,8 @@ if (os.getenv('TEST') == 'TEST'):
 #--- import several functions
 #
 import extract_radiation_data    as erd        #---- radiation related data reading
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import interval_set              as ivs        #---- sorted and merged time intervals
 #
 #--- temp writing file name
 #
@@ -360,35 +362,20 @@ def find_fmt_region(start, stop, fmt, time):
             stop_set  = [fmt1_stop,  fmt2_stop,  fmt3_stop,  fmt4_stop,  fmt5_stop]
     """
 #
-#--- create dictioinary with fmt names
+#--- the periods of each fmt; a period runs from the time the fmt changes to it
+#--- to the time of the next change (the last one to the last time)
 #
+    f_run   = ivs.runs(time, [fval.lower() for fval in fmt])
+
     s_start = {}
     s_stop  = {}
     for fval in ['fmt1', 'fmt2','fmt3','fmt4','fmt5','fmt6','fmt7','fmt8']:
-        s_start[fval] = []
-        s_stop[fval]  = []
-
-    flen = len(fmt)
-#
-#--- start reading fmt; if fmt is same as one before, skip
-#
-    prev = fmt[0].lower()
-    s_start[prev] = [time[0]]
-
-    for k in range(1, flen):
-        fval = fmt[k].lower()
-        if fval == prev:
-            continue
+        if fval in f_run:
+            s_start[fval] = f_run[fval].starts.tolist()
+            s_stop[fval]  = f_run[fval].stops.tolist()
         else:
-            s_stop  = update_dict_ent(s_stop,  prev, time[k])
-            s_start = update_dict_ent(s_start, fval, time[k])
-            prev    = fval
-#
-#--- closet the last entry
-#
-    flast  = fmt[flen-1].lower()
-    ftime  = time[flen-1]
-    s_stop = update_dict_ent(s_stop, flast, ftime)
+            s_start[fval] = []
+            s_stop[fval]  = []
 #
 #--- since fmt3 , fmt4, fmt5 don't happen often and rather quick, expand the "line" width
 #--- so that we can see on the plot
@@ -402,22 +389,6 @@ def find_fmt_region(start, stop, fmt, time):
 
     return [start_set, stop_set]
 
-#----------------------------------------------------------------------------------------------------------
-#----------------------------------------------------------------------------------------------------------
-#----------------------------------------------------------------------------------------------------------
-
-def update_dict_ent(cdict, key, val):
-
-    try:
-        out = cdict[key]
-        out.append(val)
-        cdict[key] = out
-    except:
-        cdict[key] = [val]
-
-    return cdict
-
-
 #----------------------------------------------------------------------------------------------------------
 #-- plot_strip_box: plotting shaded boxes on a panel                                                     --
 #----------------------------------------------------------------------------------------------------------
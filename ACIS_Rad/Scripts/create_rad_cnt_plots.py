@@ -44,6 +44,14 @@ if (os.getenv('TEST') == 'TEST'):
     os.system('mkdir -p TestOut')
     test_out = os.getcwd() + '/TestOut'
 #
+#--- shared modules
+#
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import month_archive as mar
+import rollup        as rol
+import rad_rollups   as rrl
+import time_convert  as tcv
+#
 #--- temp writing file name
 #
 import random
@@ -53,6 +61,10 @@ zspace = '/tmp/zspace' + str(rtail)
 #--- others
 #
 colorList = ['red','blue', 'lime', 'green', 'maroon']
+#
+#--- the beginning of the acis dose data
+#
+DOSE_START = Chandra.Time.DateTime('1999:200:00:00:00').secs
 m_list    = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun','Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
 #----------------------------------------------------------------------------------------------------------
@@ -84,6 +96,12 @@ def plot_radiation_counts(start, stop, outname):
 #--- set plotting plate
 #
     plt.close("all")
+#
+#--- set the size of the plotting area in inch (width: 12.0in, height 10.0in); the panel
+#--- width in pixels decides the resolution of the data read for a long period
+#   
+    fig = matplotlib.pyplot.gcf()
+    fig.set_size_inches(12.0, 10.0)
     mpl.rcParams['font.size'] = 11 
     props = font_manager.FontProperties(size=6)
     plt.subplots_adjust(hspace=0.06)
@@ -98,50 +116,57 @@ def plot_radiation_counts(start, stop, outname):
     if stop <= 699411594:                           #--- Mar 01, 2020 01:00:00
         title     = 'GOES Primary Rates'
         ylabel    = 'particles/cm^2 Sr s MeV'
-        pdata     = read_goes_data(start, stop, byear)
+        [pdata, band] = read_panel_data(ax1, 'goes', start, stop, lambda a, b: read_goes_data(a, b, byear))
         dname_set = ['0.8-4','4-9','40-80', '(in Kev)']
-        plot_strip(ax1, start, stop, 1.0e-2, 1.0e3, pdata[0], pdata[1:], dname_set, title, ylabel)
+        plot_strip(ax1, start, stop, 1.0e-2, 1.0e3, pdata[0], pdata[1:], dname_set, title, ylabel,\
+                   band_set=band)
     else:
         title     = 'GOES R Rates'
         ylabel    = 'particles/cm^2 Sr s MeV'
-        pdata     = read_goes_data_r(start, stop, byear)
+        [pdata, band] = read_panel_data(ax1, 'goes_r', start, stop, lambda a, b: read_goes_data_r(a, b, byear))
         dname_set = ['1.0-3.3','3.4-11','40-98', '(in Kev)']
-        plot_strip(ax1, start, stop, 1.0e-4, 1.0e3, pdata[0], pdata[1:], dname_set, title, ylabel)
+        plot_strip(ax1, start, stop, 1.0e-4, 1.0e3, pdata[0], pdata[1:], dname_set, title, ylabel,\
+                   band_set=band)
 #
 #--- ace data
 #
-    pdata     = read_ace_data(start,  stop, byear)
     dname_set = ['47-65','112-187','310-580', '761-1220', '1060-1810', '(in Kev)']
     title     = 'ACE Rates'
     ylabel    = 'particles/cm^2 Sr s MeV'
     ax2       = plt.subplot(4, 1, 2)
-    plot_strip(ax2, start, stop, 1.0e-4, 1.0e6, pdata[0], pdata[1:], dname_set, title, ylabel)
+    [pdata, band] = read_panel_data(ax2, 'ace', start, stop, lambda a, b: read_ace_data(a, b, byear))
+    plot_strip(ax2, start, stop, 1.0e-4, 1.0e6, pdata[0], pdata[1:], dname_set, title, ylabel,\
+               band_set=band)
 #
 #--- xmm data
 #
-    pdata     = read_xmm_data(start,  stop)
     dname_set = ['LE1', 'LE2', 'HES1', 'HES2', 'HESC']
     title     = 'XMM Rates'
     ylabel    = 'Counts/sec'
     ax3       = plt.subplot(4, 1, 3)
-    plot_strip(ax3, start, stop, 1.0e-1, 1.0e6, pdata[0], pdata[1:], dname_set, title, ylabel)
+    [pdata, band] = read_panel_data(ax3, 'xmm', start, stop, read_xmm_data)
+    plot_strip(ax3, start, stop, 1.0e-1, 1.0e6, pdata[0], pdata[1:], dname_set, title, ylabel,\
+               band_set=band)
 #
 #--- acis data
 #
-    pdata     = read_cti_data(start,  stop)
     dname_set = ['CCD5', 'CCD6', 'CCD7']
     title     = 'ACIS Rates'
     ylabel    = 'Counts/sec'
     xlabel    = 'Year Date (Year: ' +  str(byear) + ')'
     ax4       = plt.subplot(4, 1, 4)
-    t_list    = [pdata[0][0], pdata[1][0], pdata[2][0]]
-    d_list    = [pdata[0][1], pdata[1][1], pdata[2][1]]
-    plot_strip(ax4, start, stop, 0, 50.0, t_list, d_list, dname_set, title, ylabel, xname=xlabel, ylog=0)
+    [pdata, band] = read_panel_data(ax4, 'acis', start, stop, read_cti_data)
 #
-#--- set the size of the plotting area in inch (width: 10.0in, height 5.0in)
-#   
-    fig = matplotlib.pyplot.gcf()
-    fig.set_size_inches(12.0, 10.0)
+#--- the original data have a time list for each ccd; the rollup bins are shared
+#
+    if band is None:
+        t_list = [pdata[0][0], pdata[1][0], pdata[2][0]]
+        d_list = [pdata[0][1], pdata[1][1], pdata[2][1]]
+    else:
+        t_list = pdata[0]
+        d_list = pdata[1:]
+    plot_strip(ax4, start, stop, 0, 50.0, t_list, d_list, dname_set, title, ylabel, xname=xlabel, ylog=0,\
+               band_set=band)
     #fig.tight_layout()                 #---- this makes too tight; commented out
 #
 #--- save the plot in png format
@@ -156,7 +181,8 @@ def plot_radiation_counts(start, stop, outname):
 #-- plot_strip: create plot panel data                                                                  ---
 #----------------------------------------------------------------------------------------------------------
 
-def plot_strip(ax, xmin, xmax, ymin, ymax, stime, data_set, dname_set, title, yname, xname = '', ylog=1):
+def plot_strip(ax, xmin, xmax, ymin, ymax, stime, data_set, dname_set, title, yname, xname = '', ylog=1,\
+               band_set=None):
     """
     create plot panel data
     input:  ax          --- ax name
@@ -171,6 +197,8 @@ def plot_strip(ax, xmin, xmax, ymin, ymax, stime, data_set, dname_set, title, yn
             yname       --- y label nanme
             xname       --- x label name; default:''
             ylog        --- indicator to set y axis in log 1: yes/0: no
+            band_set    --- [<a list of lists of min>, <a list of lists of max>] of the rolled
+                            up data; the min-max range is drawn behind the data. default: None
     output: plot panel data
     """
 #
@@ -191,12 +219,7 @@ def plot_strip(ax, xmin, xmax, ymin, ymax, stime, data_set, dname_set, title, yn
 
     [year1, xmin] = convert_time_format3(xmin)
     [year2, xmax] = convert_time_format3(xmax)
-    if year2 > year1:
-        if isLeapYear(year1) == 1:
-            base = 366
-        else:
-            base = 365
-        xmax += base
+    xmax += year_offset(year1, year2)
 #
 #--- set plotting range
 #
@@ -223,6 +246,11 @@ def plot_strip(ax, xmin, xmax, ymin, ymax, stime, data_set, dname_set, title, yn
             else:
                 if len(t_list[k]) > 0:
                     plt.plot(t_list[k], data_set[k], color=colorList[k], marker='.', markersize=1, lw=0)
+#
+#--- min-max range of the rolled up data
+#
+        if band_set is not None and dchk == 0 and len(ytime) > 0:
+            plt.vlines(ytime, band_set[0][k], band_set[1][k], color=colorList[k], lw=0.5, alpha=0.3)
 
 #
 #--- put axis label
@@ -267,6 +295,116 @@ def plot_strip(ax, xmin, xmax, ymin, ymax, stime, data_set, dname_set, title, yn
         else:
             plt.text(xpos, ypos, dname_set[k], color=colorList[k])
 
+#----------------------------------------------------------------------------------------------------------
+#-- read_panel_data: read the data of a plot panel in the resolution which fills the panel width         --
+#----------------------------------------------------------------------------------------------------------
+
+def read_panel_data(ax, key, start, stop, reader):
+    """
+    read the data of a plot panel. for a long period, the coarsest rollup (hourly/daily
+    min-mean-max) which still gives one bin per pixel of the panel is read instead of
+    the original data
+    input:  ax      --- ax name
+            key     --- data set name (see find_rollup_source)
+            start   --- starting time in seconds from 1998.1.1
+            stop    --- stopping time in seconds from 1998.1.1
+            reader  --- function to read the original data: reader(start, stop)
+    output: [pdata, band]
+                pdata   --- list of data: time, data1, data2, ...
+                band    --- [<list of min lists>, <list of max lists>] or None
+    """
+    width = ax.get_window_extent().width
+    res   = rol.pick_resolution(start, stop, width)
+    if res is not None:
+        try:
+            out = read_rollup_data(key, start, stop, res)
+            if out is not None:
+                return out
+        except OSError:
+            pass
+
+    return [reader(start, stop), None]
+
+#----------------------------------------------------------------------------------------------------------
+#-- read_rollup_data: read the rolled up data between start and stop time period                         --
+#----------------------------------------------------------------------------------------------------------
+
+def read_rollup_data(key, start, stop, res):
+    """
+    read the rolled up data between start and stop time period. the rollups are kept
+    current by the ingestion scripts (see update_rollups); they are only read here
+    input:  key     --- data set name (see find_rollup_source)
+            start   --- starting time in seconds from 1998.1.1
+            stop    --- stopping time in seconds from 1998.1.1
+            res     --- resolution name: 'hour' or 'day'
+    output: [pdata, band] or None if the rollup has no bin in the period
+                pdata   --- list of data: time (the middle of the bin), mean1, mean2, ...
+                band    --- [<list of min lists>, <list of max lists>]
+    """
+    part_dir = find_rollup_source(key)[0]
+
+    [t_list, mins, means, maxs] = rrl.read_window(key, part_dir, res, start, stop)
+    if len(t_list) == 0:
+        return None
+
+    t_list = t_list + 0.5 * dict(rol.RESOLUTIONS)[res]
+
+    return [[list(t_list)] + [list(ent) for ent in means], [mins, maxs]]
+
+#----------------------------------------------------------------------------------------------------------
+#-- update_rollups: bring the rollups of the data written outside of this system up to date             --
+#----------------------------------------------------------------------------------------------------------
+
+def update_rollups():
+    """
+    bring the monthly files and the rollups of the data written outside of this system
+    (goes_data.txt and the acis dose files) up to date. the goes_r, ace and xmm rollups
+    are updated by their ingestion scripts (collect_goes_long.py, update_ace_data_files.py
+    and update_xmm_rad_data.py)
+    input:  none
+    output: the monthly files and the rollups in <goes_dir>/Data/Monthly and <acis_dir>/Data/Monthly
+    """
+    for key in ['goes', 'acis']:
+        [part_dir, name, legacy, time_of, values_of] = find_rollup_source(key)
+#
+#--- the acis dose data have no legacy archive; they are copied from the monthly dose files
+#
+        if key == 'acis':
+            sync_acis_dose(part_dir, name)
+        else:
+            mar.sync(legacy, part_dir, name, time_of)
+
+        rrl.update(key, part_dir)
+
+#----------------------------------------------------------------------------------------------------------
+#-- find_rollup_source: give the archive and the value function of a data set                           --
+#----------------------------------------------------------------------------------------------------------
+
+def find_rollup_source(key):
+    """
+    give the archive and the value function of a data set
+    input:  key     --- data set name: 'goes', 'goes_r', 'ace', 'xmm', 'acis'
+    output: [<monthly file dir>, <archive name>, <legacy archive>, <line time function>,
+             <value function>] (see rad_rollups.find_source)
+    """
+    [name, time_of, values_of] = rrl.find_source(key)
+
+    if key == 'goes':
+        return [goes_dir + 'Data/Monthly', name, goes_dir + 'Data/goes_data.txt', time_of, values_of]
+
+    elif key == 'goes_r':
+        return [goes_dir + 'Data/Monthly', name, goes_dir + 'Data/goes_data_r.txt', time_of, values_of]
+
+    elif key == 'ace':
+        return [ace_dir + 'Data/longterm/Monthly', name, ace_dir + 'Data/longterm/ace_data.txt',\
+                time_of, values_of]
+
+    elif key == 'acis':
+        return [acis_dir + 'Data/Monthly', name, None, time_of, values_of]
+
+    else:
+        return [xmm_dir + 'Data/Monthly', name, xmm_dir + 'Data/xmm.archive', time_of, values_of]
+
 #----------------------------------------------------------------------------------------------------------
 #-- read_goes_data: read GOES Data between start and stop time period                                    --
 #----------------------------------------------------------------------------------------------------------
@@ -279,26 +417,23 @@ def read_goes_data(start, stop, byear):
             byear   --- year of the starting time
     output: list of data: goes_time, goes_p1, goes_p2, goes_p5
     """
-    goesfile  = goes_dir + 'Data/goes_data.txt'
-    data      = read_data_file(goesfile)
+    [part_dir, name, goesfile, time_of, values_of] = find_rollup_source('goes')
+#
+#--- read only the monthly files in the period
+#
+    data      = mar.read_window(part_dir, name, start, stop, time_of, legacy=goesfile)
     goes_time = []
     goes_p1   = []
     goes_p2   = []
     goes_p5   = []
-    stime     = 0
     for ent in data:
-        atemp = re.split('\s+', ent)
-        if int(atemp[0]) < byear:
-            continue
-        elif stime > stop:
-            break
-        else:
-            stime = convert_time_format(atemp[0], atemp[1], atemp[2], atemp[3])
-            goes_time.append(stime)
-            goes_p1.append(float(atemp[6]))
-            goes_p2.append(float(atemp[7]))
-            goes_p5.append(float(atemp[10]))
+        [p1, p2, p5] = values_of(ent)
+        goes_time.append(time_of(ent))
+        goes_p1.append(p1)
+        goes_p2.append(p2)
+        goes_p5.append(p5)
 
+    return [goes_time, goes_p1, goes_p2, goes_p5]
 
 #----------------------------------------------------------------------------------------------------------
 #-- read_goes_data_r: read GOES Data between start and stop time period  (newer data set)                --
@@ -315,43 +450,22 @@ def read_goes_data_r(start, stop, byear):
                 p2 :  3.4MeV - 11MeV
                 p4 :  40MeV  - 98MeV
     """
-    goesfile  = goes_dir + 'Data/goes_data_r.txt'
-    data      = read_data_file(goesfile)
+    [part_dir, name, goesfile, time_of, values_of] = find_rollup_source('goes_r')
+#
+#--- read only the monthly files in the period; the header lines are skipped
+#
+    data      = mar.read_window(part_dir, name, start, stop, time_of, legacy=goesfile)
 
     goes_time = []
     goes_p1   = []
     goes_p2   = []
     goes_p4   = []
-    for ent in data[2:]:        #--- the first two lines are headers
-        adat  = re.split('\s+', ent)
-
-        try:
-            stime = Chandra.Time.DateTime(adat[0]).secs
-            if stime < start:
-                continue
-            goes_time.append(stime)
-        except:
-            continue
-
-        c0    = float(adat[1])
-        c1    = float(adat[2])
-        c2    = float(adat[3])
-        c3    = float(adat[4])
-        c4    = float(adat[5])
-        c7    = float(adat[8])
-        c8    = float(adat[9])
-#
-#--- combine the data for the bands
-#
-        val = (c0 *(1.85 - 1.02)  + c1 * (2.3 - 1.9) + c2  * (3.3 - 2.3)) / (3.3 -1.0)
-        goes_p1.append(val)
-
-        val = (c3 * (6.48 - 3.4) + c4 * (11.0 - 5.84)) / (11 - 3.4)
-        goes_p2.append(val)
-
-        val = (c7 * (73.4 - 40.3)+ c8 * (98.5 - 83.7)) / (98.5 - 40.3)
-        goes_p4.append(val)
-
+    for ent in data:
+        [p1, p2, p4] = values_of(ent)
+        goes_time.append(time_of(ent))
+        goes_p1.append(p1)
+        goes_p2.append(p2)
+        goes_p4.append(p4)
 
     return [goes_time, goes_p1, goes_p2, goes_p4]
 
@@ -367,29 +481,25 @@ def read_ace_data(start, stop, byear):
             byear   --- year of starting time
     output: list of data: ace_time, ace_ch1, ace_ch2, ace_ch3, ace_ch4, ace_ch5
     """
-    acefile  = ace_dir  + 'Data/longterm/ace_data.txt'
-    data     = read_data_file(acefile)
+    [part_dir, name, acefile, time_of, values_of] = find_rollup_source('ace')
+#
+#--- read only the monthly files in the period
+#
+    data     = mar.read_window(part_dir, name, start, stop, time_of, legacy=acefile)
     ace_time = []
     ace_ch1  = []
     ace_ch2  = []
     ace_ch3  = []
     ace_ch4  = []
     ace_ch5  = []
-    stime    = 0
     for ent in data:
-        atemp = re.split('\s+', ent)
-        if int(atemp[0])  < byear:
-            continue
-        elif stime > stop:
-            break
-        else:
-            stime = convert_time_format(atemp[0], atemp[1], atemp[2], atemp[3])
-            ace_time.append(stime)
-            ace_ch1.append(float(atemp[10]))
-            ace_ch2.append(float(atemp[11]))
-            ace_ch3.append(float(atemp[12]))
-            ace_ch4.append(float(atemp[13]))
-            ace_ch5.append(float(atemp[14]))
+        [ch1, ch2, ch3, ch4, ch5] = values_of(ent)
+        ace_time.append(time_of(ent))
+        ace_ch1.append(ch1)
+        ace_ch2.append(ch2)
+        ace_ch3.append(ch3)
+        ace_ch4.append(ch4)
+        ace_ch5.append(ch5)
 
     return [ace_time, ace_ch1, ace_ch2, ace_ch3, ace_ch4, ace_ch5]
 
@@ -407,39 +517,26 @@ def read_xmm_data(start, stop):
 #
 #--- xmm data
 #
-    xmmfile  = xmm_dir  + 'Data/xmm.archive'
-    data     = read_data_file(xmmfile)
+    [part_dir, name, xmmfile, time_of, values_of] = find_rollup_source('xmm')
+    data     = mar.read_window(part_dir, name, start, stop, time_of, legacy=xmmfile)
     xmm_time = []
-    le0      = []
     le1      = []
     le2      = []
-    hes0     = []
     hes1     = []
     hes2     = []
     hesc     = []
     for ent in data:
-        atemp = re.split('\s+', ent)
         try:
-            stime = float(atemp[0])
+            vals = values_of(ent)
         except:
             continue
-        if stime < start:
-            continue
-        elif stime > stop:
-            continue
-            #break
-        else:
-            try:
-                xmm_time.append(stime)
-                #le0.append(float(atemp[1]))
-                le1.append(float(atemp[2]))
-                le2.append(float(atemp[3]))
-                #hes0.append(float(atemp[4]))
-                hes1.append(float(atemp[5]))
-                hes2.append(float(atemp[6]))
-                hesc.append(float(atemp[7]))
-            except:
-                continue
+
+        xmm_time.append(time_of(ent))
+        le1.append(vals[0])
+        le2.append(vals[1])
+        hes1.append(vals[2])
+        hes2.append(vals[3])
+        hesc.append(vals[4])
 
     return [xmm_time, le1, le2, hes1, hes2, hesc]
 
@@ -456,7 +553,11 @@ def read_cti_data(start, stop):
     """
     #ctifile     = mta_dir  + 'Data/cti_data.txt'
     ctifile  = '/data/mta4/www/DAILY/mta_rad/cti_data.txt'
-    data     = read_data_file(ctifile)
+#
+#--- cti_data.txt is written outside of this system; it is split into the monthly files here
+#
+    data     = mar.read_window(acis_dir + 'Data/Monthly', 'cti_data', start, stop,\
+                               cti_line_time, legacy=ctifile)
     cti_start = []
     cti_stop  = []
     for ent in data:
@@ -492,6 +593,66 @@ def read_cti_data(start, stop):
 
     return [ccd5, ccd6, ccd7]
 
+#----------------------------------------------------------------------------------------------------------
+#-- sync_acis_dose: copy the new acis dose data into the monthly files                                   --
+#----------------------------------------------------------------------------------------------------------
+
+def sync_acis_dose(part_dir, name):
+    """
+    copy the acis dose data newer than the last partitioned line into the monthly files
+    so that they can be rolled up. a line is <time> <ccd5> <ccd6> <ccd7> (count rates;
+    nan where a ccd has no data at the time). the data are copied only up to the time
+    which all three ccds have reached, so that a ccd file written later is not skipped
+    input:  part_dir    --- the directory of the monthly files
+            name        --- the archive name
+    output: the number of the lines added
+    """
+    last  = mar.last_time(part_dir, name, mar.secs_line_time)
+    start = DOSE_START if last is None else last + 1.0
+    stop  = Chandra.Time.DateTime().secs
+
+    f_list = find_acis_does_files(start, stop)
+    doses  = [read_ccd_dose(ccd, f_list, start, stop) for ccd in ['ccd5', 'ccd6', 'ccd7']]
+    if min([len(ent[0]) for ent in doses]) == 0:
+        return 0
+#
+#--- merge the three time lists; keep only the part all the ccds have reached
+#
+    tend   = min([ent[0][-1] for ent in doses])
+    t_all  = numpy.unique(numpy.concatenate([numpy.array(ent[0]) for ent in doses]))
+    t_all  = t_all[t_all <= tend]
+    vals   = numpy.full((3, len(t_all)), numpy.nan)
+    for k in range(0, 3):
+        t_ccd = numpy.array(doses[k][0])
+        d_ccd = numpy.array(doses[k][1])
+        keep  = t_ccd <= tend
+        vals[k, numpy.searchsorted(t_all, t_ccd[keep])] = d_ccd[keep]
+
+    lines = []
+    for m in range(0, len(t_all)):
+        lines.append('%d\t%s\t%s\t%s' % (t_all[m], vals[0, m], vals[1, m], vals[2, m]))
+
+    return mar.append(part_dir, name, lines, mar.secs_line_time)
+
+#----------------------------------------------------------------------------------------------------------
+#-- cti_line_time: give the time of a line of cti_data.txt                                              --
+#----------------------------------------------------------------------------------------------------------
+
+def cti_line_time(line):
+    """
+    give the time of a line of cti_data.txt (seconds from 1998.1.1 or <yyyy>-<mm>-<dd>T<hh>:<mm>:<ss>)
+    input:  line    --- data line
+    output: time in seconds from 1998.1.1; None if it is not a data line
+    """
+    stime = mar.secs_line_time(line)
+    if stime is not None:
+        return stime
+
+    try:
+        return convert_time_format2(re.split('\s+', line)[0])
+    except:
+        return None
+
 #----------------------------------------------------------------------------------------------------------
 #-- convert_time_format: given <yyyy> <mm> <dd> <hh>:<mm> time data, convert it to seconds from 1998.1.1 --
 #----------------------------------------------------------------------------------------------------------
@@ -560,27 +721,34 @@ def convert_s_list_to_yd_list(s_list):
     """
     convert a list of time in seconds from 1998.1.1 to a list of ydate
     input:  s_list  --- a list of time in seconds from 1998.1.1
-    output: yd_list --- a list of time in fractional ydate
+    output: yd_list --- a list of time in fractional ydate; the days of the years
+                        after the first year are added (e.g. 367.5 for Jan 2 of the next year)
     """
+    [year, yday] = tcv.secs_to_fdoy(numpy.asarray(s_list, dtype=float) + 1.0)
+    syear        = int(year[0])
 
-    out   = Chandra.Time.DateTime(s_list[0] +2.0).date
-    atemp = re.split(':', out)
-    syear = int(atemp[0])
+    yd_list = []
+    for k in range(0, len(yday)):
+        yd_list.append(float(yday[k]) + year_offset(syear, int(year[k])))
 
-    if isLeapYear(syear) == 1:
-        base = 366
-    else:
-        base = 365
+    return yd_list
 
-    yd_list = []
-    for ent in s_list:
-        [year, yday] = convert_time_format3(ent)
-        if year > syear:
-            yday += base
+#----------------------------------------------------------------------------------------------------------
+#-- year_offset: give the number of days from the beginning of a year to the beginning of another year  --
+#----------------------------------------------------------------------------------------------------------
 
-        yd_list.append(yday)
+def year_offset(syear, year):
+    """
+    give the number of days from the beginning of a year to the beginning of another year
+    input:  syear   --- the base year
+            year    --- the year
+    output: the number of days (0 if year <= syear)
+    """
+    days = 0
+    for ent in range(syear, year):
+        days += 365 + isLeapYear(ent)
 
-    return yd_list
+    return days
 
 #----------------------------------------------------------------------------------------------------------
 #-- find_acis_does_files: find acis does data file names of a given time period                          --
@@ -600,19 +768,12 @@ def find_acis_does_files(start, stop):
     [eyr, emon] = find_year_mon(stop)
 
     f_list = []
-    if syr == eyr:
-        for k in range(smon, emon+1):
-            mon = m_list[k-1]
-            path = does_dir + mon.upper() + str(syr)
-            f_list.append(path)
-    else:
-        for k in range(smon, 13):
-            mon = m_list[k-1]
-            path = does_dir + mon.upper() + str(syr)
-            f_list.append(path)
-        for k in range(1, emon+1):
-            mon = m_list[k-1]
-            path = does_dir + mon.upper() + str(eyr)
+    for year in range(syr, eyr+1):
+        mstart = smon if year == syr else 1
+        mstop  = emon if year == eyr else 12
+        for k in range(mstart, mstop+1):
+            mon  = m_list[k-1]
+            path = does_dir + mon.upper() + str(year)
             f_list.append(path)
 
     return f_list
@@ -860,4 +1021,5 @@ if __name__ == "__main__":
     else:
         print("Input: start stop in the format of 2014:204:00:00:00 or in seconds from 1998.1.1")
         exit(1)
+    update_rollups()
     plot_radiation_counts(start, stop, out)
@@ -62,6 +62,11 @@ def create_radiation_realted_plots():
     output: radiation related png files
     """
 #
+#--- bring the rollups of goes_data.txt and the acis dose data up to date (the other
+#--- rollups are updated by their ingestion scripts); the plots only read them
+#
+    crcp.update_rollups()
+#
 #--- find today's date
 #
     today = time.strftime("%Y:%j:00:00:00", time.gmtime())
@@ -119,54 +124,50 @@ def create_radiation_realted_plots():
 
         create_plots(start, stop, cout1, cout2, cout3, cout4, cout5)
 
-    exit(1)         #---- we are not plotting  longer period anymore
-#-------------------------------------------------------------------------------
+#
+#--- longer periods: the radiation count plots read the hourly/daily rollups
+#--- (the configuration plots are not created for these periods)
+#
+    yday   = int(time.strftime("%j", time.gmtime()))
+    syear2 = str(year - 1)
+#
 #--- last year
 #
     if (yday > 2) and (yday < 5):
         out1 = plot_dir + "rad_cnts_"     + syear2  + ".png"
-        out2 = plot_dir + "rad_use_"      + syear2  + ".png"
-        out1  = ''
-        out2  = ''
+        out2 = ''
         out3 = plot_dir + "mon_diff_"     + syear2  + ".png"
         out4 = plot_dir + "per_diff_"     + syear2  + ".png"
         out5 = plot_dir + "mon_per_diff_" + syear2  + ".png"
 
-        start = last_year + ':001' + ':00:00:00'
-        stop  = lmon_year + ':001' + ':00:00:00'
-        stop  = str(year) + ':001' + ':00:00:00'
+        start = syear2    + ':001:00:00:00'
+        stop  = str(year) + ':001:00:00:00'
         create_plots(start, stop, out1, out2, out3, out4, out5)
-
 #
 #--- last one year
 #
     if yday % 3 == 0:
         out1 = plot_dir + "rad_cnts_last_one_year.png"
-        out2 = plot_dir + "rad_use_last_one_year.png"
-        out1 = ''
         out2 = ''
         out3 = plot_dir + "mon_diff_last_one_year.png"
         out4 = plot_dir + "per_diff_last_one_year.png"
         out5 = plot_dir + "mon_per_diff_last_one_year.png"
 
-        start = last_year + ":" + today + ':00:00:00'
-        #stop  = lmon_year + ":" + today + ':00:00:00'
-        stop  = str(year) + ":" + today + ':00:00:00'
+        stop  = Chandra.Time.DateTime(time.strftime("%Y:%j:00:00:00", time.gmtime())).secs
+        start = stop - 365 * 86400
         create_plots(start, stop, out1, out2, out3, out4, out5)
 #
 #--- entire period
 #
     if day == 10:
         out1 = plot_dir + "rad_cnts_all.png"
-        out2 = plot_dir + "rad_use_all.png"
-        out1 = ''
         out2 = ''
         out3 = plot_dir + "mon_diff_all.png"
         out4 = plot_dir + "per_diff_all.png"
         out5 = plot_dir + "mon_per_diff_all.png"
 
-        start = '1999:200'
-        stop  = str(year) + ':' + str(yday)
+        start = '1999:200:00:00:00'
+        stop  = time.strftime("%Y:%j:00:00:00", time.gmtime())
         create_plots(start, stop, out1, out2, out3, out4, out5)
 
 #----------------------------------------------------------------------------------------------------------
@@ -46,6 +46,10 @@ sys.path.append('/data/mta4/Script/Python3.10/MTA/')
 #--- import several functions
 #
 import mta_common_functions as mcf
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import ts_store
+import time_convert         as tcv
+import interval_set         as ivs
 #
 #--- temp writing file name
 #
@@ -56,6 +60,7 @@ zspace = '/tmp/zspace' + str(rtail)
 #--- set paths to the files
 #
 pool     = '/pool14/chandra/chandra_psi.snapshot'
+fphist   = '/proj/sot/acis/FLU-MON/FPHIST-2001.dat'
 #
 #--- current time
 #
@@ -607,102 +612,86 @@ def calc_acis_att_time(start, stop):
     output: att_time    --- total acis operation time during the given period
     """
 #
-#--- read the instrument in use list
-#
-    ifile = '/proj/sot/acis/FLU-MON/FPHIST-2001.dat'
-    data  = mcf.read_data_file(ifile)
-    
-#
-#--- create lists of starting time and stopping time for ACIS-I, ACIS-S, HRC-I, HRC-S 
-#--- set their positional index to 0, 1, 2, and 3, respectively
-#
-    inst_start = [[], [], [], []]
-    inst_stop  = [[], [], [], []]
-#
-#--- dummy instrument indicator
-#
-    pinst = -999
-    pchk  = 0
-
-    klen = len(data)
-    for k in range(0, klen):
-        atemp = re.split('\s+', data[k])
-        try:
-            ctime = Chandra.Time.DateTime(atemp[0]).secs
-        except:
-            continue
-
-        if atemp[1] == 'ACIS-I':
-            pos = 0
-        elif atemp[1] == 'ACIS-S':
-            pos = 1
-        elif atemp[1] == 'HRC-I':
-            pos = 2
-        elif atemp[1] == 'HRC-S':
-            pos = 3
+#--- read the instrument in use list; the instrument before the period and the
+#--- ones after the period starts
+#
+    store = open_fphist_store()
+    data  = store.rows(start)
+    prev  = store.previous(start)
+    store.close()
+    if prev is not None:
+        data  = [prev] + data
+#
+#--- each instrument is in use from its line to the next instrument line (the last
+#--- one to the end of the period); acis-i and acis-s are counted together
+#
+    t_list = []
+    i_list = []
+    for atemp in data:
+        if atemp[1] in ['ACIS-I', 'ACIS-S']:
+            i_list.append('ACIS')
+        elif atemp[1] in ['HRC-I', 'HRC-S']:
+            i_list.append(atemp[1])
         else:
             continue
-#
-#--- if the time is before the collecting period, just keep which instrument is used
-#
-        if ctime < start:
-            pinst = pos
-            continue
-#
-#--- if the time is after the collecting period, add the stop time to the previous instrument
-#--- before breaking the loop unless there is no starting time yet; then also add starting time
-#
-        if ctime > stop:
-            if pchk == 0:
-                inst_start[pinst].append(start)
-            inst_stop[pinst].append(stop)
-            break 
-#
-#--- the time is in the period first time, add the time to previous instrument
-#
-        if pchk == 0:
-            inst_start[pinst].append(start)
-            pchk = 1
-#
-#--- close the previous instrument and start the period of the new instrument
-#
-        inst_stop[pinst].append(ctime)
-        inst_start[pos].append(ctime)
-        pinst = pos
+        t_list.append(atemp[0])
 #
 #--- accumulate time periods when acis is in use
 #
-    att_time = 0.0
-    for k in range(0, len(inst_start[0])):
-        istart = inst_start[0][k]
-        try:
-            istop  = inst_stop[0][k]
-        except:
-            istop  = stop
-
-        if istart < start:
-            istart = start
-        if istop > stop:
-            istop = stop
-
-        att_time += istop - istart
-
-    for k in range(0, len(inst_start[1])):
-        istart = inst_start[1][k]
-        try:
-            istop  = inst_stop[1][k]
-        except:
-            istop  = stop
-        if istart < start:
-            istart = start
-        if istop > stop:
-            istop = stop
-
-        att_time += istop - istart
+    inst_run = ivs.runs(t_list, i_list, stop=stop)
+    if 'ACIS' not in inst_run:
+        return 0.0
+
+    att_time = inst_run['ACIS'].total(start, stop)
 
     return att_time
             
 
+#-----------------------------------------------------------------------------
+#-- open_fphist_store: open the store of the instrument in use list         --
+#-----------------------------------------------------------------------------
+
+def open_fphist_store():
+    """
+    open the store of the instrument in use list. the lines added to the list
+    since the last run are read into the store
+    input:  none but read from:
+            /proj/sot/acis/FLU-MON/FPHIST-2001.dat
+    output: store   --- ts_store.TimeSeriesStore of [time, instrument]
+    """
+    dbfile = alerts_dir + 'Data/fphist.db'
+    #for writing out files in test directory
+    if (os.getenv('TEST') == 'TEST'):
+        dbfile = test_out + '/' + os.path.basename(dbfile)
+
+    store = ts_store.TimeSeriesStore(dbfile, [['inst', 'text']])
+    store.import_text(fphist, parse_fphist_line)
+
+    return store
+
+#-----------------------------------------------------------------------------
+#-- parse_fphist_line: read a line of the instrument in use list            --
+#-----------------------------------------------------------------------------
+
+def parse_fphist_line(line):
+    """
+    read a line of the instrument in use list
+    input:  line    --- data line: <time> <instrument> ...
+    output: [time in seconds from 1998.1.1, instrument] or None
+    """
+    atemp = re.split('\s+', line.strip())
+    if len(atemp) < 2:
+        return None
+
+    if atemp[1] not in ['ACIS-I', 'ACIS-S', 'HRC-I', 'HRC-S']:
+        return None
+    try:
+        ctime = tcv.date_to_secs(atemp[0])
+    except:
+        return None
+
+    return [ctime, atemp[1]]
+
 #-----------------------------------------------------------------------------
 #--get_snapshot_time: find the current snapshot time                        --
 #-----------------------------------------------------------------------------
@@ -17,8 +17,7 @@ import math
 import time
 import Chandra.Time
 import maude
-import urllib.request
-import json
+import numpy
 import random
 
 path = '/data/mta4/Space_Weather/house_keeping/dir_list'
@@ -41,6 +40,10 @@ sys.path.append(goes_dir)
 sys.path.append('/data/mta4/Script/Python3.10/MTA/')
 
 import mta_common_functions     as mcf
+sys.path.append('/data/mta4/Space_Weather/GOES/Scripts/')
+import goes_ingest              as gi
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import orbit_events             as oev
 #
 #--- set a temporary file name
 #
@@ -170,60 +173,37 @@ def compute_goes_fluence(dlink, energy_list, ostart, factor):
     output: <data_dir>/<out file>
     """
 #
-#--- read json file from the web
+#--- read json file from the web; the records from the orbit start time
+#--- (a missing or null entry is nan)
 #
     try:
-        with urllib.request.urlopen(dlink) as url:
-            data = json.loads(url.read().decode())
+        [s_list, flux] = gi.read_goes_table(dlink, energy_list, start=ostart, fill=numpy.nan)
     except:
         return ['na', 'na'], ['na', 'na']
 #
 #--- go through all energy ranges
 #
-    elen   = len(energy_list)
     d_save = []
     a_save = []
-    for k in range(0, elen):
-        fluence = 0.0
-        aflux   = 0.0
-        energy = energy_list[k]
-        for ent in data:
+    for k in range(0, len(energy_list)):
+        vals = flux[:,k]
 #
-#--- read time and flux of the given energy range
+#--- a bad value appeas as negative; for the case of electron, the null value seems 4.0; so drop it
 #
-            if ent['energy'] == energy:
-#
-#--- convert time into seconds from 1998.1.1
-#
-                otime = ent['time_tag']
-                otime = time.strftime('%Y:%j:%H:%M:%S', time.strptime(otime, '%Y-%m-%dT%H:%M:%SZ'))
-                stime = int(Chandra.Time.DateTime(otime).secs)
-                if stime < ostart:
-                    continue
-                try:
-                    flux  = float(ent['flux'])
-                except:
-                    continue
-#
-#--- a bad value appeas as negative
-#
-                if flux < 0.0:
-                    continue 
-#
-#--- for the case of electron,  the null value seems 4.0; so drop it
-#
-                if factor == 1.0 and flux <= 4.0:
-                    continue
+        mask = numpy.isfinite(vals) & (vals >= 0.0)
+        if factor == 1.0:
+            mask &= (vals > 4.0)
+        vals = vals[mask] * factor
 #
 #--- data is given every 5 mins
 #
-                aflux    = flux * factor
-                fluence += aflux * 300
-
+        if len(vals) > 0:
+            aflux = vals[-1]
+        else:
+            aflux = 0.0
 
         d_save.append(aflux)
-        a_save.append(fluence)
-
+        a_save.append(numpy.sum(vals) * 300)
 
     return d_save, a_save
 
@@ -235,29 +215,15 @@ def find_the_orbit_period():
     """
     find the last orbital starting time
     input: none but read from: 
-                <ephem_dir>/Data/PE.EPH.gsme_spherical
+                <ephem_dir>/Data/PE.EPH.gsme_spherical (through its orbit event index)
     output: the orbit starting time in seconds from 19981.1.
     """
-    data = mcf.read_data_file(ephem_file)
-    t_list = []
-    alt    = []
-    for ent in data:
-        atemp = re.split('\s+', ent)
-        stime = float(atemp[0])
-        if stime > current_chandra_time:
-            break
-
-        t_list.append(stime)
-        alt.append(float(atemp[1]))
-
-    dlen   = len(t_list)
-    t_list = t_list[::-1]
-    alt    = alt[::-1]
-    for k in range(0, dlen-2):
-        if (alt[k] >= alt[k+1]) and (alt[k+1] <= alt[k+2]):
-            return t_list[k+1]
+    events = oev.get_events(ephem_file)
+    pstart = events.last_perigee(current_chandra_time)
+    if pstart is None:
+        return False
 
-    return False
+    return pstart
 
 
 #----------------------------------------------------------------------------
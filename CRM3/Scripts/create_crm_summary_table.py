@@ -33,6 +33,10 @@ for ent in data:
 
 sys.path.append('/data/mta4/Script/Python3.10/MTA/')
 import mta_common_functions     as mcf
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_index               as tix
+sys.path.append('/data/mta4/Space_Weather/CRM3/Scripts/')
+import crm_grid                 as cg
 #
 #--- set a temporary file name
 #
@@ -43,7 +47,7 @@ zspace = '/tmp/zspace' + str(rtail)
 #
 root_dir    = '/data/mta4/proj/rac/ops/'
 web_dir     = html_dir  + 'CRM/'
-crmdat_root = crm3_dir  + '/Data/CRM3_p.dat'
+crmdat_root = crm3_dir  + 'Data/CRM3_p'
 sumdat      = crm3_dir  + '/Data/CRMsummary.dat'
 arcdat      = crm3_dir  + '/Data/CRMarchive.dat'
 ephdat      = ephem_dir + '/Data/gephem.dat'
@@ -67,12 +71,6 @@ if (os.getenv('TEST') == 'TEST'):
 delta      = 300
 sw_factor  = [0, 1, 2, 0.5]
 crm_factor = [0, 0, 1, 1]
-#
-#--- crm file category according to kp value
-#
-crm_n_list = ['00', '03', '07', '10', '13', '17', '20', '23', '27','30', '33', '37',\
-              '40', '43', '47', '50', '53', '57', '60', '63', '67','70', '73', '77',\
-              '80', '83', '87', '90']
 
 gp_p4_c_factor = 3.4            #---- factor to correct p2 to p4gm 
 gp_p7_c_factor = 12.0           #---- facotr to correct p5 to p41gm
@@ -360,6 +358,7 @@ def read_crm_fluence(kpi, ace):
     input:  kpi --- crm file indicator
             ace --- ace vluae
             it also reads  data from <sumdat>= CRMsummary.dat
+            and the CRM model grid <crmdat_root>.grid.npy
     output: flux
             summary --- a list of values of:
                 Currently scheduled FPSI, OTG
@@ -397,35 +396,17 @@ def read_crm_fluence(kpi, ace):
 
         summary.append(val)
 
-    ifile = crmdat_root + kpi
-    data  = mcf.read_data_file(ifile)
-
-    chk = 0
-    for ent in data:
-        atemp = re.split('\s+', ent)
-        time  = float(atemp[0])
-        if time > current_time:
-            comp = atemp
-            chk =1
-            break
-        else:
-            stime = time
-            save  = atemp
+    grid  = cg.load_grid(oroot=crmdat_root)
 #
 #--- find data closest to the current time
 #
-    if chk == 0:
-        crm = save
-    else:
-        if abs(time - current_time) > abs(current_time - stime):
-            crm = save
-        else:
-            crm = comp
+    k   = tix.asof_join([current_time], grid['time'], direction='nearest')[1][0]
+    crm = grid['grid'][k, cg.kp_index(kpi)]
 #
 #--- find flux with correction
 #
-    region = int(float(crm[1]))     
-    flux   = crm_factor[region] * float(crm[2]) + sw_factor[region] * ace
+    region = int(crm[cg.REGION])
+    flux   = crm_factor[region] * float(crm[cg.MEAN]) + sw_factor[region] * ace
 
     return [region, flux, summary]
 
@@ -602,26 +583,6 @@ def convert_grathist_format():
         fo.write(line)
 
 
-#-------------------------------------------------------------------------------
-#---THIS IS NOT USED....                                                     ---
-#-------------------------------------------------------------------------------
-
-def read_crm_data():
-    file1 = crmdat_root + '87'
-    file2 = crmdat_root + '90'
-    if os.path.isfile(file2):
-        if os.stat(file1).st_size == os.stat(file2).st_size:
-            new_crm = []
-            for ent in crm_n_list:
-                ifile = crmdat_root + ent
-                data  = mcf.read_data_file(ifile)
-                new_crm.append(data)
-
-        return new_crm
-    else:
-        return False
-
-
 #-------------------------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       crm_grid.py: binary CRM model grid (time x kp x values) and its loader      #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   runcrm writes one text file for each of the 28 kp values (CRM3_p.dat<#>:
+#   <time> <region> <mean> <95%> <50%> <sd>). the same values are also kept in one
+#   binary file (CRM3_p.grid.npy), a numpy structured array of
+#
+#       time    --- time in seconds from 1998.1.1
+#       grid    --- (kp x [region, mean, p95, p50, sd]) array; kp index i is kp = i / 3
+#
+#   the loader memory-maps the file and gives the rows in a time window. if the grid
+#   is older than the text files (e.g. they were written by the fortran runcrm), it
+#   is rebuilt first; if it cannot be rebuilt (e.g. the text files are being
+#   rewritten), the existing grid file is used, or the text files without one.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/CRM3/Scripts/')
+#       import crm_grid as cg
+#       grid = cg.load_grid(start, stop)
+#       flux = grid['grid'][:, cg.kp_index(kp), cg.MEAN]
+#
+#   to rebuild the grid from the text files:
+#       crm_grid.py [<output root>]
+#
+
+import os
+import sys
+import numpy
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_index as tix
+
+#
+#--- the kp designations of the text files; kp = <index> / 3
+#
+TAIL      = ['00', '03', '07', '10', '13', '17', '20', '23', '27',\
+             '30', '33', '37', '40', '43', '47', '50', '53', '57',\
+             '60', '63', '67', '70', '73', '77', '80', '83', '87', '90']
+#
+#--- the values of each kp and their position in the grid
+#
+FIELDS    = ['region', 'mean', 'p95', 'p50', 'sd']
+REGION    = 0
+MEAN      = 1
+P95       = 2
+P50       = 3
+SD        = 4
+#
+#--- the default output root and the tail of the grid file
+#
+DATA_ROOT = '/data/mta4/Space_Weather/CRM3/Data/CRM3_p'
+GRID_TAIL = '.grid.npy'
+
+#---------------------------------------------------------------------------------------
+#-- load_grid: give the rows of the CRM model grid in a time window                   --
+#---------------------------------------------------------------------------------------
+
+def load_grid(start=None, stop=None, oroot=DATA_ROOT):
+    """
+    give the rows of the CRM model grid in start <= time <= stop
+    input:  start   --- starting time in seconds from 1998.1.1; if None, from the beginning
+            stop    --- stopping time in seconds from 1998.1.1; if None, to the end
+            oroot   --- the root of the files, e.g. <crm3_dir>/Data/CRM3_p
+    output: grid    --- structured array (a memory-mapped view) of time and grid
+    """
+    gfile = oroot + GRID_TAIL
+    if is_stale(oroot):
+#
+#--- a ValueError comes from the text files half written by runcrm; the last
+#--- grid file is used until they are complete
+#
+        try:
+            write_grid(oroot)
+        except (OSError, ValueError):
+            if not os.path.isfile(gfile):
+                grid = read_text_grid(oroot)
+                [i0, i1] = tix.find_window(grid['time'], start, stop, include_stop=True)
+                return grid[i0:i1]
+
+    grid     = numpy.load(gfile, mmap_mode='r')
+    [i0, i1] = tix.find_window(grid['time'], start, stop, include_stop=True)
+
+    return grid[i0:i1]
+
+#---------------------------------------------------------------------------------------
+#-- write_grid: create the binary grid file from the text files                       --
+#---------------------------------------------------------------------------------------
+
+def write_grid(oroot=DATA_ROOT):
+    """
+    create the binary grid file from the text files
+    input:  oroot   --- the root of the files, e.g. <crm3_dir>/Data/CRM3_p
+                        read from <oroot>.dat<#>
+    output: <oroot>.grid.npy
+            the number of the rows
+    """
+    grid  = read_text_grid(oroot)
+#
+#--- write via a temporary file so that readers never see a partial file
+#
+    ofile = oroot + GRID_TAIL
+    tfile = ofile + '.tmp%d' % os.getpid()
+    with open(tfile, 'wb') as fo:
+        numpy.save(fo, grid)
+
+    os.replace(tfile, ofile)
+
+    return len(grid)
+
+#---------------------------------------------------------------------------------------
+#-- read_text_grid: read the text files into a grid                                   --
+#---------------------------------------------------------------------------------------
+
+def read_text_grid(oroot=DATA_ROOT):
+    """
+    read the text files of all kp values into a grid
+    input:  oroot   --- the root of the files; read from <oroot>.dat<#>
+    output: grid    --- structured array of time and grid
+    """
+    data = []
+    for tail in TAIL:
+        out = numpy.loadtxt(oroot + '.dat' + tail, ndmin=2)
+        if len(data) > 0 and (len(out) != len(data[0]) or numpy.any(out[:, 0] != data[0][:, 0])):
+            raise ValueError('The time lists of the CRM files do not match: ' + oroot + '.dat' + tail)
+
+        data.append(out)
+
+    grid = numpy.zeros(len(data[0]), dtype=grid_dtype())
+    grid['time'] = data[0][:, 0]
+    for k in range(0, len(TAIL)):
+        grid['grid'][:, k, :] = data[k][:, 1:1+len(FIELDS)]
+
+    return grid
+
+#---------------------------------------------------------------------------------------
+#-- is_stale: check whether the grid file is older than the text files                --
+#---------------------------------------------------------------------------------------
+
+def is_stale(oroot=DATA_ROOT):
+    """
+    check whether the grid file is missing or older than the text files
+    input:  oroot   --- the root of the files
+    output: True/False
+    """
+    try:
+        gtime = os.path.getmtime(oroot + GRID_TAIL)
+    except OSError:
+        return True
+
+    for tail in TAIL:
+        try:
+            if os.path.getmtime(oroot + '.dat' + tail) > gtime:
+                return True
+        except OSError:
+            pass
+
+    return False
+
+#---------------------------------------------------------------------------------------
+#-- grid_dtype: give the data type of the grid                                        --
+#---------------------------------------------------------------------------------------
+
+def grid_dtype():
+    """
+    give the data type of the grid
+    input:  none
+    output: numpy dtype of [time, grid (kp x values)]
+    """
+    return numpy.dtype([('time', 'f8'), ('grid', 'f8', (len(TAIL), len(FIELDS)))])
+
+#---------------------------------------------------------------------------------------
+#-- kp_index: give the grid index of a kp value                                       --
+#---------------------------------------------------------------------------------------
+
+def kp_index(kp):
+    """
+    give the grid index of a kp value (the closest one of 0, 1/3, 2/3, ..., 9)
+    input:  kp  --- kp value or its file designation (e.g. '23' for kp = 2.3)
+    output: index
+    """
+    if isinstance(kp, str):
+        if kp in TAIL:
+            return TAIL.index(kp)
+        kp = float(kp) / 10.0
+
+    return min(max(int(round(3.0 * float(kp))), 0), len(TAIL) - 1)
+
+#---------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    if len(sys.argv) > 1:
+        write_grid(sys.argv[1].strip())
+    else:
+        write_grid()
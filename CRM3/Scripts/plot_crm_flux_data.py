@@ -47,10 +47,16 @@ if (os.getenv('TEST') == 'TEST'):
 #--- append  pathes to private folders to a python directory
 #
 sys.path.append('/data/mta4/Script/Python3.10/MTA/')
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+sys.path.append('/data/mta4/Space_Weather/CRM3/Scripts/')
 #
 #--- import several functions
 #
 import mta_common_functions as mcf
+import time_index           as tix
+import orbit_events         as oev
+import crm_grid             as cg
+import interval_set         as ivs
 #
 #--- temp writing file name
 #
@@ -80,7 +86,7 @@ def plot_crm_flux_data():
     input:  <crm3_dir>/Data/CRMsummary.dat
             <ephem_dir>/Data/PE.EPH.gsme_spherical_short
             <comm_dir>/Data/comm_data
-            <crm3_dir>/Data/CRM3_p.dat30
+            <crm3_dir>/Data/CRM3_p.grid.npy
             /proj/sot/acis/FLU-MON/FPHIST-2001.dat
             /proj/sot/acis/FLU-MON/GRATHIST-2001.dat
     output: <html_dir>/Prbit/Plots/crmpl.png        --- extranal flux plot
@@ -260,7 +266,7 @@ def read_region_data(time_list, cre=0):
     """
     read region data and assign color to correspoinding time list
     input:  time_list   --- a list of time
-            also read from: <crm3_dir>/Data/CRM3_p.dat30
+            also read from: <crm3_dir>/Data/CRM3_p.grid.npy (kp = 3.0)
     output: color       --- a list of color correspond to the time_list
                 region: 1   solar wind      color: aqua
                 region: 2   magnetoshearth  color: fuchsia
@@ -274,64 +280,42 @@ def read_region_data(time_list, cre=0):
 #
 #--- read data 
 #
-    infile = crm3_dir + '/Data/CRM3_p.dat30'
-    data   = mcf.read_data_file(infile)
-    ctime  = []
-    region = []
-    for ent in data:
-        atemp = re.split('\s+', ent)
-        rtime = float(atemp[0])
-        if rtime < start:
-            continue
-        elif rtime > stop:
-            break
-        ctime.append(rtime)
-        region.append(int(float(atemp[1])))
+    grid   = cg.load_grid(start, stop, oroot=crm3_dir + 'Data/CRM3_p')
+    ctime  = grid['time'].tolist()
+    region = grid['grid'][:, cg.kp_index('30'), cg.REGION].astype(int).tolist()
 #
-#--- compare two time list and find which region satellite is in
+#--- compare two time list and find which region satellite is in;
+#--- the region of the interval ctime[k] <= time < ctime[k+1]
 #
     color  = []
     r_list = []
-    start = 0
-    clen  = len(ctime)
-    chk   = 0
-    tlen  = len(time_list)
+    clen   = len(ctime)
+    tlen   = len(time_list)
+    k_list = tix.asof_join(time_list, ctime)[1]
     for n in range(0, tlen):
         r_list.append(1)
-        otime = time_list[n]
-
-        for k in range(start, clen):
-            k1 = k + 1
-            if k1 >= clen:
-                chk = 1
-                break
+        k = k_list[n]
+#
+#--- the time is after the region list covers; fill below
+#
+        if clen < 2 or k + 1 >= clen:
+            break
 #
 #--- if the region list could not cover the first part of the time list, use color "white"
 #
-            if k == 0 and otime < ctime[k]:
-                color.append('white')
-                r_list[n] =  1
-                break
-
-            elif otime >=ctime[k] and otime < ctime[k1]:
-                if region[k] == 1:
-                    color.append('aqua')
-                    r_list[n] = 1
-                elif region[k] == 2:
-                    color.append('fuchsia')
-                    r_list[n] = 2
-                else:
-                    color.append('yellow')
-                    r_list[n] = 3
-                start = k - 5
-                if start < 0:
-                    start = 0
-                break
-            else:
-                continue
+        if k < 0:
+            color.append('white')
+            r_list[n] =  1
 
-        if chk > 0:
-            break
+        elif region[k] == 1:
+            color.append('aqua')
+            r_list[n] = 1
+        elif region[k] == 2:
+            color.append('fuchsia')
+            r_list[n] = 2
+        else:
+            color.append('yellow')
+            r_list[n] = 3
 #
 #--- if the color list was not be filled, use the last region color to fill
 #
@@ -357,7 +341,7 @@ def read_flux_model(kp):
     """
     read CRM flux model
     input:  kp  --- kp value
-            <crm3_dir>/Data/CRM3_p.dat*
+            <crm3_dir>/Data/CRM3_p.grid.npy
     output: time_list   --- a list of lists of times
             flux_list   --- a list of lists of flux
             color_list  --- a list of lists of color indicating a region where the satellite is in
@@ -365,54 +349,43 @@ def read_flux_model(kp):
                   based on the current kp value
     """
 #
-#--- find the model # corresponding to kp value
-#
-    ikp = int(10 * kp)
-    lkp = str(ikp)
-    if ikp < 10:
-        lkp = '0' + lkp
-#
 #--- set start and stop time
 #
     start = today_chandra_time -2.0 * 86400.
     stop  = start + 10.0 * 86400.0
 #
-#--- select 10 models + kp correspoinding flux
+#--- select 10 models (kp = 0, 1, ..., 9) + kp correspoinding flux
 #
-    tail_list  = ['00', '10', '20', '30', '40', '50', '60', '70', '80', '90', lkp]
-    time_list  = [[], [], [], [], [], [], [], [], [], [], []]
-    color_list = [[], [], [], [], [], [], [], [], [], [], []]
-    flux_list  = [[], [], [], [], [], [], [], [], [], [], []]
+    kp_list    = ['00', '10', '20', '30', '40', '50', '60', '70', '80', '90']
+    kp_list    = [cg.kp_index(ent) for ent in kp_list] + [cg.kp_index(kp)]
 #
-#--- read each of them and save the fluxes
+#--- one windowed read of the model grid for all of them
 #
-    for k in range(0, 11):
-        ifile = crm3_dir + 'Data/CRM3_p.dat' + tail_list[k]
-        data  = mcf.read_data_file(ifile)
-        for ent in data:
-            atemp = re.split('\s+', ent)
-            xtime = float(atemp[0])
-            if xtime < start:
-                continue
-            elif xtime > stop:
-                break
-            area  = float(atemp[1])     #--- where the satellite is such as solar wind region
-            flux  = float(atemp[2])
-
-            time_list[k].append(xtime)
-            flux_list[k].append(flux)
+    grid       = cg.load_grid(start, stop, oroot=crm3_dir + 'Data/CRM3_p')
+    t_list     = grid['time'].tolist()
+
+    time_list  = []
+    color_list = []
+    flux_list  = []
+    for ikp in kp_list:
+        time_list.append(list(t_list))
+        flux_list.append(grid['grid'][:, ikp, cg.MEAN].tolist())
 #
 #--- change the region in which the satellite is to color code
 #--- yellow --- magnetosphere
 #--- fuchisa--- magnetosphearth
 #--- aqua   --- soloar wind
 #
+        colors = []
+        for area in grid['grid'][:, ikp, cg.REGION]:
             if area == 1:
-                color_list[k].append('aqua')
+                colors.append('aqua')
             elif area == 2:
-                color_list[k].append('fuchsia')
+                colors.append('fuchsia')
             else:
-                color_list[k].append('yellow')
+                colors.append('yellow')
+
+        color_list.append(colors)
 
     return [time_list, flux_list, color_list]
 
@@ -590,51 +563,33 @@ def create_attenuation_list(ftime_list, flux_list, inst_start, inst_stop, otg_st
     nptime = numpy.array(ftime_list)
     nflux  = numpy.array(flux_list)
 #
-#--- assign values to compute attenuation factor for instruments and otgs.
+#--- attenuation factor for instruments and otgs; the intervals of each are merged
+#--- into one set and all the times are checked against the set at once
 #
     flen = len(ftime_list[0])
-    inst = numpy.ones(flen)
-    otg  = numpy.ones(flen)
 #
-#--- acis: no change, but hrc will be 0 (totally attenuated)
+#--- acis: no change, but hrc (hrc i or hrc s) will be 0 (totally attenuated)
 #
-#--- hrc i
+    hrc  = ivs.IntervalSet(inst_start[2] + inst_start[3], inst_stop[2] + inst_stop[3])
+    inst = ivs.paint(nptime[0], [[hrc, 0.0]])
 #
-    for k in range(0, len(inst_start[2])):
-        ind = (nptime[0] >= inst_start[2][k]) & (nptime[0] < inst_stop[2][k])
-        inst[ind] = 0
-#
-#--- hrc s
-#
-    for k in range(0, len(inst_start[3])):
-        ind = (nptime[0] >= inst_start[3][k]) & (nptime[0] < inst_stop[3][k])
-        inst[ind] = 0
+#--- hetg: 0.2 and letg: 0.5; letg wins where they overlap
 #
-#--- hetg 
-#
-    for k in range(0, len(otg_start[0])):
-        ind = (nptime[0] >= otg_start[0][k]) & (nptime[0] < otg_stop[0][k])
-        otg[ind] = 0.2
-#
-#--- letg
-#
-    for k in range(0, len(otg_start[1])):
-        ind = (nptime[0] >= otg_start[1][k]) & (nptime[0] < otg_stop[1][k])
-        otg[ind] = 0.5
+    hetg = ivs.IntervalSet(otg_start[0], otg_stop[0])
+    letg = ivs.IntervalSet(otg_start[1], otg_stop[1])
+    otg  = ivs.paint(nptime[0], [[hetg, 0.2], [letg, 0.5]])
 #
 #--- create instrumental attenuation value array
 #
     af = inst * otg
 #
-#---- find the perigees
+#---- find the perigees of the plotted orbital data (as before, not at the last two
+#---- samples); the fluence is reset between the perigee and the sample before it
 #
-    pg = numpy.ones(flen)
-    for k in range(0, len(otime)-3):
-        diff1 = altitude[k+1] - altitude[k]
-        diff2 = altitude[k+2] - altitude[k+1]
-        if diff1 <= 0 and diff2 >= 0:
-            ind = (nptime[0] >= otime[k]) & (nptime[0] < otime[k+1])
-            pg[ind] = 0
+    events  = oev.OrbitEvents(oev.build_events(otime[:-1], altitude[:-1], levels=[]))
+    pspan   = events.perigee_brackets()
+    resets  = ivs.IntervalSet([ent[0] for ent in pspan], [ent[1] for ent in pspan])
+    pg      = ivs.paint(nptime[0], [[resets, 0.0]])
 #
 #--- read region data
 #
@@ -782,10 +737,10 @@ def plot_crm(otime, altitude, orbit_color_list, dsn_start, dsn_stop, inst_start,
 
     ax0.set_ylabel('Altitude (Mm)', fontweight='heavy')
 #
-#--- DSN plot
+#--- DSN plot; the overlapping contacts (of different stations) are shaded once
 #
-    for k in range(0, len(dsn_start)):
-        ax0.axvspan(dsn_start[k], dsn_stop[k], alpha=0.8, color='white')
+    for [dstart, dstop] in ivs.IntervalSet(dsn_start, dsn_stop).spans():
+        ax0.axvspan(dstart, dstop, alpha=0.8, color='white')
 #
 #--- no tick labeling 
 #
@@ -17,6 +17,9 @@ import os
 import re
 import string
 import math
+import argparse
+import multiprocessing
+import numpy
 #
 #--- reading directory list
 #
@@ -39,27 +42,40 @@ if (os.getenv('TEST') == 'TEST'):
 #
 sys.path.append('/data/mta4/Script/Python3.10/MTA/')
 sys.path.append('/data/mta4/Space_Weather/CRMFLX/CRMFLX_PYTHON/')
+sys.path.append('/data/mta4/Space_Weather/CRM3/Scripts/')
 #
 #--- import several functions
 #
 import mta_common_functions as mcf
 import crmflx               as cflx
+import crm_grid             as cg
 
-tail = ['00','03','07','10','13','17','20','23','27',\
-        '30','33','37','40','43','47','50','53','57',\
-        '60','63','67','70','73','77','80','83','87','90']
+tail = cg.TAIL
+#
+#--- the flux databases and the ephemeris used by compute_kp_flux. they are set
+#--- before the worker processes are forked, so that the workers share them
+#--- instead of reading the databases again
+#
+crm_data = {}
 
 #----------------------------------------------------------------------------
 #-- runcrm: calculate CRM proton flux for Chandra ephemeris                --
 #----------------------------------------------------------------------------
 
-def runcrm(ifile=''):
+def runcrm(ifile='', workers=1, incremental=False):
     """
     calculate CRM proton flux for Chandra ephemeris
     read from a file, for all 28 possible values of Kp.
 
     input:  ifile   --- input ephemeris file, e.g., 'PE.EPH.gsme_in_Re_short'
+            workers --- number of worker processes; the kp values are split
+                        among them. default: 1 (no worker process)
+            incremental --- if True, keep the rows of the existing output files
+                        whose ephemeris entries did not change since the last
+                        run, and compute only the new/changed rows
     output: <crm3_dir>/Data/CRM3_p.dat<#>
+            <crm3_dir>/Data/CRM3_p.grid.npy --- all kp values in one binary grid
+            <crm3_dir>/Data/CRM3_p.eph  --- copy of the ephemeris used
     """
     if ifile == '':
         ifile = ephem_dir + 'Data/PE.EPH.gsme_in_Re_short'
@@ -84,64 +100,204 @@ def runcrm(ifile=''):
     fswi50  = 0.0
     fswisd  = 0.0
 #
+#--- read the ephemeris data
+#
+    data  = mcf.read_data_file(ifile)
+    if len(data) < 1:
+        exit(1)
+    cdata = mcf.separate_data_to_arrays(data)
+    tlist = numpy.array(cdata[0])
+    xgsm  = numpy.array(cdata[1])
+    ygsm  = numpy.array(cdata[2])
+    zgsm  = numpy.array(cdata[3])
+    tkey  = ['%13.1f' % tval for tval in tlist]
+#
+#--- find the rows which must be computed
+#
+    if incremental:
+        cidx, reuse = find_rows_to_compute(data, tkey)
+    else:
+        cidx  = numpy.arange(0, len(tkey))
+        reuse = [{} for i in range(0, len(tail))]
+
+    if len(cidx) > 0:
+#
 #--- read solar wind database
 #
-    xflux1, yflux1, zflux1, flxbin1, numbin1, numdat1 = cflx.swinit(ispeci)
+        swdb  = cflx.swinit(ispeci)
 #
 #--- read magnetosheath databas
 #
-    xflux2, yflux2, zflux2, flxbin2, numbin2, numdat2 = cflx.mshinit(ispeci)
+        mshdb = cflx.mshinit(ispeci)
 #
 #--- read magnetosphere database
 #
-    xflux3, yflux3, zflux3, flxbin3, numbin3, numdat3,imapindx3,\
-          nsphvol3, ioffset3,joffset3,koffset3  = cflx.mspinit(ispeci)
+        mspdb = cflx.mspinit(ispeci)
+    else:
+        swdb  = mshdb = mspdb = None
 #
-#--- read the ephemeris data
+#--- share the databases and the ephemeris with the workers
 #
-    data  = mcf.read_data_file(ifile)
-    if len(data) < 1:
-        exit(1)
-    cdata = mcf.separate_data_to_arrays(data)
-    tlist = cdata[0]
-    xgsm  = cdata[1]
-    ygsm  = cdata[2]
-    zgsm  = cdata[3]
-
-    for i in range(0, 28):
-        xkp   = i / 3.0
-        line  = ''
-        for j in range(0, len(tlist)):
-            idloc,fluxmn,flux95,flux50,fluxsd =\
-                cflx.crmflx(xkp,xgsm[j],ygsm[j],zgsm[j],ispeci,iusesw,\
-                    fswimn,fswi95,fswi50,fswisd,iusemsh,iusemsp,smooth1,\
-                    nflxget,ndrophi,ndroplo,logflg,rngtol,fpchi,fpclo,\
-                    xflux1, yflux1, zflux1, flxbin1, numbin1, numdat1,\
-                    xflux2, yflux2, zflux2, flxbin2, numbin2, numdat2,\
-                    xflux3, yflux3, zflux3, flxbin3, numbin3, numdat3,\
-                    nsphvol3, ioffset3,joffset3,koffset3,imapindx3)
-
-            line = line + '%13.1f\t' % tlist[j]
-            line = line + '%2d\t'    % idloc
-            line = line + '%13.6e\t' % fluxmn
-            line = line + '%13.6e\t' % flux95
-            line = line + '%13.6e\t' % flux50
-            line = line + '%13.6e\n' % fluxsd
-
-        ofile = crm3_dir +  'Data/CRM3_p.dat' + tail[i]
-        #for writing out files in test directory
-        if (os.getenv('TEST') == 'TEST'):
-            ofile = test_out + "/CRM3_p.dat" + tail[i]
-        with open(ofile, 'w') as fo:
-            fo.write(line)
+    crm_data['param'] = [ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,iusemsh,\
+                         iusemsp,smooth1,nflxget,ndrophi,ndroplo,logflg,rngtol,\
+                         fpchi,fpclo]
+    crm_data['db']    = [swdb, mshdb, mspdb]
+    crm_data['ephem'] = [tlist[cidx], xgsm[cidx], ygsm[cidx], zgsm[cidx]]
+    crm_data['cidx']  = cidx
+    crm_data['tkey']  = tkey
+    crm_data['reuse'] = reuse
+#
+#--- compute the flux for all 28 kp values; each group of kp values is
+#--- computed in one crmflx_batch call and written to its own files
+#
+    workers = max(1, min(workers, len(tail)))
+    kp_grps = numpy.array_split(numpy.arange(0, len(tail)), workers)
+
+    if workers == 1:
+        compute_kp_flux(kp_grps[0])
+    else:
+        pool = multiprocessing.get_context('fork').Pool(workers)
+        try:
+            pool.map(compute_kp_flux, kp_grps)
+        finally:
+            pool.close()
+            pool.join()
+#
+#--- the binary grid of all kp values for the readers
+#
+    cg.write_grid(get_output_root())
+#
+#--- keep the ephemeris used for the next incremental run; this is written
+#--- last so that the outputs are never newer than this copy
+#
+    write_file_atomic(get_output_root() + '.eph', ''.join([ent + '\n' for ent in data]))
+
+#----------------------------------------------------------------------------
+#-- compute_kp_flux: compute CRM proton flux for a group of kp values and write out
+#----------------------------------------------------------------------------
+
+def compute_kp_flux(kp_idx):
+    """
+    compute CRM proton flux for a group of kp values and write out the results
+    input:  kp_idx  --- array of kp indices (0 - 27); kp = kp_idx / 3
+            crm_data--- databases, ephemeris and parameters set by runcrm
+    output: <crm3_dir>/Data/CRM3_p.dat<#> for each kp in the group
+    """
+    [ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,iusemsh,iusemsp,smooth1,\
+     nflxget,ndrophi,ndroplo,logflg,rngtol,fpchi,fpclo] = crm_data['param']
+    [swdb, mshdb, mspdb]       = crm_data['db']
+    [tlist, xgsm, ygsm, zgsm]  = crm_data['ephem']
+    cidx  = crm_data['cidx']
+    tkey  = crm_data['tkey']
+
+    if len(cidx) > 0:
+        kp_list = numpy.array(kp_idx) / 3.0
+        idloc,fluxmn,flux95,flux50,fluxsd =\
+            cflx.crmflx_batch(kp_list,xgsm,ygsm,zgsm,ispeci,iusesw,\
+                fswimn,fswi95,fswi50,fswisd,iusemsh,iusemsp,smooth1,\
+                nflxget,ndrophi,ndroplo,logflg,rngtol,fpchi,fpclo,\
+                swdb, mshdb, mspdb)
+
+    for m, i in enumerate(kp_idx):
+#
+#--- the rows kept from the last run, updated with the newly computed rows
+#
+        rows = crm_data['reuse'][i]
+        for n, j in enumerate(cidx):
+            rows[tkey[j]] = '%13.1f\t%2d\t%13.6e\t%13.6e\t%13.6e\t%13.6e\n' \
+                            % (tlist[n], idloc[m,n], fluxmn[m,n], flux95[m,n],\
+                               flux50[m,n], fluxsd[m,n])
+#
+#--- write out in the order of the ephemeris; the rows dropped from 
+#--- the head of the ephemeris are dropped here
+#
+        line = ''.join([rows[tval] for tval in tkey])
+
+        write_file_atomic(get_output_root() + '.dat' + tail[i], line)
+
+#----------------------------------------------------------------------------
+#-- find_rows_to_compute: find ephemeris rows which are not in the last outputs
+#----------------------------------------------------------------------------
+
+def find_rows_to_compute(data, tkey):
+    """
+    compare the ephemeris with the copy kept by the last run and find the rows
+    which must be computed. a row is reused only if its ephemeris entry did not
+    change and it is in all of the output files.
+    input:  data    --- a list of ephemeris data lines
+            tkey    --- a list of the time of each row in the output format
+    output: cidx    --- array of indices of the rows to be computed
+            reuse   --- a list (one per kp) of dictionaries: tkey -> output line
+    """
+    oroot = get_output_root()
+    reuse = [{} for i in range(0, len(tail))]
+
+    try:
+        with open(oroot + '.eph', 'r') as f:
+            prev = set([line.strip() for line in f.readlines()])
+    except OSError:
+        return numpy.arange(0, len(tkey)), reuse
+#
+#--- the times of the rows whose ephemeris did not change
+#
+    keep = set([tkey[j] for j in range(0, len(tkey)) if data[j] in prev])
+
+    for i in range(0, len(tail)):
+        try:
+            with open(oroot + '.dat' + tail[i], 'r') as f:
+                for line in f:
+                    tval = line[:13]
+                    if tval in keep:
+                        reuse[i][tval] = line
+        except OSError:
+            pass
+
+    cidx = [j for j in range(0, len(tkey)) \
+                if not all(tkey[j] in reuse[i] for i in range(0, len(tail)))]
+
+    return numpy.array(cidx, dtype=int), reuse
+
+#----------------------------------------------------------------------------
+#-- get_output_root: give the path of the output files without the extension
+#----------------------------------------------------------------------------
+
+def get_output_root():
+    """
+    give the path of the output files without the extension
+    input:  none
+    output: oroot   --- e.g., <crm3_dir>/Data/CRM3_p
+    """
+    #for writing out files in test directory
+    if (os.getenv('TEST') == 'TEST'):
+        return test_out + '/CRM3_p'
+
+    return crm3_dir + 'Data/CRM3_p'
+
+#----------------------------------------------------------------------------
+#-- write_file_atomic: write a file via a temporary file                   --
+#----------------------------------------------------------------------------
+
+def write_file_atomic(ofile, line):
+    """
+    write a file via a temporary file so that readers never see a partial file
+    input:  ofile   --- output file name
+            line    --- the content
+    output: ofile
+    """
+    tfile = ofile + '.tmp%d' % os.getpid()
+    with open(tfile, 'w') as fo:
+        fo.write(line)
+
+    os.replace(tfile, ofile)
 
 #---------------------------------------------------------------------
 
 if __name__ == '__main__': 
 
-    if len(sys.argv) > 1:
-        ifile = sys.argv[1].strip()
-    else:
-        ifile = ''
+    parser = argparse.ArgumentParser()
+    parser.add_argument("ifile", nargs = '?', default = '', help = "Input ephemeris file.")
+    parser.add_argument("-w", "--workers", type = int, default = 1, help = "Number of worker processes for the kp values.")
+    parser.add_argument("-i", "--incremental", action = 'store_true', help = "Compute only the new/changed ephemeris rows.")
+    args = parser.parse_args()
 
-    runcrm(ifile)
+    runcrm(args.ifile.strip(), args.workers, args.incremental)
@@ -0,0 +1,100 @@
+#####################################################################################
+#                                                                                   #
+#       test_crm_grid.py: test the binary CRM model grid and its loader             #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '..', 'Common', 'Scripts'))
+sys.path.insert(0, SCRIPT_DIR)
+
+import crm_grid as cg
+
+TIMES = [1000.0, 2000.0, 3000.0, 4000.0]
+
+def write_text_files(oroot, times=TIMES):
+    """
+    <time> <region> <mean> <95%> <50%> <sd>; the mean is <kp index> * 100 + <row>
+    """
+    for k in range(0, len(cg.TAIL)):
+        with open(oroot + '.dat' + cg.TAIL[k], 'w') as fo:
+            for m in range(0, len(times)):
+                fo.write('%.1f 1 %d %d %d 0.5\n' % (times[m], k * 100 + m, k, m))
+
+def set_mtime(oroot, tail, atime):
+    os.utime(oroot + tail, (atime, atime))
+
+#-----------------------------------------------------------------------------
+
+def test_load_grid_window(tmp_path):
+    """
+    the grid is made from the text files; start <= time <= stop
+    """
+    oroot = str(tmp_path / 'CRM3_p')
+    write_text_files(oroot)
+
+    grid = cg.load_grid(2000.0, 3000.0, oroot=oroot)
+    assert os.path.isfile(oroot + cg.GRID_TAIL)
+    assert grid['time'].tolist() == [2000.0, 3000.0]
+    assert grid['grid'][:, cg.kp_index(2.3), cg.MEAN].tolist() == [701.0, 702.0]
+    assert grid['grid'][0, cg.kp_index('90'), cg.P95] == 27.0
+    assert len(cg.load_grid(oroot=oroot)) == 4
+
+#-----------------------------------------------------------------------------
+
+def test_stale_grid_is_rebuilt(tmp_path):
+    """
+    the grid older than a text file is made again
+    """
+    oroot = str(tmp_path / 'CRM3_p')
+    write_text_files(oroot)
+    cg.write_grid(oroot)
+    set_mtime(oroot, cg.GRID_TAIL, 1.0e9)
+    assert cg.is_stale(oroot)
+
+    write_text_files(oroot, TIMES + [5000.0])
+    assert cg.load_grid(4500.0, None, oroot=oroot)['time'].tolist() == [5000.0]
+    assert not cg.is_stale(oroot)
+
+#-----------------------------------------------------------------------------
+
+def test_half_written_text_files(tmp_path):
+    """
+    while the text files do not match, the last grid is used (or the text files
+    raise the error if there is no grid)
+    """
+    oroot = str(tmp_path / 'CRM3_p')
+    write_text_files(oroot)
+    cg.write_grid(oroot)
+    for tail in [cg.GRID_TAIL] + ['.dat' + ent for ent in cg.TAIL[1:]]:
+        set_mtime(oroot, tail, 1.0e9)
+
+    with open(oroot + '.dat00', 'a') as fo:
+        fo.write('5000.0 1 0 0 0 0.5\n')
+
+    assert cg.load_grid(oroot=oroot)['time'].tolist() == TIMES
+
+    os.remove(oroot + cg.GRID_TAIL)
+    with pytest.raises(ValueError):
+        cg.load_grid(oroot=oroot)
+
+#-----------------------------------------------------------------------------
+
+def test_kp_index():
+    """
+    the closest of kp = 0, 1/3, ..., 9 for a value or a file designation
+    """
+    assert cg.kp_index(0.0)   == 0
+    assert cg.kp_index(2.3)   == 7
+    assert cg.kp_index(9.5)   == 27
+    assert cg.kp_index(-1.0)  == 0
+    assert cg.kp_index('23')  == 7
+    assert cg.kp_index('25')  == 8
@@ -24,6 +24,7 @@ from datetime import datetime
 import Chandra.Time
 import copy
 import unittest
+from libc.math cimport sqrt, fabs
 #
 #--- reading directory list
 #
@@ -41,10 +42,12 @@ for ent in data:
 #--- append  pathes to private folders to a python directory
 #
 sys.path.append('/data/mta/Script/Python3.8/MTA/')
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
 #
 #--- import several functions
 #
 import mta_common_functions as mcf
+import crm_region           as crr
 #
 #--- temp writing file name
 #
@@ -87,6 +90,23 @@ num2    = 6         #--- Sub-Volume Element Database Parameters: number of sub-v
 xinc2   = 0.1666666 #--- Sub-Volume Element Database Parameters: length of sub-volume element in x-direction (Re)
 yinc2   = 0.1666666 #--- Sub-Volume Element Database Parameters: length of sub-volume element in y-direction (Re)
 zinc2   = 1.0       #--- Sub-Volume Element Database Parameters: length of sub-volume element in z-direction (Re)
+chunklen = 32       #--- number of database cells in a chunk of the near-neighbor scan (see flxdat1_chunk)
+#
+#--- the result of the near-neighbor scan of one kp (see flxdat1_chunk)
+#
+ctypedef struct nbrcell:
+    double flux
+    double avgnum
+    double rngcell
+    int    numcell
+#
+#--- the flux statistics at the satellite's position (see nbrflux)
+#
+ctypedef struct fluxstat:
+    double fluxmn
+    double flux95
+    double flux50
+    double fluxsd
 
 #----------------------------------------------------------------------------
 #-- crmflx: calculates the ion flux as a function of the magnetic activity kp index
@@ -94,10 +114,7 @@ zinc2   = 1.0       #--- Sub-Volume Element Database Parameters: length of sub-v
 
 def crmflx(xkp,xgsm,ygsm,zgsm,ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,\
            iusemsh,iusemsp,smooth1,nflxget,ndrophi,ndroplo,logflg,rngtol,fpchi,fpclo,\
-           xflux1, yflux1, zflux1, flxbin1, numbin1, numdat1, \
-           xflux2, yflux2, zflux2, flxbin2, numbin2, numdat2, \
-           xflux3, yflux3, zflux3, flxbin3, numbin3, numdat3, \
-           nsphvol3, ioffset3,joffset3,koffset3,imapindx3):
+           swdb, mshdb, mspdb):
     """
     this routine calculates the ion flux as a function of the
     magnetic activity kp index.
@@ -172,32 +189,9 @@ def crmflx(xkp,xgsm,ygsm,zgsm,ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,\
                                 (used if smooth1 = 6).
             fpclo   --- lower percentile limit for spatial averaging of flux
                                 (used if smooth1 = 6).
-            xflux1  --- array of arrays containing the x-coordinate of each data cell's center (re)
-            yflux1  --- array of arrays containing the y-coordinate of each data cell's center (re)
-            zflux1  --- array of arrays containing the z-coordinate of each data cell's center (re)
-            flxbin1 --- array of arrays the average ion flux within each cell  (ions/[cm^2-sec-sr-mev])
-            numbin1 --- array of arrays of the number of non-zero values within each cell
-            numdat1 --- number of non-zero values in the database
-                        ----for solar wind
-            xflux2  --- array of arrays containing the x-coordinate of each data cell's center (re)
-            yflux2  --- array of arrays containing the y-coordinate of each data cell's center (re)
-            zflux2  --- array of arrays containing the z-coordinate of each data cell's center (re)
-            flxbin2 --- array of arrays the average ion flux within each cell  (ions/[cm^2-sec-sr-mev])
-            numbin2 --- array of arrays of the number of non-zero values within each cell
-            numdat2 --- number of non-zero values in the database
-                        ---- for magnetosheath
-            xflux3  --- array of arrays containing the x-coordinate of each data cell's center (re)
-            yflux3  --- array of arrays containing the y-coordinate of each data cell's center (re)
-            zflux3  --- array of arrays containing the z-coordinate of each data cell's center (re)
-            flxbin3 --- array of arrays of the average ion flux within each cell  (ions/[cm^2-sec-sr-mev])
-            numbin3 --- array of arrays of the number of non-zero values within each cell
-            numdat3 --- number of non-zero values in the database
-            nsphvol3  - number of volume elements stored in search volume.
-            ioffset3  - array of offset indices for x-direction.
-            joffset3  - array of offset indices for y-direction.
-            koffset3  - array of offset indices for z-direction.
-            imapindx3 - array of pointers to flux database.
-                        ---- for magnetosphere
+            swdb    --- FluxDatabase of the solar wind (see swinit)
+            mshdb   --- FluxDatabase of the magnetosheath (see mshinit)
+            mspdb   --- FluxDatabase of the magnetosphere (see mspinit)
 
     output: idloc   --- phenomenogical region location identification flag:
                             idloc = 1 if spacecraft is in solar wind
@@ -231,7 +225,7 @@ def crmflx(xkp,xgsm,ygsm,zgsm,ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,\
 #--- spacecraft's coordinates are returned after transformation into
 #--- the magnetotail aligned coordinate system.
 #
-    xtail,ytail,ztail,idloc = locreg(xkp,xgsm,ygsm,zgsm)
+    xtail,ytail,ztail,idloc = crr.locreg(xkp,xgsm,ygsm,zgsm)
 #
 #--- the spacecraft is in region 1: the solar wind
 #
@@ -263,9 +257,8 @@ def crmflx(xkp,xgsm,ygsm,zgsm,ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,\
 #
         fluxmn,flux95,flux50,fluxsd = \
             nbrflux(xkp,nsectr2,sectx2,secty2,scmean2,sc952,sc502, \
-                    scsig2,xtail,ytail,ztail,numdat2,xflux2,yflux2,zflux2,\
-                    flxbin2,numbin2,smooth1,nflxget,ndrophi,ndroplo,logflg,\
-                    rngtol,fpchi,fpclo)
+                    scsig2,xtail,ytail,ztail,mshdb,smooth1,nflxget,ndrophi,\
+                    ndroplo,logflg,rngtol,fpchi,fpclo)
 #
 #--- the spacecraft is in region 3, the magnetosphere
 #
@@ -292,10 +285,8 @@ def crmflx(xkp,xgsm,ygsm,zgsm,ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,\
 #
         fluxmn,flux95,flux50,fluxsd = \
                 nbrflux_map_z(xkp3,nsectr3,sectx3,secty3,scmean3,sc953,
-                              sc503,scsig3,xtail,ytail,ztail,numdat3,xflux3,yflux3,zflux3,
-                              flxbin3,numbin3,smooth1,nflxget,ndrophi,ndroplo,logflg,
-                              rngtol,fpchi,fpclo,nsphvol3,ioffset3,joffset3,koffset3,
-                              imapindx3)
+                              sc503,scsig3,xtail,ytail,ztail,mspdb,smooth1,nflxget,
+                              ndrophi,ndroplo,logflg,rngtol,fpchi,fpclo)
     else:
         print(" error in phenomenological region id!")
         exit(1)
@@ -303,6 +294,137 @@ def crmflx(xkp,xgsm,ygsm,zgsm,ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,\
 
     return idloc, fluxmn, flux95, flux50, fluxsd
 
+#----------------------------------------------------------------------------
+#-- crmflx_batch: calculates the ion flux for arrays of kp values and positions
+#----------------------------------------------------------------------------
+
+def crmflx_batch(xkp_array,xgsm,ygsm,zgsm,ispeci,iusesw,fswimn,fswi95,fswi50,fswisd,\
+           iusemsh,iusemsp,smooth1,nflxget,ndrophi,ndroplo,logflg,rngtol,fpchi,fpclo,\
+           swdb, mshdb, mspdb):
+    """
+    this routine calculates the ion flux for every kp value in xkp_array
+    at every satellite position in one call. the kp scaling parameters
+    depend only on kp, so they are computed once per kp value instead of
+    once per position, and the regions of all positions are found at once
+    for each kp value (see crm_region.locreg_array). the near-neighbor flux is
+    computed by the typed kernels (nbrflux_kernel, nbrflux_map_z_kernel)
+    with one set of work arrays.
+
+    input:  xkp_array   --- array of kp indices user desires output for.
+            xgsm        --- array of satellite's x-coordinates (re).
+            ygsm        --- array of satellite's y-coordinates (re).
+            zgsm        --- array of satellite's z-coordinates (re).
+            the rest of the input is same as crmflx
+
+    output: idloc   --- int array (kp x position) of phenomenogical region
+                        location identification flag (see crmflx)
+            fluxmn  --- array (kp x position) of mean flux (#/[cm^2-sec-sr-mev]).
+            flux95  --- array (kp x position) of 95% flux (#/[cm^2-sec-sr-mev]).
+            flux50  --- array (kp x position) of 50% flux (#/[cm^2-sec-sr-mev]).
+            fluxsd  --- array (kp x position) of standard deviation of flux.
+    """
+    cdef double [:] kp_v = numpy.ascontiguousarray(xkp_array, dtype=numpy.float64)
+    cdef double [:] x_v  = numpy.ascontiguousarray(xgsm,      dtype=numpy.float64)
+    cdef double [:] y_v  = numpy.ascontiguousarray(ygsm,      dtype=numpy.float64)
+    cdef double [:] z_v  = numpy.ascontiguousarray(zgsm,      dtype=numpy.float64)
+    cdef Py_ssize_t nkp  = kp_v.shape[0]
+    cdef Py_ssize_t npnt = x_v.shape[0]
+    cdef Py_ssize_t i, j
+    cdef double xkp, xkp3, xtail, ytail, ztail
+    cdef long   iloc
+    cdef double [:] xtail_v, ytail_v, ztail_v
+    cdef long   [:] iloc_v
+    cdef double [:] sectx2, secty2, sectx3, secty3
+    cdef double [:,:] scmean2, sc952, sc502, scsig2
+    cdef double [:,:] scmean3, sc953, sc503, scsig3
+    cdef FluxView mshview = mshdb.view
+    cdef FluxView mspview = mspdb.view
+    cdef int      ismooth = smooth1
+    cdef double   drngtol = rngtol
+    cdef fluxstat out
+#
+#--- the work arrays of the kernels
+#
+    cdef double [:]   flxsto  = numpy.zeros(maxcell)
+    cdef double [:]   numsto  = numpy.zeros(maxcell)
+    cdef long   [:]   numstoi = numpy.zeros(maxcell, dtype=int)
+    cdef double [:,:] work    = numpy.zeros((12, maxkp))
+
+    idloc  = numpy.zeros((nkp, npnt), dtype=numpy.int64)
+    fluxmn = numpy.zeros((nkp, npnt))
+    flux95 = numpy.zeros((nkp, npnt))
+    flux50 = numpy.zeros((nkp, npnt))
+    fluxsd = numpy.zeros((nkp, npnt))
+
+    cdef long   [:, :] idloc_v  = idloc
+    cdef double [:, :] fluxmn_v = fluxmn
+    cdef double [:, :] flux95_v = flux95
+    cdef double [:, :] flux50_v = flux50
+    cdef double [:, :] fluxsd_v = fluxsd
+
+    for i in range(0, nkp):
+        xkp = kp_v[i]
+#
+#--- magnetosheath scaling parameters for this kp
+#
+        nsectr2,sectx2,secty2,scmean2,sc952,sc502,scsig2 = scalkp2(xkp,ispeci)
+#
+#--- magnetosphere scaling parameters for this kp (avoid the xkp = 0 value)
+#
+        if xkp <= -1.5:
+            xkp3 = 1.5
+        else:
+            xkp3 = xkp
+        nsectr3,sectx3,secty3,scmean3,sc953,sc503,scsig3 = scalkp3(xkp3,ispeci)
+#
+#--- find the regions of all positions for this kp at once
+#
+        xtail_a, ytail_a, ztail_a, iloc_a = \
+                    crr.locreg_array(xkp, numpy.asarray(x_v), numpy.asarray(y_v), numpy.asarray(z_v))
+        xtail_v = xtail_a
+        ytail_v = ytail_a
+        ztail_v = ztail_a
+        iloc_v  = iloc_a
+
+        for j in range(0, npnt):
+            xtail = xtail_v[j]
+            ytail = ytail_v[j]
+            ztail = ztail_v[j]
+            iloc  = iloc_v[j]
+#
+#--- solar wind: use the user's value for the uniform solar wind flux
+#
+            if iloc == 1:
+                out.fluxmn = fswimn
+                out.flux95 = fswi95
+                out.flux50 = fswi50
+                out.fluxsd = fswisd
+#
+#--- magnetosheath
+#
+            elif iloc == 2:
+                out = nbrflux_kernel(xtail, ytail, ztail, sectx2, secty2, scmean2,\
+                                     sc952, sc502, scsig2, mshview, ismooth, drngtol,\
+                                     flxsto, numsto, work)
+#
+#--- magnetosphere
+#
+            elif iloc == 3:
+                out = nbrflux_map_z_kernel(xtail, ytail, ztail, sectx3, secty3, scmean3,\
+                                           sc953, sc503, scsig3, mspview, ismooth, drngtol,\
+                                           flxsto, numstoi, work)
+            else:
+                print(" error in phenomenological region id!")
+                exit(1)
+
+            idloc_v[i, j]  = iloc
+            fluxmn_v[i, j] = out.fluxmn
+            flux95_v[i, j] = out.flux95
+            flux50_v[i, j] = out.flux50
+            fluxsd_v[i, j] = out.fluxsd
+
+    return idloc, fluxmn, flux95, flux50, fluxsd
+
 #----------------------------------------------------------------------------
 #-- mspinit:  opens the crm magnetosphere database file and initializes the datarrays
 #----------------------------------------------------------------------------
@@ -316,17 +438,8 @@ def  mspinit(ispeci):
                         ispeci = 1 for protons
                         ispeci = 2 for helium
                         ispeci = 3 for cno
-    output: xflux3  --- array of arrays of containing the x-coordinate of each data cell's center (re)
-            yflux3  --- array of arrays of containing the y-coordinate of each data cell's center (re)
-            zflux3  --- array of arrays of containing the z-coordinate of each data cell's center (re)
-            flxbin3 --- array of arrays of the average ion flux within each cell  (ions/[cm^2-sec-sr-mev])
-            numbin3 --- array of arrays of the number of non-zero values within each cell
-            numdat3 --- number of non-zero values in the database
-            nsphvol3  - number of volume elements stored in search volume.
-            ioffset3  - array of offset indices for x-direction.
-            joffset3  - array of offset indices for y-direction.
-            koffset3  - array of offset indices for z-direction.
-            imapindx3 - array of pointers to flux database.
+    output: mspdb   --- FluxDatabase of the magnetosphere, with the search
+                        volume used for the near-neighbor flux
 
     param included xinc, yinc, zinc
     """
@@ -346,7 +459,7 @@ def  mspinit(ispeci):
         print("No data file found: msph_short.asc")
         exit(1)
 
-    xflux3, yflux3, zflux3, flxbin3, numbin3, numdat3, imapindx3 = read_init_data_file(ifile)
+    mspdb = read_init_data_file(ifile)
 #
 #--- get the (i,j,k) index offset values used to search for the
 #--- near-neighbor flux
@@ -354,10 +467,9 @@ def  mspinit(ispeci):
 #--- set the maximum distance (re) to search for a near-neighbo
 #
     distmapmax3 = 20.0
-    nsphvol3, ioffset3,joffset3,koffset3 = mapsphere(distmapmax3,xinc,yinc,zinc)
+    mspdb.set_search_volume(distmapmax3)
 
-    return  xflux3, yflux3, zflux3, flxbin3, numbin3,numdat3, imapindx3,\
-            nsphvol3, ioffset3,joffset3,koffset3
+    return  mspdb
 
 #----------------------------------------------------------------------------
 #-- mshinit: opens the crm magnetosheath database file and initializes the datarrays
@@ -372,12 +484,8 @@ def mshinit(ispeci):
                         ispeci = 1 for protons
                         ispeci = 2 for helium
                         ispeci = 3 for cno
-    output: xflux2  --- array of arrays of containing the x-coordinate of each data cell's center (re)
-            yflux2  --- array of arrays of containing the y-coordinate of each data cell's center (re)
-            zflux2  --- array of arrays of containing the z-coordinate of each data cell's center (re)
-            flxbin2 --- array of arrays of the average ion flux within each cell  (ions/[cm^2-sec-sr-mev])
-            numbin2 --- array of arrays of the number of non-zero values within each cell
-            numdat2 --- number of non-zero values in the database
+    output: mshdb   --- FluxDatabase of the magnetosheath, with the search
+                        volume used for the near-neighbor flux
     """
 #
 #--- open input file containing solar wind data
@@ -395,7 +503,10 @@ def mshinit(ispeci):
         print("No data file found: msheath_short.asc")
         exit(1)
 
-    return read_init_data_file(ifile, 0)
+    mshdb = read_init_data_file(ifile)
+    mshdb.set_search_volume(20.0)
+
+    return mshdb
 
 #----------------------------------------------------------------------------
 #-- swinit: opens the crm solar wind database file and initializes the datarrays
@@ -410,12 +521,8 @@ def swinit(ispeci):
                         ispeci = 1 for protons
                         ispeci = 2 for helium
                         ispeci = 3 for cno
-    output: xflux1  --- array of arrays of containing the x-coordinate of each data cell's center (re)
-            yflux1  --- array of arrays of containing the y-coordinate of each data cell's center (re)
-            zflux1  --- array of arrays of containing the z-coordinate of each data cell's center (re)
-            flxbin1 --- array of arrays of the average ion flux within each cell  (ions/[cm^2-sec-sr-mev])
-            numbin1 --- array of arrays of the number of non-zero values within each cell
-            numdat1 --- number of non-zero values in the database
+    output: swdb    --- FluxDatabase of the solar wind, with the search
+                        volume used for the near-neighbor flux
     """
 #
 #--- open input file containing solar wind data
@@ -433,51 +540,56 @@ def swinit(ispeci):
         print("No data file found: solwind_short.asc")
         exit(1)
 
-    return read_init_data_file(ifile, 0)
+    swdb = read_init_data_file(ifile)
+    swdb.set_search_volume(20.0)
+
+    return swdb
 
 #----------------------------------------------------------------------------
 #-- read_init_data_file(ifile): read input ascii file and initialize the datarrays
 #----------------------------------------------------------------------------
 
-def read_init_data_file(ifile, iset=1):
+def read_init_data_file(ifile):
     """
-    read input ascii file and initialize the datarrays
+    read input ascii file and initialize the datarrays. the parsed data are
+    kept in a binary cache file (see read_cached_data_file) and the ascii
+    file is parsed only when the cache is missing or out of date.
     input:  ifile   --- data file name
-            iset    --- if > 0, create imapindx
-    output: xflux   --- array of arrays of containing the x-coordinate of each data cell's center (re)
-            yflux   --- array of arrays of containing the y-coordinate of each data cell's center (re)
-            zflux   --- array of arrays of containing the z-coordinate of each data cell's center (re)
-            flxbin  --- array of arrays of the average ion flux within each cell  (ions/[cm^2-sec-sr-mev])
-            numbin  --- array of arrays of the number of non-zero values within each cell
-            Note: sub arrays have different length and you cannot apply noraml numpy operation
-            numdat  --- number of non-zero values in the database
-            imapindx--- array of pointers to flux database (if iset ==), this is not created)
+    output: fdb     --- FluxDatabase holding the cells of all kp values
+    """
+    cfile = os.path.splitext(ifile)[0] + '.npz'
+
+    cdata = read_cached_data_file(ifile, cfile)
+    if cdata is None:
+        cdata = parse_init_data_file(ifile)
+        write_cached_data_file(ifile, cfile, cdata)
+
+    return FluxDatabase(cdata)
+
+#----------------------------------------------------------------------------
+#-- parse_init_data_file: parse input ascii file into flat arrays          --
+#----------------------------------------------------------------------------
+
+def parse_init_data_file(ifile):
+    """
+    parse input ascii file into flat arrays. the cells of each kp value are
+    stored one after another (kp 0 cells first, then kp 1 cells, ...).
+    input:  ifile   --- data file name
+    output: cdata   --- dictionary of flat arrays:
+                        xflux, yflux, zflux, flxbin, numbin, xidx, yidx, zidx
+                        and numdat (number of cells for each kp)
     """
 #
 #--- read data file
 #
     data = mcf.read_data_file(ifile)
 #
-#--- initialize
-#
-    xflux  = []
-    yflux  = []
-    zflux  = []
-    flxbin = []
-    numbin = []
-    numdat = []
-    if iset > 0:
-        imapindx = numpy.full((maxkp, maxnum, maxnum, maxnum), -9999, int)
+#--- initialize; the data lists are created for each kp values between 1 and 9 (0 - 8 columns)
 #
-#--- the data lists are created for each kp values between 1 and 9 (0 - 8 columns)
-#
-    for k in range(0, maxkp):
-        xflux.append([])
-        yflux.append([])
-        zflux.append([])
-        flxbin.append([])
-        numbin.append([])
-        numdat.append(0)
+    names = ['xflux', 'yflux', 'zflux', 'flxbin', 'numbin', 'xidx', 'yidx', 'zidx']
+    save  = {}
+    for name in names:
+        save[name] = [[] for k in range(0, maxkp)]
 
     for ent in data:
         atemp = re.split('\s+', ent)
@@ -503,472 +615,223 @@ def read_init_data_file(ifile, iset=1):
                 nval = int(float(atemp[15+k]))
 
                 if nval > 0:
-                    xflux[k].append(xpos)
-                    yflux[k].append(ypos)
-                    zflux[k].append(zpos)
-                    flxbin[k].append(fval)
-                    numbin[k].append(nval)
-
-                    if iset > 0:
-                        imapindx[k][xidx][yidx][zidx] = int(numdat[k])
-
-                    numdat[k] += 1
-#
-#--- since the lists in the lists are all different length, we need to handle 
-#--- separately to convert into an array
-#
-    xflux   = numpy.array([numpy.array(xi) for xi in xflux])
-    yflux   = numpy.array([numpy.array(xi) for xi in yflux])
-    zflux   = numpy.array([numpy.array(xi) for xi in zflux])
-    flxbin  = numpy.array([numpy.array(xi) for xi in flxbin])
-    numbin  = numpy.array([numpy.array(xi).astype(int) for xi in numbin])
-    numdat  = numpy.array(numdat)
-
-    if iset  > 0:
-        return xflux, yflux, zflux, flxbin, numbin, numdat, imapindx
-    else:
-        return xflux, yflux, zflux, flxbin, numbin, numdat
-         
-#----------------------------------------------------------------------------
-#-- locreg: determines which phenomenological region the spacecraft is in  --
-#----------------------------------------------------------------------------
-
-def locreg( xkp, xgsm, ygsm, zgsm):
-    """
-    this routine determines which phenomenological region the
-    spacecraft is in.
-    
-    input:  xkp     --- kp index (real value between 0 & 9).
-            xgsm    --- satellite's x-coordinate (re).
-            ygsm    --- satellite's y-coordinate (re).
-            zgsm    --- satellite's z-coordinate (re).
-         
-    output: xtail   --- satellite's x-coordinate in geotail system (re).
-            ytail   --- satellite's y-coordinate in geotail system (re).
-            ztail   --- satellite's z-coordinate in geotail system (re).
-            idloc   --- phenomenogical region location identification flag:
-                        idloc = 1 if spacecraft is in solar wind
-                        idloc = 2 if spacecraft is in magnetosheath
-                        idloc = 3 if spacecraft is in magnetosphere
-    """
-#
-#--- set the region identification flag to "no region
-#
-    idloc = 0
-#
-#--- get the solar wind parameters used as inputs for the bow shock
-#--- and magnetopause boundary models for this value of kp
-#
-    [bx,by,bz,vx,vy,vz,dennum,swetemp,swptemp,hefrac,swhtemp,bowang,dypres,abang,xhinge]\
-                    = solwind(xkp)
-#
-#--- transform the spacecraft's coordinates to a system aligned with the geotail
-#
-#--- rotate the bow shock by the aberration angle
-#
-    angrad        = -abang * 0.01745329252
-    [xtail,ytail] = rot8ang(angrad,xgsm,ygsm,xhinge)
-    ztail         = zgsm
-#
-#--- determine if the spacecraft is inside the magnetosphere.  use the
-#--- tsyganenko magnetopause model
-#
-    vel = -1
-    xmgp,ymgp,zmgp,dist,xid = locate(dypres,vel,xtail,ytail,ztail)
-#
-#--- the spacecraft is inside the magnetosphere
-#
-    if xid == 1:
-        idloc = 3
-#
-#--- determine if the spacecraft is in either the solar wind or
-#--- the magnetosheath.  calculate the bow shock radius at this point
-#
-    else:
-        radbs = bowshk2(bx,by,bz,vx,vy,vz,dennum,swetemp,swptemp,hefrac,swhtemp,xtail,bowang)
-#
-#--- find the distance of the spacecraft from the aberrated x-axi
-#
-        distsc = math.sqrt(ytail**2 + ztail**2)
-#
-#--- the spacecraft is in the magnetosheath
-#
-        if distsc <= radbs:
-            idloc = 2
-#
-#--- the spacecraft is in the solar wind
-#
+                    save['xflux'][k].append(xpos)
+                    save['yflux'][k].append(ypos)
+                    save['zflux'][k].append(zpos)
+                    save['flxbin'][k].append(fval)
+                    save['numbin'][k].append(nval)
+                    save['xidx'][k].append(xidx)
+                    save['yidx'][k].append(yidx)
+                    save['zidx'][k].append(zidx)
+
+    cdata = {}
+    cdata['numdat'] = numpy.array([len(ent) for ent in save['xflux']]).astype(int)
+    for name in names:
+        flat = [val for ent in save[name] for val in ent]
+        if name in ['xflux', 'yflux', 'zflux', 'flxbin']:
+            cdata[name] = numpy.array(flat, dtype=float)
         else:
-            idloc = 1
-
-    return xtail, ytail, ztail, idloc
-
-#----------------------------------------------------------------------------
-#-- bowshk2: give the bow shock radius, at a given x                      ---
-#----------------------------------------------------------------------------
-
-def bowshk2( bx, by, bz, vx, vy, vz, dennum, swetemp, swptemp,  hefrac, swhtemp, xpos, bowang):
-    """
-    this routine is designed to give the bow shock radius, at a
-    given x, of the bow shock for any solar wind conditions.
-    
-    
-    references:
-    this routine is adpated from the paper by l. bennet et.al.,
-    "a model of the earth's distant bow shock."  this paper was
-    to be published in the journal of geophysical research, 1997.
-    their source code was obtained from their web site at:
-    http://www.igpp.ucla.edu/galileo/newmodel.htm
-    
-    this routine has been optimized for the simulation.
-    
-    inputs  bx      --- the imf b_x [nt]
-            by      --- the imf b_y [nt]
-            bz      --- the imf b_z [nt]
-            vx      --- the imf v_x [km/s]
-            vy      --- the imf v_y [km/s]
-            vz      --- the imf v_z [km/s]
-            dennum  --- the solar wind proton number density [#/cm^3]
-            swetemp --- the solar wind electron temperature [k]
-            swptemp --- the solar wind proton temperature [k]
-            hefrac  --- fraction of solar wind ions which are helium ions
-            swhtemp --- the temperature of the helium [k]
-            xpos    --- down tail distance cross section is calculated [re]
-            bowang  --- angle bow shock radius calculated (rad).
-    
-    output: bowrad  --- updated cylindrical radius (re).
-
-    """
-#
-#--- convert the temperature from kelvins to ev
-#
-    etemp  = swetemp / 11600.
-    ptemp  = swptemp / 11600.
-    hetemp = swhtemp / 11600.
-    dpr    = 6.2832  / 360.0
-    rade   = 6378.0
-    pi     = 4.0 * math.atan(1.0)
-    gamma  = 5.0 / 3.0
-#
-#--- parameters that specify the shape of the base model
-#--- of the bow shock.  the model has the form
-#--- rho**2 = a*x**2 -b*x + c.
-#---
-#--- the parameters are for the greenstadt etal. 1990 model
-#--- (grl, vol 17, p 753, 1990)
-#
-    xl = 22.073117134
-    x0 =  3.493725046
-    xn = 14.422071657
-#
-#--- here the eccentricity of the base model is adjusted.  see 
-#--- the paper for an explanation
-#
-    eps = 1.0040
-#
-#--- calculate new paramaters for cylindrical shock model after
-#--- adjustment of eccentricity.
-#
-#--- calculate parameters of interest
-#
-    btotcgs = math.sqrt(bx * bx + by * by + bz * bz) * 1.e-5    #--- btot in cgs units
-    btot    = btotcgs * 1.e+5                                   #--- btot in mks units
-    vtot    = math.sqrt(vx * vx + vy * vy + vz * vz) * 1.e+5    #--- vtot in cm/sec
-    vtot1   = math.sqrt(vx * vx + vy * vy + vz * vz)            #--- vtot in km/sec
-#
-#--- the following definitions of v_a and c_s are taken from
-#--- slavin & holzer jgr dec 1981
-#
-    v_a   = btotcgs / math.sqrt(4.0 * pi * dennum * 1.67e-24 * (1.0 + hefrac * 4.0)) 
-    pres1 = dennum * ((1.0 + hefrac * 2.0) * etemp + (1 + hefrac * hetemp) * ptemp) * 1.602e-12
-    c_s   = math.sqrt(2.0 * pres1 / (dennum * 1.67e-24 * (1.0 + hefrac * 4.0)))
-#
-#--- calculate mach numbers
-#
-#--- m_f is the fast magnetosonic speed for theta_bn = 90 degrees
-#
-    m_a = vtot / v_a
-    m_s = vtot / c_s
-    m_f = vtot / math.sqrt(v_a * v_a + c_s * c_s)
-#
-#--- this is the modification for the change in the bow shock due
-#--- to changing solar wind dynamic pressure
-#
-#--- average values of number density and solar wind velocity
-#
-    xnave =  7.0
-    vave = 430.0
-#
-#--- fracpres is the fraction by which all length scales in the
-#--- bow shock model will change due to the change in the sola
-#--- wind dynamic pressure
-#
-    fracpres = ((xnave * vave * vave) / (dennum * vtot1 * vtot1))**(1.0/6.0)
-
-    xn1 = xn * fracpres
-    x0  = x0 * fracpres
-    xl  = xl * fracpres
-#
-#--- calculate yet again the parameters for the updated model
-#
-    a = eps * eps -1
-    b = 2.0 * eps * xl + 2.0 *( eps * eps -1) * x0
-    c = xl * xl + 2.0 * eps * xl * x0 + (eps * eps -1) * x0 * x0
-#
-#--- calculate shock with correct pressure
-#
-    xtemp = a * xpos**2 - b * xpos + c
-    if xtemp < 0:
-        rho2 = 0
-    else:
-        rho2 = math.sqrt(xtemp)
-#
-#--- modify the bow shock for the change in flaring due to the
-#--- change in local magnetosonic mach number
-#
-#--- first calculate the flaring angle for average solar wind conditions
-#
-    ave_ma   = 9.4
-    ave_ms   = 7.2
-    vwin_ave = 430.0*1.e+5
-    va_ave   = vwin_ave / ave_ma
-    vs_ave   = vwin_ave / ave_ms
-    bxave    = -3
-    byave    =  3
-    bzave    =  0
-
-    vms      = math.sqrt(0.5 * ((va_ave**2 + vs_ave**2) \
-                + math.sqrt((va_ave**2  + vs_ave**2)**2 \
-                - 4.0 * va_ave**2 * vs_ave**2 *(math.cos(45 * dpr)**2))))
-
-    ave_mf   = vwin_ave / vms
-    thet2    = math.asin(1.0 / ave_mf)
-#
-#--- now calculate the cylindrical radius, and the y and z coordinates,
-#--- of the shock for the angle bowang around the tail axis for a given
-#--- xpos.  note that bowang is 0 along the positive z axis
-#--- (bowang/dpr is the angle about the tail axis in degrees,
-#--- rhox is the updated cylindrical radius of the prevailing bow
-#--- shock at downtail distance xpos in earth radii.
-#
-    vms      = fast(bx,by,bz,v_a,c_s,vtot,bowang)
-
-    m_f      = vtot / vms
-    thet1    = math.asin(1.0 / m_f)
-    xtemp1   = xn1 - xpos
-    rhox     = rho2 + xtemp1 * (math.tan(thet1) - math.tan(thet2))
-    bowrad   = rhox
-
-    return bowrad
-
-#----------------------------------------------------------------------------
-#-- fast: local fast magnetosonic speed                                    --
-#----------------------------------------------------------------------------
-
-def fast( bx, by, bz, va, vs, v0, alp):
-    """
-    local fast magnetosonic speed
-
-    it uses the simple bisection method to solve the equations.
-    accuracy to 0.01 in v_ms is good enough 
-    
-        this routine is adpated from the paper by l. bennet et.al.,
-        "a model of the earth's distant bow shock."  this paper was
-        to be published in the journal of geophysical research, 1997.
-        this source code is from their web site at:
-        http://www.igpp.ucla.edu/galileo/newmodel.htm
-    """
-    dpr  = 6.2832/360.0
-    btot = math.sqrt(bx * bx + by * by + bz * bz)
-    vx   = 1
-    va1  = va / 1.0e5
-    vs1  = vs / 1.0e5
-    v01  = v0 / 1.0e5
-
-    func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
-
-    step1 = 2.0
-    step2 = 0.1
-    step3 = 0.01
-
-    if func > 0:
-        while func > 0:
-            vx += step1
-            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
-            if func <= 0:
-                break
-
-        while func < 0:
-            vx -= step2
-            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
-            if func >= 0:
-                break
-
-        while func > 0:
-            vx += step3
-            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
-            if func <= 0:
-                break
-
-    elif func < 0:
-        while func < 0:
-            vx += step1
-            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
-            if func >= 0:
-                break
-
-        while func > 0:
-            vx -= step2
-            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
-            if func <= 0:
-                break
-
-        while func < 0:
-            vx += step3
-            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
-            if func >= 0:
-                break
-
-    vy    = math.sin(alp) * math.sqrt(v01 * vx - vx**2)
-    vz    = math.cos(alp) * math.sqrt(v01 * vx - vx**2)
-
-    angle = math.acos((bx * vx + by * vy + bz * vz)\
-                      /(math.sqrt(bx * bx + by * by + bz * bz) \
-                      * math.sqrt(vx * vx + vy * vy + vz * vz)))
-
-    vms   = 1.0e5 * math.sqrt(vx * vx + vy * vy + vz * vz)
-
-    return vms
-
-#----------------------------------------------------------------------------
-#----------------------------------------------------------------------------
-#----------------------------------------------------------------------------
-
-def fast_func( bx,  by,  bz,  alp, btot,  vx,  va1,  vs1,  v01):
+            cdata[name] = numpy.array(flat, dtype=int)
+
+    return cdata
+
+#----------------------------------------------------------------------------
+#-- FluxDatabase: crm flux database of one region for all kp values        --
+#----------------------------------------------------------------------------
+
+class FluxDatabase():
+    """
+    crm flux database of one region (solar wind, magnetosheath or magnetosphere)
+    for all kp values. the cells of all kp values are kept in flat contiguous
+    arrays, one kp after another; the cells of kp index k are in the range
+    offset[k] <= i < offset[k+1] of the flat arrays.
+
+    the grid index is kept in two small levels instead of a dense 
+    (maxkp, maxnum, maxnum, maxnum) block:
+        cellrow[x, y, z]  --- row number of the grid cell (-1 if no kp has data there)
+        rowindx[kp, row]  --- position of the cell in the flat arrays (-1 if no data)
+
+    the flat arrays are also cut into chunks of chunklen cells, and the bounding
+    box of the cell centers of each chunk is kept in chunkbox (see flxdat1_chunk).
+    """
+    def __init__(self, cdata):
+        """
+        initialize a FluxDatabase object
+        input:  cdata   --- dictionary of flat arrays (see parse_init_data_file)
+        output: numdat  --- array of the number of non-zero cells for each kp
+                offset  --- array of the start position of each kp in the flat arrays
+                xflux   --- array of the x-coordinate of each data cell's center (re)
+                yflux   --- array of the y-coordinate of each data cell's center (re)
+                zflux   --- array of the z-coordinate of each data cell's center (re)
+                flxbin  --- array of the average ion flux within each cell  (ions/[cm^2-sec-sr-mev])
+                numbin  --- array of the number of non-zero values within each cell
+                cellrow --- grid index of the rows (see above)
+                rowindx --- position of the cells of each kp (see above)
+                chunkbox--- bounding box of each chunk of the flat arrays (see above)
+        """
+        self.numdat = numpy.array(cdata['numdat']).astype(int)
+        self.offset = numpy.concatenate([[0], numpy.cumsum(self.numdat)]).astype(int)
+
+        self.xflux  = numpy.ascontiguousarray(cdata['xflux'],  dtype=float)
+        self.yflux  = numpy.ascontiguousarray(cdata['yflux'],  dtype=float)
+        self.zflux  = numpy.ascontiguousarray(cdata['zflux'],  dtype=float)
+        self.flxbin = numpy.ascontiguousarray(cdata['flxbin'], dtype=float)
+        self.numbin = numpy.ascontiguousarray(cdata['numbin'], dtype=int)
+
+        self.make_map_index(cdata['xidx'], cdata['yidx'], cdata['zidx'])
+        self.make_chunk_box()
+        self.set_search_volume(0.0)
+
+    def make_map_index(self, xidx, yidx, zidx):
+        """
+        create the two level grid index of the cells
+        input:  xidx    --- flat array of the x grid index of each cell
+                yidx    --- flat array of the y grid index of each cell
+                zidx    --- flat array of the z grid index of each cell
+        output: self.cellrow, self.rowindx
+        """
+        key       = (numpy.array(xidx) * maxnum + numpy.array(yidx)) * maxnum + numpy.array(zidx)
+        ukey, row = numpy.unique(key, return_inverse=True)
+
+        cellrow   = numpy.full(maxnum**3, -1, dtype=numpy.int32)
+        cellrow[ukey] = numpy.arange(0, len(ukey))
+        self.cellrow  = cellrow.reshape((maxnum, maxnum, maxnum))
+
+        kpidx     = numpy.repeat(numpy.arange(0, maxkp), self.numdat)
+        self.rowindx  = numpy.full((maxkp, len(ukey)), -1, dtype=numpy.int32)
+        self.rowindx[kpidx, row.ravel()] = numpy.arange(0, len(key))
+
+    def make_chunk_box(self):
+        """
+        find the bounding box of the cell centers of each chunk of chunklen cells
+        of the flat arrays. a chunk can hold the cells of two kp values; the box
+        is still a bound of the cells of each of them
+        input:  none, but use self.xflux, self.yflux, self.zflux
+        output: self.chunkbox   --- array of [xlo, xhi, ylo, yhi, zlo, zhi] of each chunk
+        """
+        cstart = numpy.arange(0, len(self.xflux), chunklen)
+        box    = numpy.zeros((len(cstart), 6))
+        if len(cstart) > 0:
+            for k, pos in enumerate([self.xflux, self.yflux, self.zflux]):
+                box[:, 2*k]   = numpy.minimum.reduceat(pos, cstart)
+                box[:, 2*k+1] = numpy.maximum.reduceat(pos, cstart)
+
+        self.chunkbox = box
+
+    def set_search_volume(self, distmapmax):
+        """
+        set the search volume for the near-neighbor flux (see mapsphere)
+        input:  distmapmax  --- maximum distance (re) to search for a near-neighbor
+        output: self.nsphvol, self.ioffset, self.joffset, self.koffset
+                self.view   --- FluxView of the database (see FluxView)
+        """
+        self.nsphvol, self.ioffset, self.joffset, self.koffset \
+                    = mapsphere(distmapmax, xinc, yinc, zinc)
+
+        self.view = FluxView(self)
+
+#----------------------------------------------------------------------------
+#-- FluxView: typed views of a FluxDatabase for the cdef kernels           --
+#----------------------------------------------------------------------------
+
+cdef class FluxView:
+    """
+    typed views of the arrays of a FluxDatabase and of the grid parameters.
+    the cdef kernels of the near-neighbor flux (nbrflux_kernel, 
+    nbrflux_map_z_kernel) read the database through it, without python objects.
+    """
+    cdef double [:]     xflux, yflux, zflux, flxbin
+    cdef long   [:]     numbin, offset
+    cdef double [:,:]   chunkbox
+    cdef int    [:,:,:] cellrow
+    cdef int    [:,:]   rowindx
+    cdef long   [:]     ioffset, joffset, koffset
+    cdef long   nsphvol, maxnum, maxkp, maxcell
+    cdef double xmin, ymin, zmin, xinc, yinc, zinc
+
+    def __init__(self, fdb):
+        """
+        initialize a FluxView object
+        input:  fdb     --- FluxDatabase
+        """
+        self.xflux    = fdb.xflux
+        self.yflux    = fdb.yflux
+        self.zflux    = fdb.zflux
+        self.flxbin   = fdb.flxbin
+        self.numbin   = fdb.numbin
+        self.offset   = numpy.ascontiguousarray(fdb.offset,  dtype=int)
+        self.chunkbox = fdb.chunkbox
+        self.cellrow  = fdb.cellrow
+        self.rowindx  = fdb.rowindx
+        self.ioffset  = numpy.ascontiguousarray(fdb.ioffset, dtype=int)
+        self.joffset  = numpy.ascontiguousarray(fdb.joffset, dtype=int)
+        self.koffset  = numpy.ascontiguousarray(fdb.koffset, dtype=int)
+        self.nsphvol  = fdb.nsphvol
+        self.maxnum   = maxnum
+        self.maxkp    = maxkp
+        self.maxcell  = maxcell
+        self.xmin     = xmin
+        self.ymin     = ymin
+        self.zmin     = zmin
+        self.xinc     = xinc
+        self.yinc     = yinc
+        self.zinc     = zinc
+
+#----------------------------------------------------------------------------
+#-- read_cached_data_file: read the binary cache of the database file      --
+#----------------------------------------------------------------------------
+
+def read_cached_data_file(ifile, cfile):
+    """
+    read the binary cache of the database file. the cache keeps the
+    modification time and the size of the ascii file it was made from,
+    and it is used only if they still match the ascii file.
+    input:  ifile   --- ascii data file name
+            cfile   --- cache file name
+    output: cdata   --- dictionary of flat arrays (see parse_init_data_file)
+                        None if the cache is missing or out of date
+    """
+    if not os.path.isfile(cfile):
+        return None
+
+    stat = os.stat(ifile)
+    try:
+        with numpy.load(cfile) as fz:
+            if (float(fz['src_mtime']) != stat.st_mtime) \
+                    or (int(fz['src_size']) != stat.st_size):
+                return None
 
-    out  = va1**2 + vs1**2 - 2.0 * v01 * vx + math.sqrt((va1**2 + vs1**2)**2         \
-           - 4.0 *va1**2 * vs1**2 * (vx * bx + by * math.sin(alp) * math.sqrt(v01*vx \
-           - vx**2) + bz * math.cos(alp) * math.sqrt(v01*vx                          \
-           - vx**2))**2 / (btot**2 *v01 * vx))
+            cdata = {}
+            for name in ['numdat', 'xflux', 'yflux', 'zflux', 'flxbin',\
+                         'numbin', 'xidx', 'yidx', 'zidx']:
+                cdata[name] = fz[name]
+    except Exception:
+        return None
 
-    return out
+    return cdata
 
 #----------------------------------------------------------------------------
-#-- locate: defines the position of a point  at the model magnetopause      -
+#-- write_cached_data_file: write the binary cache of the database file    --
 #----------------------------------------------------------------------------
 
-def locate( xn_pd, vel, xgsm, ygsm, zgsm):
+def write_cached_data_file(ifile, cfile, cdata):
     """
-    this subroutine defines the position of a point (xmgnp,ymgnp,zmgnp)
-    at the model magnetopause, closest to a given point of space
-    (xgsm,ygsm,zgsm),   and the distance between them (dist)
-    
-     nput:  xn_pd --- either solar wind proton number density (per c.c.) (if vel>0)
-                      or the solar wind ram pressure in nanopascals   (if vel<0)
-            vel   --- either solar wind velocity (km/sec)
-                      or any negative number, which indicates that xn_pd stands
-                      for the solar wind pressure, rather than for the density
-    
-            xgsm,ygsm,zgsm - coordinates of the observation point in earth radii
-    
-    output: xmgnp,ymgnp,zmgnp - coordinates of a point at the magnetopause,
-                                closest to the point  xgsm,ygsm,zgsm
-            dist  ---  the distance between the above two points, in re,
-            xid   ---  indicator; id=+1 and id=-1 mean that the point
-                       (xgsm,ygsm,zgsm)  lies inside or outside
-                       the model magnetopause, respectively
-    
-    the pressure-dependent magnetopause is that used in the t96_01 model
-    coded by:  n.a. tsyganenko, aug.1, 1995;  revised  june 22, 1996
-
+    write the binary cache of the database file. if the directory is not
+    writable, the cache is just not created.
+    input:  ifile   --- ascii data file name
+            cfile   --- cache file name
+            cdata   --- dictionary of flat arrays (see parse_init_data_file)
+    output: cfile
     """
-#
-#--- pd is the solar wind dynamic pressure (in nanopascals)
-#
-    if vel < 0.0:
-        pd = xn_pd
-    else:
-        pd = 1.94e-6 * xn_pd * vel**2
-#
-#--- ratio of pd to the average pressure, assumed as 2 npa
-#
-    rat   = pd / 2.0
-#
-#--- the power in the scaling factor is the best-fit value
-#--- obtained from data in the t96_01 version of the model
-#
-    rat16 = rat**0.14
-#
-#--- values of the magnetopause parameters for  pd = 2 npa are:
-#---   a0    = 70.00 /   s00   =  1.08 /   x00   =  5.48
-#--- values of the magnetopause parameters, scaled to the actual pressure
-#
-    a     = 70.0 / rat16
-    s0    = 1.08
-    x0    = 5.48 / rat16
-#
-#--- this is the x-coordinate of the "seam" between the ellipsoid and the cylinder
-#
-    xm    = x0 - a
-#
-#--- (for details on the ellipsoidal coordinates, see the paper:
-#--- n.a.tsyganenko, solution of chapman-ferraro problem for an
-#--- ellipsoidal magnetopause, planet.space sci., v.37, p.1037, 1989)
-#
-    if (ygsm != 0.0) or (zgsm != 0.0):
-        phi = math.atan2(ygsm,zgsm)
-    else:
-        phi = 0.0
-
-    rho = math.sqrt(ygsm**2 + zgsm**2)
-
-    if xgsm < xm:
-#
-#--- calculate (x,y,z) for the closest point at the magnetopause
-#
-        xmgnp   = xgsm
-        rhomgnp = a * math.sqrt(s0**2 - 1)
-        ymgnp   = rhomgnp * math.sin(phi)
-        zmgnp   = rhomgnp * math.cos(phi)
-#
-#--- xid=-1 means that the point lies outside the magnetosphere
-#--- xid=+1 means that the point lies inside  the magnetosphere
-#
-        xid     = 0
-        if rhomgnp > rho:
-            xid =  1
-        elif rhomgnp < rho:
-            xid = -1
-
-    else:
-        xksi  = (xgsm - x0) / a + 1.0
-        xdzt  = rho / a
-        sq1   = math.sqrt((1.0 + xksi)**2 + xdzt**2)
-        sq2   = math.sqrt((1.0 - xksi)**2 + xdzt**2)
-        sigma = 0.5 * (sq1 + sq2)
-        tau   = 0.5 * (sq1 - sq2)
-#
-#--- calculate (x,y,z) for the closest point at the magnetopause
-#
-        xmgnp   = x0 - a * (1.0 - s0 * tau)
-        rhomgnp = a * math.sqrt((s0**2 - 1.0)*(1.0 - tau**2))
-        ymgnp   = rhomgnp * math.sin(phi)
-        zmgnp   = rhomgnp * math.cos(phi)
-#
-#--- xid=-1 means that the point lies outside the magnetosphere
-#--- xid=+1 means that the point lies inside  the magnetosphere
-#
-        xid = 0
-        if sigma > s0:
-            xid = -1
-        elif sigma < s0:
-            xid =  1
-#
-#--- calculate the shortest distance between the point xgsm,ygsm,zgsm and the magnetopause
-#
-    dist = compute_rng(xgsm, ygsm, zgsm, xmgnp, ymgnp, zmgnp)
-
-    return xmgnp, ymgnp, zmgnp, dist, xid
+    stat  = os.stat(ifile)
+    tfile = cfile + '.tmp' + str(os.getpid())
+    try:
+        with open(tfile, 'wb') as fo:
+            numpy.savez(fo, src_mtime=stat.st_mtime, src_size=stat.st_size, **cdata)
+        os.replace(tfile, cfile)
+    except OSError:
+        if os.path.isfile(tfile):
+            os.remove(tfile)
 
 #----------------------------------------------------------------------------
 #-- mapsphere: finds the (i,j,k) index offset values                      ---
@@ -1006,49 +869,32 @@ def mapsphere(distmapmax,xinc,yinc,zinc):
     kstep   = int(distmapmax / zinc)
 #
 #--- store the index offset values for each volume element that
-#--- lies within the search volume sphere
+#--- lies within the search volume sphere. the elements are listed in
+#--- the same (i, j, k) loop order as the nested loops of the fortran code
 #
-    istart    = -istep
-    jstart    = -jstep
-    kstart    = -kstep
-    istop     =  istep + 1
-    jstop     =  jstep + 1
-    kstop     =  kstep + 1
-
-    rngoffset = numpy.zeros(maxnsphvol)
-    ioffset   = numpy.zeros(maxnsphvol).astype(int)
-    joffset   = numpy.zeros(maxnsphvol).astype(int)
-    koffset   = numpy.zeros(maxnsphvol).astype(int)
-    nsphvol   =0
-
-    for i in range(istart, istop):
-        for j in range(jstart, jstop):
-            for k in range(kstart, kstop):
+    [ioffset, joffset, koffset] = numpy.meshgrid(numpy.arange(-istep, istep + 1),\
+                                                 numpy.arange(-jstep, jstep + 1),\
+                                                 numpy.arange(-kstep, kstep + 1),\
+                                                 indexing='ij')
+    ioffset   = ioffset.ravel().astype(int)
+    joffset   = joffset.ravel().astype(int)
+    koffset   = koffset.ravel().astype(int)
 #
 #--- calculate the distance of this volume element from the
 #--- search volume's central volume element
 #
-                xrng = i * xinc
-                yrng = j * yinc
-                zrng = k * zinc
-                dist = math.sqrt(xrng**2 + yrng**2 + zrng**2)
-#
-#--- store this volume element's indices as part of the spherical search volume
-#
-                if dist <= distmapmax:
-                    rngoffset[nsphvol] = dist
-                    ioffset[nsphvol] = i
-                    joffset[nsphvol] = j
-                    koffset[nsphvol] = k
-                    nsphvol += 1
+    rngoffset = numpy.sqrt((ioffset * xinc)**2 + (joffset * yinc)**2 + (koffset * zinc)**2)
+
+    idx       = rngoffset <= distmapmax
+    rngoffset = rngoffset[idx][:maxnsphvol]
+    ioffset   = ioffset[idx][:maxnsphvol]
+    joffset   = joffset[idx][:maxnsphvol]
+    koffset   = koffset[idx][:maxnsphvol]
+    nsphvol   = len(rngoffset)
 #
 #--- sort the offset index arrays in ascending by geocentric range
 #--- from the center of the search volume
 #
-    rngoffset  = rngoffset[:nsphvol]
-    ioffset    = ioffset[:nsphvol]
-    joffset    = joffset[:nsphvol]
-    koffset    = koffset[:nsphvol]
     [rngoffset, ioffset, joffset, koffset] =\
                     sort_multi_lists([rngoffset, ioffset, joffset, koffset])
 
@@ -1114,8 +960,7 @@ def msheflx(xkp,ispeci):
 #----------------------------------------------------------------------------
 
 def nbrflux(xkp,nsectrs,sectx,secty,scmean,sc95,sc50,scsig,xtail,ytail,ztail,\
-            numdat,xflux,yflux,zflux,fluxbin,numbin,smooth1,nflxget,ndrophi,\
-            ndroplo,logflg,rngtol,fpchi,fpclo):
+            fdb,smooth1,nflxget,ndrophi,ndroplo,logflg,rngtol,fpchi,fpclo):
     """
     this routine provides the region's ion flux as a function of kp.
 
@@ -1130,17 +975,7 @@ def nbrflux(xkp,nsectrs,sectx,secty,scmean,sc95,sc50,scsig,xtail,ytail,ztail,\
             xtail   --- satellite's x-coordinate in geotail system (re).
             ytail   --- satellite's y-coordinate in geotail system (re).
             ztail   --- satellite's z-coordinate in geotail system (re).
-            numdat  --- number of non-zero values in the database.
-            xflux   --- array containing the x-coordinate of each data
-                        cell's center  (re).
-            yflux   --- array containing the y-coordinate of each data
-                        cell's center  (re).
-            zflux   --- array containing the z-coordinate of each data
-                        cell's center  (re).
-            fluxbin --- array containing the average ion flux within
-                        each cell  (ions/[cm^2-sec-sr-mev]).
-            numbin  --- array containing the number of non-zero values within
-                        each cell.
+            fdb     --- FluxDatabase of the region.
             smooth1 --- flag for control of database smoothing filter:
                         smooth1 = 0 if no data smoothing is used.
                         smooth1 = 1 if spike rejection and near neighbor flux.
@@ -1179,201 +1014,336 @@ def nbrflux(xkp,nsectrs,sectx,secty,scmean,sc95,sc50,scsig,xtail,ytail,ztail,\
             flux95  --- 95% flux (#/[cm^2-sec-sr-mev]) for selected species.
             flux50  --- 50% flux (#/[cm^2-sec-sr-mev]) for selected species.
             fluxsd  --- standard deviation of flux for selected species.
+
+    the flux is computed by nbrflux_kernel; crmflx_batch calls it directly.
     """
-#
-#--- set a couple of parameters
-#
-#    rnggeo  = 6.0
-#    numscal = 2
+    cdef fluxstat out
+
+    out = nbrflux_kernel(xtail, ytail, ztail, sectx, secty, scmean, sc95, sc50, scsig,\
+                         fdb.view, smooth1, rngtol, numpy.zeros(maxcell),\
+                         numpy.zeros(maxcell), numpy.zeros((12, maxkp)))
+
+    return out.fluxmn, out.flux95, out.flux50, out.fluxsd
+
+#----------------------------------------------------------------------------
+#-- nbrflux_kernel: the typed kernel of nbrflux                            --
+#----------------------------------------------------------------------------
+
+cdef fluxstat nbrflux_kernel(double xtail, double ytail, double ztail,\
+                             double [:] sectx, double [:] secty, double [:,:] scmean,\
+                             double [:,:] sc95, double [:,:] sc50, double [:,:] scsig,\
+                             FluxView fv, int smooth1, double rngtol,\
+                             double [:] flxsto, double [:] numsto, double [:,:] work):
+    """
+    the typed kernel of nbrflux: the region's ion flux as a function of kp.
+
+    input:  xtail, ytail, ztail, sectx, secty, scmean, sc95, sc50, scsig,
+            smooth1, rngtol     --- see nbrflux
+            fv      --- FluxView of the region.
+            flxsto  --- array (maxcell) to save flux values.
+            numsto  --- array (maxcell) to save data numbers of the cells.
+            work    --- (12, maxkp) work array.
+
+    output: fluxstat of fluxmn, flux95, flux50, fluxsd  --- see nbrflux
+    """
+    cdef int     i
+    cdef double  rngck, rng1, rng2, rngchk, totnum, zcklo, zckhi
+    cdef nbrcell cell
+    cdef fluxstat out
+
+    out.fluxmn = 0.0
+    out.flux95 = 0.0
+    out.flux50 = 0.0
+    out.fluxsd = 0.0
 #
 #--- do not allow for calculations to take place inside the minimum
 #--- sphere, which is needed because of geotail's orbit
 #
-    rngck = math.sqrt(xtail**2 + ytail**2 + ztail**2)
+    rngck = sqrt(xtail * xtail + ytail * ytail + ztail * ztail)
 
     if rngck < 6.0:
-        fluxmn = 0.
-        flux95 = 0.
-        flux50 = 0.
-        fluxsd = 0.
-
-        return fluxmn, flux95, flux50, fluxsd
-#
-#--- rank order the kp scaling sectors on the basis of their range
-#--- from the satellite in the xy-plan
+        return out
 #
-    indsect, rngsect = neighbr(xtail, ytail, sectx, secty)
+#--- the distance weighted sum of the kp scaling factors of the two
+#--- nearest sectors in the xy-plane (work[0:4])
 #
-#--- calculate the distance weighted sum of the kp scaling factors
-#
-    wtmean, wt95, wt50, wtsig = \
-            wtscal(2,indsect,rngsect,scmean,sc95,sc50,scsig)
+    wtscal_kernel(xtail, ytail, sectx, secty, scmean, sc95, sc50, scsig, work)
 #
 #--- find the near-neighbor flux data cell for each kp interval.
 #--- these flux values are treated as the average flux at the center
-#--- their respective kp intervals.
-#
-#--- fix the range tolerance for the near-neighbor flux calculation
+#--- their respective kp intervals. the range tolerance is fixed to 1.0.
 #
-    rngchk  = 1.0
-    flux    = numpy.zeros(maxkp)
-    avgnum  = numpy.zeros(maxkp)
-    rngcell = numpy.zeros(maxkp)
-    numcell = numpy.zeros(maxkp)
-    tarr    = numpy.zeros(maxcell)
-    cdef double [:] flxsto =  copy.deepcopy(tarr)
-    cdef double [:] numsto =  copy.deepcopy(tarr)
-#
-#--- set z range
-#   
-    zcklo, zckhi = zbinner(xtail, ztail)
+    zbin(xtail, ztail, &zcklo, &zckhi)
 
-    for i in range(0, maxkp):
-#
-#--- calculate the flux with no data smoothing or with spatial
-#--- averaging inside the volume defined by rngtol
-#
-        flux[i],avgnum[i],rngcell[i],numcell[i] = \
-                                flxdat1(xtail, ytail, ztail, numdat[i],\
-                                        xflux[i], yflux[i], zflux[i],\
-                                        fluxbin[i], numbin[i], rngchk,\
-                                        flxsto, numsto, zcklo, zckhi)
+    for i in range(0, fv.maxkp):
+        cell = flxdat1_chunk(xtail, ytail, ztail, fv.offset[i], fv.offset[i+1],\
+                             fv.xflux, fv.yflux, fv.zflux, fv.flxbin, fv.numbin,\
+                             fv.chunkbox, 1.0, flxsto, numsto, zcklo, zckhi)
+        work[4, i] = cell.flux
+        work[5, i] = cell.avgnum
+        work[6, i] = cell.rngcell
 #
 #--- find the minimum distance to a data cell from any one of the database's kp intervals
 #
-    rng1 = min(rngcell)
+    rng1 = work[6, 0]
+    for i in range(1, fv.maxkp):
+        if work[6, i] < rng1:
+            rng1 = work[6, i]
 #
 #--- get the weighted sum (average) of all of the useable flux values
 #--- that lie within the specified range tolerance above the minimum
-#--- range. get the flux statistics by multiplying the average flux
-#--- value at the spacecraft's location by the distance weighted sum
-#--- of the kp scaling factors
+#--- range (rngtol if spatial averaging is used, otherwise 1.0). get the 
+#--- flux statistics by multiplying the average flux value at the spacecraft's
+#--- location by the distance weighted sum of the kp scaling factors
 #
-#
-#--- spatial averaging is used
-#
-    if smooth1 in [4, 5, 6]:
+    if (smooth1 >= 4) and (smooth1 <= 6):
         rngchk = rngtol
-#
-#--- there is no data smoothing used
-#
     else:
         rngchk = 1.0
 
-    rng2 = rng1 + rngchk
-
-    idx    = rngcell <= rng2
-    fluxmn = numpy.sum(flux[idx] * avgnum[idx] * wtmean[idx])
-    flux95 = numpy.sum(flux[idx] * avgnum[idx] * wt95[idx])
-    flux50 = numpy.sum(flux[idx] * avgnum[idx] * wt50[idx])
-    fluxsd = numpy.sum(flux[idx] * avgnum[idx] * wtsig[idx])
-    totnum = numpy.sum(avgnum[idx])
+    rng2   = rng1 + rngchk
+    totnum = 0.0
+    for i in range(0, fv.maxkp):
+        if work[6, i] <= rng2:
+            out.fluxmn += work[4, i] * work[5, i] * work[0, i]
+            out.flux95 += work[4, i] * work[5, i] * work[1, i]
+            out.flux50 += work[4, i] * work[5, i] * work[2, i]
+            out.fluxsd += work[4, i] * work[5, i] * work[3, i]
+            totnum     += work[5, i]
 
     if totnum < 1.0:
         totnum = 1.0
 
-    fluxmn = fluxmn / totnum
-    flux95 = flux95 / totnum
-    flux50 = flux50 / totnum
-    fluxsd = fluxsd / totnum
+    out.fluxmn = out.fluxmn / totnum
+    out.flux95 = out.flux95 / totnum
+    out.flux50 = out.flux50 / totnum
+    out.fluxsd = out.fluxsd / totnum
 
-    return fluxmn, flux95, flux50, fluxsd
+    return out
 
 #----------------------------------------------------------------------------
-#-- flxdat1: finds the flux corresponding to the satellite's gsm position coordinate
+#-- wtscal_kernel: the weighted kp scaling factors of the two nearest sectors
 #----------------------------------------------------------------------------
 
-def flxdat1(double xgsm, double ygsm, double zgsm, long numdat,\
-            double [:] xflux, double [:] yflux, double [:] zflux,\
-            double [:] fluxbin, long [:] numbin, double rngchk,\
-            double [:] flxsto, double [:] numsto, int zcklo, int zckhi):
+cdef void wtscal_kernel(double xtail, double ytail, double [:] sectx, double [:] secty,\
+                        double [:,:] scmean, double [:,:] sc95, double [:,:] sc50,\
+                        double [:,:] scsig, double [:,:] work):
+    """
+    this routine calculates the distance weighted sum of the kp scaling 
+    factors of the two sectors nearest to the satellite in the xy-plane 
+    (neighbr and wtscal of the fortran code, with numscal = 2). the kp 
+    scaling factors are "blended" together according to their relative 
+    distances: the closest sector's factors are multiplied by the distance 
+    to the other sector and vice versa, and the sum is divided by the total
+    distance.
+    input:  xtail   --- satellite's x-coordinate in geotail system (re).
+            ytail   --- satellite's y-coordinate in geotail system (re).
+            sectx   --- array of each sector center's x coordinate.
+            secty   --- array of each sector center's y coordinate.
+            scmean  --- array of each sector's mean flux scale factor.
+            sc95    --- array of each sector's 95% flux scale factor.
+            sc50    --- array of each sector's 50% flux scale factor.
+            scsig   --- array of each sector's std dev flux scale factor.
+            work    --- work array; the results are put in the first four rows
+    output: work[0:4]   --- distance weighted sum of the mean, 95%, 50% and
+                            std dev flux scale factors
+    """
+    cdef int    i
+    cdef int    m0 = -1
+    cdef int    m1 = -1
+    cdef double sx, sy, rng, dtot
+    cdef double r0 = 0.0
+    cdef double r1 = 0.0
+#
+#--- the nearest (m0) and the second nearest (m1) sectors; of the same range,
+#--- the first one comes first
+#
+    for i in range(0, sectx.shape[0]):
+        sx  = sectx[i] - xtail
+        sy  = secty[i] - ytail
+        rng = sqrt(sx * sx + sy * sy)
+        if (m0 < 0) or (rng < r0):
+            m1 = m0
+            r1 = r0
+            m0 = i
+            r0 = rng
+        elif (m1 < 0) or (rng < r1):
+            m1 = i
+            r1 = rng
+#
+#--- each sector is weighted by the range to the other one
+#
+    dtot = r0 + r1
+    for i in range(0, work.shape[1]):
+        work[0, i] = (scmean[m0, i] * r1 + scmean[m1, i] * r0) / dtot
+        work[1, i] = (sc95[m0, i]   * r1 + sc95[m1, i]   * r0) / dtot
+        work[2, i] = (sc50[m0, i]   * r1 + sc50[m1, i]   * r0) / dtot
+        work[3, i] = (scsig[m0, i]  * r1 + scsig[m1, i]  * r0) / dtot
+
+#----------------------------------------------------------------------------
+#-- flxdat1_chunk: finds the flux at the satellite's position, skipping far chunks
+#----------------------------------------------------------------------------
+
+cdef nbrcell flxdat1_chunk(double xgsm, double ygsm, double zgsm, long start, long stop,\
+                           double [:] xflux, double [:] yflux, double [:] zflux,\
+                           double [:] fluxbin, long [:] numbin, double [:,:] chunkbox,\
+                           double rngchk, double [:] flxsto, double [:] numsto,\
+                           double zcklo, double zckhi):
     """
     this routine finds the flux corresponding to the satellite's
-    gsm position coordinates by use of the geotail database.
-    
-    this routine is used if no data smoothing is selected or if
-    spatial averaging within the volume defined by rngchk is selected.
-    
-    input:  xgsm    --- satellite's x-coordinate (re).
-            ygsm    --- satellite's y-coordinate (re).
-            zgsm    --- satellite's z-coordinate (re).
-            numdat  --- number of non-zero values in the database.
-            xflux   --- array containing the x-coordinate of each data
-                        cell's center  (re).
-            yflux   --- array containing the y-coordinate of each data
-                        cell's center  (re).
-            zflux   --- array containing the z-coordinate of each data
-                        cell's center  (re).
-            fluxbin --- array containing the average ion flux within
-                        each cell  (ions/[cm^2-sec-sr-mev]).
-            numbin  --- array containing the number of non-zero values within
-                        each cell.
-            rngchk  --- the range tolerance variable (re).
-            flxsto  --- array to save flxu value
-            numsto  --- array to save data number of the cell
-            zcklo   --- lower z value
-            zckhi   --- upper z value
-
-    output: flux    --- computed average flux value  (ions/[cm^2-sec-sr-mev]).
+    gsm position coordinates by use of the geotail database. it gives
+    exactly the same result as the linear scan of the cells (flxdat1 of
+    the fortran code), but it skips the chunks of cells (see FluxDatabase)
+    which cannot change the result.
+
+    the linear scan goes through the cells in the database order; a cell closer than the
+    current nearest cell by more than rngchk starts a new average and a cell
+    within rngchk of it is added to the average. the current nearest range never
+    grows, and after a cell of range r is scanned it is at most r + rngchk. so if
+    rngrun is the smallest range of the cells scanned so far, a cell farther than
+    rngrun + 2 * rngchk does nothing, and a chunk whose bounding box is farther
+    than that is skipped. the database is stored in the grid order, so once a
+    near cell is scanned, most of the chunks are skipped.
+
+    the scan still goes through the chunks before the near cells; which of them
+    matter depends on the position, so it cannot be cut to a fixed set of cells.
+
+    input:  xgsm     --- satellite's x-coordinate (re).
+            ygsm     --- satellite's y-coordinate (re).
+            zgsm     --- satellite's z-coordinate (re).
+            start    --- first position of the kp in the flat database arrays.
+            stop     --- last position + 1 of the kp in the flat database arrays.
+            xflux    --- array containing the x-coordinate of each data
+                         cell's center  (re).
+            yflux    --- array containing the y-coordinate of each data
+                         cell's center  (re).
+            zflux    --- array containing the z-coordinate of each data
+                         cell's center  (re).
+            fluxbin  --- array containing the average ion flux within
+                         each cell  (ions/[cm^2-sec-sr-mev]).
+            numbin   --- array containing the number of non-zero values within
+                         each cell.
+            chunkbox --- bounding box of each chunk (see FluxDatabase).
+            rngchk   --- the range tolerance variable (re).
+            flxsto   --- array to save flux values
+            numsto   --- array to save data numbers of the cells
+            zcklo    --- lower z value
+            zckhi    --- upper z value
+
+    output: nbrcell of
+            flux    --- computed average flux value  (ions/[cm^2-sec-sr-mev]).
             avgnum  --- average number of flux values per cell used to get flux.
             rngcell --- distance to center of flux database cell used  (re).
             numcell --- number of flux database cells used that have the
                         same value of rngcell.
     """
-    cdef double flux, avgnum, rngcell, rngdiff, rngabs
-    cdef int    i, numcell
-
-    rngcell = 1.0e25
-    numcell = 0
+    cdef long   i, c, cend
+    cdef long   mcell   = maxcell
+    cdef long   nchunk  = chunklen
+    cdef int    numcell = 0
+    cdef int    full    = 0
+    cdef double rng, rngdiff, rngabs, dx, dy, dz
+    cdef double rngcell = 1.0e25
+    cdef double rngrun  = 1.0e25
+    cdef nbrcell out
+
+    i = start
+    while (i < stop) and (full == 0):
+        c    = i // nchunk
+        cend = min((c + 1) * nchunk, stop)
+#
+#--- the distance from the satellite to the bounding box of the chunk; skip the chunk
+#--- if no cell in it can do anything (with a small margin for the rounding)
+#
+        dx = max(chunkbox[c, 0] - xgsm, xgsm - chunkbox[c, 1], 0.0)
+        dy = max(chunkbox[c, 2] - ygsm, ygsm - chunkbox[c, 3], 0.0)
+        dz = max(chunkbox[c, 4] - zgsm, zgsm - chunkbox[c, 5], 0.0)
+        if sqrt(dx * dx + dy * dy + dz * dz) > rngrun + 2.0 * rngchk + 1.0e-9:
+            i = cend
+            continue
 
-    for i in range(0, numdat):
-        if (fluxbin[i] > 1) and (zflux[i] > zcklo) and (zflux[i] <= zckhi):
+        while i < cend:
+            if (fluxbin[i] > 1) and (zflux[i] > zcklo) and (zflux[i] <= zckhi):
 
-            rng = compute_rng(xflux[i],yflux[i],zflux[i], xgsm, ygsm, zgsm)
+                rng = compute_rng(xflux[i], yflux[i], zflux[i], xgsm, ygsm, zgsm)
+                if rng < rngrun:
+                    rngrun = rng
 
-            rngdiff = rng - rngcell
-            rngabs  = abs(rngdiff)
+                rngdiff = rng - rngcell
+                rngabs  = fabs(rngdiff)
 #
 #--- there is a new nearest neighbor data cell
 #
-            if (rngabs > rngchk) and (rngdiff < 0.0):
-                numcell = 1
-                rngcell = rng
-                flxsto[0] = fluxbin[i]
-                numsto[0] = numbin[i]
-                
+                if (rngabs > rngchk) and (rngdiff < 0.0):
+                    numcell = 1
+                    rngcell = rng
+                    flxsto[0] = fluxbin[i]
+                    numsto[0] = numbin[i]
 #
-#--- there is a new data cell within the range
-#--- tolerance to the nearest neighbor.  this cell's flux
-#--- should be included in the average for this location
+#--- there is a new data cell within the range tolerance to the nearest neighbor
 #
-            elif rngabs <= rngchk:
-                flxsto[numcell] = fluxbin[i]
-                numsto[numcell] = numbin[i]
-                numcell += 1
+                elif rngabs <= rngchk:
+                    flxsto[numcell] = fluxbin[i]
+                    numsto[numcell] = numbin[i]
+                    numcell += 1
 
-                if numcell > maxcell -1:
-                    break
+                    if numcell > mcell -1:
+                        full = 1
+                        break
+            i += 1
 #
 #--- use the average of the flux from all bins at the same distance
 #
     if numcell > 0:
-        flux   = numpy.mean(flxsto[:numcell])
-        avgnum = numpy.mean(numsto[:numcell])
+        out.flux   = mean_of(flxsto, numcell)
+        out.avgnum = mean_of(numsto, numcell)
     else:
-        flux   = 0.0
-        avgnum = 0.0
+        out.flux   = 0.0
+        out.avgnum = 0.0
+
+    out.rngcell = rngcell
+    out.numcell = numcell
+
+    return out
+
+#----------------------------------------------------------------------------
+#-- mean_of: gives the mean of the first n entries of the array            --
+#----------------------------------------------------------------------------
+
+cdef double mean_of(double [:] a, int n):
+    """
+    give the mean of the first n entries of the array (added in the order)
+    input:  a   --- array
+            n   --- the number of entries (> 0)
+    output: the mean
+    """
+    cdef int    i
+    cdef double tot = 0.0
+
+    for i in range(0, n):
+        tot += a[i]
+
+    return tot / n
+
+cdef double mean_of_long(long [:] a, int n):
+    """
+    give the mean of the first n entries of the integer array (see mean_of)
+    """
+    cdef int    i
+    cdef double tot = 0.0
 
-    return flux, avgnum, rngcell, numcell
+    for i in range(0, n):
+        tot += a[i]
+
+    return tot / n
 
 #----------------------------------------------------------------------------
 #-- nbrflux_map_z:  provides the region's ion flux as a function of kp    ---
 #----------------------------------------------------------------------------
 
 def nbrflux_map_z(xkp,nsectrs,sectx,secty,scmean,sc95,sc50,scsig,xtail,ytail,\
-                  ztail,numdat,xflux,yflux,zflux,fluxbin,numbin,smooth1,nflxget,\
-                  ndrophi,ndroplo,logflg,rngtol,fpchi,fpclo,nsphvol,ioffset,\
-                  joffset,koffset,imapindx):
+                  ztail,fdb,smooth1,nflxget,ndrophi,ndroplo,logflg,rngtol,fpchi,\
+                  fpclo):
     """
     this routine provides the region's ion flux as a function of kp.
 
@@ -1388,16 +1358,8 @@ def nbrflux_map_z(xkp,nsectrs,sectx,secty,scmean,sc95,sc50,scsig,xtail,ytail,\
             xtail   --- satellite's x-coordinate in geotail system (re).
             ytail   --- satellite's y-coordinate in geotail system (re).
             ztail   --- satellite's z-coordinate in geotail system (re).
-            numdat  --- number of non-zero values in the database.
-            xflux   --- array containing the x-coordinate of each data
-            yflux   --- array containing the y-coordinate of each data
-                        cell's center  (re).
-            zflux   --- array containing the z-coordinate of each data
-                        cell's center  (re).
-            fluxbin --- array containing the average ion flux within
-                        each cell  (ions/[cm^2-sec-sr-mev]).
-            numbin  ---  containing the number of non-zero values within
-                        each cell.
+            fdb     --- FluxDatabase of the region; its search volume
+                        is the streamline mapping search volume.
             smooth1 --- flag for control of database smoothing filter:
                         smooth1 = 0 if no data smoothing is used.
                         smooth1 = 1 if spike rejection and near neighbor flux.
@@ -1430,12 +1392,6 @@ def nbrflux_map_z(xkp,nsectrs,sectx,secty,scmean,sc95,sc50,scsig,xtail,ytail,\
                         (used if smooth1 = 6).
             fpclo    --- lower percentile limit for spatial averaging of flux
                         (used if smooth1 = 6).
-            nsphvol  --- number of volume elements stored in the
-                        streamline mapping search volume.
-            ioffset  --- array of offset indices for x-direction.
-            joffset  --- array of offset indices for y-direction.
-            koffset  --- array of offset indices for z-direction.
-            imapindx --- array of pointers for mapped database.
     
     output: fluxmn  --- mean flux (#/[cm^2-sec-sr-mev]) for selected species.
             flux95  --- 95% flux (#/[cm^2-sec-sr-mev]) for selected species.
@@ -1443,211 +1399,193 @@ def nbrflux_map_z(xkp,nsectrs,sectx,secty,scmean,sc95,sc50,scsig,xtail,ytail,\
             fluxsd  --- standard deviation of flux for selected species.
 
     from param file --- maxpnt, maxnum, maxkp, blendx1, blendx2, maxcell, maxnsphvol
+
+    the flux is computed by nbrflux_map_z_kernel; crmflx_batch calls it directly.
     """
-#
-#--- set a couple of parameters
-#
-    rnggeo  = 6.0
-    numscal = 2
+    cdef fluxstat out
+
+    out = nbrflux_map_z_kernel(xtail, ytail, ztail, sectx, secty, scmean, sc95, sc50,\
+                               scsig, fdb.view, smooth1, rngtol, numpy.zeros(maxcell),\
+                               numpy.zeros(maxcell, dtype=int), numpy.zeros((12, maxkp)))
+
+    return out.fluxmn, out.flux95, out.flux50, out.fluxsd
+
+#----------------------------------------------------------------------------
+#-- nbrflux_map_z_kernel: the typed kernel of nbrflux_map_z                --
+#----------------------------------------------------------------------------
+
+cdef fluxstat nbrflux_map_z_kernel(double xtail, double ytail, double ztail,\
+                                   double [:] sectx, double [:] secty, double [:,:] scmean,\
+                                   double [:,:] sc95, double [:,:] sc50, double [:,:] scsig,\
+                                   FluxView fv, int smooth1, double rngtol,\
+                                   double [:] flxsto, long [:] numsto, double [:,:] work):
+    """
+    the typed kernel of nbrflux_map_z: the region's ion flux as a function of kp.
+
+    input:  xtail, ytail, ztail, sectx, secty, scmean, sc95, sc50, scsig,
+            smooth1, rngtol     --- see nbrflux_map_z
+            fv      --- FluxView of the region; its search volume is the
+                        streamline mapping search volume.
+            flxsto  --- array (maxcell) to save flux values.
+            numsto  --- integer array (maxcell) to save data numbers of the cells.
+            work    --- (12, maxkp) work array.
+
+    output: fluxstat of fluxmn, flux95, flux50, fluxsd  --- see nbrflux_map_z
+    """
+    cdef int     i, ikp, indx, indy, indz
+    cdef long    rngchk
+    cdef double  rngck, rng1, rng2, zcklo, zckhi, blend1, blend2
+    cdef double  fluxmn1, flux951, flux501, fluxsd1, totnum1
+    cdef double  fluxmn2, flux952, flux502, fluxsd2, totnum2
+    cdef double  bx1 = blendx1
+    cdef double  bx2 = blendx2
+    cdef double  deltarng = 0.2
+    cdef nbrcell cell
+    cdef fluxstat out
+
+    out.fluxmn = 0.0
+    out.flux95 = 0.0
+    out.flux50 = 0.0
+    out.fluxsd = 0.0
 #
 #--- do not allow for calculations to take place inside the minimum
 #--- sphere, which is needed because of geotail's orbit
 #
-    rngck = math.sqrt(xtail**2 + ytail**2 + ztail**2)
-
-    if rngck < rnggeo:
-        fluxmn = 0.
-        flux95 = 0.
-        flux50 = 0.
-        fluxsd = 0.
+    rngck = sqrt(xtail * xtail + ytail * ytail + ztail * ztail)
 
-        return fluxmn, flux95, flux50, fluxsd
-#
-#--- rank order the kp scaling sectors on the basis of their range
-#--- from the satellite in the xy-plan
-#
-    indsect, rngsect = neighbr(xtail, ytail, sectx, secty)
-#
-#--- calculate the distance weighted sum of the kp scaling factors
-#
-    wtmean, wt95, wt50, wtsig = wtscal(numscal,indsect,rngsect,scmean,sc95,sc50,scsig)
-#
-#--- find the near-neighbor flux data cell for each kp interval.
-#--- these flux values are treated as the average flux at the center
-#--- their respective kp intervals.
-#
-#--- fix the range tolerance for the near-neighbor flux calculation
+    if rngck < 6.0:
+        return out
 #
-#--- spatial averaging is used
+#--- the distance weighted sum of the kp scaling factors of the two
+#--- nearest sectors in the xy-plane (work[0:4])
 #
-    if smooth1 in [4, 5, 6]:
-        rngchk = rngtol
+    wtscal_kernel(xtail, ytail, sectx, secty, scmean, sc95, sc50, scsig, work)
 #
-#--- there is no data smoothing used
+#--- fix the range tolerance for the near-neighbor flux calculation (a whole
+#--- number of re as flxdat1_map takes it); rngtol if spatial averaging is used
 #
+    if (smooth1 >= 4) and (smooth1 <= 6):
+        rngchk = <long> rngtol
     else:
-        rngchk = 1.0
+        rngchk = 1
 #
-#--- find the index for the current kp value
+#--- work[4:8]:  flux, avgnum, rngcell, good (numcell > 0) without z-layers
+#--- work[8:12]: the same with z-layers
 #
-    ikp_good   = numpy.full(maxkp, False)
-    flux       = numpy.zeros(maxkp)
-    avgnum     = numpy.zeros(maxkp)
-    rngcell    = numpy.zeros(maxkp)
-    numcell    = numpy.zeros(maxkp)
-
-    ikp_good_z = numpy.full(maxkp, False)
-    flux_z     = numpy.zeros(maxkp)
-    avgnum_z   = numpy.zeros(maxkp)
-    rngcell_z  = numpy.zeros(maxkp)
-    numcell_z  = numpy.zeros(maxkp)
+    for i in range(4, 12):
+        for ikp in range(0, work.shape[1]):
+            work[i, ikp] = 0.0
 #
 #--- get the limits on z-values used to search for near-neighbors
+#--- and the index for this s/c position
 #
-    zcklo, zckhi = zbinner(xtail, ztail)
-#
-#--- calculate the index for this s/c position
-#
-    indx = int((xtail - xmin) / xinc)
-    indy = int((ytail - ymin) / yinc)
-    indz = int((ztail - zmin) / zinc)
+    zbin(xtail, ztail, &zcklo, &zckhi)
 
-    tarr    = numpy.zeros(maxcell)
-    cdef double [:] flxsto = tarr 
-    tarr    = numpy.zeros(maxcell).astype(int)
-    cdef long [:]   numsto  = tarr
+    indx = <int> ((xtail - fv.xmin) / fv.xinc)
+    indy = <int> ((ytail - fv.ymin) / fv.yinc)
+    indz = <int> ((ztail - fv.zmin) / fv.zinc)
 
     for ikp in range(2, 7):
 #
-#--- calculate the flux with no data smoothing or with spatial
-#--- averaging inside the volume defined by rngtol
-#
-#
 #--- no z-layers
 #
-        if xtail >= blendx2:
-            flux[ikp],avgnum[ikp],rngcell[ikp], numcell[ikp] = \
-                                flxdat1_map(xtail,ytail,ztail,numdat[ikp],xflux[ikp],\
-                                            yflux[ikp], zflux[ikp],fluxbin[ikp],\
-                                            numbin[ikp],rngchk,nsphvol,ioffset,\
-                                            joffset,koffset,imapindx[ikp],\
-                                            flxsto, numsto, indx, indy, indz,\
-                                            zcklo, zckhi, zchk=0)
-#
-#--- if numcell == 0, do not include this calculation in the statistics.
-#
-            if numcell[ikp] == 0:
-                ikp_good[ikp] = False
-            else:
-                ikp_good[ikp] = True
+        if xtail >= bx2:
+            cell = flxdat1_map(fv, ikp, xtail, ytail, ztail, rngchk, flxsto, numsto,\
+                               indx, indy, indz, zcklo, zckhi, 0)
+            work[4, ikp] = cell.flux
+            work[5, ikp] = cell.avgnum
+            work[6, ikp] = cell.rngcell
+            work[7, ikp] = 1.0 if cell.numcell > 0 else 0.0
 #
 #--- use z-layers
 #
-        if xtail <= blendx1:
-            flux_z[ikp],avgnum_z[ikp],rngcell_z[ikp], numcell_z[ikp] = \
-                                flxdat1_map(xtail,ytail,ztail,numdat[ikp],xflux[ikp],
-                                            yflux[ikp],zflux[ikp],fluxbin[ikp],\
-                                            numbin[ikp],rngchk,nsphvol,ioffset,\
-                                            joffset,koffset,imapindx[ikp],\
-                                            flxsto, numsto, indx, indy, indz,\
-                                            zcklo, zckhi, zchk=1)
-#
-#--- if numcell == 0, do not include this calculation in the statistics.
-#
-            if numcell_z[ikp] == 0:
-                ikp_good_z[ikp] = False
-            else:
-                ikp_good_z[ikp] = True
-#
-#--- find the minimum distance to a data cell from any one of the database's kp intervals
-#
-    rng1     = 1.e+20
-    for ikp in range(2, 7):
-        if (rng1 >= rngcell[ikp]) and ikp_good[ikp]:
-            rng1 = rngcell[ikp]
-    deltarng = 0.2
-    rng2     = rng1 + deltarng
-#
-#--- get the weighted sum (average) of all of the useable flux values
-#--- that lie within the specified range tolerance above the minimum
-#--- range. get the flux statistics by multiplying the average flux
-#--- value at the spacecraft's location by the distance weighted sum
-#--- of the kp scaling factors.
+        if xtail <= bx1:
+            cell = flxdat1_map(fv, ikp, xtail, ytail, ztail, rngchk, flxsto, numsto,\
+                               indx, indy, indz, zcklo, zckhi, 1)
+            work[8,  ikp] = cell.flux
+            work[9,  ikp] = cell.avgnum
+            work[10, ikp] = cell.rngcell
+            work[11, ikp] = 1.0 if cell.numcell > 0 else 0.0
 #
 #--- ***** calculate the flux values without z-binning *****
-#--- *****        of near-neighbor flux values.        *****
+#--- find the minimum distance to a data cell from any one of the database's 
+#--- kp intervals and get the weighted sum (average) of the useable flux values
+#--- within deltarng above it
 #
-    idx     = (rngcell <= rng2) & (ikp_good)
-    anndist = numpy.sum(rngcell[idx] * avgnum[idx])
-    fluxmn1 = numpy.sum(flux[idx]    * avgnum[idx] * wtmean[idx])
-    flux951 = numpy.sum(flux[idx]    * avgnum[idx] * wt95[idx])
-    flux501 = numpy.sum(flux[idx]    * avgnum[idx] * wt50[idx])
-    fluxsd1 = numpy.sum(flux[idx]    * avgnum[idx] * wtsig[idx])
-    totnum1 = numpy.sum(avgnum[idx])
+    rng1 = 1.e+20
+    for ikp in range(2, 7):
+        if (rng1 >= work[6, ikp]) and (work[7, ikp] > 0):
+            rng1 = work[6, ikp]
+    rng2 = rng1 + deltarng
+
+    fluxmn1 = 0.0
+    flux951 = 0.0
+    flux501 = 0.0
+    fluxsd1 = 0.0
+    totnum1 = 0.0
+    for i in range(0, fv.maxkp):
+        if (work[6, i] <= rng2) and (work[7, i] > 0):
+            fluxmn1 += work[4, i] * work[5, i] * work[0, i]
+            flux951 += work[4, i] * work[5, i] * work[1, i]
+            flux501 += work[4, i] * work[5, i] * work[2, i]
+            fluxsd1 += work[4, i] * work[5, i] * work[3, i]
+            totnum1 += work[5, i]
 
     if totnum1 < 1.0: 
         totnum1 = 1.0
-    anndist = anndist / totnum1
     fluxmn1 = fluxmn1 / totnum1
     flux951 = flux951 / totnum1
     flux501 = flux501 / totnum1
     fluxsd1 = fluxsd1 / totnum1
 #
 #--- ***** calculate the flux values with z-binning    *****
-#--- *****        of near-neighbor flux values.        *****
-#
-#--- find the minimum distance to a data cell from any one of the 
-#--- database's kp intervals
 #
-    try:
-        rng1 = numpy.min(rngcell_z[ikp_good_z])
-    except:
-        rng1     = 1.e+20
-
-    deltarng = 0.2
-    rng2     = rng1 + deltarng
-
-    idx     = (rngcell_z <= rng2) & (ikp_good_z)
-    anndist = numpy.sum(rngcell_z[idx] * avgnum_z[idx])
-    fluxmn2 = numpy.sum(flux_z[idx]    * avgnum_z[idx] * wtmean[idx])
-    flux952 = numpy.sum(flux_z[idx]    * avgnum_z[idx] * wt95[idx])
-    flux502 = numpy.sum(flux_z[idx]    * avgnum_z[idx] * wt50[idx])
-    fluxsd2 = numpy.sum(flux_z[idx]    * avgnum_z[idx] * wtsig[idx])
-    totnum2 = numpy.sum(avgnum_z[idx])
+    rng1 = 1.e+20
+    for ikp in range(0, fv.maxkp):
+        if (work[11, ikp] > 0) and (work[10, ikp] < rng1):
+            rng1 = work[10, ikp]
+    rng2 = rng1 + deltarng
+
+    fluxmn2 = 0.0
+    flux952 = 0.0
+    flux502 = 0.0
+    fluxsd2 = 0.0
+    totnum2 = 0.0
+    for i in range(0, fv.maxkp):
+        if (work[10, i] <= rng2) and (work[11, i] > 0):
+            fluxmn2 += work[8, i] * work[9, i] * work[0, i]
+            flux952 += work[8, i] * work[9, i] * work[1, i]
+            flux502 += work[8, i] * work[9, i] * work[2, i]
+            fluxsd2 += work[8, i] * work[9, i] * work[3, i]
+            totnum2 += work[9, i]
 
     if totnum2 < 1.0: 
         totnum2 = 1.0
-    anndist = anndist / totnum2
     fluxmn2 = fluxmn2 / totnum2
     flux952 = flux952 / totnum2
     flux502 = flux502 / totnum2
     fluxsd2 = fluxsd2 / totnum2
-
 #
 #--- ***** perform the blending of the flux values from *****
 #--- ***** the two near-neighbor algorithms.            *****
 #
-#--- find the relative weighting of the two flux values.
-#
 #--- do not use z-layers to find the near-neighbor flux
 #
-    if xtail >= blendx1:
+    if xtail >= bx1:
         blend1 = 1.0
         blend2 = 0.0
 #
 #--- only use z-layers to find the near-neighbor flux
 #
-    elif xtail <= blendx2:
+    elif xtail <= bx2:
         blend1 = 0.0
         blend2 = 1.0
 #
-#--- the spacecraft is in the transition (blending) region.
+#--- the spacecraft is in the transition (blending) region; interpolate
+#--- linearly on xtail (see crm_region.y_interpolate)
 #
     else:
-#
-#--- interpolate to find blend1 value on xtail
-#
-        blend1 = y_interpolate(blendx1, 1.0, blendx2, 0.0, xtail, 1)
+        blend1 = 1.0 - (1.0 - 0.0) * (bx1 - xtail) / (bx1 - bx2)
         if blend1 >= 1.0:
             blend1 = 1.0
 
@@ -1658,24 +1596,20 @@ def nbrflux_map_z(xkp,nsectrs,sectx,secty,scmean,sc95,sc50,scsig,xtail,ytail,\
 #
 #--- get the final flux values
 #
-    fluxmn = fluxmn1 * blend1 + fluxmn2 * blend2
-    flux95 = flux951 * blend1 + flux952 * blend2
-    flux50 = flux501 * blend1 + flux502 * blend2
-    fluxsd = fluxsd1 * blend1 + fluxsd2 * blend2
+    out.fluxmn = fluxmn1 * blend1 + fluxmn2 * blend2
+    out.flux95 = flux951 * blend1 + flux952 * blend2
+    out.flux50 = flux501 * blend1 + flux502 * blend2
+    out.fluxsd = fluxsd1 * blend1 + fluxsd2 * blend2
 
-    return fluxmn, flux95, flux50, fluxsd
+    return out
 
 #----------------------------------------------------------------------------
 #-- flxdat1_map:  finds the flux corresponding to the satellite's gsm position  
 #----------------------------------------------------------------------------
 
-def  flxdat1_map(double xgsm,double ygsm,double zgsm,\
-                 long numdat,double [:] xflux,double [:] yflux, double [:] zflux,\
-                 double [:] fluxbin,long [:]numbin, long rngchk, long nsphvol,\
-                 long [:] ioffset,long [:] joffset,long [:] koffset, \
-                 long [:,:,:]imapindx, double [:] flxsto, long [:] numsto, \
-                 int indx, int indy, int indz,\
-                 float zcklo, float zckhi,int zchk=0):
+cdef nbrcell flxdat1_map(FluxView fv, int kp, double xgsm, double ygsm, double zgsm,\
+                         long rngchk, double [:] flxsto, long [:] numsto,\
+                         int indx, int indy, int indz, float zcklo, float zckhi, int zchk):
     """
     this routine finds the flux corresponding to the satellite's
     gsm position coordinates by use of the geotail database.
@@ -1686,27 +1620,13 @@ def  flxdat1_map(double xgsm,double ygsm,double zgsm,\
     this routine is used if the database has been populated by use
     of streamline mapping.
     
-    input:  xgsm     --- satellite's x-coordinate (re).
+    input:  fv       --- FluxView of the database: the cells, the grid index
+                         and the streamline mapping search volume.
+            kp       --- kp index (0 - maxkp-1)
+            xgsm     --- satellite's x-coordinate (re).
             ygsm     --- satellite's y-coordinate (re).
             zgsm     --- satellite's z-coordinate (re).
-            numdat   --- number of non-zero values in the database.
-            xflux    --- array containing the x-coordinate of each data
-                         cell's center  (re).
-            yflux    --- array containing the y-coordinate of each data
-                         cell's center  (re).
-            zflux    --- array containing the z-coordinate of each data
-                         cell's center  (re).
-            fluxbin  --- array containing the average ion flux within
-                         each cell  (ions/[cm^2-sec-sr-mev]).
-            numbin   --- array containing the number of non-zero values within
-                         each cell.
             rngchk   --- the range tolerance variable (re).
-            nsphvol  --- number of volume elements stored in the
-                         streamline mapping search volume.
-            ioffset  --- array of offset indices for x-direction.
-            joffset  --- array of offset indices for y-direction.
-            koffset  --- array of offset indices for z-direction.
-            imapindx --- array of pointers for mapped database.
             flxsto   --- array to save flxu value
             numsto   --- array to save data number of the cell
             indx     --- index of the center x coordinate
@@ -1717,19 +1637,18 @@ def  flxdat1_map(double xgsm,double ygsm,double zgsm,\
             zckhi    --- upper z flux value
             zchk     --- indicator of whether to include z flux (> 0) or just x/y (==0)
     
-    output: flux    --- computed average flux value  (ions/[cm^2-sec-sr-mev]).
+    output: nbrcell of
+            flux    --- computed average flux value  (ions/[cm^2-sec-sr-mev]).
             avgnum  --- average number of flux values per cell used to get flux.
             rngcell --- distance to center of flux database cell used  (re).
             numcell --- number of flux database cells used that have the
                         same value of rngcell.
-
-    from param file --- maxpnt, maxnum, maxkp, maxcell, maxnsphvol
-                        xmin, ymin, zmin, xinc, yinc, zinc, maxnum
     """
-    cdef int    i, j, k, n, numcell, indexnow
+    cdef int    i, j, k, n, numcell, row, indexnow
     cdef float  rngchk2
-    cdef double rngcell, flux, avgnum, rngdiff, rngabs
+    cdef double rngcell, rng, rngdiff, rngabs
     cdef double fve, xve, yve, zve
+    cdef nbrcell out
 
     rngcell = 1.0e25
     numcell = 0
@@ -1738,16 +1657,19 @@ def  flxdat1_map(double xgsm,double ygsm,double zgsm,\
 #
     rngchk2 = 1.20 * rngchk
 
-    for n in range(0, nsphvol):
-        i = indx + ioffset[n]
-        j = indy + joffset[n]
-        k = indz + koffset[n]
+    for n in range(0, fv.nsphvol):
+        i = indx + fv.ioffset[n]
+        j = indy + fv.joffset[n]
+        k = indz + fv.koffset[n]
         if (i >= 0) and (j >= 0) and (k >= 0)\
-           and (i < maxnum) and (j < maxnum) and (k < maxnum):
-            indexnow = imapindx[i][j][k]
+           and (i < fv.maxnum) and (j < fv.maxnum) and (k < fv.maxnum):
+            row      = fv.cellrow[i, j, k]
+            if row < 0:
+                continue
 
+            indexnow = fv.rowindx[kp, row]
             if indexnow >= 0:
-                zve     = zflux[indexnow]
+                zve     = fv.zflux[indexnow]
 #
 #--- for the map_z, extra check is required
 #
@@ -1755,9 +1677,9 @@ def  flxdat1_map(double xgsm,double ygsm,double zgsm,\
                     if (zve < zcklo) or (zve > zckhi):
                         continue
 
-                fve     = fluxbin[indexnow]
-                xve     = xflux[indexnow]
-                yve     = yflux[indexnow]
+                fve     = fv.flxbin[indexnow]
+                xve     = fv.xflux[indexnow]
+                yve     = fv.yflux[indexnow]
 
                 rng     = compute_rng(xve, yve, zve, xgsm, ygsm, zgsm)
                 rngdiff = rng - rngcell
@@ -1767,7 +1689,7 @@ def  flxdat1_map(double xgsm,double ygsm,double zgsm,\
 #
                 if numcell == 0:
                     flxsto[numcell] = fve
-                    numsto[numcell] = numbin[indexnow]
+                    numsto[numcell] = fv.numbin[indexnow]
                     numcell = 1
                     rngcell = rng
 #
@@ -1777,10 +1699,10 @@ def  flxdat1_map(double xgsm,double ygsm,double zgsm,\
                 else:
                     if rngabs <= rngchk:
                         flxsto[numcell] = fve
-                        numsto[numcell] = numbin[indexnow]
+                        numsto[numcell] = fv.numbin[indexnow]
                         numcell += 1
 
-                        if numcell > maxcell-1:
+                        if numcell > fv.maxcell-1:
                             break
                     else:
                         if rngabs > rngchk2:
@@ -1789,90 +1711,34 @@ def  flxdat1_map(double xgsm,double ygsm,double zgsm,\
 #--- use the average of the flux from all bins at the same distance
 #
     if numcell == 0:
-        flux    = 0.0
-        avgnum  = 0.0
-        rngcell = 0.0
+        out.flux    = 0.0
+        out.avgnum  = 0.0
+        rngcell     = 0.0
     
     elif numcell == 1:
-        flux    = flxsto[0]
-        avgnum  = float(numsto[0])
+        out.flux    = flxsto[0]
+        out.avgnum  = numsto[0]
     
-    elif numcell > 1:
-        flux    = numpy.mean(flxsto[:numcell])
-        avgnum  = numpy.mean(numsto[:numcell])
+    else:
+        out.flux    = mean_of(flxsto, numcell)
+        out.avgnum  = mean_of_long(numsto, numcell)
 
-    return flux, avgnum, rngcell, numcell
+    out.rngcell = rngcell
+    out.numcell = numcell
+
+    return out
 
 #----------------------------------------------------------------------------
 #----------------------------------------------------------------------------
 #----------------------------------------------------------------------------
 
-def compute_rng(double xve, double yve, double zve, double xgsm, double ygsm, double zgsm):
+cpdef double compute_rng(double xve, double yve, double zve, double xgsm, double ygsm, double zgsm):
     cdef double rng
 
-    rng = math.sqrt((xve - xgsm)**2 + (yve - ygsm)**2 + (zve - zgsm)**2)
+    rng = sqrt((xve - xgsm)**2 + (yve - ygsm)**2 + (zve - zgsm)**2)
 
     return rng
 
-#----------------------------------------------------------------------------
-#-- neighbr:  finds the nearest neighbors to the point in question         --
-#----------------------------------------------------------------------------
-
-def neighbr(xtail, ytail, sectx, secty):
-    """
-    this routine finds the nearest neighbors to the point in
-    question. this routine is used to find the spatial sectors used
-    to perform the kp scaling for a given point.
-    
-    input:  xtail   --- satellite's x-coordinate in geotail system (re).
-            ytail   --- satellite's y-coordinate in geotail system (re).
-            sectx   --- array of each sector center's x coordinate.
-            secty   --- array of each sector center's y coordinate.
-    
-    output: idx     --- index list pointing to the kp scaling sectors,
-                        ranked in order of nearest to farthest.
-            rngsect --- array containing the sorted range values of the
-                        spacecraft to the kp scaling sectors,
-    """
-#
-#--- first, find the range to each sector in their original order
-#
-    sx      = sectx - xtail
-    sy      = secty - ytail
-    rngsect = numpy.sqrt(sx * sx + sy * sy)
-#
-#--- sort the kp scaling sector range list in order of nearest to farthest
-#
-    idx     = numpy.argsort(rngsect)
-    rngsect = rngsect[idx]
-
-
-    return  idx, rngsect
-
-#----------------------------------------------------------------------------
-#-- rot8ang: rotates the 2-d vector about its hinge point in the xy-plane  --
-#----------------------------------------------------------------------------
-
-def rot8ang(ang, x, y, xhinge):
-    """
-    this routine rotates the 2-d vector about its hinge point in the xy-plane.
-    input:  ang    --- angle to rotate (rad).
-            x      --- initial x value.
-            y      --- initial y value.
-            xhinge --- x value of aberration hinge point.
-    
-    output: xrot2  --- final x value.
-            yrot2  --- final y value.
-    """
-    if x <= xhinge:
-        xrot2 =  x * math.cos(ang) + y * math.sin(ang)
-        yrot2 = -x * math.sin(ang) + y * math.cos(ang)
-    else:
-        xrot2 = x
-        yrot2 = y
-
-    return [xrot2, yrot2]
-
 #----------------------------------------------------------------------------
 #-- scalkp1: finds the kp scaling parameters in the solar wind             --
 #----------------------------------------------------------------------------
@@ -2886,79 +2752,6 @@ def solwflx(int xkp, int ispeci):
 
     return fluxmn, flux95, flux50, fluxsd
 
-#----------------------------------------------------------------------------
-#-- solwind: get the solar wind parameters used as inputs for the bow shock -
-#----------------------------------------------------------------------------
-
-def solwind(xkp):
-    """
-    get the solar wind parameters used as inputs for the bow shock
-    and magnetopause boundary models.
-    
-    input:  xkp     --- kp index (real value between 0 & 9).
-    output: bx      --- the imf b_x [nt]
-            by      --- the imf b_y [nt]
-            bz      --- the imf b_z [nt]
-            vx      --- x component of solar wind bulk flow velocity (km/s).
-            vy      --- y component of solar wind bulk flow velocity (km/s).
-            vz      --- z component of solar wind bulk flow velocity (km/s).
-            dennum  --- the solar wind proton number density [#/cm^3]
-            swetemp --- the solar wind electron temperature [k]
-            swptemp --- the solar wind proton temperature [k]
-            hefrac  --- fraction of solar wind ions which are helium ions
-            swhtemp --- the temperature of the helium [k]
-            bowang  --- angle bow shock radius calculated (rad).
-            dypres  --- solar wind dynamic pressure (np).
-            abang   --- aberration angle of magnetotail (deg).
-            xhinge  --- hinge point of magnetotail (re).
-
-    from parm file      pi
-    """
-
-    bx      =   -5.0
-    by      =    6.0
-    bz      =    6.0
-    vx      = -500.0
-    vy      =    0.0
-    vz      =    0.0
-
-    dennum  = 8.0
-    swetemp = 1.4e+5
-    swptemp = 1.2e+5
-    hefrac  = 0.047
-    swhtemp = 5.8e+5
-    bowang  = pi
-
-    if xkp <= 4.0:
-        dypres  =    1.0
-        abang   =    4.0
-        xhinge  =   14.0
-        vx      = -400.0
-
-    elif (xkp > 4.0) and (xkp <= 6.0): 
-        dypres1 =    1.0
-        abang1  =    4.0
-        vx1     = -400.0
-        dypres2 =    4.0
-        abang2  =    0.0
-        vx2     = -500.0
-
-        dypres  = y_interpolate(4.0, dypres1, 6.0, dypres2, xkp, 1)
-        abang   = y_interpolate(4.0, abang1,  6.0, abang2,  xkp, 1)
-        xhinge  = 14.0
-        vx      = y_interpolate(4.0, vx1,     6.0, vx2,     xkp, 1)
-
-    else:
-        dypres1 =    4.0
-        dypres2 =   10.0
-        dypres  = y_interpolate(6.0, dypres1, 9.0, dypres2, xkp, 1)
-        abang   =    0.0
-        xhinge  =   14.0
-        vx      = -500.0
-
-    return [bx, by, bz, vx, vy, vz, dennum, swetemp, swptemp, hefrac,\
-            swhtemp, bowang, dypres, abang, xhinge]
-
 #----------------------------------------------------------------------------
 #-- sort_multi_lists: sort all lists in list_save with in the sorted order of the list at postion given
 #----------------------------------------------------------------------------
@@ -3032,122 +2825,14 @@ def statflx(ain, fpchi, fpclo):
     return apchi, apclo, amean, asig, amax, amin
 
 #----------------------------------------------------------------------------
-#-- wtscal:  calculates the distance weighted sum of the Kp scaling factors -
-#----------------------------------------------------------------------------
-
-def wtscal(numscal, indsect, rngsect, scmean, sc95, sc50, scsig):
-    """
-    This routine calculates the distance weighted sum of the Kp
-    scaling factors.  The objective of this approach is to arrive
-    at a set of Kp scaling factors that have been "blended" together
-    according to their relative distances from the point at which
-    output is desired.
-    
-    Algorithm:
-    
-    (1) Multiply the closest sector's Kp scaling factors by the
-        distance to the farthest sector.
-    (2) Multiply the  2nd closest sector's Kp scaling factors by the
-        distance to the 2nd farthest sector.
-    (3) Repeat this process until you multiply the farthest sector's
-        Kp scaling factors by the distance to the closest sector.
-    (4) Get the final set of Kp scaling factors by summing the distance
-        scaled quantities and dividing the sum by the total distance
-        to all of the sectors.
-    
-    input:  numscal --- the number of Kp scaling sectors to use per
-                        calculation. (NUMSCAL must not exceed NUMSEC!)
-            indsect --- index list pointing to the Kp scaling sectors,
-                        ranked in order of nearest to farthest.
-            rngsect --- list containing the sorted range values of the
-                        spacecraft to the Kp scaling sectors,
-            scmean  --- list of each sector's mean flux scale factor.
-            sc95    --- list of each sector's 95% flux scale factor.
-            sc50    --- list of each sector's 50% flux scale factor.
-            scsig   --- list of each sector's std dev flux scale factor.
-    
-    output: wtmean  --- distance weighted sum of the mean flux scale factors.
-            wt95    --- distance weighted sum of the 95% flux scale factors.
-            wt50    --- distance weighted sum of the 50% flux scale factors.
-            wtsig   --- distance weighted sum of the std dev flux scale factors.
-
-    from param file     maxkp
-    """
-    wtmean = numpy.zeros(maxkp)
-    wt95   = numpy.zeros(maxkp)
-    wt50   = numpy.zeros(maxkp)
-    wtsig  = numpy.zeros(maxkp)
-    
-    dtot   = 0
-    for i in range(0, numscal):
-        dtot  += rngsect[i]
-        m  = indsect[i]
-        n  = numscal - i - 1
-        weight = rngsect[n]
-     
-        wtmean = create_weighted_sum(wtmean, scmean[m], weight)
-        wt95   = create_weighted_sum(wt95,   sc95[m],   weight)
-        wt50   = create_weighted_sum(wt50,   sc50[m],   weight)
-        wtsig  = create_weighted_sum(wtsig,  scsig[m],  weight)
-    
-    wtmean /= float(dtot)
-    wt95   /= float(dtot)
-    wt50   /= float(dtot)
-    wtsig  /= float(dtot)
-
-    return wtmean, wt95, wt50, wtsig
-
-#----------------------------------------------------------------------------
-#----------------------------------------------------------------------------
-#----------------------------------------------------------------------------
-
-def create_weighted_sum(a, b, w):
-
-    a += b * w
-
-    return a
-
-#----------------------------------------------------------------------------
-#-- y_interpolate: return y coordinate corresponding to xin                --
-#----------------------------------------------------------------------------
-
-def y_interpolate(x1, y1, x2, y2, xin, mode=1):
-    """
-    return y coordinate corresponding to xin along the line define by (x1, y1)/(x2, y2)
-    input:  (x1, y1)/(x2, y2)   --- coordinates of two points
-            xin                 --- x value to be estimated
-            mode                --- 1: linear
-                                    2: semilog log/linear
-                                    3: semilog linear/log
-                                    4: log/log
-    output: yest                --- resulted y value
-    """
-    if mode in [2, 4]:
-        x1  = math.log(x1)
-        x2  = math.log(x2)
-        xin = math.log(xin)
-
-    if mode in [3, 4]:
-        y1  = math.log(y1)
-        y2  = math.log(y2)
-#
-#--- linear interpolation
-#
-    yest = y1 - (y1 - y2) *(x1 -xin) / (x1 - x2)
-
-    if mode in [3, 4]:
-        yest = math.exp(yest)
-
-    return yest
-
-#----------------------------------------------------------------------------
-#-- zbinner: determins the z-layer of the magnetosphere used to find       --
+#-- zbin: determins the z-layer of the magnetosphere used to find          --
 #----------------------------------------------------------------------------
 
-def zbinner(xgsm, zgsm):
+cdef void zbin(double xgsm, double zgsm, double *zcklo, double *zckhi):
     """
     this routine determins the z-layer of the magnetosphere used to find
-    the speacecraft's near-nighbor flux
+    the speacecraft's near-nighbor flux. as in the fortran code (zbinner), 
+    z = -6 belongs to the lowest layer.
     input:  xgsm    --- satellite's x-coordinate in re
             zgsm    --- satellite's z-coordinate in re
     output: zcklo   --- lower z-value used to check for near-neighbor flux in re
@@ -3157,74 +2842,73 @@ def zbinner(xgsm, zgsm):
 #--- do not use z-layer on the dayside of the magnetospere
 #
     if xgsm >= 0:
-        zcklo = -7.0
-        zckhi = 100.0
+        zcklo[0] = -7.0
+        zckhi[0] = 100.0
 #
 #--- use the nearest neighbor flux only inside a range of z-values
 #
     else:
 #
-#--- use the nearest neighbor in the -7 < z < -6 range
+#--- use the nearest neighbor in the -7 < z <= -6 range
 #
-        if zgsm < -6.0:
-            zcklo = -7.0
-            zckhi = -6.0
+        if zgsm <= -6.0:
+            zcklo[0] = -7.0
+            zckhi[0] = -6.0
 #
 #--- use the nearest neighbor in the -6 < Z < -5. range
 #
         elif (zgsm > -6.0) and (zgsm <= -5.0):
-            zcklo = -6.0
-            zckhi = -5.0
+            zcklo[0] = -6.0
+            zckhi[0] = -5.0
 #
 #--- use the nearest neighbor in the -5 < Z < +4. range
 #
         elif (zgsm > -5.0) and (zgsm <=  4.0):
-            zcklo = -5.0
-            zckhi =  4.0
+            zcklo[0] = -5.0
+            zckhi[0] =  4.0
 #
 #--- use the nearest neighbor in the +4 < Z < +5. range
 #
         elif (zgsm >  4.0) and (zgsm <=  5.0):
-            zcklo =  4.0
-            zckhi =  5.0
+            zcklo[0] =  4.0
+            zckhi[0] =  5.0
 #
 #--- use the nearest neighbor in the +5 < Z < +6. range
 #
         elif (zgsm >  5.0) and (zgsm <=  6.0):
-            zcklo =  5.0
-            zckhi =  6.0
+            zcklo[0] =  5.0
+            zckhi[0] =  6.0
 #
 #--- use the nearest neighbor in the +6 < Z < +7. range
 #
         elif (zgsm >  6.0) and (zgsm <=  7.0):
-            zcklo =  6.0
-            zckhi =  7.0
+            zcklo[0] =  6.0
+            zckhi[0] =  7.0
 #
 #--- use the nearest neighbor in the +7 < Z < +8. range
 #
         elif (zgsm >  7.0) and (zgsm <=  8.0):
-            zcklo =  7.0
-            zckhi =  8.0
+            zcklo[0] =  7.0
+            zckhi[0] =  8.0
 #
 #--- use the nearest neighbor in the +8 < Z < +9. range
 #
         elif (zgsm >  8.0) and (zgsm <=  9.0):
-            zcklo =  8.0
-            zckhi =  9.0
+            zcklo[0] =  8.0
+            zckhi[0] =  9.0
 #
 #--- use the nearest neighbor in the +9 < Z < +10. range
 #
         elif (zgsm >  9.0) and (zgsm <=  10.0):
-            zcklo =  9.0
-            zckhi = 10.0
+            zcklo[0] =  9.0
+            zckhi[0] = 10.0
 #
 #--- use the nearest neighbor in the +10 < Z < +11. range
 #
         elif zgsm > 10.0:
-            zcklo = 10.0
-            zckhi = 11.0
+            zcklo[0] = 10.0
+            zckhi[0] = 11.0
 
-    return zcklo, zckhi
 
 #----------------------------------------------------------------------------
 #---TEST TEST TEST TEST TEST TEST TEST TEST TEST TEST  ----------------------
@@ -3271,11 +2955,11 @@ class run_test(unittest.TestCase):
 
     def test_solwind(self):
         xkp= 2.3
-        out = solwind(xkp)
+        out = crr.solwind(xkp)
         print("solwind: %2.3f" % round(out[-3], 3))
 
         xkp= 4.3
-        out = solwind(xkp)
+        out = crr.solwind(xkp)
         print("solwind: %2.3f" % round(out[-3], 3))
 
 #---------------------------------------
@@ -3300,7 +2984,7 @@ class run_test(unittest.TestCase):
         x2  = 3.0
         y2  = 3.0
         xin = 2.0
-        yin = y_interpolate(x1, y1, x2, y2, xin)
+        yin = crr.y_interpolate(x1, y1, x2, y2, xin)
     
         self.assertEqual(yin, 2.0)
 
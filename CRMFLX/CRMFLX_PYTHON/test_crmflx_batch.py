@@ -0,0 +1,84 @@
+#####################################################################################
+#                                                                                   #
+#       test_crmflx_batch.py: test crmflx_batch against the per position crmflx     #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   crmflx is the compiled module (python setup.py build_ext --inplace); the test
+#   is skipped where it is not built or its site set up (dir_list) is not there.
+#
+
+import os
+import sys
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '..', 'Common', 'Scripts'))
+sys.path.insert(0, SCRIPT_DIR)
+
+try:
+    import crmflx as cflx
+except (ImportError, OSError):
+    pytest.skip('crmflx is not built here', allow_module_level=True)
+
+#
+#--- ispeci, iusesw, fswimn, fswi95, fswi50, fswisd, iusemsh, iusemsp, smooth1,
+#--- nflxget, ndrophi, ndroplo, logflg, rngtol, fpchi, fpclo (see runcrm.py)
+#
+PARAM = [1, 0, 1.0, 2.0, 3.0, 4.0, 1, 1, 4, 0, 0, 0, 1, 4.0, 0, 0]
+
+def make_database(seed, distmapmax=6.0):
+    """
+    a small flux database: every cell in -20 <= x < 16, -16 <= y < 16, -8 <= z < 8
+    (re) with a random flux for each kp
+    """
+    rng   = numpy.random.default_rng(seed)
+    [xidx, yidx, zidx] = [ent.ravel() for ent in\
+                          numpy.meshgrid(numpy.arange(10, 46), numpy.arange(14, 46),\
+                                         numpy.arange(22, 38), indexing='ij')]
+    ncell = len(xidx)
+    nkp   = cflx.maxkp
+
+    cdata = {}
+    cdata['numdat'] = numpy.full(nkp, ncell, dtype=int)
+    cdata['xidx']   = numpy.tile(xidx, nkp)
+    cdata['yidx']   = numpy.tile(yidx, nkp)
+    cdata['zidx']   = numpy.tile(zidx, nkp)
+    cdata['xflux']  = cflx.xmin + (cdata['xidx'] + 0.5) * cflx.xinc
+    cdata['yflux']  = cflx.ymin + (cdata['yidx'] + 0.5) * cflx.yinc
+    cdata['zflux']  = cflx.zmin + (cdata['zidx'] + 0.5) * cflx.zinc
+    cdata['flxbin'] = 10.0 ** rng.uniform(2.0, 6.0, ncell * nkp)
+    cdata['numbin'] = rng.integers(1, 20, ncell * nkp)
+
+    fdb = cflx.FluxDatabase(cdata)
+    fdb.set_search_volume(distmapmax)
+
+    return fdb
+
+#-----------------------------------------------------------------------------
+
+def test_batch_matches_per_position_crmflx():
+    """
+    every (kp, position) of crmflx_batch is the same as a crmflx call
+    """
+    rng  = numpy.random.default_rng(11)
+    xgsm = rng.uniform(-18.0, 14.0, 40)
+    ygsm = rng.uniform(-14.0, 14.0, 40)
+    zgsm = rng.uniform(-6.0, 6.0, 40)
+    kps  = numpy.array([0.0, 1.0, 3.0, 5.6667, 9.0])
+    dbs  = [make_database(1), make_database(2), make_database(3)]
+
+    out  = cflx.crmflx_batch(kps, xgsm, ygsm, zgsm, *PARAM, *dbs)
+    assert out[0].shape == (len(kps), len(xgsm))
+
+    for m in range(0, len(kps)):
+        for n in range(0, len(xgsm)):
+            one = cflx.crmflx(kps[m], xgsm[n], ygsm[n], zgsm[n], *PARAM, *dbs)
+            assert out[0][m, n] == one[0]
+            assert [out[k][m, n] for k in range(1, 5)] == pytest.approx(list(one[1:5]), rel=1.0e-12)
+
+    assert sorted(set(out[0].ravel().tolist())) == [1, 2, 3]
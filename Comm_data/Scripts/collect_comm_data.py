@@ -17,7 +17,6 @@ import string
 import math
 import time
 import random
-import Chandra.Time
 import codecs
 #
 #--- reading directory list
@@ -41,6 +40,8 @@ if (os.getenv('TEST') == 'TEST'):
 #
 sys.path.append('/data/mta4/Script/Python3.10/MTA/')
 import mta_common_functions     as mcf
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_convert             as tcv
 #
 #--- temp writing file name
 #
@@ -89,17 +90,23 @@ def collect_comm_data():
     with codecs.open(f_list[-1], 'r', encoding='utf-8', errors='ignore') as f:
         data = [line.strip() for line in f.readlines()]
 #
-#--- skip the header part
+#--- skip the header part and the short (e.g. blank) lines; convert all starting
+#--- and stopping times at once
 #
-    for ent in data[2:]:
-        atemp  = re.split('\s+', ent)
+    rows   = [re.split('\s+', ent) for ent in data[2:]]
+    rows   = [atemp for atemp in rows if len(atemp) >= 10]
+    s_list = tcv.date_to_secs([atemp[3] for atemp in rows])
+    e_list = tcv.date_to_secs([atemp[4] for atemp in rows])
+
+    for k in range(0, len(rows)):
+        atemp  = rows[k]
         tstart = atemp[3]
         tstop  = atemp[4]
 #
 #--- select data in the selection time interval
 #
-        sstart = Chandra.Time.DateTime(tstart).secs
-        sstop  = Chandra.Time.DateTime(tstop).secs
+        sstart = s_list[k]
+        sstop  = e_list[k]
         if sstop < tbegin:
             continue
 
@@ -114,8 +121,8 @@ def collect_comm_data():
         cstop  = dtemp[0] + ':' + dtemp[1] + ':'
         cstop  = cstop + atemp[6][0] + atemp[6][1] + ':' + atemp[6][2] + atemp[6][3] + ':00'
 
-        stime1 = Chandra.Time.DateTime(cstart).secs
-        stime2 = Chandra.Time.DateTime(cstop).secs
+        stime1 = tcv.date_to_secs(cstart)
+        stime2 = tcv.date_to_secs(cstop)
 #
 #--- sometime contact does not start till the following day; make sure the starting time is correct
 #
@@ -128,8 +135,8 @@ def collect_comm_data():
         ctemp = re.split('\.', tstart)
         dtemp = re.split('\.', tstop)
         line = line + ctemp[0] + '\t' + dtemp[0]  + '\t' + cstart + '\t' + cstop + '\t'
-        line = line + str(int(Chandra.Time.DateTime(cstart).secs)) + '\t'
-        line = line + str(int(Chandra.Time.DateTime(cstop).secs))  + '\t'
+        line = line + str(int(tcv.date_to_secs(cstart))) + '\t'
+        line = line + str(int(stime2))  + '\t'
         line = line + change_to_fday(cstart)        + '\t'
         line = line + change_to_fday(cstop)         + '\t\t'
         line = line + atemp[7] + '/' + atemp[9]     + '\n'
@@ -165,7 +172,7 @@ def set_collection_interval(iday=3.0):
             tend    --- stopping time in seconds from 1998.1.1
     """
     today  = time.strftime("%Y:%j:00:00:00", time.gmtime())
-    today  = Chandra.Time.DateTime(today).secs
+    today  = tcv.date_to_secs(today)
     tbegin = today - iday * 86400.0
     tend   = today + iday * 86400.0
 
@@ -0,0 +1,824 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       crm_region.py: phenomenological region (solar wind / magnetosheath /        #
+#                      magnetosphere) of the spacecraft positions                   #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the region routines of crmflx (locreg, locate, bowshk2, fast and solwind of the
+#   fortran code CRMFLX_V33) shared by CRMFLX/CRMFLX_PYTHON/crmflx.pyx and
+#   EPHEM/Scripts/convert_coord.py. the array versions classify all positions of
+#   a kp value at once; the solar wind and bow shock parameters depend only on kp
+#   and are kept in region_params.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import crm_region as crr
+#       xtail, ytail, ztail, idloc = crr.locreg(kp, xgsm, ygsm, zgsm)
+#       xtail, ytail, ztail, idloc = crr.locreg_array(<kp>, <xgsm>, <ygsm>, <zgsm>)
+#
+#       idloc = 1 (solar wind), 2 (magnetosheath), 3 (magnetosphere)
+#
+
+import math
+import numpy
+
+pi = 3.14159265359
+#
+#--- the solar wind and bow shock parameters of each kp value (see get_region_params)
+#
+region_params = {}
+
+#----------------------------------------------------------------------------
+#-- locreg: determines which phenomenological region the spacecraft is in  --
+#----------------------------------------------------------------------------
+
+def locreg( xkp, xgsm, ygsm, zgsm):
+    """
+    this routine determines which phenomenological region the
+    spacecraft is in.
+    
+    input:  xkp     --- kp index (real value between 0 & 9).
+            xgsm    --- satellite's x-coordinate (re).
+            ygsm    --- satellite's y-coordinate (re).
+            zgsm    --- satellite's z-coordinate (re).
+         
+    output: xtail   --- satellite's x-coordinate in geotail system (re).
+            ytail   --- satellite's y-coordinate in geotail system (re).
+            ztail   --- satellite's z-coordinate in geotail system (re).
+            idloc   --- phenomenogical region location identification flag:
+                        idloc = 1 if spacecraft is in solar wind
+                        idloc = 2 if spacecraft is in magnetosheath
+                        idloc = 3 if spacecraft is in magnetosphere
+    """
+#
+#--- set the region identification flag to "no region
+#
+    idloc = 0
+#
+#--- get the solar wind parameters used as inputs for the bow shock
+#--- and magnetopause boundary models for this value of kp
+#
+    [bx,by,bz,vx,vy,vz,dennum,swetemp,swptemp,hefrac,swhtemp,bowang,dypres,abang,xhinge]\
+                    = solwind(xkp)
+#
+#--- transform the spacecraft's coordinates to a system aligned with the geotail
+#
+#--- rotate the bow shock by the aberration angle
+#
+    angrad        = -abang * 0.01745329252
+    [xtail,ytail] = rot8ang(angrad,xgsm,ygsm,xhinge)
+    ztail         = zgsm
+#
+#--- determine if the spacecraft is inside the magnetosphere.  use the
+#--- tsyganenko magnetopause model
+#
+    vel = -1
+    xmgp,ymgp,zmgp,dist,xid = locate(dypres,vel,xtail,ytail,ztail)
+#
+#--- the spacecraft is inside the magnetosphere
+#
+    if xid == 1:
+        idloc = 3
+#
+#--- determine if the spacecraft is in either the solar wind or
+#--- the magnetosheath.  calculate the bow shock radius at this point
+#
+    else:
+        radbs = bowshk2(bx,by,bz,vx,vy,vz,dennum,swetemp,swptemp,hefrac,swhtemp,xtail,bowang)
+#
+#--- find the distance of the spacecraft from the aberrated x-axi
+#
+        distsc = math.sqrt(ytail**2 + ztail**2)
+#
+#--- the spacecraft is in the magnetosheath
+#
+        if distsc <= radbs:
+            idloc = 2
+#
+#--- the spacecraft is in the solar wind
+#
+        else:
+            idloc = 1
+
+    return xtail, ytail, ztail, idloc
+
+#----------------------------------------------------------------------------
+#-- locreg_array: determines the phenomenological regions of an array of positions
+#----------------------------------------------------------------------------
+
+def locreg_array(xkp, xgsm, ygsm, zgsm):
+    """
+    array version of locreg: determines which phenomenological region the
+    spacecraft is in at each of the positions.
+
+    input:  xkp     --- kp index (real value between 0 & 9); either one value or
+                        an array (one for each position).
+            xgsm    --- array of satellite's x-coordinates (re).
+            ygsm    --- array of satellite's y-coordinates (re).
+            zgsm    --- array of satellite's z-coordinates (re).
+
+    output: xtail   --- array of satellite's x-coordinates in geotail system (re).
+            ytail   --- array of satellite's y-coordinates in geotail system (re).
+            ztail   --- array of satellite's z-coordinates in geotail system (re).
+            idloc   --- int array of phenomenogical region location identification
+                        flag (see locreg)
+    """
+    xgsm  = numpy.asarray(xgsm, dtype=float)
+    ygsm  = numpy.asarray(ygsm, dtype=float)
+    zgsm  = numpy.asarray(zgsm, dtype=float)
+    xkp   = numpy.broadcast_to(numpy.asarray(xkp, dtype=float), xgsm.shape)
+
+    xtail = numpy.zeros(xgsm.shape)
+    ytail = numpy.zeros(xgsm.shape)
+    ztail = numpy.array(zgsm)
+    idloc = numpy.zeros(xgsm.shape, dtype=int)
+#
+#--- the boundaries depend only on kp; classify the positions of each kp value at once
+#
+    for kval in numpy.unique(xkp):
+        idx = xkp == kval
+#
+#--- get the solar wind and the bow shock parameters for this value of kp
+#
+        [swpar, bcoef] = get_region_params(kval)
+        [bx,by,bz,vx,vy,vz,dennum,swetemp,swptemp,hefrac,swhtemp,bowang,dypres,abang,xhinge]\
+                    = swpar
+#
+#--- transform the spacecraft's coordinates to a system aligned with the geotail
+#
+        angrad = -abang * 0.01745329252
+        [xtail[idx], ytail[idx]] = rot8ang_array(angrad,xgsm[idx],ygsm[idx],xhinge)
+#
+#--- determine if the spacecraft is inside the magnetosphere (see locreg)
+#
+        vel = -1
+        xid = locate_array(dypres,vel,xtail[idx],ytail[idx],ztail[idx])[4]
+#
+#--- outside of the magnetosphere, compare the distance from the aberrated x-axis
+#--- with the bow shock radius
+#
+        radbs  = bowshk2_radius(bcoef, xtail[idx])
+        distsc = numpy.sqrt(ytail[idx]**2 + ztail[idx]**2)
+
+        idloc[idx] = numpy.where(xid == 1, 3, numpy.where(distsc <= radbs, 2, 1))
+
+    return xtail, ytail, ztail, idloc
+
+#----------------------------------------------------------------------------
+#-- get_region_params: give the solar wind and bow shock parameters of kp  --
+#----------------------------------------------------------------------------
+
+def get_region_params(xkp):
+    """
+    give the solar wind and bow shock parameters of kp. they depend only on kp,
+    so they are computed once for each kp value and kept in region_params.
+    input:  xkp     --- kp index (real value between 0 & 9).
+    output: swpar   --- the solar wind parameters (see solwind)
+            bcoef   --- the bow shock coefficients (see bowshk2_coeff)
+    """
+    xkp = float(xkp)
+    if xkp not in region_params:
+        swpar = solwind(xkp)
+        [bx,by,bz,vx,vy,vz,dennum,swetemp,swptemp,hefrac,swhtemp,bowang,dypres,abang,xhinge]\
+                    = swpar
+        bcoef = bowshk2_coeff(bx,by,bz,vx,vy,vz,dennum,swetemp,swptemp,hefrac,swhtemp,bowang)
+
+        region_params[xkp] = [swpar, bcoef]
+
+    return region_params[xkp]
+
+#----------------------------------------------------------------------------
+#-- solwind: get the solar wind parameters used as inputs for the bow shock -
+#----------------------------------------------------------------------------
+
+def solwind(xkp):
+    """
+    get the solar wind parameters used as inputs for the bow shock
+    and magnetopause boundary models.
+    
+    input:  xkp     --- kp index (real value between 0 & 9).
+    output: bx      --- the imf b_x [nt]
+            by      --- the imf b_y [nt]
+            bz      --- the imf b_z [nt]
+            vx      --- x component of solar wind bulk flow velocity (km/s).
+            vy      --- y component of solar wind bulk flow velocity (km/s).
+            vz      --- z component of solar wind bulk flow velocity (km/s).
+            dennum  --- the solar wind proton number density [#/cm^3]
+            swetemp --- the solar wind electron temperature [k]
+            swptemp --- the solar wind proton temperature [k]
+            hefrac  --- fraction of solar wind ions which are helium ions
+            swhtemp --- the temperature of the helium [k]
+            bowang  --- angle bow shock radius calculated (rad).
+            dypres  --- solar wind dynamic pressure (np).
+            abang   --- aberration angle of magnetotail (deg).
+            xhinge  --- hinge point of magnetotail (re).
+
+    from parm file      pi
+    """
+
+    bx      =   -5.0
+    by      =    6.0
+    bz      =    6.0
+    vx      = -500.0
+    vy      =    0.0
+    vz      =    0.0
+
+    dennum  = 8.0
+    swetemp = 1.4e+5
+    swptemp = 1.2e+5
+    hefrac  = 0.047
+    swhtemp = 5.8e+5
+    bowang  = pi
+
+    if xkp <= 4.0:
+        dypres  =    1.0
+        abang   =    4.0
+        xhinge  =   14.0
+        vx      = -400.0
+
+    elif (xkp > 4.0) and (xkp <= 6.0): 
+        dypres1 =    1.0
+        abang1  =    4.0
+        vx1     = -400.0
+        dypres2 =    4.0
+        abang2  =    0.0
+        vx2     = -500.0
+
+        dypres  = y_interpolate(4.0, dypres1, 6.0, dypres2, xkp, 1)
+        abang   = y_interpolate(4.0, abang1,  6.0, abang2,  xkp, 1)
+        xhinge  = 14.0
+        vx      = y_interpolate(4.0, vx1,     6.0, vx2,     xkp, 1)
+
+    else:
+        dypres1 =    4.0
+        dypres2 =   10.0
+        dypres  = y_interpolate(6.0, dypres1, 9.0, dypres2, xkp, 1)
+        abang   =    0.0
+        xhinge  =   14.0
+        vx      = -500.0
+
+    return [bx, by, bz, vx, vy, vz, dennum, swetemp, swptemp, hefrac,\
+            swhtemp, bowang, dypres, abang, xhinge]
+
+#----------------------------------------------------------------------------
+#-- y_interpolate: return y coordinate corresponding to xin                --
+#----------------------------------------------------------------------------
+
+def y_interpolate(x1, y1, x2, y2, xin, mode=1):
+    """
+    return y coordinate corresponding to xin along the line define by (x1, y1)/(x2, y2)
+    input:  (x1, y1)/(x2, y2)   --- coordinates of two points
+            xin                 --- x value to be estimated
+            mode                --- 1: linear
+                                    2: semilog log/linear
+                                    3: semilog linear/log
+                                    4: log/log
+    output: yest                --- resulted y value
+    """
+    if mode in [2, 4]:
+        x1  = math.log(x1)
+        x2  = math.log(x2)
+        xin = math.log(xin)
+
+    if mode in [3, 4]:
+        y1  = math.log(y1)
+        y2  = math.log(y2)
+#
+#--- linear interpolation
+#
+    yest = y1 - (y1 - y2) *(x1 -xin) / (x1 - x2)
+
+    if mode in [3, 4]:
+        yest = math.exp(yest)
+
+    return yest
+
+#----------------------------------------------------------------------------
+#-- rot8ang: rotates the 2-d vector about its hinge point in the xy-plane  --
+#----------------------------------------------------------------------------
+
+def rot8ang(ang, x, y, xhinge):
+    """
+    this routine rotates the 2-d vector about its hinge point in the xy-plane.
+    input:  ang    --- angle to rotate (rad).
+            x      --- initial x value.
+            y      --- initial y value.
+            xhinge --- x value of aberration hinge point.
+    
+    output: xrot2  --- final x value.
+            yrot2  --- final y value.
+    """
+    if x <= xhinge:
+        xrot2 =  x * math.cos(ang) + y * math.sin(ang)
+        yrot2 = -x * math.sin(ang) + y * math.cos(ang)
+    else:
+        xrot2 = x
+        yrot2 = y
+
+    return [xrot2, yrot2]
+
+#----------------------------------------------------------------------------
+#-- rot8ang_array: rotates arrays of 2-d vectors about the hinge point     --
+#----------------------------------------------------------------------------
+
+def rot8ang_array(ang, x, y, xhinge):
+    """
+    array version of rot8ang
+    input:  ang    --- angle to rotate (rad).
+            x      --- array of initial x values.
+            y      --- array of initial y values.
+            xhinge --- x value of aberration hinge point.
+    
+    output: xrot2  --- array of final x values.
+            yrot2  --- array of final y values.
+    """
+    x     = numpy.asarray(x, dtype=float)
+    y     = numpy.asarray(y, dtype=float)
+    rot   = x <= xhinge
+
+    xrot2 = numpy.where(rot,  x * math.cos(ang) + y * math.sin(ang), x)
+    yrot2 = numpy.where(rot, -x * math.sin(ang) + y * math.cos(ang), y)
+
+    return [xrot2, yrot2]
+
+#----------------------------------------------------------------------------
+#-- locate: defines the position of a point  at the model magnetopause      -
+#----------------------------------------------------------------------------
+
+def locate( xn_pd, vel, xgsm, ygsm, zgsm):
+    """
+    this subroutine defines the position of a point (xmgnp,ymgnp,zmgnp)
+    at the model magnetopause, closest to a given point of space
+    (xgsm,ygsm,zgsm),   and the distance between them (dist)
+    
+     nput:  xn_pd --- either solar wind proton number density (per c.c.) (if vel>0)
+                      or the solar wind ram pressure in nanopascals   (if vel<0)
+            vel   --- either solar wind velocity (km/sec)
+                      or any negative number, which indicates that xn_pd stands
+                      for the solar wind pressure, rather than for the density
+    
+            xgsm,ygsm,zgsm - coordinates of the observation point in earth radii
+    
+    output: xmgnp,ymgnp,zmgnp - coordinates of a point at the magnetopause,
+                                closest to the point  xgsm,ygsm,zgsm
+            dist  ---  the distance between the above two points, in re,
+            xid   ---  indicator; id=+1 and id=-1 mean that the point
+                       (xgsm,ygsm,zgsm)  lies inside or outside
+                       the model magnetopause, respectively
+    
+    the pressure-dependent magnetopause is that used in the t96_01 model
+    coded by:  n.a. tsyganenko, aug.1, 1995;  revised  june 22, 1996
+
+    """
+#
+#--- pd is the solar wind dynamic pressure (in nanopascals)
+#
+    if vel < 0.0:
+        pd = xn_pd
+    else:
+        pd = 1.94e-6 * xn_pd * vel**2
+#
+#--- ratio of pd to the average pressure, assumed as 2 npa
+#
+    rat   = pd / 2.0
+#
+#--- the power in the scaling factor is the best-fit value
+#--- obtained from data in the t96_01 version of the model
+#
+    rat16 = rat**0.14
+#
+#--- values of the magnetopause parameters for  pd = 2 npa are:
+#---   a0    = 70.00 /   s00   =  1.08 /   x00   =  5.48
+#--- values of the magnetopause parameters, scaled to the actual pressure
+#
+    a     = 70.0 / rat16
+    s0    = 1.08
+    x0    = 5.48 / rat16
+#
+#--- this is the x-coordinate of the "seam" between the ellipsoid and the cylinder
+#
+    xm    = x0 - a
+#
+#--- (for details on the ellipsoidal coordinates, see the paper:
+#--- n.a.tsyganenko, solution of chapman-ferraro problem for an
+#--- ellipsoidal magnetopause, planet.space sci., v.37, p.1037, 1989)
+#
+    if (ygsm != 0.0) or (zgsm != 0.0):
+        phi = math.atan2(ygsm,zgsm)
+    else:
+        phi = 0.0
+
+    rho = math.sqrt(ygsm**2 + zgsm**2)
+
+    if xgsm < xm:
+#
+#--- calculate (x,y,z) for the closest point at the magnetopause
+#
+        xmgnp   = xgsm
+        rhomgnp = a * math.sqrt(s0**2 - 1)
+        ymgnp   = rhomgnp * math.sin(phi)
+        zmgnp   = rhomgnp * math.cos(phi)
+#
+#--- xid=-1 means that the point lies outside the magnetosphere
+#--- xid=+1 means that the point lies inside  the magnetosphere
+#
+        xid     = 0
+        if rhomgnp > rho:
+            xid =  1
+        elif rhomgnp < rho:
+            xid = -1
+
+    else:
+        xksi  = (xgsm - x0) / a + 1.0
+        xdzt  = rho / a
+        sq1   = math.sqrt((1.0 + xksi)**2 + xdzt**2)
+        sq2   = math.sqrt((1.0 - xksi)**2 + xdzt**2)
+        sigma = 0.5 * (sq1 + sq2)
+        tau   = 0.5 * (sq1 - sq2)
+#
+#--- calculate (x,y,z) for the closest point at the magnetopause
+#
+        xmgnp   = x0 - a * (1.0 - s0 * tau)
+        rhomgnp = a * math.sqrt((s0**2 - 1.0)*(1.0 - tau**2))
+        ymgnp   = rhomgnp * math.sin(phi)
+        zmgnp   = rhomgnp * math.cos(phi)
+#
+#--- xid=-1 means that the point lies outside the magnetosphere
+#--- xid=+1 means that the point lies inside  the magnetosphere
+#
+        xid = 0
+        if sigma > s0:
+            xid = -1
+        elif sigma < s0:
+            xid =  1
+#
+#--- calculate the shortest distance between the point xgsm,ygsm,zgsm and the magnetopause
+#
+    dist = math.sqrt((xgsm - xmgnp)**2 + (ygsm - ymgnp)**2 + (zgsm - zmgnp)**2)
+
+    return xmgnp, ymgnp, zmgnp, dist, xid
+
+#----------------------------------------------------------------------------
+#-- locate_array: locate for an array of points                            --
+#----------------------------------------------------------------------------
+
+def locate_array( xn_pd, vel, xgsm, ygsm, zgsm):
+    """
+    array version of locate
+    input:  xn_pd, vel  --- see locate
+            xgsm,ygsm,zgsm - arrays of coordinates of the observation points in earth radii
+    output: xmgnp,ymgnp,zmgnp - arrays of coordinates of the points at the magnetopause
+            dist  ---  array of the distances between the above two points, in re,
+            xid   ---  int array of indicators (see locate)
+    """
+    xgsm = numpy.asarray(xgsm, dtype=float)
+    ygsm = numpy.asarray(ygsm, dtype=float)
+    zgsm = numpy.asarray(zgsm, dtype=float)
+#
+#--- the magnetopause parameters scaled to the actual pressure (see locate)
+#
+    if vel < 0.0:
+        pd = xn_pd
+    else:
+        pd = 1.94e-6 * xn_pd * vel**2
+
+    rat   = pd / 2.0
+    rat16 = rat**0.14
+    a     = 70.0 / rat16
+    s0    = 1.08
+    x0    = 5.48 / rat16
+    xm    = x0 - a
+#
+#--- atan2(0, 0) is 0, the same as the special case of locate
+#
+    phi   = numpy.arctan2(ygsm, zgsm)
+    rho   = numpy.sqrt(ygsm**2 + zgsm**2)
+#
+#--- the points in the cylinder part (xgsm < xm)
+#
+    tail     = xgsm < xm
+    rhotail  = a * math.sqrt(s0**2 - 1)
+#
+#--- the points in the ellipsoid part
+#
+    xksi  = (xgsm - x0) / a + 1.0
+    xdzt  = rho / a
+    sq1   = numpy.sqrt((1.0 + xksi)**2 + xdzt**2)
+    sq2   = numpy.sqrt((1.0 - xksi)**2 + xdzt**2)
+    sigma = 0.5 * (sq1 + sq2)
+    tau   = 0.5 * (sq1 - sq2)
+#
+#--- calculate (x,y,z) for the closest point at the magnetopause
+#
+    xmgnp   = numpy.where(tail, xgsm, x0 - a * (1.0 - s0 * tau))
+    rhomgnp = numpy.where(tail, rhotail, \
+                          a * numpy.sqrt(numpy.maximum((s0**2 - 1.0)*(1.0 - tau**2), 0.0)))
+    ymgnp   = rhomgnp * numpy.sin(phi)
+    zmgnp   = rhomgnp * numpy.cos(phi)
+#
+#--- xid=-1 means that the point lies outside the magnetosphere
+#--- xid=+1 means that the point lies inside  the magnetosphere
+#--- xid= 0 on the magnetopause
+#
+    xid  = numpy.where(tail, numpy.sign(rhotail - rho), numpy.sign(s0 - sigma)).astype(int)
+
+    dist = numpy.sqrt((xgsm - xmgnp)**2 + (ygsm - ymgnp)**2 + (zgsm - zmgnp)**2)
+
+    return xmgnp, ymgnp, zmgnp, dist, xid
+
+#----------------------------------------------------------------------------
+#-- bowshk2: give the bow shock radius, at a given x                      ---
+#----------------------------------------------------------------------------
+
+def bowshk2( bx, by, bz, vx, vy, vz, dennum, swetemp, swptemp,  hefrac, swhtemp, xpos, bowang):
+    """
+    this routine is designed to give the bow shock radius, at a
+    given x, of the bow shock for any solar wind conditions.
+    
+    
+    references:
+    this routine is adpated from the paper by l. bennet et.al.,
+    "a model of the earth's distant bow shock."  this paper was
+    to be published in the journal of geophysical research, 1997.
+    their source code was obtained from their web site at:
+    http://www.igpp.ucla.edu/galileo/newmodel.htm
+    
+    this routine has been optimized for the simulation.
+    
+    inputs  bx      --- the imf b_x [nt]
+            by      --- the imf b_y [nt]
+            bz      --- the imf b_z [nt]
+            vx      --- the imf v_x [km/s]
+            vy      --- the imf v_y [km/s]
+            vz      --- the imf v_z [km/s]
+            dennum  --- the solar wind proton number density [#/cm^3]
+            swetemp --- the solar wind electron temperature [k]
+            swptemp --- the solar wind proton temperature [k]
+            hefrac  --- fraction of solar wind ions which are helium ions
+            swhtemp --- the temperature of the helium [k]
+            xpos    --- down tail distance cross section is calculated [re]
+            bowang  --- angle bow shock radius calculated (rad).
+    
+    output: bowrad  --- updated cylindrical radius (re).
+
+    """
+    bcoef = bowshk2_coeff(bx,by,bz,vx,vy,vz,dennum,swetemp,swptemp,hefrac,swhtemp,bowang)
+
+    return bowshk2_radius(bcoef, xpos)
+
+#----------------------------------------------------------------------------
+#-- bowshk2_radius: give the bow shock radius at x from the coefficients   --
+#----------------------------------------------------------------------------
+
+def bowshk2_radius(bcoef, xpos):
+    """
+    give the bow shock radius at x from the coefficients of the shock
+    input:  bcoef   --- [a, b, c, xn1, dtan] (see bowshk2_coeff)
+            xpos    --- down tail distance(s) cross section is calculated [re]
+                        either a value or a numpy array
+    output: bowrad  --- updated cylindrical radius (re).
+    """
+    [a, b, c, xn1, dtan] = bcoef
+#
+#--- calculate shock with correct pressure
+#
+    xtemp = a * xpos**2 - b * xpos + c
+    if numpy.ndim(xtemp) == 0:
+        if xtemp < 0:
+            rho2 = 0
+        else:
+            rho2 = math.sqrt(xtemp)
+    else:
+        rho2 = numpy.sqrt(numpy.maximum(xtemp, 0.0))
+#
+#--- the updated cylindrical radius of the prevailing bow shock at downtail
+#--- distance xpos in earth radii (see bowshk2_coeff)
+#
+    xtemp1   = xn1 - xpos
+    rhox     = rho2 + xtemp1 * dtan
+    bowrad   = rhox
+
+    return bowrad
+
+#----------------------------------------------------------------------------
+#-- bowshk2_coeff: give the coefficients of the bow shock                  --
+#----------------------------------------------------------------------------
+
+def bowshk2_coeff( bx, by, bz, vx, vy, vz, dennum, swetemp, swptemp,  hefrac, swhtemp, bowang):
+    """
+    give the coefficients of the bow shock for the solar wind conditions.
+    these do not depend on the down tail distance (see bowshk2).
+    input:  see bowshk2
+    output: bcoef   --- [a, b, c, xn1, dtan] where the radius at x is:
+                        sqrt(a * x**2 - b * x + c) + (xn1 - x) * dtan
+    """
+#
+#--- convert the temperature from kelvins to ev
+#
+    etemp  = swetemp / 11600.
+    ptemp  = swptemp / 11600.
+    hetemp = swhtemp / 11600.
+    dpr    = 6.2832  / 360.0
+    rade   = 6378.0
+    pi     = 4.0 * math.atan(1.0)
+    gamma  = 5.0 / 3.0
+#
+#--- parameters that specify the shape of the base model
+#--- of the bow shock.  the model has the form
+#--- rho**2 = a*x**2 -b*x + c.
+#---
+#--- the parameters are for the greenstadt etal. 1990 model
+#--- (grl, vol 17, p 753, 1990)
+#
+    xl = 22.073117134
+    x0 =  3.493725046
+    xn = 14.422071657
+#
+#--- here the eccentricity of the base model is adjusted.  see 
+#--- the paper for an explanation
+#
+    eps = 1.0040
+#
+#--- calculate new paramaters for cylindrical shock model after
+#--- adjustment of eccentricity.
+#
+#--- calculate parameters of interest
+#
+    btotcgs = math.sqrt(bx * bx + by * by + bz * bz) * 1.e-5    #--- btot in cgs units
+    btot    = btotcgs * 1.e+5                                   #--- btot in mks units
+    vtot    = math.sqrt(vx * vx + vy * vy + vz * vz) * 1.e+5    #--- vtot in cm/sec
+    vtot1   = math.sqrt(vx * vx + vy * vy + vz * vz)            #--- vtot in km/sec
+#
+#--- the following definitions of v_a and c_s are taken from
+#--- slavin & holzer jgr dec 1981
+#
+    v_a   = btotcgs / math.sqrt(4.0 * pi * dennum * 1.67e-24 * (1.0 + hefrac * 4.0)) 
+    pres1 = dennum * ((1.0 + hefrac * 2.0) * etemp + (1 + hefrac * hetemp) * ptemp) * 1.602e-12
+    c_s   = math.sqrt(2.0 * pres1 / (dennum * 1.67e-24 * (1.0 + hefrac * 4.0)))
+#
+#--- calculate mach numbers
+#
+#--- m_f is the fast magnetosonic speed for theta_bn = 90 degrees
+#
+    m_a = vtot / v_a
+    m_s = vtot / c_s
+    m_f = vtot / math.sqrt(v_a * v_a + c_s * c_s)
+#
+#--- this is the modification for the change in the bow shock due
+#--- to changing solar wind dynamic pressure
+#
+#--- average values of number density and solar wind velocity
+#
+    xnave =  7.0
+    vave = 430.0
+#
+#--- fracpres is the fraction by which all length scales in the
+#--- bow shock model will change due to the change in the sola
+#--- wind dynamic pressure
+#
+    fracpres = ((xnave * vave * vave) / (dennum * vtot1 * vtot1))**(1.0/6.0)
+
+    xn1 = xn * fracpres
+    x0  = x0 * fracpres
+    xl  = xl * fracpres
+#
+#--- calculate yet again the parameters for the updated model
+#
+    a = eps * eps -1
+    b = 2.0 * eps * xl + 2.0 *( eps * eps -1) * x0
+    c = xl * xl + 2.0 * eps * xl * x0 + (eps * eps -1) * x0 * x0
+#
+#--- modify the bow shock for the change in flaring due to the
+#--- change in local magnetosonic mach number
+#
+#--- first calculate the flaring angle for average solar wind conditions
+#
+    ave_ma   = 9.4
+    ave_ms   = 7.2
+    vwin_ave = 430.0*1.e+5
+    va_ave   = vwin_ave / ave_ma
+    vs_ave   = vwin_ave / ave_ms
+    bxave    = -3
+    byave    =  3
+    bzave    =  0
+
+    vms      = math.sqrt(0.5 * ((va_ave**2 + vs_ave**2) \
+                + math.sqrt((va_ave**2  + vs_ave**2)**2 \
+                - 4.0 * va_ave**2 * vs_ave**2 *(math.cos(45 * dpr)**2))))
+
+    ave_mf   = vwin_ave / vms
+    thet2    = math.asin(1.0 / ave_mf)
+#
+#--- now calculate the cylindrical radius, and the y and z coordinates,
+#--- of the shock for the angle bowang around the tail axis for a given
+#--- xpos.  note that bowang is 0 along the positive z axis
+#--- (bowang/dpr is the angle about the tail axis in degrees,
+#--- rhox is the updated cylindrical radius of the prevailing bow
+#--- shock at downtail distance xpos in earth radii.
+#
+    vms      = fast(bx,by,bz,v_a,c_s,vtot,bowang)
+
+    m_f      = vtot / vms
+    thet1    = math.asin(1.0 / m_f)
+    dtan     = math.tan(thet1) - math.tan(thet2)
+
+    return [a, b, c, xn1, dtan]
+
+#----------------------------------------------------------------------------
+#-- fast: local fast magnetosonic speed                                    --
+#----------------------------------------------------------------------------
+
+def fast( bx, by, bz, va, vs, v0, alp):
+    """
+    local fast magnetosonic speed
+
+    it uses the simple bisection method to solve the equations.
+    accuracy to 0.01 in v_ms is good enough 
+    
+        this routine is adpated from the paper by l. bennet et.al.,
+        "a model of the earth's distant bow shock."  this paper was
+        to be published in the journal of geophysical research, 1997.
+        this source code is from their web site at:
+        http://www.igpp.ucla.edu/galileo/newmodel.htm
+    """
+    dpr  = 6.2832/360.0
+    btot = math.sqrt(bx * bx + by * by + bz * bz)
+    vx   = 1
+    va1  = va / 1.0e5
+    vs1  = vs / 1.0e5
+    v01  = v0 / 1.0e5
+
+    func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
+
+    step1 = 2.0
+    step2 = 0.1
+    step3 = 0.01
+
+    if func > 0:
+        while func > 0:
+            vx += step1
+            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
+            if func <= 0:
+                break
+
+        while func < 0:
+            vx -= step2
+            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
+            if func >= 0:
+                break
+
+        while func > 0:
+            vx += step3
+            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
+            if func <= 0:
+                break
+
+    elif func < 0:
+        while func < 0:
+            vx += step1
+            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
+            if func >= 0:
+                break
+
+        while func > 0:
+            vx -= step2
+            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
+            if func <= 0:
+                break
+
+        while func < 0:
+            vx += step3
+            func = fast_func(bx, by, bz, alp, btot, vx, va1, vs1, v01)
+            if func >= 0:
+                break
+
+    vy    = math.sin(alp) * math.sqrt(v01 * vx - vx**2)
+    vz    = math.cos(alp) * math.sqrt(v01 * vx - vx**2)
+
+    angle = math.acos((bx * vx + by * vy + bz * vz)\
+                      /(math.sqrt(bx * bx + by * by + bz * bz) \
+                      * math.sqrt(vx * vx + vy * vy + vz * vz)))
+
+    vms   = 1.0e5 * math.sqrt(vx * vx + vy * vy + vz * vz)
+
+    return vms
+
+#----------------------------------------------------------------------------
+#----------------------------------------------------------------------------
+#----------------------------------------------------------------------------
+
+def fast_func( bx,  by,  bz,  alp, btot,  vx,  va1,  vs1,  v01):
+
+    out  = va1**2 + vs1**2 - 2.0 * v01 * vx + math.sqrt((va1**2 + vs1**2)**2         \
+           - 4.0 *va1**2 * vs1**2 * (vx * bx + by * math.sin(alp) * math.sqrt(v01*vx \
+           - vx**2) + bz * math.cos(alp) * math.sqrt(v01*vx                          \
+           - vx**2))**2 / (btot**2 *v01 * vx))
+
+    return out
@@ -0,0 +1,580 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       fetch_cache.py: download web data through a shared on-disk cache            #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the scripts often download the same feed (noaa/swpc json/text files, tle) in the
+#   same minute. the downloaded data are kept in a cache directory keyed by the url:
+#       - if the cached copy is younger than max_age (sec), it is used as it is
+#       - otherwise the server is asked with If-None-Match (etag) and
+#         If-Modified-Since (last-modified); "304 not modified" reuses the copy
+#       - connections are kept open and reused for the same host in the process
+#
+#   a local directory can be used instead of the web (for tests): the file of the
+#   same name as the last part of the url is read from the directory. set it with
+#   the environment variable SW_FETCH_LOCAL_DIR or with set_local_dir().
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import fetch_cache as fc
+#       text = fc.fetch_text(<url>)
+#       data = fc.fetch_json(<url>, max_age=60)
+#       with fc.fetch_stream(<url>) as f:      --- read the cached file block by block
+#
+
+import os
+import time
+import json
+import gzip
+import zlib
+import shutil
+import tempfile
+import hashlib
+import http.client
+import urllib.parse
+import urllib.request
+from email.utils import formatdate
+
+#
+#--- cache directory (SW_FETCH_CACHE_DIR overrides it) and default max age in sec
+#
+CACHE_DIR       = '/data/mta4/Space_Weather/Common/Cache/'
+DEFAULT_MAX_AGE = 60.0
+TIMEOUT         = 60.0
+MAX_REDIRECT    = 5
+BLOCK           = 1 << 16
+
+#---------------------------------------------------------------------------------------
+#-- DiskCache: cache of the downloaded data in a directory                            --
+#---------------------------------------------------------------------------------------
+
+class DiskCache():
+    """
+    cache of the downloaded data in a directory. the data of a url are kept in
+    <sha1 of url> and its etag, last-modified and the download time in <sha1 of url>.meta
+
+        cache_dir   --- the cache directory; it is created if it does not exist
+    """
+    def __init__(self, cache_dir):
+
+        self.cache_dir = cache_dir
+
+    def path(self, url):
+        """
+        give the file name of the url in the cache
+        input:  url     --- url
+        output: file name (without .meta)
+        """
+        key = hashlib.sha1(url.encode()).hexdigest()
+
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, url):
+        """
+        give the cached data of the url
+        input:  url     --- url
+        output: [body, meta] or None if not in the cache. meta is a dictionary
+                with 'url', 'etag', 'last_modified' and 'fetched' (time.time())
+        """
+        dfile = self.path(url)
+        try:
+            with open(dfile + '.meta', 'r') as f:
+                meta = json.load(f)
+            with open(dfile, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        return [body, meta]
+
+    def get_meta(self, url):
+        """
+        give the meta data of the cached data of the url
+        input:  url     --- url
+        output: meta (see get) or None if the data are not in the cache
+        """
+        dfile = self.path(url)
+        if not os.path.isfile(dfile):
+            return None
+        try:
+            with open(dfile + '.meta', 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, body, meta):
+        """
+        keep the data of the url in the cache; a cache which cannot be written is ignored
+        input:  url     --- url
+                body    --- downloaded data (bytes)
+                meta    --- dictionary of 'etag', 'last_modified' and 'fetched'
+        """
+        meta  = dict(meta)
+        meta['url'] = url
+        dfile = self.path(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if body is not None:
+                write_atomic(dfile, body)
+            write_atomic(dfile + '.meta', json.dumps(meta).encode())
+        except OSError:
+            pass
+
+#---------------------------------------------------------------------------------------
+#-- HttpBackend: download data from the web, reusing the connections                  --
+#---------------------------------------------------------------------------------------
+
+class HttpBackend():
+    """
+    download data from the web with http.client. a connection to a host is kept
+    open and reused for the next request to the same host. other than http/https
+    (e.g. ftp) is read with urllib.request.
+
+        timeout     --- connection timeout in seconds
+    """
+    def __init__(self, timeout=TIMEOUT):
+
+        self.timeout = timeout
+        self.conns   = {}
+
+    def connection(self, scheme, host):
+        """
+        give the (possibly open) connection to the host
+        input:  scheme  --- 'http' or 'https'
+                host    --- host[:port]
+        output: http.client connection
+        """
+        key = (scheme, host)
+        if key not in self.conns:
+            if scheme == 'https':
+                self.conns[key] = http.client.HTTPSConnection(host, timeout=self.timeout)
+            else:
+                self.conns[key] = http.client.HTTPConnection(host, timeout=self.timeout)
+
+        return self.conns[key]
+
+    def drop(self, scheme, host):
+        """
+        close and forget the connection to the host
+        """
+        conn = self.conns.pop((scheme, host), None)
+        if conn is not None:
+            conn.close()
+
+    def request(self, url, headers, sink=None):
+        """
+        send a GET request (following redirects)
+        input:  url     --- url
+                headers --- dictionary of request headers
+                sink    --- if given, a binary file object to which the body of a
+                            200 response is written block by block (body is None)
+        output: [status, body, response headers (dictionary with lower case keys)]
+        """
+        for k in range(0, MAX_REDIRECT + 1):
+            [status, body, rhead] = self.send(url, headers, sink)
+
+            if status in [301, 302, 303, 307, 308] and 'location' in rhead:
+                url = urllib.parse.urljoin(url, rhead['location'])
+                continue
+
+            return [status, body, rhead]
+
+        raise IOError('Too many redirects: ' + url)
+
+    def send(self, url, headers, sink=None):
+        """
+        send one GET request; a broken kept-open connection is opened again once
+        input:  url     --- url
+                headers --- dictionary of request headers
+                sink    --- if given, a binary file object for the body of a 200 response
+        output: [status, body, response headers (dictionary with lower case keys)]
+        """
+        part = urllib.parse.urlsplit(url)
+#
+#--- ftp and others: no conditional request and no kept-open connection
+#
+        if part.scheme not in ['http', 'https']:
+            with urllib.request.urlopen(url, timeout=self.timeout) as f:
+                if sink is not None:
+                    shutil.copyfileobj(f, sink, BLOCK)
+                    return [200, None, {}]
+                return [200, f.read(), {}]
+
+        path = part.path or '/'
+        if part.query:
+            path = path + '?' + part.query
+
+        headers = dict(headers)
+        headers['Accept-Encoding'] = 'gzip'
+
+        for chk in range(0, 2):
+            conn = self.connection(part.scheme, part.netloc)
+            try:
+                conn.request('GET', path, headers=headers)
+                resp  = conn.getresponse()
+                rhead = dict([(key.lower(), val) for (key, val) in resp.getheaders()])
+                gzchk = (rhead.get('content-encoding', '') == 'gzip')
+                if sink is not None and resp.status == 200:
+                    copy_body(resp, sink, gzchk)
+                    body = None
+                else:
+                    body = resp.read()
+                    if gzchk:
+                        body = gzip.decompress(body)
+                break
+            except (http.client.HTTPException, OSError):
+                self.drop(part.scheme, part.netloc)
+                if chk > 0:
+                    raise
+
+        if resp.will_close:
+            self.drop(part.scheme, part.netloc)
+
+        return [resp.status, body, rhead]
+
+#---------------------------------------------------------------------------------------
+#-- LocalDirBackend: read the data from a local directory instead of the web          --
+#---------------------------------------------------------------------------------------
+
+class LocalDirBackend():
+    """
+    read the data from a local directory instead of the web (for tests). the file
+    of the same name as the last part of the url path is read; 404 if it is not there.
+
+        local_dir   --- the directory which holds the saved files
+    """
+    def __init__(self, local_dir):
+
+        self.local_dir = local_dir
+
+    def request(self, url, headers, sink=None):
+        """
+        read the file for the url
+        input:  url     --- url
+                headers --- dictionary of request headers (If-Modified-Since is used)
+                sink    --- if given, a binary file object to which the file is copied
+        output: [status, body, response headers]
+        """
+        name  = os.path.basename(urllib.parse.urlsplit(url).path)
+        lfile = os.path.join(self.local_dir, name)
+        if not os.path.isfile(lfile):
+            return [404, b'', {}]
+
+        mtime = formatdate(os.path.getmtime(lfile), usegmt=True)
+        if headers.get('If-Modified-Since') == mtime:
+            return [304, b'', {'last-modified': mtime}]
+
+        with open(lfile, 'rb') as f:
+            if sink is not None:
+                shutil.copyfileobj(f, sink, BLOCK)
+                return [200, None, {'last-modified': mtime}]
+            body = f.read()
+
+        return [200, body, {'last-modified': mtime}]
+
+#---------------------------------------------------------------------------------------
+#-- Fetcher: download data through the cache                                          --
+#---------------------------------------------------------------------------------------
+
+class Fetcher():
+    """
+    download data through the cache
+
+        cache       --- DiskCache (or None: no cache)
+        backend     --- HttpBackend or LocalDirBackend
+        max_age     --- the cached copy younger than this (sec) is used without asking
+    """
+    def __init__(self, cache, backend, max_age=DEFAULT_MAX_AGE):
+
+        self.cache   = cache
+        self.backend = backend
+        self.max_age = max_age
+
+    def fetch(self, url, max_age=None):
+        """
+        give the data of the url
+        input:  url     --- url
+                max_age --- if given, use this instead of the default max age;
+                            0 always asks the server (still with etag/last-modified)
+        output: body    --- the data (bytes)
+        """
+        if max_age is None:
+            max_age = self.max_age
+
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.get(url)
+#
+#--- the cached copy is fresh enough
+#
+        now     = time.time()
+        headers = {}
+        if entry is not None:
+            [body, meta] = entry
+            if now - meta.get('fetched', 0) < max_age:
+                return body
+#
+#--- ask the server whether the data changed
+#
+            if meta.get('etag'):
+                headers['If-None-Match']     = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        [status, body, rhead] = self.backend.request(url, headers)
+
+        if status == 304 and entry is not None:
+            meta = entry[1]
+            meta['fetched'] = now
+            if self.cache is not None:
+                self.cache.put(url, None, meta)
+            return entry[0]
+
+        if status != 200:
+            raise IOError('HTTP ' + str(status) + ': ' + url)
+
+        if self.cache is not None:
+            meta = {'etag': rhead.get('etag'), 'last_modified': rhead.get('last-modified'),\
+                    'fetched': now}
+            self.cache.put(url, body, meta)
+
+        return body
+
+    def open(self, url, max_age=None):
+        """
+        give the data of the url as a binary file object without holding the data
+        in memory: the body is written to the cache file block by block and the
+        cache file is opened (a temporary file is used if there is no cache or
+        it cannot be written)
+        input:  url     --- url
+                max_age --- see fetch
+        output: binary file object
+        """
+        if max_age is None:
+            max_age = self.max_age
+
+        meta = None
+        if self.cache is not None:
+            meta = self.cache.get_meta(url)
+#
+#--- the cached copy is fresh enough
+#
+        now     = time.time()
+        headers = {}
+        if meta is not None:
+            if now - meta.get('fetched', 0) < max_age:
+                return open(self.cache.path(url), 'rb')
+
+            if meta.get('etag'):
+                headers['If-None-Match']     = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+#
+#--- no cache: download into a temporary file
+#
+        tfile = None
+        if self.cache is not None:
+            dfile = self.cache.path(url)
+            tfile = dfile + '.' + str(os.getpid()) + '.tmp'
+            try:
+                os.makedirs(self.cache.cache_dir, exist_ok=True)
+                sink = open(tfile, 'wb')
+            except OSError:
+                tfile = None
+
+        if tfile is None:
+            sink = tempfile.TemporaryFile()
+            [status, body, rhead] = self.backend.request(url, {}, sink)
+            if status != 200:
+                sink.close()
+                raise IOError('HTTP ' + str(status) + ': ' + url)
+            sink.seek(0)
+            return sink
+
+        try:
+            with sink:
+                [status, body, rhead] = self.backend.request(url, headers, sink)
+            if status == 200:
+                os.replace(tfile, dfile)
+        finally:
+            if os.path.exists(tfile):
+                os.remove(tfile)
+
+        if status == 304 and meta is not None:
+            meta['fetched'] = now
+            self.cache.put(url, None, meta)
+            return open(dfile, 'rb')
+
+        if status != 200:
+            raise IOError('HTTP ' + str(status) + ': ' + url)
+
+        meta = {'etag': rhead.get('etag'), 'last_modified': rhead.get('last-modified'),\
+                'fetched': now}
+        self.cache.put(url, None, meta)
+
+        return open(dfile, 'rb')
+
+#
+#--- the fetcher shared by the scripts in the same process
+#
+FETCHER = None
+
+#---------------------------------------------------------------------------------------
+#-- get_fetcher: give the shared fetcher                                              --
+#---------------------------------------------------------------------------------------
+
+def get_fetcher():
+    """
+    give the shared fetcher; it reads from SW_FETCH_LOCAL_DIR if the environment
+    variable is set, otherwise from the web
+    input:  none
+    output: Fetcher
+    """
+    global FETCHER
+
+    if FETCHER is None:
+        cache_dir = os.getenv('SW_FETCH_CACHE_DIR', CACHE_DIR)
+        local_dir = os.getenv('SW_FETCH_LOCAL_DIR')
+        if local_dir:
+            backend = LocalDirBackend(local_dir)
+        else:
+            backend = HttpBackend()
+
+        FETCHER = Fetcher(DiskCache(cache_dir), backend)
+
+    return FETCHER
+
+#---------------------------------------------------------------------------------------
+#-- set_local_dir: read the data from a local directory instead of the web            --
+#---------------------------------------------------------------------------------------
+
+def set_local_dir(local_dir, cache_dir=None):
+    """
+    read the data from a local directory instead of the web (for tests)
+    input:  local_dir   --- the directory which holds the saved files
+            cache_dir   --- the cache directory; if None, no cache is used
+    output: none (the shared fetcher is replaced)
+    """
+    global FETCHER
+
+    cache   = None
+    if cache_dir is not None:
+        cache = DiskCache(cache_dir)
+
+    FETCHER = Fetcher(cache, LocalDirBackend(local_dir))
+
+#---------------------------------------------------------------------------------------
+#-- fetch: give the data of the url                                                   --
+#---------------------------------------------------------------------------------------
+
+def fetch(url, max_age=None):
+    """
+    give the data of the url through the shared cache
+    input:  url     --- url
+            max_age --- max age of the cached copy in seconds (default: DEFAULT_MAX_AGE)
+    output: body    --- the data (bytes)
+    """
+    return get_fetcher().fetch(url, max_age)
+
+#---------------------------------------------------------------------------------------
+#-- fetch_text: give the data of the url as a string                                  --
+#---------------------------------------------------------------------------------------
+
+def fetch_text(url, max_age=None):
+    """
+    give the data of the url as a string
+    input:  url     --- url
+            max_age --- max age of the cached copy in seconds
+    output: text    --- the data (string)
+    """
+    return fetch(url, max_age).decode(errors='replace')
+
+#---------------------------------------------------------------------------------------
+#-- fetch_lines: give the data of the url as a list of lines                          --
+#---------------------------------------------------------------------------------------
+
+def fetch_lines(url, max_age=None):
+    """
+    give the data of the url as a list of stripped lines
+    input:  url     --- url
+            max_age --- max age of the cached copy in seconds
+    output: data    --- a list of lines
+    """
+    return [line.strip() for line in fetch_text(url, max_age).splitlines()]
+
+#---------------------------------------------------------------------------------------
+#-- fetch_json: give the json data of the url                                         --
+#---------------------------------------------------------------------------------------
+
+def fetch_json(url, max_age=None):
+    """
+    give the json data of the url
+    input:  url     --- url
+            max_age --- max age of the cached copy in seconds
+    output: data    --- the decoded json data
+    """
+    return json.loads(fetch(url, max_age))
+
+#---------------------------------------------------------------------------------------
+#-- fetch_stream: give the data of the url as a binary file object                    --
+#---------------------------------------------------------------------------------------
+
+def fetch_stream(url, max_age=None):
+    """
+    give the data of the url as a binary file object; the data are read from the
+    cache file (written block by block) instead of being held in memory
+    input:  url     --- url
+            max_age --- max age of the cached copy in seconds
+    output: binary file object (close it after use)
+    """
+    return get_fetcher().open(url, max_age)
+
+#---------------------------------------------------------------------------------------
+#-- copy_body: write the body of a http response to a file block by block            --
+#---------------------------------------------------------------------------------------
+
+def copy_body(resp, sink, gzchk=False):
+    """
+    write the body of a http response to a file block by block
+    input:  resp    --- http.client response
+            sink    --- binary file object; it is emptied first (for a retried request)
+            gzchk   --- if True, the body is gzip compressed and is decompressed
+    output: none
+    """
+    sink.seek(0)
+    sink.truncate()
+
+    dobj = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzchk else None
+    while True:
+        block = resp.read(BLOCK)
+        if not block:
+            break
+        if dobj is not None:
+            block = dobj.decompress(block)
+        sink.write(block)
+
+    if dobj is not None:
+        sink.write(dobj.flush())
+
+#---------------------------------------------------------------------------------------
+#-- write_atomic: write a file through a temporary file                               --
+#---------------------------------------------------------------------------------------
+
+def write_atomic(ofile, body):
+    """
+    write a file through a temporary file so that a reader never sees a partial file
+    input:  ofile   --- output file name
+            body    --- data (bytes)
+    output: ofile
+    """
+    tfile = ofile + '.' + str(os.getpid()) + '.tmp'
+    with open(tfile, 'wb') as fo:
+        fo.write(body)
+    os.replace(tfile, ofile)
@@ -0,0 +1,177 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       interval_set.py: sorted and merged time intervals                           #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   a set of half open time intervals [start, stop) is kept as two sorted arrays of
+#   the merged (non overlapping) intervals. a time list is checked against the whole
+#   set with one numpy.searchsorted, so that a mask or a factor list is created
+#   without looping over the intervals.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import interval_set as ivs
+#       hrc  = ivs.IntervalSet(<start list>, <stop list>)
+#       mask = hrc.contains(<time list>)
+#       fact = ivs.paint(<time list>, [[hrc, 0.0], [<interval set>, 0.5]])
+#       used = hrc.total(start, stop)
+#       runs = ivs.runs(<time list>, <label list>)      --- {<label>: IntervalSet}
+#
+
+import numpy
+
+#---------------------------------------------------------------------------------------
+#-- IntervalSet: sorted and merged time intervals                                     --
+#---------------------------------------------------------------------------------------
+
+class IntervalSet():
+    """
+    a set of half open time intervals [start, stop); the overlapping and touching
+    intervals are merged.
+
+        starts  --- an array of the interval starting times (sorted)
+        stops   --- an array of the interval stopping times
+    """
+    def __init__(self, starts=[], stops=[]):
+
+        starts = numpy.asarray(starts, dtype=float).ravel()
+        stops  = numpy.asarray(stops,  dtype=float).ravel()
+        if len(starts) != len(stops):
+            raise ValueError('The numbers of the starting and stopping times do not match')
+#
+#--- drop reversed intervals and sort the rest by the starting time
+#
+        keep   = stops >= starts
+        starts = starts[keep]
+        stops  = stops[keep]
+        order  = numpy.argsort(starts, kind='stable')
+        starts = starts[order]
+        stops  = stops[order]
+#
+#--- a new interval begins where the start is after all the stops before it
+#
+        if len(starts) > 0:
+            reach = numpy.maximum.accumulate(stops)
+            first = numpy.nonzero(numpy.r_[True, starts[1:] > reach[:-1]])[0]
+            last  = numpy.r_[first[1:] - 1, len(starts) - 1]
+            starts = starts[first]
+            stops  = reach[last]
+
+        self.starts = starts
+        self.stops  = stops
+
+    def __len__(self):
+
+        return len(self.starts)
+
+    def spans(self):
+        """
+        give the intervals
+        input:  none
+        output: a list of [start, stop]
+        """
+        return [[start, stop] for [start, stop] in zip(self.starts.tolist(), self.stops.tolist())]
+
+    def contains(self, times):
+        """
+        check which times are in the intervals
+        input:  times   --- a list/array of time
+        output: mask    --- a boolean array; True where start <= time < stop
+        """
+        times = numpy.asarray(times, dtype=float)
+        k     = numpy.searchsorted(self.starts, times, side='right') - 1
+        mask  = k >= 0
+        mask[mask] = times[mask] < self.stops[k[mask]]
+
+        return mask
+
+    def clip(self, start=None, stop=None):
+        """
+        give the parts of the intervals in the window
+        input:  start   --- starting time; if None, from the beginning
+                stop    --- stopping time; if None, to the end
+        output: IntervalSet
+        """
+        starts = self.starts if start is None else numpy.maximum(self.starts, start)
+        stops  = self.stops  if stop  is None else numpy.minimum(self.stops,  stop)
+        keep   = stops > starts
+
+        return IntervalSet(starts[keep], stops[keep])
+
+    def total(self, start=None, stop=None):
+        """
+        give the total length of the intervals in the window
+        input:  start   --- starting time; if None, from the beginning
+                stop    --- stopping time; if None, to the end
+        output: the total length
+        """
+        part = self.clip(start, stop)
+
+        return float(numpy.sum(part.stops - part.starts))
+
+    def union(self, other):
+        """
+        give the union of two interval sets
+        input:  other   --- IntervalSet
+        output: IntervalSet
+        """
+        return IntervalSet(numpy.r_[self.starts, other.starts], numpy.r_[self.stops, other.stops])
+
+#---------------------------------------------------------------------------------------
+#-- paint: create a value list of the times from interval sets                        --
+#---------------------------------------------------------------------------------------
+
+def paint(times, layers, fill=1.0):
+    """
+    create a value list of the times; the times in an interval set get its value.
+    when the interval sets overlap, the later one in the list wins
+    input:  times   --- a list/array of time
+            layers  --- a list of [IntervalSet, value]
+            fill    --- the value of the times not in any of the interval sets
+    output: values  --- an array of the values
+    """
+    times  = numpy.asarray(times, dtype=float)
+    values = numpy.full(len(times), fill, dtype=float)
+    for [iset, value] in layers:
+        values[iset.contains(times)] = value
+
+    return values
+
+#---------------------------------------------------------------------------------------
+#-- runs: find the periods of the same label in a time ordered label list             --
+#---------------------------------------------------------------------------------------
+
+def runs(times, labels, stop=None):
+    """
+    find the periods of the same label in a time ordered label list. a period starts
+    at the time the label changes to the value and stops at the time of the next change
+    input:  times   --- a list of time (sorted)
+            labels  --- a list of labels of the times
+            stop    --- the stopping time of the last period; if None (or before the
+                        last time), the last time
+    output: a dictionary of <label>: IntervalSet
+    """
+    times  = numpy.asarray(times, dtype=float)
+    labels = numpy.asarray(labels)
+    if len(times) == 0:
+        return {}
+#
+#--- the indices where a new period starts; each period stops at the start of the next one
+#
+    first = numpy.nonzero(numpy.r_[True, labels[1:] != labels[:-1]])[0]
+    tend  = times[-1] if stop is None else max(stop, times[-1])
+    ends  = numpy.r_[times[first[1:]], tend]
+
+    out = {}
+    for label in numpy.unique(labels[first]):
+        ind = labels[first] == label
+        out[label.item()] = IntervalSet(times[first][ind], ends[ind])
+
+    return out
@@ -0,0 +1,308 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       month_archive.py: monthly partitioned text archive                          #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   a long term text archive (one line per time, sorted in the increasing order) is
+#   also kept as one file per month: <part_dir>/<name>_<yyyy>_<mm>.txt. a window read
+#   opens only the months which overlap with the window. all months are kept: the
+#   entire period plots read the archives back to 1999.
+#
+#   the ingestion scripts keep writing the legacy archive (other scripts read it) and
+#   then call sync, which copies the lines newer than the last partitioned line into
+#   the monthly files (the first call splits the whole legacy archive).
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import month_archive as mar
+#       mar.sync(<archive>, <part_dir>, <name>, mar.calendar_line_time)
+#       lines = mar.read_window(<part_dir>, <name>, start, stop, mar.calendar_line_time)
+#
+#   to split an archive by hand:
+#       month_archive.py -i <archive> -d <part_dir> -n <name> -f calendar
+#
+
+import os
+import sys
+import re
+import argparse
+import numpy
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_convert as tcv
+import offset_index as oix
+
+#
+#--- the monthly file name: <name>_<yyyy>_<mm>.txt
+#
+PART_FMT = re.compile(r'^(.+)_(\d{4})_(\d{2})\.txt$')
+
+#---------------------------------------------------------------------------------------
+#-- read_window: read the lines of the monthly archive in a time window               --
+#---------------------------------------------------------------------------------------
+
+def read_window(part_dir, name, start, stop, time_of, legacy=None):
+    """
+    read the lines of the monthly archive in start <= time <= stop; only the monthly
+    files overlapping with the window are opened
+    input:  part_dir    --- the directory of the monthly files
+            name        --- the archive name
+            start       --- starting time in seconds from 1998.1.1; if None, from the beginning
+            stop        --- stopping time in seconds from 1998.1.1; if None, to the end
+            time_of     --- a function which gives the time of a line (or None)
+            legacy      --- the legacy archive; if given, the monthly files are synced
+                            with it first. if they cannot be written, the legacy archive
+                            is read (through the byte offset index)
+    output: lines       --- a list of lines (stripped) in the window
+    """
+    if legacy is not None:
+        try:
+            sync(legacy, part_dir, name, time_of)
+        except OSError:
+            return oix.read_window(legacy, start, stop, time_of)
+
+    lines = []
+    for [year, mon, ifile] in partitions(part_dir, name):
+        if start is not None and month_start(year, mon + 1) <= start:
+            continue
+        if stop is not None and month_start(year, mon) > stop:
+            break
+
+        with open(ifile) as f:
+            for line in f:
+                line  = line.strip()
+                atime = time_of(line)
+                if atime is None:
+                    continue
+                if start is not None and atime < start:
+                    continue
+                if stop is not None and atime > stop:
+                    break
+
+                lines.append(line)
+
+    return lines
+
+#---------------------------------------------------------------------------------------
+#-- append: add lines to the monthly files                                            --
+#---------------------------------------------------------------------------------------
+
+def append(part_dir, name, lines, time_of):
+    """
+    add lines to the monthly files. the lines not newer than the last line of the
+    archive (and the lines out of the time order) are skipped
+    input:  part_dir    --- the directory of the monthly files
+            name        --- the archive name
+            lines       --- a list of data lines
+            time_of     --- a function which gives the time of a line (or None)
+    output: the number of the lines added
+    """
+    last  = last_time(part_dir, name, time_of)
+    keep  = []
+    times = []
+    for line in lines:
+        line  = line.strip()
+        atime = time_of(line)
+        if atime is None:
+            continue
+        if last is not None and atime <= last:
+            continue
+
+        keep.append(line)
+        times.append(atime)
+        last = atime
+
+    if len(keep) == 0:
+        return 0
+#
+#--- the month of each line; the lines of the same month are written at once
+#
+    [year, mon] = tcv.secs_to_calendar(numpy.array(times))[:2]
+    cut = numpy.nonzero((year[1:] != year[:-1]) | (mon[1:] != mon[:-1]))[0] + 1
+    cut = [0] + cut.tolist() + [len(keep)]
+
+    os.makedirs(part_dir, exist_ok=True)
+    for k in range(0, len(cut) - 1):
+        [i0, i1] = [cut[k], cut[k+1]]
+        ofile    = partition_file(part_dir, name, year[i0], mon[i0])
+        with open(ofile, 'a') as fo:
+            fo.write('\n'.join(keep[i0:i1]) + '\n')
+
+    return len(keep)
+
+#---------------------------------------------------------------------------------------
+#-- sync: copy the new lines of the legacy archive into the monthly files             --
+#---------------------------------------------------------------------------------------
+
+def sync(ifile, part_dir, name, time_of):
+    """
+    copy the lines of the legacy archive newer than the last partitioned line into
+    the monthly files; if there is no monthly file yet, the whole archive is split
+    input:  ifile       --- the legacy archive (sorted by time)
+            part_dir    --- the directory of the monthly files
+            name        --- the archive name
+            time_of     --- a function which gives the time of a line (or None)
+    output: the number of the lines added
+    """
+    if not os.path.isfile(ifile):
+        return 0
+
+    last  = last_time(part_dir, name, time_of)
+    lines = oix.read_window(ifile, last, None, time_of)
+
+    return append(part_dir, name, lines, time_of)
+
+#---------------------------------------------------------------------------------------
+#-- last_time: give the time of the last line of the monthly archive                  --
+#---------------------------------------------------------------------------------------
+
+def last_time(part_dir, name, time_of):
+    """
+    give the time of the last line of the monthly archive
+    input:  part_dir    --- the directory of the monthly files
+            name        --- the archive name
+            time_of     --- a function which gives the time of a line (or None)
+    output: time in seconds from 1998.1.1 or None if the archive is empty
+    """
+    for [year, mon, ifile] in reversed(partitions(part_dir, name)):
+        with open(ifile) as f:
+            data = [line.strip() for line in f.readlines()]
+
+        for line in reversed(data):
+            atime = time_of(line)
+            if atime is not None:
+                return atime
+
+    return None
+
+#---------------------------------------------------------------------------------------
+#-- partitions: list the monthly files of the archive                                 --
+#---------------------------------------------------------------------------------------
+
+def partitions(part_dir, name):
+    """
+    list the monthly files of the archive
+    input:  part_dir    --- the directory of the monthly files
+            name        --- the archive name
+    output: a list of [year, mon, <file path>] sorted by time
+    """
+    if not os.path.isdir(part_dir):
+        return []
+
+    out = []
+    for ent in os.listdir(part_dir):
+        mchk = PART_FMT.match(ent)
+        if mchk is None or mchk.group(1) != name:
+            continue
+
+        out.append([int(mchk.group(2)), int(mchk.group(3)), os.path.join(part_dir, ent)])
+
+    out.sort()
+
+    return out
+
+#---------------------------------------------------------------------------------------
+#-- partition_file: give the monthly file name                                        --
+#---------------------------------------------------------------------------------------
+
+def partition_file(part_dir, name, year, mon):
+    """
+    give the monthly file name
+    input:  part_dir    --- the directory of the monthly files
+            name        --- the archive name
+            year        --- year
+            mon         --- month
+    output: <part_dir>/<name>_<yyyy>_<mm>.txt
+    """
+    return os.path.join(part_dir, '%s_%04d_%02d.txt' % (name, int(year), int(mon)))
+
+#---------------------------------------------------------------------------------------
+#-- month_start: give the starting time of the month                                  --
+#---------------------------------------------------------------------------------------
+
+def month_start(year, mon):
+    """
+    give the starting time of the month
+    input:  year    --- year
+            mon     --- month; 13 is january of the next year
+    output: time in seconds from 1998.1.1
+    """
+    if mon > 12:
+        [year, mon] = [year + 1, mon - 12]
+
+    return float(tcv.calendar_to_secs(year, mon, 1))
+
+#---------------------------------------------------------------------------------------
+#-- calendar_line_time: give the time of a line starting with <yyyy> <mm> <dd> <hhmm> --
+#---------------------------------------------------------------------------------------
+
+def calendar_line_time(line):
+    """
+    give the time of a data line starting with <yyyy> <mm> <dd> <hhmm>
+    (e.g. ace_data.txt, goes_data.txt)
+    input:  line    --- data line
+    output: time in seconds from 1998.1.1; None if it is not a data line
+    """
+    atemp = line.split()
+    try:
+        [hh, mm] = [int(atemp[3][0:2]), int(atemp[3][2:4])]
+        return float(tcv.calendar_to_secs(int(atemp[0]), int(atemp[1]), int(atemp[2]), hh, mm))
+    except (IndexError, ValueError):
+        return None
+
+#---------------------------------------------------------------------------------------
+#-- date_line_time: give the time of a line starting with <yyyy>:<ddd>:<hh>:<mm>:<ss> --
+#---------------------------------------------------------------------------------------
+
+def date_line_time(line):
+    """
+    give the time of a data line starting with <yyyy>:<ddd>:<hh>:<mm>:<ss> (e.g. goes_data_r.txt)
+    input:  line    --- data line
+    output: time in seconds from 1998.1.1; None if it is not a data line
+    """
+    atemp = line.split()
+    if len(atemp) == 0 or tcv.parse_date(atemp[0]) is None:
+        return None
+
+    return float(tcv.date_to_secs(atemp[0]))
+
+#---------------------------------------------------------------------------------------
+#-- secs_line_time: give the time of a line starting with seconds from 1998.1.1       --
+#---------------------------------------------------------------------------------------
+
+def secs_line_time(line):
+    """
+    give the time of a data line starting with seconds from 1998.1.1 (e.g. xmm.archive)
+    input:  line    --- data line
+    output: time in seconds from 1998.1.1; None if it is not a data line
+    """
+    atemp = line.split()
+    try:
+        return float(atemp[0])
+    except (IndexError, ValueError):
+        return None
+
+#
+#--- the line formats for the command line use
+#
+LINE_TIME = {'calendar': calendar_line_time, 'date': date_line_time, 'secs': secs_line_time}
+
+#---------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--input", required = True, help = "legacy archive")
+    parser.add_argument("-d", "--dir",   required = True, help = "directory of the monthly files")
+    parser.add_argument("-n", "--name",  required = True, help = "archive name")
+    parser.add_argument("-f", "--format", choices = list(LINE_TIME.keys()), required = True,\
+                        help = "time format of the lines")
+    args = parser.parse_args()
+
+    nadd = sync(args.input, args.dir, args.name, LINE_TIME[args.format])
+    print(str(nadd) + ' lines added')
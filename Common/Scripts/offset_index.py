@@ -0,0 +1,192 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       offset_index.py: time ---> byte offset index of a text archive              #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   a text archive which has one line per time (sorted in the increasing order) is
+#   read only in the requested time window: the time and the byte offset of every
+#   <step>-th data line are kept in a sidecar file (<archive>.offsets) and the
+#   reader seeks to the offset just before the window. when lines are appended to
+#   the archive, only the new part is indexed; if the archive was rewritten (the
+#   indexed part changed), the index is rebuilt.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import offset_index as oix
+#       lines = oix.read_window(<archive>, start, stop, <function: line ---> time or None>)
+#
+
+import os
+import sys
+import json
+import bisect
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import fetch_cache  as fc
+
+#
+#--- the number of data lines between the index points
+#
+STEP       = 256
+#
+#--- the tail of the sidecar index file name
+#
+INDEX_TAIL = '.offsets'
+
+#---------------------------------------------------------------------------------------
+#-- read_window: read the lines of a text archive in a time window                    --
+#---------------------------------------------------------------------------------------
+
+def read_window(ifile, start, stop, time_of, step=STEP, index_file=None):
+    """
+    read the lines of a text archive in start <= time <= stop
+    input:  ifile       --- text archive; the lines are sorted by time
+            start       --- starting time; if None, from the beginning
+            stop        --- stopping time; if None, to the end
+            time_of     --- a function which gives the time of a line (str);
+                            None for a header or a line which cannot be read
+            step        --- the number of data lines between the index points
+            index_file  --- sidecar index file; default: <ifile>.offsets
+    output: lines       --- a list of lines (stripped) in the window
+    """
+    if not os.path.isfile(ifile):
+        return []
+
+    index  = update_index(ifile, time_of, step, index_file)
+#
+#--- seek to the last index point before the window
+#
+    offset = 0
+    if start is not None:
+        k = bisect.bisect_left(index['times'], start) - 1
+        if k >= 0:
+            offset = index['offsets'][k]
+
+    lines = []
+    with open(ifile, 'rb') as f:
+        f.seek(offset)
+        for bline in f:
+            line  = bline.decode('utf-8', errors='replace').strip()
+            atime = time_of(line)
+            if atime is None:
+                continue
+            if start is not None and atime < start:
+                continue
+            if stop is not None and atime > stop:
+                break
+
+            lines.append(line)
+
+    return lines
+
+#---------------------------------------------------------------------------------------
+#-- update_index: read/update the time ---> byte offset index of a text archive       --
+#---------------------------------------------------------------------------------------
+
+def update_index(ifile, time_of, step=STEP, index_file=None):
+    """
+    read the index of a text archive and add the lines appended since the last update
+    input:  ifile       --- text archive
+            time_of     --- a function which gives the time of a line (or None)
+            step        --- the number of data lines between the index points
+            index_file  --- sidecar index file; default: <ifile>.offsets
+    output: index       --- a dictionary of:
+                            times, offsets  --- lists of time and byte offset of the index points
+                            size            --- the size of the indexed part
+                            count           --- data lines after the last index point
+                            check           --- [offset, line] of the last indexed line
+    """
+    if index_file is None:
+        index_file = ifile + INDEX_TAIL
+
+    index = read_index(index_file)
+    if index is None or index.get('step') != step or not is_same_part(ifile, index):
+        index = {'step': step, 'times': [], 'offsets': [], 'size': 0, 'count': step, 'check': None}
+
+    size = os.path.getsize(ifile)
+    if size == index['size']:
+        return index
+#
+#--- index the appended part; a partly written last line is left for the next time
+#
+    with open(ifile, 'rb') as f:
+        f.seek(index['size'])
+        offset = index['size']
+        for bline in f:
+            if not bline.endswith(b'\n'):
+                break
+
+            line  = bline.decode('utf-8', errors='replace').strip()
+            atime = time_of(line) if index['count'] >= step else None
+
+            if atime is not None:
+                index['times'].append(atime)
+                index['offsets'].append(offset)
+                index['count'] = 0
+
+            elif index['count'] < step and len(line) > 0:
+                index['count'] += 1
+
+            index['check'] = [offset, line]
+            offset        += len(bline)
+
+    index['size'] = offset
+#
+#--- the index is only a speed up; keep going if it cannot be saved
+#
+    try:
+        fc.write_atomic(index_file, json.dumps(index).encode('utf-8'))
+    except OSError:
+        pass
+
+    return index
+
+#---------------------------------------------------------------------------------------
+#-- read_index: read the sidecar index file                                           --
+#---------------------------------------------------------------------------------------
+
+def read_index(index_file):
+    """
+    read the sidecar index file
+    input:  index_file  --- sidecar index file
+    output: index (a dictionary) or None if it cannot be read
+    """
+    try:
+        with open(index_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+#---------------------------------------------------------------------------------------
+#-- is_same_part: check whether the indexed part of the archive is unchanged          --
+#---------------------------------------------------------------------------------------
+
+def is_same_part(ifile, index):
+    """
+    check whether the indexed part of the archive is unchanged (only appended)
+    input:  ifile   --- text archive
+            index   --- index dictionary
+    output: True/False
+    """
+    try:
+        if os.path.getsize(ifile) < index['size']:
+            return False
+
+        if index['check'] is None:
+            return index['size'] == 0
+
+        [offset, line] = index['check']
+        with open(ifile, 'rb') as f:
+            f.seek(offset)
+            bline = f.readline()
+
+        return (offset + len(bline) == index['size']) and\
+               (bline.decode('utf-8', errors='replace').strip() == line)
+    except (OSError, KeyError, TypeError, ValueError):
+        return False
@@ -0,0 +1,336 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       orbit_events.py: orbit event index (perigee, apogee, altitude crossings)    #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the orbit events are found from an ephemeris file (e.g. PE.EPH.gsme_spherical:
+#   <time> <altitude in kkm> ...) once and saved next to it (<ephem file>.events.json).
+#   the saved index is used until the ephemeris file is updated (the file size or
+#   the modification time changes), and the events are found with a binary search.
+#
+#       perigee     --- the altitude minimum: alt[k-1] >= alt[k] <= alt[k+1]
+#       apogee      --- the altitude maximum: alt[k-1] <= alt[k] >= alt[k+1]
+#       up/down     --- the altitude crossings of a level; the time of the last sample
+#                       below (up) or at/above (down) the level before the crossing.
+#                       the spans above the level are [up, down] and the spans below
+#                       the level (e.g. the radiation zone) are [down, up]
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import orbit_events as oev
+#       events = oev.get_events(<ephem file>, levels=[70.0])
+#       pstart = events.last_perigee(<time>)
+#       [start, stop] = events.last_above(70.0, <time>)
+#
+
+import os
+import sys
+import json
+import numpy
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_index   as tix
+import fetch_cache  as fc
+
+#
+#--- altitude levels (kkm) of the crossings kept in the index by default
+#
+LEVELS     = [70.0]
+#
+#--- the tail of the saved index file name
+#
+INDEX_TAIL = '.events.json'
+
+#---------------------------------------------------------------------------------------
+#-- OrbitEvents: orbit event index                                                    --
+#---------------------------------------------------------------------------------------
+
+class OrbitEvents():
+    """
+    orbit event index; all times are in seconds from 1998.1.1 and sorted.
+
+        events  --- a dictionary from build_events (or the saved index)
+    """
+    def __init__(self, events):
+
+        self.events = events
+
+    def level_key(self, level):
+        """
+        give the key of the crossing lists of the level
+        input:  level   --- altitude level
+        output: key (string)
+        """
+        key = '%.3f' % float(level)
+        if key not in self.events['up']:
+            raise ValueError('The level is not in the index: ' + str(level))
+
+        return key
+
+    def perigees(self, start=None, stop=None):
+        """
+        give the perigee times in start <= time < stop
+        input:  start   --- starting time; if None, from the beginning
+                stop    --- stopping time; if None, to the end
+        output: a list of perigee times
+        """
+        plist    = self.events['perigee']
+        [i0, i1] = tix.find_window(plist, start, stop)
+
+        return plist[i0:i1]
+
+    def perigee_brackets(self, start=None, stop=None):
+        """
+        give the perigees with the time of the sample just before them
+        input:  start   --- starting time; if None, from the beginning
+                stop    --- stopping time; if None, to the end
+        output: a list of [<time of the previous sample>, <perigee time>]
+        """
+        plist    = self.events['perigee']
+        [i0, i1] = tix.find_window(plist, start, stop)
+
+        return [list(ent) for ent in zip(self.events['perigee_prev'][i0:i1], plist[i0:i1])]
+
+    def last_perigee(self, atime):
+        """
+        give the last perigee at/before the time (the start of the orbit)
+        input:  atime   --- time
+        output: the perigee time or None
+        """
+        return give_previous(self.events['perigee'], atime)
+
+    def next_perigee(self, atime):
+        """
+        give the first perigee after the time
+        input:  atime   --- time
+        output: the perigee time or None
+        """
+        return give_next(self.events['perigee'], atime)
+
+    def last_apogee(self, atime):
+        """
+        give the last apogee at/before the time
+        input:  atime   --- time
+        output: the apogee time or None
+        """
+        return give_previous(self.events['apogee'], atime)
+
+    def crossings(self, level):
+        """
+        give the crossing times of the level
+        input:  level   --- altitude level
+        output: [up, down]  --- lists of the times of going up and coming down
+        """
+        key = self.level_key(level)
+
+        return [self.events['up'][key], self.events['down'][key]]
+
+    def last_above(self, level, atime):
+        """
+        give the last (or current) span above the level before the time
+        input:  level   --- altitude level
+                atime   --- time
+        output: [start, stop]   --- start: the last sample below the level before the span
+                                    stop:  the last sample of the span (or the time if the
+                                           span continues); None if there is no such span
+        """
+        [up, down] = self.crossings(level)
+
+        return find_span(up, down, atime)
+
+    def last_zone(self, level, atime):
+        """
+        give the last (or current) span below the level (e.g. the radiation zone) before the time
+        input:  level   --- altitude level
+                atime   --- time
+        output: [entry, exit]   --- entry: the last sample above the level before the span
+                                    exit:  the last sample of the span (or the time if the
+                                           span continues); None if there is no such span
+        """
+        [up, down] = self.crossings(level)
+
+        return find_span(down, up, atime)
+
+#---------------------------------------------------------------------------------------
+#-- give_previous: give the last entry at/before the time                             --
+#---------------------------------------------------------------------------------------
+
+def give_previous(t_list, atime):
+    """
+    give the last entry at/before the time
+    input:  t_list  --- a sorted list of time
+            atime   --- time
+    output: the time or None
+    """
+    k = tix.find_previous(t_list, atime)
+    if k < 0:
+        return None
+
+    return t_list[k]
+
+#---------------------------------------------------------------------------------------
+#-- give_next: give the first entry after the time                                    --
+#---------------------------------------------------------------------------------------
+
+def give_next(t_list, atime):
+    """
+    give the first entry after the time
+    input:  t_list  --- a sorted list of time
+            atime   --- time
+    output: the time or None
+    """
+    k = tix.find_next(t_list, atime, inclusive=False)
+    if k >= len(t_list):
+        return None
+
+    return t_list[k]
+
+#---------------------------------------------------------------------------------------
+#-- find_span: find the last span which starts at/before the time                     --
+#---------------------------------------------------------------------------------------
+
+def find_span(s_list, e_list, atime):
+    """
+    find the last span which starts at/before the time
+    input:  s_list  --- a sorted list of span starting times
+            e_list  --- a sorted list of span ending times
+            atime   --- time
+    output: [start, stop] or None; stop is the time if the span is not closed by then
+    """
+    start = give_previous(s_list, atime)
+    if start is None:
+        return None
+
+    stop = give_next(e_list, start)
+    if stop is None or stop > atime:
+        stop = atime
+
+    return [start, stop]
+
+#---------------------------------------------------------------------------------------
+#-- build_events: find the orbit events from the time and altitude lists              --
+#---------------------------------------------------------------------------------------
+
+def build_events(times, alts, levels=LEVELS):
+    """
+    find the orbit events from the time and altitude lists
+    input:  times   --- a list of time in seconds from 1998.1.1 (sorted)
+            alts    --- a list of altitude
+            levels  --- a list of altitude levels of the crossings
+    output: events  --- a dictionary of:
+                        perigee, perigee_prev, apogee   --- lists of time
+                        up, down                        --- dictionaries of <level>: a list of time
+    """
+    times = numpy.asarray(times, dtype=float)
+    alts  = numpy.asarray(alts,  dtype=float)
+#
+#--- local minima and maxima; k+1 of alt[k], alt[k+1], alt[k+2]
+#
+    d0    = alts[1:-1] - alts[:-2]
+    d1    = alts[2:]   - alts[1:-1]
+    pmin  = numpy.nonzero((d0 <= 0) & (d1 >= 0))[0]
+    pmax  = numpy.nonzero((d0 >= 0) & (d1 <= 0))[0]
+
+    events = {'perigee'     : times[pmin + 1].tolist(),
+              'perigee_prev': times[pmin].tolist(),
+              'apogee'      : times[pmax + 1].tolist(),
+              'up'          : {},
+              'down'        : {}}
+
+    for level in levels:
+        key   = '%.3f' % float(level)
+        above = alts >= level
+        up    = times[numpy.nonzero(~above[:-1] & above[1:])[0]].tolist()
+        down  = times[numpy.nonzero(above[:-1] & ~above[1:])[0]].tolist()
+#
+#--- a span which is already on at the beginning of the data starts at 0
+#
+        if len(alts) > 0:
+            if above[0]:
+                up   = [0.0] + up
+            else:
+                down = [0.0] + down
+
+        events['up'][key]   = up
+        events['down'][key] = down
+
+    return events
+
+#---------------------------------------------------------------------------------------
+#-- read_ephem: read time and altitude from an ephemeris file                         --
+#---------------------------------------------------------------------------------------
+
+def read_ephem(ifile):
+    """
+    read time and altitude from an ephemeris file
+    input:  ifile   --- ephemeris file: <time> <altitude> ...
+    output: [times, alts]   --- arrays of time and altitude
+    """
+    times = []
+    alts  = []
+    with open(ifile) as f:
+        for line in f:
+            atemp = line.split()
+            if len(atemp) < 2:
+                continue
+            try:
+                stime = float(atemp[0])
+                alt   = float(atemp[1])
+            except ValueError:
+                continue
+
+            times.append(stime)
+            alts.append(alt)
+
+    return [numpy.array(times), numpy.array(alts)]
+
+#---------------------------------------------------------------------------------------
+#-- get_events: give the orbit event index of an ephemeris file                       --
+#---------------------------------------------------------------------------------------
+
+def get_events(ifile, levels=LEVELS, index_file=None):
+    """
+    give the orbit event index of an ephemeris file. the saved index is used if
+    the ephemeris file is not updated; otherwise the index is built and saved
+    input:  ifile       --- ephemeris file
+            levels      --- a list of altitude levels of the crossings
+            index_file  --- the saved index file; default: <ifile>.events.json
+    output: OrbitEvents
+    """
+    if index_file is None:
+        index_file = ifile + INDEX_TAIL
+
+    stat = os.stat(ifile)
+    keys = ['%.3f' % float(level) for level in levels]
+#
+#--- use the saved index if it is built from the same file with all the levels
+#
+    try:
+        with open(index_file) as f:
+            events = json.load(f)
+
+        if events['size'] == stat.st_size and events['mtime'] == stat.st_mtime\
+                and all([key in events['up'] for key in keys]):
+            return OrbitEvents(events)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    [times, alts]   = read_ephem(ifile)
+    events          = build_events(times, alts, levels)
+    events['size']  = stat.st_size
+    events['mtime'] = stat.st_mtime
+#
+#--- the index is only a speed up; keep going if it cannot be saved
+#
+    try:
+        fc.write_atomic(index_file, json.dumps(events).encode('utf-8'))
+    except OSError:
+        pass
+
+    return OrbitEvents(events)
@@ -0,0 +1,192 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       rad_rollups.py: the rollups of the radiation data plotted by acis_rad       #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the plotted values of the goes, ace, xmm and acis dose archives and their hourly/daily
+#   rollups (see rollup.py) read by ACIS_Rad/Scripts/create_rad_cnt_plots.py. the
+#   ingestion scripts call update right after they sync the monthly files, so that the
+#   plots only read the rollups.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import rad_rollups as rrl
+#       rrl.update(<key>, <part_dir>)
+#       [t_list, mins, means, maxs] = rrl.read_window(<key>, <part_dir>, res, start, stop)
+#
+#       key: 'goes', 'goes_r', 'ace', 'xmm', 'acis'
+#
+
+import sys
+import re
+import numpy
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import month_archive as mar
+import rollup        as rol
+
+#
+#--- the name of the value set of the rollups
+#
+TAG = 'plot'
+
+#---------------------------------------------------------------------------------------
+#-- update: add the new data to the rollups of a data set                             --
+#---------------------------------------------------------------------------------------
+
+def update(key, part_dir):
+    """
+    add the complete bins since the last update to the rollups of a data set
+    input:  key         --- data set name (see find_source)
+            part_dir    --- the directory of the monthly files
+    output: the number of the bins added at each resolution
+    """
+    [name, time_of, values_of] = find_source(key)
+
+    return rol.update(part_dir, name, TAG, time_of, values_of)
+
+#---------------------------------------------------------------------------------------
+#-- read_window: read the rollup of a data set in a time window                       --
+#---------------------------------------------------------------------------------------
+
+def read_window(key, part_dir, res, start, stop):
+    """
+    read the rollup of a data set in a time window
+    input:  key         --- data set name (see find_source)
+            part_dir    --- the directory of the monthly files
+            res         --- the resolution name: 'hour' or 'day'
+            start       --- starting time in seconds from 1998.1.1
+            stop        --- stopping time in seconds from 1998.1.1
+    output: [t_list, mins, means, maxs] (see rollup.read_window)
+    """
+    name = find_source(key)[0]
+
+    return rol.read_window(part_dir, name, TAG, res, start, stop)
+
+#---------------------------------------------------------------------------------------
+#-- find_source: give the archive name and the line functions of a data set           --
+#---------------------------------------------------------------------------------------
+
+def find_source(key):
+    """
+    give the archive name and the line functions of a data set
+    input:  key     --- data set name: 'goes', 'goes_r', 'ace', 'xmm', 'acis'
+    output: [<archive name>, <line time function>, <value function>]
+    """
+    if key == 'goes':
+        return ['goes_data',   mar.calendar_line_time, goes_values]
+
+    elif key == 'goes_r':
+        return ['goes_data_r', mar.date_line_time,     goes_r_values]
+
+    elif key == 'ace':
+        return ['ace_data',    mar.calendar_line_time, ace_values]
+
+    elif key == 'acis':
+        return ['acis_dose',   mar.secs_line_time,     acis_values]
+
+    else:
+        return ['xmm_archive', mar.secs_line_time,     xmm_values]
+
+#---------------------------------------------------------------------------------------
+#-- goes_values: give the plotted values of a line of goes_data.txt                   --
+#---------------------------------------------------------------------------------------
+
+def goes_values(line):
+    """
+    give the plotted values of a line of goes_data.txt
+    input:  line    --- data line
+    output: [p1, p2, p5]; a negative (bad) value is nan
+    """
+    atemp = re.split(r'\s+', line)
+
+    return [good_value(atemp[k]) for k in [6, 7, 10]]
+
+#---------------------------------------------------------------------------------------
+#-- goes_r_values: give the plotted values of a line of goes_data_r.txt               --
+#---------------------------------------------------------------------------------------
+
+def goes_r_values(line):
+    """
+    give the plotted values of a line of goes_data_r.txt
+    input:  line    --- data line
+    output: [p1, p2, p4]; a combination with a negative (bad) channel is nan
+                p1 :  1.0MeV - 3.3MeV
+                p2 :  3.4MeV - 11MeV
+                p4 :  40MeV  - 98MeV
+    """
+    adat  = re.split(r'\s+', line)
+    [c0, c1, c2, c3, c4, c7, c8] = [good_value(adat[k]) for k in [1, 2, 3, 4, 5, 8, 9]]
+#
+#--- combine the data for the bands
+#
+    p1 = (c0 *(1.85 - 1.02)  + c1 * (2.3 - 1.9) + c2  * (3.3 - 2.3)) / (3.3 -1.0)
+    p2 = (c3 * (6.48 - 3.4) + c4 * (11.0 - 5.84)) / (11 - 3.4)
+    p4 = (c7 * (73.4 - 40.3)+ c8 * (98.5 - 83.7)) / (98.5 - 40.3)
+
+    return [p1, p2, p4]
+
+#---------------------------------------------------------------------------------------
+#-- ace_values: give the plotted values of a line of ace_data.txt                     --
+#---------------------------------------------------------------------------------------
+
+def ace_values(line):
+    """
+    give the plotted values of a line of ace_data.txt
+    input:  line    --- data line
+    output: [ch1, ch2, ch3, ch4, ch5]; a negative (bad) value is nan
+    """
+    atemp = re.split(r'\s+', line)
+
+    return [good_value(atemp[k]) for k in range(10, 15)]
+
+#---------------------------------------------------------------------------------------
+#-- xmm_values: give the plotted values of a line of xmm.archive                      --
+#---------------------------------------------------------------------------------------
+
+def xmm_values(line):
+    """
+    give the plotted values of a line of xmm.archive
+    input:  line    --- data line
+    output: [le1, le2, hes1, hes2, hesc]; a negative (bad) value is nan
+    """
+    atemp = re.split(r'\s+', line)
+
+    return [good_value(atemp[k]) for k in [2, 3, 5, 6, 7]]
+
+#---------------------------------------------------------------------------------------
+#-- acis_values: give the plotted values of a line of the acis dose archive           --
+#---------------------------------------------------------------------------------------
+
+def acis_values(line):
+    """
+    give the plotted values of a line of the acis dose archive
+    (see create_rad_cnt_plots.sync_acis_dose)
+    input:  line    --- data line
+    output: [ccd5, ccd6, ccd7]; a missing value is nan
+    """
+    atemp = re.split(r'\s+', line)
+
+    return [good_value(atemp[k]) for k in [1, 2, 3]]
+
+#---------------------------------------------------------------------------------------
+#-- good_value: convert a data entry into float; a negative (bad) value is nan        --
+#---------------------------------------------------------------------------------------
+
+def good_value(val):
+    """
+    convert a data entry into float; a negative (bad) value is nan
+    input:  val     --- data entry
+    output: float value or nan
+    """
+    val = float(val)
+    if val < 0:
+        return numpy.nan
+
+    return val
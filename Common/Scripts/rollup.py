@@ -0,0 +1,254 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       rollup.py: hourly/daily min-mean-max rollups of a monthly archive           #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the values of the lines of a monthly archive (see month_archive.py) are rolled up
+#   into fixed time bins and kept as monthly archives of their own in the same
+#   directory: <name>_<tag>_<res>_<yyyy>_<mm>.txt with the lines of
+#
+#       <bin start> <n> <min> <mean> <max> <n> <min> <mean> <max> ...
+#
+#   (one set of n/min/mean/max for each value). the finest resolution is computed
+#   from the archive and the coarser ones from the next finer rollup. only the bins
+#   after the last saved bin are computed, and a bin is saved only when it is
+#   complete (the data go past the end of the bin).
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import rollup as rol
+#       rol.update(<part_dir>, <name>, <tag>, <function: line ---> time>, <function: line ---> values>)
+#       res = rol.pick_resolution(start, stop, <pixel width>)
+#       [t_list, mins, means, maxs] = rol.read_window(<part_dir>, <name>, <tag>, res, start, stop)
+#
+
+import sys
+import numpy
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import month_archive as mar
+
+#
+#--- resolutions from the finest to the coarsest: [<name>, <bin size in seconds>]
+#
+RESOLUTIONS = [['hour', 3600], ['day', 86400]]
+
+#---------------------------------------------------------------------------------------
+#-- update: add the complete bins since the last update to the rollups                --
+#---------------------------------------------------------------------------------------
+
+def update(part_dir, name, tag, time_of, values_of, resolutions=RESOLUTIONS):
+    """
+    add the complete bins since the last update to the rollups of a monthly archive
+    input:  part_dir    --- the directory of the monthly files
+            name        --- the archive name
+            tag         --- the name of the value set (the same archive can have
+                            several rollups of different values)
+            time_of     --- a function which gives the time of a line (or None)
+            values_of   --- a function which gives a list of values of a line;
+                            a bad value is numpy.nan
+            resolutions --- a list of [<res name>, <bin size>] from the finest
+    output: the number of the bins added at each resolution
+    """
+    added = []
+    fine  = None
+    for [res, step] in resolutions:
+        rname = rollup_name(name, tag, res)
+        last  = mar.last_time(part_dir, rname, mar.secs_line_time)
+        start = None if last is None else last + step
+#
+#--- the finest bins from the archive, the coarser ones from the finer rollup
+#
+        if fine is None:
+            lines  = mar.read_window(part_dir, name, start, None, time_of)
+            [t_list, stats, end] = read_lines(lines, time_of, values_of)
+        else:
+            [t_list, stats] = read_rollup(part_dir, rollup_name(name, tag, fine[0]), start, None)
+            end = t_list[-1] + fine[1] if len(t_list) > 0 else None
+
+        [b_list, bstats] = combine(t_list, stats, step)
+#
+#--- keep only the complete bins
+#
+        rows = []
+        for k in range(0, len(b_list)):
+            if b_list[k] + step > end:
+                break
+            rows.append(format_row(b_list[k], bstats[:, k, :]))
+
+        added.append(mar.append(part_dir, rname, rows, mar.secs_line_time))
+        fine = [res, step]
+
+    return added
+
+#---------------------------------------------------------------------------------------
+#-- read_window: read the rollup in a time window                                     --
+#---------------------------------------------------------------------------------------
+
+def read_window(part_dir, name, tag, res, start, stop):
+    """
+    read the rollup in a time window
+    input:  part_dir    --- the directory of the monthly files
+            name        --- the archive name
+            tag         --- the name of the value set
+            res         --- the resolution name (e.g. 'hour', 'day')
+            start       --- starting time in seconds from 1998.1.1
+            stop        --- stopping time in seconds from 1998.1.1
+    output: [t_list, mins, means, maxs]
+                t_list  --- an array of the bin start times
+                mins, means, maxs   --- lists of arrays, one for each value
+                                        (nan where the bin has no good value)
+    """
+    [t_list, stats] = read_rollup(part_dir, rollup_name(name, tag, res), start, stop)
+
+    return [t_list] + [[stats[k, :, m] for k in range(0, stats.shape[0])] for m in range(1, 4)]
+
+#---------------------------------------------------------------------------------------
+#-- pick_resolution: pick the coarsest resolution which still fills the width         --
+#---------------------------------------------------------------------------------------
+
+def pick_resolution(start, stop, width, resolutions=RESOLUTIONS):
+    """
+    pick the coarsest resolution which still gives at least one bin per pixel
+    input:  start       --- starting time in seconds from 1998.1.1
+            stop        --- stopping time in seconds from 1998.1.1
+            width       --- the width of the plot in pixels
+            resolutions --- a list of [<res name>, <bin size>] from the finest
+    output: the resolution name or None (the original data are needed)
+    """
+    for [res, step] in reversed(resolutions):
+        if (stop - start) / step >= width:
+            return res
+
+    return None
+
+#---------------------------------------------------------------------------------------
+#-- read_lines: convert archive lines into per bin statistics of one sample           --
+#---------------------------------------------------------------------------------------
+
+def read_lines(lines, time_of, values_of):
+    """
+    convert archive lines into the statistics of the samples
+    input:  lines       --- a list of data lines
+            time_of     --- a function which gives the time of a line (or None)
+            values_of   --- a function which gives a list of values of a line
+    output: [t_list, stats, end]
+                t_list  --- an array of time
+                stats   --- (value x time x [n, min, mean, max]) array
+                end     --- the time of the last line (None if there is no line)
+    """
+    t_list = []
+    v_list = []
+    for line in lines:
+        atime = time_of(line)
+        if atime is None:
+            continue
+        try:
+            vals = [float(val) for val in values_of(line)]
+        except (IndexError, ValueError, TypeError):
+            continue
+
+        t_list.append(atime)
+        v_list.append(vals)
+
+    t_list = numpy.array(t_list, dtype=float)
+    if len(t_list) == 0:
+        return [t_list, numpy.zeros((0, 0, 4)), None]
+
+    vals  = numpy.array(v_list, dtype=float).T
+    good  = numpy.isfinite(vals)
+    stats = numpy.stack([good.astype(float), vals, vals, vals], axis=-1)
+
+    return [t_list, stats, t_list[-1]]
+
+#---------------------------------------------------------------------------------------
+#-- read_rollup: read a rollup archive                                                --
+#---------------------------------------------------------------------------------------
+
+def read_rollup(part_dir, rname, start, stop):
+    """
+    read a rollup archive
+    input:  part_dir    --- the directory of the monthly files
+            rname       --- the rollup archive name
+            start       --- starting time; if None, from the beginning
+            stop        --- stopping time; if None, to the end
+    output: [t_list, stats] --- see read_lines
+    """
+    lines  = mar.read_window(part_dir, rname, start, stop, mar.secs_line_time)
+    data   = numpy.array([[float(val) for val in line.split()] for line in lines], dtype=float)
+    if len(data) == 0:
+        return [numpy.zeros(0), numpy.zeros((0, 0, 4))]
+
+    t_list = data[:, 0]
+    stats  = data[:, 1:].reshape((len(t_list), -1, 4)).transpose((1, 0, 2))
+
+    return [t_list, stats]
+
+#---------------------------------------------------------------------------------------
+#-- combine: combine the statistics into fixed time bins                              --
+#---------------------------------------------------------------------------------------
+
+def combine(t_list, stats, step):
+    """
+    combine the statistics into fixed time bins
+    input:  t_list  --- an array of time (sorted)
+            stats   --- (value x time x [n, min, mean, max]) array
+            step    --- the bin size in seconds
+    output: [b_list, bstats]    --- the bin start times and (value x bin x 4) array
+    """
+    if len(t_list) == 0:
+        return [numpy.zeros(0), stats]
+
+    bins  = numpy.floor(t_list / step) * step
+    first = numpy.nonzero(numpy.r_[True, bins[1:] != bins[:-1]])[0]
+
+    cnt   = stats[:, :, 0]
+    good  = cnt > 0
+    total = numpy.add.reduceat(cnt, first, axis=1)
+    wsum  = numpy.add.reduceat(numpy.where(good, stats[:, :, 2] * cnt, 0.0), first, axis=1)
+#
+#--- fmin/fmax skip nan; a bin without a good value stays nan
+#
+    vmin  = numpy.fmin.reduceat(numpy.where(good, stats[:, :, 1], numpy.nan), first, axis=1)
+    vmax  = numpy.fmax.reduceat(numpy.where(good, stats[:, :, 3], numpy.nan), first, axis=1)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        mean = numpy.where(total > 0, wsum / total, numpy.nan)
+
+    return [bins[first], numpy.stack([total, vmin, mean, vmax], axis=-1)]
+
+#---------------------------------------------------------------------------------------
+#-- format_row: create a line of a rollup archive                                     --
+#---------------------------------------------------------------------------------------
+
+def format_row(btime, bstat):
+    """
+    create a line of a rollup archive
+    input:  btime   --- the bin start time
+            bstat   --- (value x [n, min, mean, max]) array
+    output: line    --- <bin start> <n> <min> <mean> <max> ...
+    """
+    line = '%d' % btime
+    for [cnt, vmin, mean, vmax] in bstat:
+        line = line + '\t%d\t%1.4e\t%1.4e\t%1.4e' % (cnt, vmin, mean, vmax)
+
+    return line
+
+#---------------------------------------------------------------------------------------
+#-- rollup_name: give the archive name of a rollup                                    --
+#---------------------------------------------------------------------------------------
+
+def rollup_name(name, tag, res):
+    """
+    give the archive name of a rollup
+    input:  name    --- the archive name
+            tag     --- the name of the value set
+            res     --- the resolution name
+    output: <name>_<tag>_<res>
+    """
+    return '%s_%s_%s' % (name, tag, res)
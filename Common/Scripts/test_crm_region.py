@@ -0,0 +1,72 @@
+#####################################################################################
+#                                                                                   #
+#       test_crm_region.py: test the crm phenomenological region routines           #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import crm_region as crr
+
+def make_positions(n=400, seed=3):
+    """
+    positions (re) in front of, beside and behind the earth
+    """
+    rng  = numpy.random.default_rng(seed)
+    xgsm = rng.uniform(-60.0, 30.0, n)
+    ygsm = rng.uniform(-40.0, 40.0, n)
+    zgsm = rng.uniform(-20.0, 20.0, n)
+
+    return [xgsm, ygsm, zgsm]
+
+#-----------------------------------------------------------------------------
+
+def test_array_matches_per_position_locreg():
+    """
+    locreg_array with a per position kp gives the same as locreg at each position
+    """
+    [xgsm, ygsm, zgsm] = make_positions()
+    xkp = numpy.resize([0.0, 2.3, 5.0, 9.0], len(xgsm))
+
+    [xtail, ytail, ztail, idloc] = crr.locreg_array(xkp, xgsm, ygsm, zgsm)
+
+    for k in range(0, len(xgsm)):
+        out = crr.locreg(xkp[k], xgsm[k], ygsm[k], zgsm[k])
+        assert [xtail[k], ytail[k], ztail[k]] == pytest.approx(list(out[:3]), abs=1.0e-9)
+        assert idloc[k] == out[3]
+
+    assert sorted(set(idloc.tolist())) == [1, 2, 3]
+
+#-----------------------------------------------------------------------------
+
+def test_array_with_one_kp():
+    """
+    a single kp value is used for all positions
+    """
+    [xgsm, ygsm, zgsm] = make_positions(n=50, seed=5)
+
+    one  = crr.locreg_array(3.0, xgsm, ygsm, zgsm)[3]
+    many = crr.locreg_array(numpy.full(len(xgsm), 3.0), xgsm, ygsm, zgsm)[3]
+
+    assert one.dtype.kind == 'i'
+    assert numpy.array_equal(one, many)
+
+#-----------------------------------------------------------------------------
+
+def test_known_regions():
+    """
+    near the earth is the magnetosphere, far upstream the solar wind, and just
+    outside of the sunward magnetopause the magnetosheath
+    """
+    assert crr.locreg(2.0,  5.0, 0.0, 0.0)[3] == 3
+    assert crr.locreg(2.0, 40.0, 0.0, 0.0)[3] == 1
+    assert crr.locreg(2.0, 12.5, 0.0, 0.0)[3] == 2
@@ -0,0 +1,177 @@
+#####################################################################################
+#                                                                                   #
+#       test_fetch_cache.py: test the on-disk cache of the downloaded data          #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import time
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import fetch_cache as fc
+
+URL = 'https://services.swpc.noaa.gov/json/test.json'
+
+class EtagBackend():
+    """
+    fake web server: it answers 304 when If-None-Match is the current etag
+    and keeps the request headers it received
+    """
+    def __init__(self, body, etag):
+
+        self.body     = body
+        self.etag     = etag
+        self.requests = []
+
+    def request(self, url, headers, sink=None):
+
+        self.requests.append(dict(headers))
+        if headers.get('If-None-Match') == self.etag:
+            return [304, b'', {'etag': self.etag}]
+
+        rhead = {'etag': self.etag, 'last-modified': 'Sun, 18 Oct 2026 00:00:00 GMT'}
+        if sink is not None:
+            sink.write(self.body)
+            return [200, None, rhead]
+
+        return [200, self.body, rhead]
+
+def age_cache(cache, url, sec):
+    """
+    make the cached copy of the url older by sec seconds
+    """
+    meta = cache.get_meta(url)
+    meta['fetched'] -= sec
+    cache.put(url, None, meta)
+
+#-----------------------------------------------------------------------------
+
+def test_fresh_copy_is_used_without_asking(tmp_path):
+    """
+    a cached copy younger than max_age does not send a request
+    """
+    backend = EtagBackend(b'{"a": 1}', '"v1"')
+    fetcher = fc.Fetcher(fc.DiskCache(str(tmp_path)), backend, max_age=60)
+
+    assert fetcher.fetch(URL) == b'{"a": 1}'
+    assert fetcher.fetch(URL) == b'{"a": 1}'
+    assert len(backend.requests) == 1
+    assert backend.requests[0] == {}
+
+#-----------------------------------------------------------------------------
+
+def test_etag_304_reuses_the_cached_copy(tmp_path):
+    """
+    a stale copy is revalidated with If-None-Match / If-Modified-Since; 304 gives
+    the cached body back and renews the fetch time
+    """
+    cache   = fc.DiskCache(str(tmp_path))
+    backend = EtagBackend(b'old', '"v1"')
+    fetcher = fc.Fetcher(cache, backend, max_age=60)
+
+    assert fetcher.fetch(URL) == b'old'
+    age_cache(cache, URL, 120)
+#
+#--- the server body changed but its etag did not: the cached copy is kept
+#
+    backend.body = b'new'
+    assert fetcher.fetch(URL) == b'old'
+    assert backend.requests[1]['If-None-Match']     == '"v1"'
+    assert backend.requests[1]['If-Modified-Since'] == 'Sun, 18 Oct 2026 00:00:00 GMT'
+    assert time.time() - cache.get_meta(URL)['fetched'] < 60
+#
+#--- a new etag: the new body replaces the cached one
+#
+    age_cache(cache, URL, 120)
+    backend.etag = '"v2"'
+    assert fetcher.fetch(URL) == b'new'
+    assert cache.get(URL)[0]  == b'new'
+    assert cache.get_meta(URL)['etag'] == '"v2"'
+
+#-----------------------------------------------------------------------------
+
+def test_open_streams_through_the_cache(tmp_path):
+    """
+    open writes the body into the cache file and 304 reopens it
+    """
+    cache   = fc.DiskCache(str(tmp_path))
+    backend = EtagBackend(b'line1\nline2\n', '"v1"')
+    fetcher = fc.Fetcher(cache, backend, max_age=0)
+
+    with fetcher.open(URL) as f:
+        assert f.read() == b'line1\nline2\n'
+
+    with fetcher.open(URL) as f:
+        assert f.read() == b'line1\nline2\n'
+
+    assert backend.requests[1]['If-None-Match'] == '"v1"'
+    assert [name for name in os.listdir(str(tmp_path)) if name.endswith('.tmp')] == []
+#
+#--- without a cache, a temporary file is used
+#
+    fetcher = fc.Fetcher(None, backend)
+    with fetcher.open(URL) as f:
+        assert f.read() == b'line1\nline2\n'
+
+#-----------------------------------------------------------------------------
+
+def test_error_status_raises(tmp_path):
+    """
+    other than 200 / 304 is an IOError and nothing is cached
+    """
+    cache   = fc.DiskCache(str(tmp_path))
+    fetcher = fc.Fetcher(cache, fc.LocalDirBackend(str(tmp_path / 'saved')))
+
+    with pytest.raises(IOError):
+        fetcher.fetch(URL)
+
+    assert cache.get(URL) is None
+
+#-----------------------------------------------------------------------------
+
+def test_local_dir_backend(tmp_path):
+    """
+    the file of the same name as the last part of the url is read; the same
+    If-Modified-Since as its mtime gives 304
+    """
+    saved = tmp_path / 'saved'
+    saved.mkdir()
+    (saved / 'test.json').write_bytes(b'{"a": 1}')
+
+    backend = fc.LocalDirBackend(str(saved))
+    [status, body, rhead] = backend.request(URL + '?x=1', {})
+    assert [status, body] == [200, b'{"a": 1}']
+
+    [status, body, rhead] = backend.request(URL, {'If-Modified-Since': rhead['last-modified']})
+    assert status == 304
+
+    assert backend.request('https://host/other.json', {})[0] == 404
+
+#-----------------------------------------------------------------------------
+
+def test_shared_fetcher_local_dir(tmp_path, monkeypatch):
+    """
+    SW_FETCH_LOCAL_DIR and set_local_dir make fetch_* read the local files
+    """
+    saved = tmp_path / 'saved'
+    saved.mkdir()
+    (saved / 'test.json').write_bytes(b'{"a": [1, 2]}\n')
+
+    monkeypatch.setattr(fc, 'FETCHER', None)
+    monkeypatch.setenv('SW_FETCH_LOCAL_DIR', str(saved))
+    monkeypatch.setenv('SW_FETCH_CACHE_DIR', str(tmp_path / 'cache'))
+
+    assert isinstance(fc.get_fetcher().backend, fc.LocalDirBackend)
+    assert fc.fetch_json(URL)  == {'a': [1, 2]}
+    assert fc.fetch_lines(URL) == ['{"a": [1, 2]}']
+
+    fc.set_local_dir(str(saved))
+    assert fc.get_fetcher().cache is None
+    with fc.fetch_stream(URL) as f:
+        assert f.read() == b'{"a": [1, 2]}\n'
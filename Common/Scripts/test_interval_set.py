@@ -0,0 +1,89 @@
+#####################################################################################
+#                                                                                   #
+#       test_interval_set.py: test the merged time interval sets                    #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+pytest.importorskip('numpy')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import interval_set as ivs
+
+#-----------------------------------------------------------------------------
+
+def test_merge_touching_and_overlapping():
+    """
+    touching intervals ([0, 10) and [10, 20)) and overlapping ones are merged;
+    unsorted input and reversed intervals are handled
+    """
+    iset = ivs.IntervalSet([30, 10, 0, 15, 50], [40, 20, 10, 18, 45])
+
+    assert iset.spans() == [[0.0, 20.0], [30.0, 40.0]]
+    assert len(iset) == 2
+
+#-----------------------------------------------------------------------------
+
+def test_merge_nested_keeps_the_longest_reach():
+    """
+    an interval inside an earlier long one does not cut it short
+    """
+    iset = ivs.IntervalSet([0, 2, 4, 30], [25, 3, 5, 31])
+
+    assert iset.spans() == [[0.0, 25.0], [30.0, 31.0]]
+
+#-----------------------------------------------------------------------------
+
+def test_contains_half_open():
+    """
+    start <= time < stop
+    """
+    iset = ivs.IntervalSet([0, 10], [10, 20])
+    mask = iset.contains([-1, 0, 9.9, 10, 19.9, 20, 25])
+
+    assert list(mask) == [False, True, True, True, True, False, False]
+    assert list(ivs.IntervalSet().contains([1.0, 2.0])) == [False, False]
+
+#-----------------------------------------------------------------------------
+
+def test_total_clip_union():
+    """
+    the length in a window, the parts in a window and the union
+    """
+    iset  = ivs.IntervalSet([0, 30], [10, 40])
+
+    assert iset.total() == 20.0
+    assert iset.total(5, 35) == 10.0
+    assert iset.clip(5, 35).spans() == [[5.0, 10.0], [30.0, 35.0]]
+    assert iset.union(ivs.IntervalSet([10], [30])).spans() == [[0.0, 40.0]]
+
+#-----------------------------------------------------------------------------
+
+def test_paint_later_layer_wins():
+    """
+    where the interval sets overlap, the later one in the list gives the value
+    """
+    hrc  = ivs.IntervalSet([0], [10])
+    half = ivs.IntervalSet([5], [15])
+    vals = ivs.paint([0, 5, 12, 20], [[hrc, 0.0], [half, 0.5]])
+
+    assert list(vals) == [0.0, 0.5, 0.5, 1.0]
+
+#-----------------------------------------------------------------------------
+
+def test_runs():
+    """
+    each period stops at the next change; the last one at stop
+    """
+    out = ivs.runs([0, 1, 2, 3, 4], ['a', 'a', 'b', 'a', 'a'], stop=6)
+
+    assert out['a'].spans() == [[0.0, 2.0], [3.0, 6.0]]
+    assert out['b'].spans() == [[2.0, 3.0]]
+    assert ivs.runs([], []) == {}
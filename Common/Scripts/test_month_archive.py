@@ -0,0 +1,113 @@
+#####################################################################################
+#                                                                                   #
+#       test_month_archive.py: test the monthly partitioned text archive            #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('Chandra.Time')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import month_archive as mar
+
+#
+#--- <yyyy> <mm> <dd> <hhmm> <value> lines around the ends of jan, feb (leap year) and dec
+#
+LINES = ['2023 12 31 2330 1', '2024 01 01 0000 2', '2024 01 31 2330 3', '2024 02 01 0000 4',\
+         '2024 02 29 2330 5', '2024 03 01 0000 6', '2024 03 01 0030 7']
+
+def write_legacy(ifile, lines):
+    with open(ifile, 'w') as fo:
+        fo.write('#yr mo da hhmm value\n')
+        for line in lines:
+            fo.write(line + '\n')
+
+def values(lines):
+    return [int(line.split()[-1]) for line in lines]
+
+#-----------------------------------------------------------------------------
+
+def test_sync_splits_by_month(tmp_path):
+    """
+    the first sync splits the whole legacy archive; the next one adds only the new lines
+    """
+    ifile    = str(tmp_path / 'ace_data.txt')
+    part_dir = str(tmp_path / 'Monthly')
+    write_legacy(ifile, LINES[:-1])
+
+    assert mar.sync(ifile, part_dir, 'ace', mar.calendar_line_time) == 6
+    assert [ent[:2] for ent in mar.partitions(part_dir, 'ace')] \
+                == [[2023, 12], [2024, 1], [2024, 2], [2024, 3]]
+
+    write_legacy(ifile, LINES)
+    assert mar.sync(ifile, part_dir, 'ace', mar.calendar_line_time) == 1
+    assert mar.sync(ifile, part_dir, 'ace', mar.calendar_line_time) == 0
+
+    with open(mar.partition_file(part_dir, 'ace', 2024, 3)) as f:
+        assert f.read() == '2024 03 01 0000 6\n2024 03 01 0030 7\n'
+
+#-----------------------------------------------------------------------------
+
+def test_read_window_across_month_boundaries(tmp_path):
+    """
+    start <= time <= stop over the month (and year) boundaries; a window which
+    ends at the start of a month still gets the line at that time
+    """
+    part_dir = str(tmp_path / 'Monthly')
+    mar.append(part_dir, 'ace', LINES, mar.calendar_line_time)
+
+    def window(start, stop):
+        start = None if start is None else mar.calendar_line_time(start)
+        stop  = None if stop  is None else mar.calendar_line_time(stop)
+        return values(mar.read_window(part_dir, 'ace', start, stop, mar.calendar_line_time))
+
+    assert window('2023 12 31 2330', '2024 01 01 0000') == [1, 2]
+    assert window('2024 01 31 2300', '2024 02 01 0000') == [3, 4]
+    assert window('2024 02 01 0001', '2024 03 01 0000') == [5, 6]
+    assert window('2024 02 29 2330', None)              == [5, 6, 7]
+    assert window(None, '2024 01 15 0000')              == [1, 2]
+    assert window('2024 01 02 0000', '2024 01 31 0000') == []
+    assert values(mar.read_window(str(tmp_path / 'none'), 'ace', 0, 1.0e9,\
+                                  mar.calendar_line_time)) == []
+
+#-----------------------------------------------------------------------------
+
+def test_append_skips_old_lines(tmp_path):
+    """
+    a line not newer than the last line of the archive is skipped
+    """
+    part_dir = str(tmp_path / 'Monthly')
+    assert mar.append(part_dir, 'ace', LINES[:3], mar.calendar_line_time) == 3
+    assert mar.append(part_dir, 'ace', LINES[1:5], mar.calendar_line_time) == 2
+    assert mar.append(part_dir, 'ace', [LINES[6], LINES[5]], mar.calendar_line_time) == 1
+
+    assert values(mar.read_window(part_dir, 'ace', None, None, mar.calendar_line_time))\
+                == [1, 2, 3, 4, 5, 7]
+    assert mar.last_time(part_dir, 'ace', mar.calendar_line_time)\
+                == mar.calendar_line_time(LINES[6])
+
+#-----------------------------------------------------------------------------
+
+def test_read_window_falls_back_to_legacy(tmp_path):
+    """
+    when the monthly files cannot be written, the legacy archive is read
+    """
+    ifile    = str(tmp_path / 'ace_data.txt')
+    part_dir = str(tmp_path / 'not_a_dir')
+    write_legacy(ifile, LINES)
+    with open(part_dir, 'w') as fo:
+        fo.write('')
+
+    start = mar.calendar_line_time(LINES[2])
+    stop  = mar.calendar_line_time(LINES[4])
+    lines = mar.read_window(part_dir, 'ace', start, stop, mar.calendar_line_time, legacy=ifile)
+
+    assert values(lines) == [3, 4, 5]
@@ -0,0 +1,98 @@
+#####################################################################################
+#                                                                                   #
+#       test_offset_index.py: test the time ---> byte offset index of an archive    #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import offset_index as oix
+
+def time_of(line):
+    """
+    time of a test archive line: <time> <value>; a header is None
+    """
+    if line.startswith('#') or len(line) == 0:
+        return None
+
+    return float(line.split()[0])
+
+def write_archive(ifile, times, mode='w'):
+    with open(ifile, mode) as fo:
+        for atime in times:
+            fo.write('%d %d\n' % (atime, atime * 10))
+
+#-----------------------------------------------------------------------------
+
+def test_read_window_inclusive(tmp_path):
+    """
+    start <= time <= stop; the header is skipped and None opens the ends
+    """
+    ifile = str(tmp_path / 'archive.txt')
+    with open(ifile, 'w') as fo:
+        fo.write('#time value\n')
+    write_archive(ifile, range(0, 100), mode='a')
+
+    lines = oix.read_window(ifile, 20, 30, time_of, step=7)
+    assert [time_of(line) for line in lines] == list(range(20, 31))
+
+    assert len(oix.read_window(ifile, None, None, time_of, step=7)) == 100
+    assert len(oix.read_window(ifile, 95, None, time_of, step=7)) == 5
+    assert oix.read_window(ifile, 200, 300, time_of, step=7) == []
+    assert oix.read_window(str(tmp_path / 'none.txt'), 0, 1, time_of) == []
+
+#-----------------------------------------------------------------------------
+
+def test_append_indexes_only_the_new_part(tmp_path):
+    """
+    the appended lines are added to the index (step lines between the index points);
+    a partly written last line waits
+    """
+    ifile = str(tmp_path / 'archive.txt')
+    write_archive(ifile, range(0, 50))
+    index = oix.update_index(ifile, time_of, step=10)
+    size  = index['size']
+    assert index['times'] == [0, 11, 22, 33, 44]
+
+    write_archive(ifile, range(50, 60), mode='a')
+    with open(ifile, 'a') as fo:
+        fo.write('60 6')
+
+    index = oix.update_index(ifile, time_of, step=10)
+    assert index['times'] == [0, 11, 22, 33, 44, 55]
+    assert index['size'] == size + 10 * len('55 550\n')
+
+    with open(ifile, 'a') as fo:
+        fo.write('00\n')
+
+    index = oix.update_index(ifile, time_of, step=10)
+    assert index['size'] == os.path.getsize(ifile)
+
+    lines = oix.read_window(ifile, 45, 70, time_of, step=10)
+    assert [time_of(line) for line in lines] == list(range(45, 61))
+    assert lines[-1] == '60 600'
+
+#-----------------------------------------------------------------------------
+
+def test_rewritten_archive_rebuilds_the_index(tmp_path):
+    """
+    when the indexed part changed (or the file shrank), the index is made again
+    """
+    ifile = str(tmp_path / 'archive.txt')
+    write_archive(ifile, range(0, 50))
+    oix.update_index(ifile, time_of, step=10)
+
+    write_archive(ifile, range(100, 180))
+    lines = oix.read_window(ifile, 150, 155, time_of, step=10)
+    assert [time_of(line) for line in lines] == list(range(150, 156))
+
+    write_archive(ifile, range(500, 505))
+    index = oix.update_index(ifile, time_of, step=10)
+    assert index['times'] == [500]
+    assert index['size']  == os.path.getsize(ifile)
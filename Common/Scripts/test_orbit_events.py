@@ -0,0 +1,96 @@
+#####################################################################################
+#                                                                                   #
+#       test_orbit_events.py: test the orbit event index                            #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import json
+import pytest
+
+pytest.importorskip('numpy')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import orbit_events as oev
+
+#
+#--- a sample every 1000 sec: apogees at 3000 and 9000, a perigee at 6000
+#
+TIMES = [1000.0 * k for k in range(0, 11)]
+ALTS  = [10.0, 40.0, 80.0, 120.0, 80.0, 40.0, 10.0, 40.0, 80.0, 120.0, 80.0]
+
+def write_ephem(ifile, times, alts):
+    with open(ifile, 'w') as fo:
+        for [stime, alt] in zip(times, alts):
+            fo.write('%.1f %.1f 0.0 0.0\n' % (stime, alt))
+
+#-----------------------------------------------------------------------------
+
+def test_perigee_and_apogee():
+    """
+    the local minima and maxima of the altitude; the ends of the data are not used
+    """
+    events = oev.OrbitEvents(oev.build_events(TIMES, ALTS))
+
+    assert events.perigees() == [6000.0]
+    assert events.perigee_brackets() == [[5000.0, 6000.0]]
+    assert events.last_perigee(5999.0) is None
+    assert events.last_perigee(6000.0) == 6000.0
+    assert events.next_perigee(6000.0) is None
+    assert events.next_perigee(0.0) == 6000.0
+    assert events.last_apogee(8999.0) == 3000.0
+
+#-----------------------------------------------------------------------------
+
+def test_crossing_spans():
+    """
+    the spans above and below the level; an open span stops at the time and the
+    span on at the beginning of the data starts at 0
+    """
+    events = oev.OrbitEvents(oev.build_events(TIMES, ALTS, levels=[70.0]))
+
+    assert events.crossings(70.0) == [[1000.0, 7000.0], [0.0, 4000.0]]
+    assert events.last_above(70.0, 5000.0) == [1000.0, 4000.0]
+    assert events.last_above(70.0, 9500.0) == [7000.0, 9500.0]
+    assert events.last_above(70.0, 500.0) is None
+    assert events.last_zone(70.0, 500.0)   == [0.0, 500.0]
+    assert events.last_zone(70.0, 8000.0)  == [4000.0, 7000.0]
+
+    with pytest.raises(ValueError):
+        events.crossings(50.0)
+
+#-----------------------------------------------------------------------------
+
+def test_saved_index_is_reused_until_the_file_changes(tmp_path):
+    """
+    the saved index is used for the same ephemeris file and the same levels
+    """
+    ifile = str(tmp_path / 'PE.EPH.gsme_spherical')
+    write_ephem(ifile, TIMES, ALTS)
+
+    assert oev.get_events(ifile).perigees() == [6000.0]
+    index_file = ifile + oev.INDEX_TAIL
+    assert os.path.isfile(index_file)
+#
+#--- a marked saved index shows that it is read instead of the ephemeris file
+#
+    with open(index_file) as f:
+        events = json.load(f)
+    events['perigee'] = [-1.0]
+    with open(index_file, 'w') as fo:
+        json.dump(events, fo)
+
+    assert oev.get_events(ifile).perigees() == [-1.0]
+    assert oev.get_events(ifile, levels=[70.0, 50.0]).perigees() == [6000.0]
+#
+#--- the updated ephemeris file rebuilds the index
+#
+    write_ephem(ifile, TIMES + [11000.0, 12000.0], ALTS + [40.0, 10.0])
+    events = oev.get_events(ifile, levels=[50.0])
+    assert events.perigees() == [6000.0]
+    assert events.crossings(50.0) == [[1000.0, 7000.0], [0.0, 4000.0, 10000.0]]
@@ -0,0 +1,62 @@
+#####################################################################################
+#                                                                                   #
+#       test_rad_rollups.py: test the rollups of the plotted radiation data         #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+numpy = pytest.importorskip('numpy')
+pytest.importorskip('Chandra.Time')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import month_archive as mar
+import rad_rollups   as rrl
+
+DAY0 = 86400.0 * 10000
+
+#-----------------------------------------------------------------------------
+
+def test_values_of_the_lines():
+    """
+    the plotted columns are picked; a negative (bad) value is nan
+    """
+    line = '2024 03 01 0000 60370 0 1.0 2.0 3.0 0 4.0 5.0 -1.0 7.0 8.0'
+    vals = rrl.ace_values(line)
+    assert vals[:2] + vals[3:] == [4.0, 5.0, 7.0, 8.0]
+    assert numpy.isnan(vals[2])
+
+    assert rrl.xmm_values('%d 1 2 3 4 5 6 7' % DAY0) == [2.0, 3.0, 5.0, 6.0, 7.0]
+    assert rrl.acis_values('%d 1 2 3' % DAY0) == [1.0, 2.0, 3.0]
+
+    p = rrl.goes_r_values('2024:061:00:00:00 1 1 1 1 1 1 1 1 1')
+    assert p == pytest.approx([(0.83 + 0.4 + 1.0) / 2.3, (3.08 + 5.16) / 7.6, (33.1 + 14.8) / 58.2])
+    assert numpy.isnan(rrl.goes_r_values('2024:061:00:00:00 -1 1 1 1 1 1 1 1 1')[0])
+
+#-----------------------------------------------------------------------------
+
+def test_update_then_read_window(tmp_path):
+    """
+    the ingestion update makes the rollups which the plotter reads
+    """
+    part_dir = str(tmp_path)
+    lines    = ['%d 0 %d 1 0 %d 2 3' % (atime, k, k) for (k, atime)\
+                    in enumerate(numpy.arange(DAY0, DAY0 + 7200 + 300, 300))]
+    mar.append(part_dir, 'xmm_archive', lines, mar.secs_line_time)
+
+    assert rrl.update('xmm', part_dir)[0] == 2
+
+    [t_list, mins, means, maxs] = rrl.read_window('xmm', part_dir, 'hour', DAY0, DAY0 + 7200)
+    assert t_list.tolist()  == [DAY0, DAY0 + 3600]
+    assert mins[0].tolist() == [0.0, 12.0]
+    assert maxs[2].tolist() == [11.0, 23.0]
+    assert means[1].tolist() == [1.0, 1.0]
+
+    assert rrl.find_source('goes_r')[0] == 'goes_data_r'
+    assert rrl.read_window('goes', part_dir, 'hour', DAY0, DAY0 + 7200)[0].tolist() == []
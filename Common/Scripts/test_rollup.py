@@ -0,0 +1,108 @@
+#####################################################################################
+#                                                                                   #
+#       test_rollup.py: test the hourly/daily rollups of a monthly archive          #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+numpy = pytest.importorskip('numpy')
+pytest.importorskip('Chandra.Time')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import month_archive as mar
+import rollup        as rol
+
+#
+#--- a day in seconds from 1998.1.1 (the start of a day) and the test resolutions
+#
+DAY0 = 86400.0 * 10000
+RES  = [['hour', 3600], ['day', 86400]]
+
+def make_lines(start, stop, step=600):
+    """
+    <secs> <value> <value * 2>; the value is -1 (bad) at the half past the hour
+    """
+    lines = []
+    for atime in numpy.arange(start, stop, step):
+        val = (atime - DAY0) / step
+        if (atime - DAY0) % 3600 == 1800:
+            val = -1
+        lines.append('%d %d %d' % (atime, val, val * 2))
+
+    return lines
+
+def values_of(line):
+    vals = [float(val) for val in line.split()[1:]]
+    return [numpy.nan if val < 0 else val for val in vals]
+
+#-----------------------------------------------------------------------------
+
+def test_only_complete_bins_are_saved(tmp_path):
+    """
+    min/mean/max skip the bad value; the bin the data have not passed is not saved
+    """
+    part_dir = str(tmp_path)
+    mar.append(part_dir, 'xmm', make_lines(DAY0, DAY0 + 3 * 3600 + 1200), mar.secs_line_time)
+
+    assert rol.update(part_dir, 'xmm', 'plot', mar.secs_line_time, values_of, RES) == [3, 0]
+
+    [t_list, mins, means, maxs] = rol.read_window(part_dir, 'xmm', 'plot', 'hour', DAY0, DAY0 + 86400)
+    assert t_list.tolist()   == [DAY0, DAY0 + 3600, DAY0 + 7200]
+    assert mins[0].tolist()  == [0.0, 6.0, 12.0]
+    assert maxs[0].tolist()  == [5.0, 11.0, 17.0]
+    assert means[0].tolist() == pytest.approx([2.4, 8.4, 14.4])
+    assert means[1].tolist() == pytest.approx([4.8, 16.8, 28.8])
+
+#-----------------------------------------------------------------------------
+
+def test_update_adds_only_new_bins(tmp_path):
+    """
+    the next update starts after the last saved bin; the day bin comes from the hours
+    """
+    part_dir = str(tmp_path)
+    mar.append(part_dir, 'xmm', make_lines(DAY0, DAY0 + 3 * 3600 + 1200), mar.secs_line_time)
+    rol.update(part_dir, 'xmm', 'plot', mar.secs_line_time, values_of, RES)
+
+    mar.append(part_dir, 'xmm', make_lines(DAY0 + 3 * 3600 + 1200, DAY0 + 86400 + 600),\
+               mar.secs_line_time)
+    assert rol.update(part_dir, 'xmm', 'plot', mar.secs_line_time, values_of, RES) == [21, 1]
+    assert rol.update(part_dir, 'xmm', 'plot', mar.secs_line_time, values_of, RES) == [0, 0]
+
+    [t_list, mins, means, maxs] = rol.read_window(part_dir, 'xmm', 'plot', 'day', DAY0, DAY0)
+    good = [val for val in range(0, 144) if val % 6 != 3]
+    assert t_list.tolist()   == [DAY0]
+    assert [mins[0][0], maxs[0][0]] == [0.0, 143.0]
+    assert means[0][0] == pytest.approx(numpy.mean(good))
+
+#-----------------------------------------------------------------------------
+
+def test_bin_without_good_value_is_nan(tmp_path):
+    """
+    a bin with only bad values has n = 0 and nan statistics
+    """
+    t_list = numpy.array([0.0, 10.0, 3600.0])
+    vals   = numpy.array([[numpy.nan, numpy.nan, 1.0]])
+    good   = numpy.isfinite(vals)
+    stats  = numpy.stack([good.astype(float), vals, vals, vals], axis=-1)
+
+    [b_list, bstats] = rol.combine(t_list, stats, 3600)
+    assert b_list.tolist() == [0.0, 3600.0]
+    assert bstats[0, 0, 0] == 0 and numpy.isnan(bstats[0, 0, 1:]).all()
+    assert bstats[0, 1].tolist() == [1.0, 1.0, 1.0, 1.0]
+
+#-----------------------------------------------------------------------------
+
+def test_pick_resolution():
+    """
+    the coarsest resolution which still gives at least one bin per pixel
+    """
+    assert rol.pick_resolution(0, 86400 * 1000, 800, RES) == 'day'
+    assert rol.pick_resolution(0, 86400 * 100,  800, RES) == 'hour'
+    assert rol.pick_resolution(0, 86400,        800, RES) is None
@@ -0,0 +1,98 @@
+#####################################################################################
+#                                                                                   #
+#       test_time_convert.py: test the chandra time conversions                     #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('Chandra.Time')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import time_convert as tcv
+
+#
+#--- 2017.1.1 00:00:00 utc: 19 years (5 leap years) and 6 leap seconds after 1998.1.1;
+#--- 1998.1.1 00:00:00 utc is 63.184 sec (tt - utc) in chandra time
+#
+SECS_2017 = 599616000.0 + 63.184 + 6
+
+#-----------------------------------------------------------------------------
+
+def test_leap_table():
+    """
+    the leap seconds since 1998 are in the table made from Chandra.Time
+    """
+    assert tcv.LEAP_UTS[:6].tolist() == [915148800.0, 1136073600.0, 1230768000.0,\
+                                         1341100800.0, 1435708800.0, 1483228800.0]
+
+#-----------------------------------------------------------------------------
+
+def test_date_to_secs():
+    """
+    the start of 1998 and a time after the leap seconds; a list gives an array
+    """
+    assert tcv.date_to_secs('1998:001:00:00:00') == pytest.approx(63.184)
+    assert tcv.date_to_secs('2017:001:00:00:00') == pytest.approx(SECS_2017)
+    assert tcv.date_to_secs('2017-01-01T00:00:00') == pytest.approx(SECS_2017)
+    assert tcv.date_to_secs('2017:001') == pytest.approx(SECS_2017)
+
+    out = tcv.date_to_secs(['2017:001:00:00:00', '2017:001:00:00:01.5'])
+    assert out.tolist() == pytest.approx([SECS_2017, SECS_2017 + 1.5])
+
+#-----------------------------------------------------------------------------
+
+def test_leap_second_boundary():
+    """
+    the day with the leap second has 86401 seconds; a time inside of the leap
+    second is given as the last second of the day
+    """
+    before = tcv.date_to_secs('2016:366:23:59:59')
+    assert SECS_2017 - before == pytest.approx(2.0)
+
+    assert tcv.secs_to_date(before)          == '2016:366:23:59:59.000'
+    assert tcv.secs_to_date(before + 1.0)    == '2016:366:23:59:59.000'
+    assert tcv.secs_to_date(SECS_2017)       == '2017:001:00:00:00.000'
+    assert tcv.secs_to_date(SECS_2017, 0)    == '2017:001:00:00:00'
+
+#-----------------------------------------------------------------------------
+
+def test_round_trips():
+    """
+    calendar, day of year and fractional day of year give back the same time
+    """
+    secs = tcv.calendar_to_secs([1999, 2012, 2024], [3, 7, 2], [1, 1, 29], 12, 30, 15)
+    [year, mon, day, hh, mm, ss] = tcv.secs_to_calendar(secs)
+    assert year.tolist() == [1999, 2012, 2024]
+    assert mon.tolist()  == [3, 7, 2]
+    assert day.tolist()  == [1, 1, 29]
+    assert hh.tolist() == [12, 12, 12] and mm.tolist() == [30, 30, 30]
+    assert ss.tolist() == pytest.approx([15.0, 15.0, 15.0])
+
+    dates = tcv.secs_to_date(secs)
+    assert tcv.date_to_secs(list(dates)).tolist() == pytest.approx(secs.tolist())
+
+    [year, fyday] = tcv.secs_to_fdoy(secs)
+    assert tcv.fdoy_to_secs(year, fyday).tolist() == pytest.approx(secs.tolist(), abs=1.0e-4)
+    assert tcv.secs_to_uts(tcv.uts_to_secs(1483228800.0)) == pytest.approx(1483228800.0)
+
+#-----------------------------------------------------------------------------
+
+def test_parse_date_and_cache():
+    """
+    the known formats are split without Chandra.Time and the results are cached
+    """
+    assert tcv.parse_date('2020:060:01:02:03.5')  == [2020.0, 60.0, 1.0, 2.0, 3.5]
+    assert tcv.parse_date('2020-03-01T01:02:03')  == [2020.0, 61.0, 1.0, 2.0, 3.0]
+    assert tcv.parse_date('Mar 1 2020') is None
+
+    tcv.DATE_CACHE.clear()
+    tcv.date_to_secs(['2020:060:01:02:03.5', '2020:060:01:02:03.5'])
+    assert list(tcv.DATE_CACHE.keys()) == ['2020:060:01:02:03.5']
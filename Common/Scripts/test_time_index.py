@@ -0,0 +1,113 @@
+#####################################################################################
+#                                                                                   #
+#       test_time_index.py: test the binary search time index helpers               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+pytest.importorskip('numpy')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import time_index as tix
+
+TIMES = [10.0, 20.0, 30.0, 40.0]
+
+#-----------------------------------------------------------------------------
+
+def test_find_previous_next():
+    """
+    inclusive / exclusive searches at, between and outside of the times
+    """
+    assert tix.find_previous(TIMES, 20.0) == 1
+    assert tix.find_previous(TIMES, 20.0, inclusive=False) == 0
+    assert tix.find_previous(TIMES, 5.0) == -1
+    assert tix.find_next(TIMES, 20.0) == 1
+    assert tix.find_next(TIMES, 20.0, inclusive=False) == 2
+    assert tix.find_next(TIMES, 45.0) == 4
+    assert list(tix.find_previous(TIMES, [5.0, 25.0, 40.0])) == [-1, 1, 3]
+
+#-----------------------------------------------------------------------------
+
+def test_find_window():
+    """
+    start <= time < stop (or <= stop with include_stop)
+    """
+    assert tix.find_window(TIMES, 20.0, 40.0) == [1, 3]
+    assert tix.find_window(TIMES, 20.0, 40.0, include_stop=True) == [1, 4]
+    assert tix.find_window(TIMES, 35.0, 32.0) == [3, 3]
+    assert tix.find_window(TIMES) == [0, 4]
+
+#-----------------------------------------------------------------------------
+
+def test_find_nearest_and_bracket():
+    """
+    a time in the middle of two gives the later one
+    """
+    assert tix.find_nearest(TIMES, 14.0) == 0
+    assert tix.find_nearest(TIMES, 15.0) == 1
+    assert tix.find_nearest(TIMES, 0.0)  == 0
+    assert tix.find_nearest(TIMES, 99.0) == 3
+
+    assert tix.find_bracket(TIMES, 10.0) == 1
+    assert tix.find_bracket(TIMES, 25.0) == 2
+    assert tix.find_bracket(TIMES, 40.0) == 3
+    assert tix.find_bracket(TIMES, 41.0) == -1
+    assert tix.interpolate(TIMES, [0.0, 1.0, 2.0, 3.0], 25.0) == pytest.approx(1.5)
+    assert tix.interpolate(TIMES, [0.0, 1.0, 2.0, 3.0], 9.0) is None
+
+#-----------------------------------------------------------------------------
+
+def test_asof_backward():
+    """
+    the last right time <= the left time; an exact match is its own entry
+    """
+    [vals, index] = tix.asof_join([5.0, 10.0, 15.0, 40.0, 50.0], TIMES, ['a', 'b', 'c', 'd'],\
+                                  direction='backward', fill='x')
+
+    assert list(index) == [-1, 0, 0, 3, 3]
+    assert list(vals)  == ['x', 'a', 'a', 'd', 'd']
+
+#-----------------------------------------------------------------------------
+
+def test_asof_forward():
+    """
+    the first right time >= the left time; none after the last right time
+    """
+    [vals, index] = tix.asof_join([5.0, 10.0, 15.0, 40.0, 50.0], TIMES, [1, 2, 3, 4],\
+                                  direction='forward', fill=-1)
+
+    assert list(index) == [0, 0, 1, 3, -1]
+    assert list(vals)  == [1, 1, 2, 4, -1]
+
+#-----------------------------------------------------------------------------
+
+def test_asof_nearest_ties():
+    """
+    the closest right time; at a tie the later one (the same as find_nearest)
+    """
+    left = [0.0, 14.0, 15.0, 16.0, 20.0, 25.0, 35.0, 99.0]
+    [vals, index] = tix.asof_join(left, TIMES, [1, 2, 3, 4], direction='nearest')
+
+    assert list(index) == [0, 0, 1, 1, 1, 2, 3, 3]
+    assert list(index) == [tix.find_nearest(TIMES, t) for t in left]
+
+#-----------------------------------------------------------------------------
+
+def test_asof_empty_right():
+    """
+    no right time: all are filled
+    """
+    for direction in ['backward', 'forward', 'nearest']:
+        [vals, index] = tix.asof_join([1.0, 2.0], [], [], direction=direction, fill=0.0)
+        assert list(index) == [-1, -1]
+        assert list(vals)  == [0.0, 0.0]
+
+    with pytest.raises(ValueError):
+        tix.asof_join([1.0], TIMES, direction='later')
@@ -0,0 +1,112 @@
+#####################################################################################
+#                                                                                   #
+#       test_ts_store.py: test the time series store                                #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import ts_store
+
+COLUMNS = [['flux', 'real'], ['note', 'text']]
+
+def parse_line(line):
+    """
+    parser of the test archive: <time> <flux> <note>
+    """
+    atemp = line.split()
+    if len(atemp) != 3:
+        return None
+
+    return [float(atemp[0]), float(atemp[1]), atemp[2]]
+
+def open_store(tmp_path):
+    return ts_store.TimeSeriesStore(str(tmp_path / 'test.db'), COLUMNS)
+
+#-----------------------------------------------------------------------------
+
+def test_append_replaces_same_time(tmp_path):
+    """
+    a row with an existing time replaces the older one; range is start <= time < stop
+    """
+    store = open_store(tmp_path)
+    store.append([[1.0, 10.0, 'a'], [2.0, 20.0, 'b'], [3.0, 30.0, 'c']])
+    store.append([[2.0, 25.0, 'd']])
+
+    assert store.range(1.0, 3.0) == [[1.0, 2.0], [10.0, 25.0], ['a', 'd']]
+    assert store.range(columns=['flux']) == [[1.0, 2.0, 3.0], [10.0, 25.0, 30.0]]
+    assert store.previous(3.0) == (2.0, 25.0, 'd')
+    assert store.previous(1.0) is None
+    assert store.last_time() == 3.0
+    store.close()
+
+#-----------------------------------------------------------------------------
+
+def test_import_text_partial_last_line(tmp_path):
+    """
+    a partly written last line is not read until its newline is written
+    """
+    ifile = str(tmp_path / 'archive.txt')
+    with open(ifile, 'w') as fo:
+        fo.write('1 10 a\n2 20 b\n3 3')
+
+    store = open_store(tmp_path)
+    assert store.import_text(ifile, parse_line) == 2
+    assert store.range()[0] == [1.0, 2.0]
+#
+#--- the rest of the line and a new line come in
+#
+    with open(ifile, 'a') as fo:
+        fo.write('0 c\n4 40 d\n')
+
+    assert store.import_text(ifile, parse_line) == 2
+    assert store.range() == [[1.0, 2.0, 3.0, 4.0], [10.0, 20.0, 30.0, 40.0], ['a', 'b', 'c', 'd']]
+#
+#--- nothing new
+#
+    assert store.import_text(ifile, parse_line) == 0
+    store.close()
+
+#-----------------------------------------------------------------------------
+
+def test_import_text_after_truncation(tmp_path):
+    """
+    when the file becomes shorter than the last import, the store is read again
+    from the start of the file
+    """
+    ifile = str(tmp_path / 'archive.txt')
+    with open(ifile, 'w') as fo:
+        fo.write('1 10 a\n2 20 b\n3 30 c\n')
+
+    store = open_store(tmp_path)
+    assert store.import_text(ifile, parse_line) == 3
+
+    with open(ifile, 'w') as fo:
+        fo.write('5 50 e\n')
+
+    assert store.import_text(ifile, parse_line) == 1
+    assert store.range() == [[5.0], [50.0], ['e']]
+    store.close()
+
+#-----------------------------------------------------------------------------
+
+def test_export_text(tmp_path):
+    """
+    the legacy text file is recreated from the store
+    """
+    store = open_store(tmp_path)
+    store.append([[1.0, 10.0, 'a'], [2.0, 20.0, 'b']])
+
+    ofile = str(tmp_path / 'out.txt')
+    store.export_text(ofile, lambda row: '%d %d %s\n' % row, header=['#head'], reverse=True)
+    with open(ofile) as f:
+        assert f.read() == '#head\n2 20 b\n1 10 a\n'
+
+    assert not os.path.exists(ofile + '.tmp')
+    store.close()
@@ -0,0 +1,483 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       time_convert.py: convert arrays of time between chandra time and utc        #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the functions convert a whole list of time at once between:
+#       chandra time    --- seconds from 1998.1.1 (tt; the same as Chandra.Time secs)
+#       uts             --- utc seconds from 1970.1.1 (unix time)
+#       date            --- <yyyy>:<ddd>:<hh>:<mm>:<ss>
+#       calendar        --- year, month, day, hour, minute, second
+#       fractional doy  --- year, <ddd>.<fractional day>
+#
+#   chandra time is computed from utc with a leap second table, instead of calling
+#   Chandra.Time.DateTime for each time. the table is made from Chandra.Time once at
+#   import (see find_leap_uts), so that the conversions follow its leap seconds. date strings which are converted
+#   are kept in a memo cache so that the same string is parsed only once; a string
+#   in a format other than <yyyy>:<ddd>... or <yyyy>-<mm>-<dd>... is passed to
+#   Chandra.Time.
+#
+#   a single value input gives a single value output; a list input gives an array.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import time_convert as tcv
+#       stime = tcv.date_to_secs('2021:075:12:00:00')
+#       t_arr = tcv.date_to_secs(date_list)
+#       dates = tcv.secs_to_date(t_arr)
+#
+
+import re
+import time
+import calendar
+import numpy
+import Chandra.Time
+
+#
+#--- utc 1998.1.1 in seconds from 1970.1.1 and tt - tai
+#
+UTS_1998 = 883612800.0
+TT_TAI   = 32.184
+#
+#--- tai - utc was 31 sec on 1998.1.1
+#
+TAI_UTC_1998 = 31.0
+
+#---------------------------------------------------------------------------------------
+#-- find_leap_uts: find the leap seconds after 1998.1.1 from Chandra.Time             --
+#---------------------------------------------------------------------------------------
+
+def find_leap_uts():
+    """
+    find the leap seconds after 1998.1.1 from Chandra.Time. a leap second is
+    inserted only at the end of june or december, so the chandra time of jan 1
+    and jul 1 of each year (to the next year) is compared with that without
+    leap seconds
+    input:  none, but read from Chandra.Time
+    output: luts    --- an array of utc seconds from 1970.1.1 when a leap second
+                        was added to tai - utc
+    """
+    uts   = []
+    dates = []
+    for year in range(1998, time.gmtime().tm_year + 2):
+        for [mon, yday] in [[1, 1], [7, 182 + calendar.isleap(year)]]:
+            uts.append(float(calendar.timegm((year, mon, 1, 0, 0, 0))))
+            dates.append('%04d:%03d:00:00:00.000' % (year, yday))
+
+    uts   = numpy.array(uts)
+    secs  = numpy.array([Chandra.Time.DateTime(ent).secs for ent in dates])
+#
+#--- the number of the leap seconds since 1998.1.1 at each of the dates
+#
+    leap  = numpy.round(secs - (uts - UTS_1998 + TT_TAI + TAI_UTC_1998))
+
+    return uts[1:][numpy.diff(leap) > 0]
+
+#
+#--- leap seconds: utc in seconds from 1970.1.1 when tai - utc became the value
+#--- (1999.1.1, 2006.1.1, 2009.1.1, 2012.7.1, 2015.7.1, 2017.1.1, ...)
+#
+LEAP_UTS     = find_leap_uts()
+#
+#--- the same leap second times in chandra time
+#
+LEAP_SECS    = LEAP_UTS - UTS_1998 + TT_TAI + TAI_UTC_1998 + numpy.arange(1, len(LEAP_UTS) + 1)
+#
+#--- date string formats read without Chandra.Time
+#
+YDAY_FMT = re.compile(r'^(\d{4}):(\d{1,3})(?::(\d{1,2}))?(?::(\d{1,2}))?(?::(\d{1,2}(?:\.\d*)?))?$')
+ISO_FMT  = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})' \
+                      + r'(?:[T ](\d{1,2}):(\d{1,2})(?::(\d{1,2}(?:\.\d*)?))?)?$')
+#
+#--- memo cache of the converted date strings: <date string> ---> chandra time
+#
+DATE_CACHE     = {}
+MAX_CACHE_SIZE = 200000
+
+#---------------------------------------------------------------------------------------
+#-- uts_to_secs: convert utc seconds from 1970.1.1 to chandra time                    --
+#---------------------------------------------------------------------------------------
+
+def uts_to_secs(uts):
+    """
+    convert utc seconds from 1970.1.1 to chandra time
+    input:  uts     --- time or a list of time in utc seconds from 1970.1.1
+    output: secs    --- time (or an array of time) in seconds from 1998.1.1
+    """
+    [uts, scalar] = to_array(uts)
+
+    leap = numpy.searchsorted(LEAP_UTS, uts, side='right')
+    secs = uts - UTS_1998 + TT_TAI + TAI_UTC_1998 + leap
+
+    return give_output(secs, scalar)
+
+#---------------------------------------------------------------------------------------
+#-- secs_to_uts: convert chandra time to utc seconds from 1970.1.1                    --
+#---------------------------------------------------------------------------------------
+
+def secs_to_uts(secs):
+    """
+    convert chandra time to utc seconds from 1970.1.1. a time inside of a leap
+    second is given as the last second of the day
+    input:  secs    --- time or a list of time in seconds from 1998.1.1
+    output: uts     --- time (or an array of time) in utc seconds from 1970.1.1
+    """
+    [secs, scalar] = to_array(secs)
+
+    leap = numpy.searchsorted(LEAP_SECS, secs, side='right')
+    uts  = secs + UTS_1998 - TT_TAI - TAI_UTC_1998 - leap
+#
+#--- remove the rounding error of tt - tai (to a micro second)
+#
+    uts  = numpy.round(uts, 6)
+#
+#--- inside of a leap second
+#
+    lsec = numpy.append(LEAP_SECS, numpy.inf)[leap] - 1.0
+    uts  = numpy.where(secs >= lsec, uts - 1.0, uts)
+
+    return give_output(uts, scalar)
+
+#---------------------------------------------------------------------------------------
+#-- now_secs: give the current time in chandra time                                   --
+#---------------------------------------------------------------------------------------
+
+def now_secs():
+    """
+    give the current time in chandra time (whole seconds of utc)
+    input:  none
+    output: secs    --- the current time in seconds from 1998.1.1
+    """
+    return uts_to_secs(float(int(time.time())))
+
+#---------------------------------------------------------------------------------------
+#-- date_to_secs: convert <yyyy>:<ddd>:<hh>:<mm>:<ss> to chandra time                 --
+#---------------------------------------------------------------------------------------
+
+def date_to_secs(dates):
+    """
+    convert date strings to chandra time
+    input:  dates   --- a date or a list of dates in <yyyy>:<ddd>:<hh>:<mm>:<ss>
+                        (<hh>:<mm>:<ss> can be dropped and <ss> can have a fraction)
+                        or <yyyy>-<mm>-<dd>T<hh>:<mm>:<ss>; other formats are
+                        passed to Chandra.Time
+    output: secs    --- time (or an array of time) in seconds from 1998.1.1
+    """
+    scalar = isinstance(dates, str)
+    if scalar:
+        dates = [dates]
+    if len(DATE_CACHE) > MAX_CACHE_SIZE:
+        DATE_CACHE.clear()
+#
+#--- parse the dates not in the cache yet
+#
+    new   = []
+    parts = []
+    for ent in set(dates):
+        if ent in DATE_CACHE:
+            continue
+
+        out = parse_date(ent)
+        if out is None:
+            DATE_CACHE[ent] = Chandra.Time.DateTime(ent).secs
+        else:
+            new.append(ent)
+            parts.append(out)
+
+    if len(new) > 0:
+        parts = numpy.array(parts, dtype=float)
+        secs  = yday_to_secs(parts[:,0], parts[:,1], parts[:,2], parts[:,3], parts[:,4])
+        for k in range(0, len(new)):
+            DATE_CACHE[new[k]] = secs[k]
+
+    secs = numpy.array([DATE_CACHE[ent] for ent in dates], dtype=float)
+
+    return give_output(secs, scalar)
+
+#---------------------------------------------------------------------------------------
+#-- parse_date: split a date string into year, day of year, hour, minute and second   --
+#---------------------------------------------------------------------------------------
+
+def parse_date(date):
+    """
+    split a date string into year, day of year, hour, minute and second
+    input:  date    --- <yyyy>:<ddd>:<hh>:<mm>:<ss> or <yyyy>-<mm>-<dd>T<hh>:<mm>:<ss>
+    output: [year, yday, hh, mm, ss] or None if the format is not recognized
+    """
+    date = date.strip()
+
+    mchk = YDAY_FMT.match(date)
+    if mchk is not None:
+        out = [float(ent) if ent else 0.0 for ent in mchk.groups()]
+        return out
+
+    mchk = ISO_FMT.match(date)
+    if mchk is not None:
+        [year, mon, day, hh, mm, ss] = [float(ent) if ent else 0.0 for ent in mchk.groups()]
+        yday = day_of_year(year, mon, day)
+        return [year, yday, hh, mm, ss]
+
+    return None
+
+#---------------------------------------------------------------------------------------
+#-- secs_to_date: convert chandra time to <yyyy>:<ddd>:<hh>:<mm>:<ss>.<sss>           --
+#---------------------------------------------------------------------------------------
+
+def secs_to_date(secs, decimal=3):
+    """
+    convert chandra time to date strings
+    input:  secs    --- time or a list of time in seconds from 1998.1.1
+            decimal --- the number of the decimal places of seconds: 3 gives
+                        the same format as Chandra.Time.DateTime().date;
+                        0 gives <yyyy>:<ddd>:<hh>:<mm>:<ss>
+    output: date    --- a date (or an array of dates) in <yyyy>:<ddd>:<hh>:<mm>:<ss>.<sss>
+    """
+    [secs, scalar]  = to_array(secs)
+
+    [year, yday, hh, mm, ss] = split_uts(secs_to_uts(secs), decimal)
+    if decimal > 0:
+        fmt = '%04d:%03d:%02d:%02d:%0' + str(decimal + 3) + '.' + str(decimal) + 'f'
+    else:
+        fmt = '%04d:%03d:%02d:%02d:%02d'
+
+    date = numpy.array([fmt % ent for ent in zip(year, yday, hh, mm, ss)])
+
+    return give_output(date, scalar)
+
+#---------------------------------------------------------------------------------------
+#-- yday_to_secs: convert year, day of year, hour, minute and second to chandra time  --
+#---------------------------------------------------------------------------------------
+
+def yday_to_secs(year, yday, hh=0, mm=0, ss=0):
+    """
+    convert year, day of year, hour, minute and second to chandra time
+    input:  year    --- year or a list of year
+            yday    --- day of year
+            hh      --- hour
+            mm      --- minute
+            ss      --- second (can have a fraction)
+    output: secs    --- time (or an array of time) in seconds from 1998.1.1
+    """
+    scalar = (numpy.ndim(year) == 0)
+
+    uts    = yday_to_uts(year, yday, hh, mm, ss)
+
+    return give_output(uts_to_secs(uts), scalar)
+
+#---------------------------------------------------------------------------------------
+#-- yday_to_uts: convert year, day of year, hour, minute and second to utc seconds    --
+#---------------------------------------------------------------------------------------
+
+def yday_to_uts(year, yday, hh=0, mm=0, ss=0):
+    """
+    convert year, day of year, hour, minute and second to utc seconds from 1970.1.1
+    input:  year    --- year or a list of year
+            yday    --- day of year
+            hh      --- hour
+            mm      --- minute
+            ss      --- second (can have a fraction)
+    output: uts     --- time (or an array of time) in utc seconds from 1970.1.1
+    """
+    scalar = (numpy.ndim(year) == 0)
+
+    year  = numpy.asarray(year, dtype=float).astype('int64')
+    days  = (year - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype('int64')
+    days  = days + numpy.asarray(yday, dtype=float) - 1.0
+
+    uts   = days * 86400.0 + numpy.asarray(hh, dtype=float) * 3600.0 \
+                           + numpy.asarray(mm, dtype=float) * 60.0   \
+                           + numpy.asarray(ss, dtype=float)
+
+    return give_output(uts, scalar)
+
+#---------------------------------------------------------------------------------------
+#-- calendar_to_secs: convert calendar date to chandra time                           --
+#---------------------------------------------------------------------------------------
+
+def calendar_to_secs(year, mon, day, hh=0, mm=0, ss=0):
+    """
+    convert calendar date to chandra time
+    input:  year    --- year or a list of year
+            mon     --- month
+            day     --- day of month
+            hh      --- hour
+            mm      --- minute
+            ss      --- second (can have a fraction)
+    output: secs    --- time (or an array of time) in seconds from 1998.1.1
+    """
+    yday = day_of_year(year, mon, day)
+
+    return yday_to_secs(year, yday, hh, mm, ss)
+
+#---------------------------------------------------------------------------------------
+#-- calendar_to_uts: convert calendar date to utc seconds from 1970.1.1               --
+#---------------------------------------------------------------------------------------
+
+def calendar_to_uts(year, mon, day, hh=0, mm=0, ss=0):
+    """
+    convert calendar date to utc seconds from 1970.1.1
+    input:  year    --- year or a list of year
+            mon     --- month
+            day     --- day of month
+            hh      --- hour
+            mm      --- minute
+            ss      --- second (can have a fraction)
+    output: uts     --- time (or an array of time) in utc seconds from 1970.1.1
+    """
+    yday = day_of_year(year, mon, day)
+
+    return yday_to_uts(year, yday, hh, mm, ss)
+
+#---------------------------------------------------------------------------------------
+#-- secs_to_calendar: convert chandra time to calendar date                           --
+#---------------------------------------------------------------------------------------
+
+def secs_to_calendar(secs):
+    """
+    convert chandra time to calendar date
+    input:  secs    --- time or a list of time in seconds from 1998.1.1
+    output: [year, mon, day, hh, mm, ss]    --- int arrays (ss: float) or values
+    """
+    [secs, scalar] = to_array(secs)
+
+    uts   = secs_to_uts(secs)
+    dtime = numpy.floor(uts).astype('int64').astype('datetime64[s]')
+    month = dtime.astype('datetime64[M]')
+
+    year  = dtime.astype('datetime64[Y]').astype('int64') + 1970
+    mon   = month.astype('int64') % 12 + 1
+    day   = (dtime.astype('datetime64[D]') - month.astype('datetime64[D]')).astype('int64') + 1
+    dsec  = uts - dtime.astype('datetime64[D]').astype('int64') * 86400.0
+    hh    = (dsec // 3600).astype('int64')
+    mm    = ((dsec % 3600) // 60).astype('int64')
+    ss    = dsec % 60
+
+    return [give_output(ent, scalar) for ent in [year, mon, day, hh, mm, ss]]
+
+#---------------------------------------------------------------------------------------
+#-- fdoy_to_secs: convert year and fractional day of year to chandra time             --
+#---------------------------------------------------------------------------------------
+
+def fdoy_to_secs(year, fyday, truncate=False):
+    """
+    convert year and fractional day of year to chandra time
+    input:  year    --- year or a list of year
+            fyday   --- fractional day of year (<ddd>.<fraction>)
+            truncate--- if True, drop the fraction of seconds
+    output: secs    --- time (or an array of time) in seconds from 1998.1.1
+    """
+    fyday = numpy.asarray(fyday, dtype=float)
+    yday  = numpy.floor(fyday)
+    dsec  = (fyday - yday) * 86400.0
+    if truncate:
+        dsec = numpy.floor(dsec + 1.0e-6)
+
+    return yday_to_secs(year, yday, 0, 0, dsec)
+
+#---------------------------------------------------------------------------------------
+#-- secs_to_fdoy: convert chandra time to year and fractional day of year             --
+#---------------------------------------------------------------------------------------
+
+def secs_to_fdoy(secs):
+    """
+    convert chandra time to year and fractional day of year
+    input:  secs    --- time or a list of time in seconds from 1998.1.1
+    output: year    --- int array of year (or a value)
+            fyday   --- array of fractional day of year (<ddd>.<fraction>)
+    """
+    [secs, scalar] = to_array(secs)
+
+    uts   = secs_to_uts(secs)
+    dtime = numpy.floor(uts).astype('int64').astype('datetime64[s]')
+    ystart= dtime.astype('datetime64[Y]')
+
+    year  = ystart.astype('int64') + 1970
+    fyday = (uts - ystart.astype('datetime64[s]').astype('int64')) / 86400.0 + 1.0
+
+    return [give_output(year, scalar), give_output(fyday, scalar)]
+
+#---------------------------------------------------------------------------------------
+#-- split_uts: split utc seconds into year, day of year, hour, minute and second      --
+#---------------------------------------------------------------------------------------
+
+def split_uts(uts, decimal=0):
+    """
+    split utc seconds from 1970.1.1 into year, day of year, hour, minute and second
+    input:  uts     --- an array of time in utc seconds from 1970.1.1
+            decimal --- the number of the decimal places kept in seconds
+    output: [year, yday, hh, mm, ss]    --- int arrays (ss: float if decimal > 0)
+    """
+    scale = 10 ** decimal
+    units = numpy.round(numpy.asarray(uts, dtype=float) * scale).astype('int64')
+    dtime = (units // scale).astype('datetime64[s]')
+    day   = dtime.astype('datetime64[D]')
+
+    year  = dtime.astype('datetime64[Y]').astype('int64') + 1970
+    yday  = (day - dtime.astype('datetime64[Y]').astype('datetime64[D]')).astype('int64') + 1
+    dsec  = (dtime - day).astype('int64')
+    hh    = dsec // 3600
+    mm    = (dsec % 3600) // 60
+    ss    = dsec % 60
+    if decimal > 0:
+        ss = ss + (units % scale) / scale
+
+    return [year, yday, hh, mm, ss]
+
+#---------------------------------------------------------------------------------------
+#-- day_of_year: give day of year of calendar date                                    --
+#---------------------------------------------------------------------------------------
+
+def day_of_year(year, mon, day):
+    """
+    give day of year of calendar date
+    input:  year    --- year or a list of year
+            mon     --- month
+            day     --- day of month
+    output: yday    --- day of year (an int array or a value)
+    """
+    year  = numpy.asarray(year, dtype=float).astype('int64')
+    mon   = numpy.asarray(mon,  dtype=float).astype('int64')
+    day   = numpy.asarray(day,  dtype=float).astype('int64')
+
+    month = ((year - 1970) * 12 + mon - 1).astype('datetime64[M]')
+    ystart= (year - 1970).astype('datetime64[Y]')
+    yday  = (month.astype('datetime64[D]') - ystart.astype('datetime64[D]')).astype('int64')
+
+    return yday + day
+
+#---------------------------------------------------------------------------------------
+#-- to_array: make an array from a value or a list                                    --
+#---------------------------------------------------------------------------------------
+
+def to_array(val):
+    """
+    make a float array from a value or a list
+    input:  val     --- a value or a list of values
+    output: [<array>, <True if the input is a single value>]
+    """
+    scalar = (numpy.ndim(val) == 0)
+
+    return [numpy.atleast_1d(numpy.asarray(val, dtype=float)), scalar]
+
+#---------------------------------------------------------------------------------------
+#-- give_output: give a single value if the input was a single value                  --
+#---------------------------------------------------------------------------------------
+
+def give_output(arr, scalar):
+    """
+    give a single value if the input was a single value
+    input:  arr     --- an array
+            scalar  --- True if the input was a single value
+    output: arr or its (only) element
+    """
+    if scalar:
+        return numpy.atleast_1d(arr)[0].item()
+
+    return arr
@@ -0,0 +1,223 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       time_index.py: find time windows and neighbors in a sorted time list        #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the functions use a binary search (bisect for a single time and numpy.searchsorted
+#   for an array of times) on a time list sorted in the increasing order, instead of
+#   scanning the list from the top.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import time_index as tix
+#       [i0, i1] = tix.find_window(t_list, start, stop)     #--- t_list[i0:i1]
+#       k        = tix.find_previous(t_list, atime)
+#
+
+import bisect
+import numpy
+
+#---------------------------------------------------------------------------------------
+#-- search_sorted: binary search of a time or an array of times                       --
+#---------------------------------------------------------------------------------------
+
+def search_sorted(times, t, side='left'):
+    """
+    binary search of a time or an array of times
+    input:  times   --- a list (or array) of time sorted in the increasing order
+            t       --- time or an array of time
+            side    --- 'left':  give the first index i with times[i] >= t
+                        'right': give the first index i with times[i] >  t
+    output: index (int) or an int array of indices
+    """
+    if numpy.ndim(t) == 0:
+        if side == 'left':
+            return bisect.bisect_left(times, t)
+        else:
+            return bisect.bisect_right(times, t)
+
+    return numpy.searchsorted(numpy.asarray(times), t, side=side)
+
+#---------------------------------------------------------------------------------------
+#-- find_previous: find the index of the last time before the time                   --
+#---------------------------------------------------------------------------------------
+
+def find_previous(times, t, inclusive=True):
+    """
+    find the index of the last time before the time
+    input:  times       --- a list of time sorted in the increasing order
+            t           --- time or an array of time
+            inclusive   --- if True, times[i] <= t; otherwise times[i] < t
+    output: index (or an array of indices); -1 if there is no such time
+    """
+    if inclusive:
+        return search_sorted(times, t, side='right') - 1
+    else:
+        return search_sorted(times, t, side='left')  - 1
+
+#---------------------------------------------------------------------------------------
+#-- find_next: find the index of the first time after the time                        --
+#---------------------------------------------------------------------------------------
+
+def find_next(times, t, inclusive=True):
+    """
+    find the index of the first time after the time
+    input:  times       --- a list of time sorted in the increasing order
+            t           --- time or an array of time
+            inclusive   --- if True, times[i] >= t; otherwise times[i] > t
+    output: index (or an array of indices); len(times) if there is no such time
+    """
+    if inclusive:
+        return search_sorted(times, t, side='left')
+    else:
+        return search_sorted(times, t, side='right')
+
+#---------------------------------------------------------------------------------------
+#-- find_window: find the index range of the times in a time window                   --
+#---------------------------------------------------------------------------------------
+
+def find_window(times, start=None, stop=None, include_stop=False):
+    """
+    find the index range of the times in start <= time < stop
+    input:  times           --- a list of time sorted in the increasing order
+            start           --- starting time; if None, from the beginning
+            stop            --- stopping time; if None, to the end
+            include_stop    --- if True, the window is start <= time <= stop
+    output: [i0, i1]        --- times[i0:i1] are in the window
+    """
+    if start is None:
+        i0 = 0
+    else:
+        i0 = find_next(times, start)
+
+    if stop is None:
+        i1 = len(times)
+    elif include_stop:
+        i1 = find_next(times, stop, inclusive=False)
+    else:
+        i1 = find_next(times, stop)
+
+    return [i0, max(i0, i1)]
+
+#---------------------------------------------------------------------------------------
+#-- find_nearest: find the index of the time closest to the time                      --
+#---------------------------------------------------------------------------------------
+
+def find_nearest(times, t):
+    """
+    find the index of the time closest to the time; if the time is in the
+    middle of two, the later one
+    input:  times   --- a list of time sorted in the increasing order (not empty)
+            t       --- time
+    output: index
+    """
+    k = find_previous(times, t)
+    if k < 0:
+        return 0
+    if k >= len(times) - 1:
+        return len(times) - 1
+
+    if (times[k+1] - t) > (t - times[k]):
+        return k
+    else:
+        return k + 1
+
+#---------------------------------------------------------------------------------------
+#-- find_bracket: find the interval which contains the time                           --
+#---------------------------------------------------------------------------------------
+
+def find_bracket(times, t):
+    """
+    find the interval which contains the time
+    input:  times   --- a list of time sorted in the increasing order
+            t       --- time
+    output: k       --- index of the first interval with times[k-1] <= t <= times[k];
+                        -1 if t is out of the range of the times
+    """
+    if len(times) < 2 or t < times[0] or t > times[-1]:
+        return -1
+
+    return max(find_next(times, t), 1)
+
+#---------------------------------------------------------------------------------------
+#-- interpolate: linearly interpolate values at the time                              --
+#---------------------------------------------------------------------------------------
+
+def interpolate(times, values, t):
+    """
+    linearly interpolate values at the time
+    input:  times   --- a list of time sorted in the increasing order
+            values  --- a list of values (or of lists of values) at the times
+            t       --- time
+    output: the interpolated value (a numpy array if values are lists);
+            None if t is out of the range of the times
+    """
+    k = find_bracket(times, t)
+    if k < 0:
+        return None
+
+    ratio = (t - times[k-1]) / (times[k] - times[k-1])
+    v0    = numpy.asarray(values[k-1], dtype=float)
+    v1    = numpy.asarray(values[k],   dtype=float)
+
+    return v0 + (v1 - v0) * ratio
+
+#---------------------------------------------------------------------------------------
+#-- asof_join: match each time of a time list to an entry of another time list        --
+#---------------------------------------------------------------------------------------
+
+def asof_join(left_times, right_times, right_values=None, direction='backward', fill=None):
+    """
+    match each time of a time list to an entry of another time list ("as-of" join)
+    input:  left_times  --- a list of time to find the matches
+            right_times --- a list of time sorted in the increasing order
+            right_values--- a list of values at right_times; if None, only index is given
+            direction   --- 'backward': the last right time <= the left time
+                            'forward':  the first right time >= the left time
+                            'nearest':  the closest right time (the later one at a tie)
+            fill        --- the value used when there is no match
+    output: values      --- an array of the matched values aligned to left_times 
+                            (None if right_values is None)
+            index       --- an int array of the matched index of right_times (-1: no match)
+    """
+    right = numpy.asarray(right_times, dtype=float)
+    left  = numpy.asarray(left_times,  dtype=float)
+    rlen  = len(right)
+
+    if direction == 'backward':
+        index = numpy.searchsorted(right, left, side='right') - 1
+
+    elif direction == 'forward':
+        index = numpy.searchsorted(right, left, side='left')
+        index = numpy.where(index >= rlen, -1, index)
+
+    elif direction == 'nearest':
+        prev  = numpy.searchsorted(right, left, side='right') - 1
+        nxt   = prev + 1
+        if rlen == 0:
+            index = prev
+        else:
+            dprev = left - right[numpy.maximum(prev, 0)]
+            dnext = right[numpy.minimum(nxt, rlen - 1)] - left
+            use   = (nxt < rlen) & ((prev < 0) | (dnext <= dprev))
+            index = numpy.where(use, nxt, prev)
+    else:
+        raise ValueError('Unknown direction: ' + str(direction))
+
+    if right_values is None:
+        return [None, index]
+
+    if rlen == 0:
+        return [numpy.array([fill] * len(left)), index]
+
+    vals   = numpy.asarray(right_values)
+    values = numpy.where(index >= 0, vals[numpy.maximum(index, 0)], fill)
+
+    return [values, index]
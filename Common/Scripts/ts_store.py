@@ -0,0 +1,284 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       ts_store.py: append friendly time series store with a time index            #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   the data are kept in a sqlite table keyed by time, so that appending new rows
+#   and reading a short time window out of a multi-year archive do not need to
+#   parse the whole text archive. the legacy text files are regenerated from the
+#   store with export_text.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+#       import ts_store
+#       store = ts_store.TimeSeriesStore(<db file>, [['flux', 'real'], ...])
+#       store.append([[<time>, <flux>, ...], ...])
+#       [t_list, f_list] = store.range(start, stop, ['flux'])
+#       ltime = store.last_time()
+#
+
+import os
+import sqlite3
+
+#
+#--- column types allowed
+#
+COL_TYPES = ['real', 'integer', 'text']
+
+#---------------------------------------------------------------------------------------
+#-- TimeSeriesStore: time series store with a time index                              --
+#---------------------------------------------------------------------------------------
+
+class TimeSeriesStore():
+    """
+    time series store with a time index. each row is [time, col1, col2, ...];
+    time is unique (a row with the same time replaces the older one).
+
+        dbfile      --- the store file name (sqlite)
+        columns     --- a list of [<column name>, <type>] of the data columns;
+                        type is one of 'real', 'integer' and 'text'
+        time_type   --- the type of the time column: 'real' or 'integer'
+        table       --- the name of the table in the file
+    """
+    def __init__(self, dbfile, columns, time_type='real', table='data'):
+
+        for [name, ctype] in columns:
+            if ctype not in COL_TYPES:
+                raise ValueError('Unknown column type: ' + ctype)
+
+        if time_type not in ['real', 'integer']:
+            raise ValueError('Unknown time type: ' + time_type)
+
+        self.dbfile  = dbfile
+        self.table   = table
+        self.columns = [ent[0] for ent in columns]
+
+        self.conn    = sqlite3.connect(dbfile)
+#
+#--- time is the primary key; it is also the index used in the range search
+#
+        cols = ', '.join([name + ' ' + ctype for [name, ctype] in columns])
+        cmd  = 'CREATE TABLE IF NOT EXISTS ' + table + ' (time ' + time_type.upper()
+        cmd  = cmd + ' PRIMARY KEY, ' + cols + ')'
+        self.conn.execute(cmd)
+#
+#--- key/value table for the bookkeeping (e.g. header lines, file offsets)
+#
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.conn.commit()
+
+    def close(self):
+        """
+        close the store
+        """
+        self.conn.close()
+
+    def check_columns(self, columns):
+        """
+        check the column names and give the select part of a query
+        input:  columns --- a list of column names; if None, all columns
+        output: select  --- 'time, <col1>, <col2>...'
+        """
+        if columns is None:
+            columns = self.columns
+
+        for name in columns:
+            if name not in self.columns:
+                raise ValueError('Unknown column: ' + name)
+
+        return ', '.join(['time'] + list(columns))
+
+    def append(self, rows):
+        """
+        append rows to the store; a row with the existing time replaces the older one
+        input:  rows    --- a list of [time, col1, col2, ...]
+        output: nrow    --- the number of the rows written
+        """
+        rows = [tuple(row) for row in rows]
+        if len(rows) == 0:
+            return 0
+
+        hold = ', '.join(['?'] * (len(self.columns) + 1))
+        cmd  = 'INSERT OR REPLACE INTO ' + self.table + ' VALUES (' + hold + ')'
+        with self.conn:
+            self.conn.executemany(cmd, rows)
+
+        return len(rows)
+
+    def rows(self, start=None, stop=None, columns=None, reverse=False):
+        """
+        give the rows in the time range start <= time < stop
+        input:  start   --- starting time; if None, from the beginning
+                stop    --- stopping time; if None, to the end
+                columns --- a list of column names; if None, all columns
+                reverse --- if True, the newest row comes first
+        output: a list of tuples of (time, col1, col2, ...)
+        """
+        select = self.check_columns(columns)
+
+        cond   = []
+        args   = []
+        if start is not None:
+            cond.append('time >= ?')
+            args.append(start)
+        if stop is not None:
+            cond.append('time < ?')
+            args.append(stop)
+
+        cmd = 'SELECT ' + select + ' FROM ' + self.table
+        if len(cond) > 0:
+            cmd = cmd + ' WHERE ' + ' AND '.join(cond)
+        if reverse:
+            cmd = cmd + ' ORDER BY time DESC'
+        else:
+            cmd = cmd + ' ORDER BY time'
+
+        return self.conn.execute(cmd, args).fetchall()
+
+    def range(self, start=None, stop=None, columns=None):
+        """
+        give the data in the time range start <= time < stop in a list of lists
+        input:  start   --- starting time; if None, from the beginning
+                stop    --- stopping time; if None, to the end
+                columns --- a list of column names; if None, all columns
+        output: a list of lists: [t_list, col1_list, col2_list, ...]
+        """
+        if columns is None:
+            columns = self.columns
+
+        out  = [[] for k in range(0, len(columns) + 1)]
+        for row in self.rows(start, stop, columns):
+            for k in range(0, len(row)):
+                out[k].append(row[k])
+
+        return out
+
+    def previous(self, atime, columns=None):
+        """
+        give the last row before the time
+        input:  atime   --- time
+                columns --- a list of column names; if None, all columns
+        output: a tuple of (time, col1, col2, ...) or None if there is no row
+        """
+        select = self.check_columns(columns)
+        cmd    = 'SELECT ' + select + ' FROM ' + self.table
+        cmd    = cmd + ' WHERE time < ? ORDER BY time DESC LIMIT 1'
+
+        return self.conn.execute(cmd, [atime]).fetchone()
+
+    def last_time(self):
+        """
+        give the time of the last row
+        input:  none
+        output: the last time or None if the store is empty
+        """
+        return self.conn.execute('SELECT MAX(time) FROM ' + self.table).fetchone()[0]
+
+    def clear(self):
+        """
+        remove all rows from the store
+        """
+        with self.conn:
+            self.conn.execute('DELETE FROM ' + self.table)
+
+    def get_meta(self, key, default=None):
+        """
+        give the bookkeeping value of the key
+        input:  key     --- key
+                default --- the value returned if the key is not set
+        output: value   --- string value
+        """
+        out = self.conn.execute('SELECT value FROM meta WHERE key = ?', [key]).fetchone()
+        if out is None:
+            return default
+
+        return out[0]
+
+    def set_meta(self, key, value):
+        """
+        set the bookkeeping value of the key
+        input:  key     --- key
+                value   --- string value
+        """
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', [key, str(value)])
+
+    def import_text(self, ifile, parser, incremental=True):
+        """
+        read a text archive into the store. with incremental, only the lines added
+        after the last import are read (if the file becomes shorter, the store is
+        cleared and the whole file is read again)
+        input:  ifile       --- text file name
+                parser      --- function which takes a line (without the newline)
+                                and gives a row [time, col1, ...] or None to skip it
+                incremental --- if True, start from the end of the last import
+        output: nrow        --- the number of the rows read
+        """
+        if not os.path.isfile(ifile):
+            return 0
+
+        key    = 'offset:' + os.path.abspath(ifile)
+        offset = 0
+        if incremental:
+            offset = int(self.get_meta(key, 0))
+            if os.path.getsize(ifile) < offset:
+                self.clear()
+                offset = 0
+
+        with open(ifile, 'rb') as f:
+            f.seek(offset)
+            text = f.read()
+#
+#--- a partly written last line is read next time
+#
+        pos  = text.rfind(b'\n') + 1
+        rows = []
+        for line in text[:pos].decode(errors='replace').split('\n'):
+            row = parser(line)
+            if row is not None:
+                rows.append(row)
+
+        nrow = self.append(rows)
+        self.set_meta(key, offset + pos)
+
+        return nrow
+
+    def export_text(self, ofile, formatter, start=None, stop=None, header=None,\
+                    reverse=False, mode='w'):
+        """
+        write the rows in start <= time < stop to a text file
+        input:  ofile       --- output file name
+                formatter   --- function which takes a row tuple (time, col1, ...)
+                                and gives a line (with the newline)
+                start       --- starting time; if None, from the beginning
+                stop        --- stopping time; if None, to the end
+                header      --- a list of header lines (without the newline)
+                reverse     --- if True, the newest row comes first
+                mode        --- 'w': replace the file; the file is written in a
+                                     temporary file and moved at the end
+                                'a': append to the file
+        output: ofile
+        """
+        rows = self.rows(start, stop, reverse=reverse)
+
+        line = ''
+        if header is not None:
+            for ent in header:
+                line = line + ent + '\n'
+        line = line + ''.join([formatter(row) for row in rows])
+
+        if mode == 'a':
+            with open(ofile, 'a') as fo:
+                fo.write(line)
+        else:
+            tfile = ofile + '.tmp'
+            with open(tfile, 'w') as fo:
+                fo.write(line)
+            os.replace(tfile, ofile)
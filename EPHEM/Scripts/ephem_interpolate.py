@@ -37,6 +37,8 @@ if (os.getenv('TEST') == 'TEST'):
 #
 sys.path.append(bin_dir)
 sys.path.append(mta_dir)
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_index as tix
 #
 #--- temp writing file name
 #
@@ -69,13 +71,11 @@ def ephem_interpolate():
     t_list = []
     d_list = []
     for ent in data:
-        atemp = re.split('\s+', ent)
-        t_list.append(float(atemp[0]))
+        t_list.append(float(ent.split(None, 1)[0]))
         d_list.append(ent)
 #
 #--- if the current data is outside of the data, stop
 #
-    t_len = len(t_list)
     if now < t_list[0]:
         print("Outside of the data range")
         exit(1)
@@ -85,52 +85,52 @@ def ephem_interpolate():
 #
 #--- find the time interval that the current time drops between
 #
-    for  k in range(1, t_len):
-        if (now >= t_list[k-1]) and (now <= t_list[k]):
+    k = tix.find_bracket(t_list, now)
+    if k < 0:
+        print("Outside of the data range")
+        exit(1)
 #
 #--- interpolate the postion
 #
-            ratio = (now - t_list[k-1]) / (t_list[k] - t_list[k-1])
+    ratio = (now - t_list[k-1]) / (t_list[k] - t_list[k-1])
 
-            atemp = re.split('\s+', d_list[k-1])
-            btemp = re.split('\s+', d_list[k])
+    atemp = re.split('\s+', d_list[k-1])
+    btemp = re.split('\s+', d_list[k])
 
-            line  = ''
-            dsum1 = 0
-            dsum2 = 0
+    line  = ''
+    dsum1 = 0
+    dsum2 = 0
 #
 #--- go through x, y, z and vx, vy, vz
 #
-            for m in range(1, 7):
-                sval = float(atemp[m])
-                tval = float(btemp[m])
-                est  = sval + (tval - sval) * ratio
-                line = line + "%16.3f" % est
-                if m in [1, 2, 3]:
-                    dsum1 += sval * sval
-                    dsum2 += tval * tval
+    for m in range(1, 7):
+        sval = float(atemp[m])
+        tval = float(btemp[m])
+        est  = sval + (tval - sval) * ratio
+        line = line + "%16.3f" % est
+        if m in [1, 2, 3]:
+            dsum1 += sval * sval
+            dsum2 += tval * tval
 #
 #--- compute the distrance from the center and ditermine whether the satellite is going up or down
 #
-            dist1 = math.sqrt(dsum1)
-            dist2 = math.sqrt(dsum2)
-            dist  = dist1 +(dist2 - dist1) * ratio
-            ###print("I AM HERE: " + str(dist1) + '<-->' + str(dist2) + '<-->' + str(dist) +'<-->' + str(ratio))
-            if dist1 <= dist2:
-                direct = 'A'
-            else:
-                direct = 'D'
-            sline = "%7d" % dist + ' ' +  direct + line + '\n'
+    dist1 = math.sqrt(dsum1)
+    dist2 = math.sqrt(dsum2)
+    dist  = dist1 +(dist2 - dist1) * ratio
+    ###print("I AM HERE: " + str(dist1) + '<-->' + str(dist2) + '<-->' + str(dist) +'<-->' + str(ratio))
+    if dist1 <= dist2:
+        direct = 'A'
+    else:
+        direct = 'D'
+    sline = "%7d" % dist + ' ' +  direct + line + '\n'
 #
 #--- print out the result
 #
-            outfile = o_file
-            if (os.getenv('TEST') == 'TEST'):
-                outfile = test_out + "/" + os.path.basename(o_file)
-            with open(outfile, 'w') as fo:
-                fo.write(sline)
-            
-            break
+    outfile = o_file
+    if (os.getenv('TEST') == 'TEST'):
+        outfile = test_out + "/" + os.path.basename(o_file)
+    with open(outfile, 'w') as fo:
+        fo.write(sline)
                 
 #-------------------------------------------------------------------------------------
 #-------------------------------------------------------------------------------------
@@ -0,0 +1,221 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#####################################################################################
+#                                                                                   #
+#       geopack_cache.py: cache the geopack.recalc rotations by time                #
+#                                                                                   #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                               #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+#
+#   geopack.recalc sets the gei -> geo -> gsm and gsm -> gse rotations for one time
+#   (it also computes the igrf coefficients, which makes it expensive). this module
+#   runs recalc once for each time (or time bucket), keeps the resulting rotation
+#   matrices in a bounded lru cache, and rotates arrays of coordinates with them.
+#
+#   two shared caches:
+#       RECALC_CACHE        --- exact time; the same results as geopack.recalc per row.
+#                               used for the data files (convert_coord, create_orbital_data_files)
+#       RECALC_BUCKET_CACHE --- 30 min buckets with linear interpolation; the position
+#                               error is below 5.e-4 of the distance (0.01 re at the xmm
+#                               apogee). used for the plots (XMM/Scripts/plot_gsm_orbits*.py)
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/EPHEM/Scripts/')
+#       import geopack_cache as gpc
+#       [gsm, gse] = gpc.gei_to_gsm(uts, pos)
+#
+#   note: recalc sets the geopack global state which other geopack functions use.
+#         gei_to_gsm leaves it set for the last time of the list, as a row by row
+#         loop of recalc does.
+#
+
+import sys
+import math
+import numpy
+from collections import OrderedDict
+sys.path.append('/data/mta4/Script/Python3.10/lib/python3.10/site-packages')
+from geopack  import geopack
+
+#---------------------------------------------------------------------------------------
+#-- compute_recalc_matrices: run geopack.recalc and read off the rotation matrices    --
+#---------------------------------------------------------------------------------------
+
+def compute_recalc_matrices(uts):
+    """
+    run geopack.recalc for the time and read off the rotation matrices by
+    transforming the three unit vectors at once
+    input:  uts     --- ut in seconds from 1970.1.1
+    output: mgsm    --- (3, 3) gei -> gsm rotation matrix
+            mgse    --- (3, 3) gsm -> gse rotation matrix
+    """
+    unit = numpy.identity(3)
+
+    geopack.recalc(uts)
+
+    xgeo, ygeo, zgeo = geopack.geigeo(unit[0], unit[1], unit[2], 1)
+    mgsm = numpy.array(geopack.geogsm(xgeo, ygeo, zgeo, 1))
+    mgse = numpy.array(geopack.gsmgse(unit[0], unit[1], unit[2], 1))
+
+    return [mgsm, mgse]
+
+#---------------------------------------------------------------------------------------
+#-- RecalcCache: lru cache of the geopack.recalc rotation matrices                    --
+#---------------------------------------------------------------------------------------
+
+class RecalcCache():
+    """
+    lru cache of the geopack.recalc rotation matrices.
+
+        bucket      --- width of the time bucket in seconds. if it is 0 (default), the
+                        matrices are computed for the exact time (the results are the
+                        same as calling geopack.recalc for each row). if it is > 0, the
+                        matrices are computed at the bucket edges, floor(uts/bucket) * bucket,
+                        only.
+        interpolate --- if True, the matrices are linearly interpolated between the
+                        two edges of the bucket; otherwise the lower edge is used.
+                        (used only if bucket > 0)
+        tolerance   --- if the elements of the matrices at the two edges differ more
+                        than this, the bucket is not used and the matrices are computed
+                        for the exact time. (used only if interpolate is True)
+        maxsize     --- the maximum number of times kept in the cache
+    """
+    def __init__(self, bucket=0.0, interpolate=False, tolerance=1.0e-4, maxsize=8192):
+
+        self.bucket      = float(bucket)
+        self.interpolate = interpolate
+        self.tolerance   = tolerance
+        self.maxsize     = maxsize
+        self.cache       = OrderedDict()
+
+    def lookup(self, uts):
+        """
+        give the rotation matrices at the time, computing them if not in the cache
+        input:  uts     --- ut in seconds from 1970.1.1
+        output: mgsm    --- (3, 3) gei -> gsm rotation matrix
+                mgse    --- (3, 3) gsm -> gse rotation matrix
+        """
+        uts = float(uts)
+        if uts in self.cache:
+            self.cache.move_to_end(uts)
+            return self.cache[uts]
+
+        out = compute_recalc_matrices(uts)
+        self.cache[uts] = out
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+        return out
+
+    def get(self, uts):
+        """
+        give the rotation matrices for the time
+        input:  uts     --- ut in seconds from 1970.1.1
+        output: mgsm    --- (3, 3) gei -> gsm rotation matrix
+                mgse    --- (3, 3) gsm -> gse rotation matrix
+        """
+        if self.bucket <= 0.0:
+            return self.lookup(uts)
+
+        tstart = math.floor(uts / self.bucket) * self.bucket
+        if not self.interpolate:
+            return self.lookup(tstart)
+
+        if tstart == uts:
+            return self.lookup(uts)
+
+        [gsm1, gse1] = self.lookup(tstart)
+        [gsm2, gse2] = self.lookup(tstart + self.bucket)
+
+        diff = max(numpy.max(numpy.abs(gsm2 - gsm1)), numpy.max(numpy.abs(gse2 - gse1)))
+        if diff > self.tolerance:
+            return self.lookup(uts)
+
+        ratio = (uts - tstart) / self.bucket
+
+        return [gsm1 + ratio * (gsm2 - gsm1), gse1 + ratio * (gse2 - gse1)]
+
+    def get_array(self, uts):
+        """
+        give the rotation matrices for a list of times
+        input:  uts     --- a list of ut in seconds from 1970.1.1
+        output: mgsm    --- (n, 3, 3) array of gei -> gsm rotation matrices
+                mgse    --- (n, 3, 3) array of gsm -> gse rotation matrices
+        """
+        ulist, uinv = numpy.unique(numpy.array(uts, dtype=float), return_inverse=True)
+
+        mgsm = numpy.zeros((len(ulist), 3, 3))
+        mgse = numpy.zeros((len(ulist), 3, 3))
+        for k in range(0, len(ulist)):
+            [mgsm[k], mgse[k]] = self.get(ulist[k])
+
+        return [mgsm[uinv.ravel()], mgse[uinv.ravel()]]
+
+    def clear(self):
+        """
+        remove all entries from the cache
+        """
+        self.cache.clear()
+#
+#--- the caches shared by the scripts in the same process (see the header)
+#
+RECALC_CACHE        = RecalcCache()
+RECALC_BUCKET_CACHE = RecalcCache(bucket=1800.0, interpolate=True, tolerance=0.05)
+
+#---------------------------------------------------------------------------------------
+#-- gei_to_gsm: convert gei coordinates into gsm and gse coordinates                  --
+#---------------------------------------------------------------------------------------
+
+def gei_to_gsm(uts, pos, cache=None):
+    """
+    convert gei coordinates into gsm and gse coordinates
+    input:  uts     --- a list of ut in seconds from 1970.1.1
+            pos     --- (n, 3) array of gei x, y, z coordinates
+            cache   --- RecalcCache to use; default: RECALC_CACHE
+    output: gsm     --- (n, 3) array of gsm coordinates (in the unit of pos)
+            gse     --- (n, 3) array of gse coordinates (in the unit of pos)
+    """
+    if cache is None:
+        cache = RECALC_CACHE
+
+    pos = numpy.array(pos, dtype=float).reshape((-1, 3))
+
+    [mgsm, mgse] = cache.get_array(uts)
+
+    gsm = numpy.einsum('kij,kj->ki', mgsm, pos)
+    gse = numpy.einsum('kij,kj->ki', mgse, gsm)
+#
+#--- leave the geopack global state at the last time (the matrices came from the
+#--- cache, so recalc may have been run last for some other time)
+#
+    if len(pos) > 0:
+        geopack.recalc(float(numpy.ravel(uts)[-1]))
+
+    return [gsm, gse]
+
+#---------------------------------------------------------------------------------------
+#-- sphcar_array: convert arrays of cartesian coordinates to spherical coordinates    --
+#---------------------------------------------------------------------------------------
+
+def sphcar_array(x, y, z):
+    """
+    convert arrays of cartesian coordinates to spherical coordinates; the same
+    computation as geopack.sphcar(x, y, z, -1) on arrays
+    input:  x, y, z --- arrays of cartesian coordinates
+    output: r       --- array of distance
+            t       --- array of co-latitude (rad)
+            p       --- array of longitude (rad; 0 - 2pi)
+    """
+    x  = numpy.asarray(x, dtype=float)
+    y  = numpy.asarray(y, dtype=float)
+    z  = numpy.asarray(z, dtype=float)
+
+    sq = x**2 + y**2
+    r  = numpy.sqrt(sq + z**2)
+    t  = numpy.arctan2(numpy.sqrt(sq), z)
+    p  = numpy.where(sq != 0, numpy.arctan2(y, x), 0.0)
+    p  = numpy.where(p < 0, p + 2.0 * math.pi, p)
+
+    return [r, t, p]
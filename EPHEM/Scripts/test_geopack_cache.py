@@ -0,0 +1,99 @@
+#####################################################################################
+#                                                                                   #
+#       test_geopack_cache.py: test the cached geopack.recalc rotations             #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+numpy = pytest.importorskip('numpy')
+pytest.importorskip('geopack')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import geopack_cache as gpc
+from geopack import geopack
+
+#
+#--- 2024:061 in utc seconds from 1970.1.1, every 10 min for 3 hours
+#
+UTS = 1709251200.0 + 600.0 * numpy.arange(0, 18)
+POS = numpy.column_stack([1.0e5 * numpy.cos(UTS / 1.0e4), 5.0e4 * numpy.sin(UTS / 1.0e4),\
+                          2.0e4 * numpy.ones(len(UTS))])
+
+def recalc_per_row(uts, pos):
+    """
+    the row by row computation which gei_to_gsm replaces
+    """
+    gsm = []
+    gse = []
+    for k in range(0, len(uts)):
+        geopack.recalc(uts[k])
+        [x, y, z]    = geopack.geigeo(pos[k][0], pos[k][1], pos[k][2], 1)
+        [x, y, z]    = geopack.geogsm(x, y, z, 1)
+        gsm.append([x, y, z])
+        gse.append(list(geopack.gsmgse(x, y, z, 1)))
+
+    return [numpy.array(gsm), numpy.array(gse)]
+
+#-----------------------------------------------------------------------------
+
+def test_exact_cache_matches_recalc_per_row():
+    """
+    the exact time cache gives the same coordinates as recalc for each row
+    """
+    [gsm0, gse0] = recalc_per_row(UTS, POS)
+    [gsm, gse]   = gpc.gei_to_gsm(UTS, POS, cache=gpc.RecalcCache())
+
+    assert numpy.allclose(gsm, gsm0, rtol=0, atol=1.0e-6)
+    assert numpy.allclose(gse, gse0, rtol=0, atol=1.0e-6)
+
+#-----------------------------------------------------------------------------
+
+def test_bucket_cache_error():
+    """
+    the 30 min bucket interpolation is within 5.e-4 of the distance
+    """
+    [gsm0, gse0] = recalc_per_row(UTS, POS)
+    [gsm, gse]   = gpc.gei_to_gsm(UTS, POS,\
+                        cache=gpc.RecalcCache(bucket=1800.0, interpolate=True, tolerance=0.05))
+
+    dist = numpy.sqrt(numpy.sum(POS**2, axis=1))
+    assert numpy.all(numpy.sqrt(numpy.sum((gsm - gsm0)**2, axis=1)) < 5.0e-4 * dist)
+    assert numpy.all(numpy.sqrt(numpy.sum((gse - gse0)**2, axis=1)) < 5.0e-4 * dist)
+
+#-----------------------------------------------------------------------------
+
+def test_lru_and_repeated_times():
+    """
+    a repeated time is computed once; the oldest time is dropped at maxsize
+    """
+    cache = gpc.RecalcCache(maxsize=3)
+    [mgsm, mgse] = cache.get_array([UTS[0], UTS[1], UTS[0], UTS[2]])
+
+    assert mgsm.shape == (4, 3, 3)
+    assert numpy.array_equal(mgsm[0], mgsm[2])
+    assert list(cache.cache.keys()) == [UTS[0], UTS[1], UTS[2]]
+
+    cache.get(UTS[0])
+    cache.get(UTS[3])
+    assert list(cache.cache.keys()) == [UTS[2], UTS[0], UTS[3]]
+
+#-----------------------------------------------------------------------------
+
+def test_sphcar_array():
+    """
+    the same as geopack.sphcar(x, y, z, -1) on arrays
+    """
+    x = numpy.array([1.0, -1.0, 0.0, 0.0, 3.0])
+    y = numpy.array([1.0, -2.0, 0.0, 2.0, 0.0])
+    z = numpy.array([1.0, 0.5, -1.0, 0.0, 4.0])
+
+    [r, t, p] = gpc.sphcar_array(x, y, z)
+    for k in range(0, len(x)):
+        assert [r[k], t[k], p[k]] == pytest.approx(list(geopack.sphcar(x[k], y[k], z[k], -1)))
@@ -12,10 +12,16 @@
 import os
 import sys
 import time
+import numpy
 import Chandra.Time
-import urllib.request
-import json
 import argparse
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import ts_store
+import month_archive as mar
+import rad_rollups as rrl
+sys.path.append('/data/mta4/Space_Weather/GOES/Scripts/')
+import goes_ingest as gi
+import goes_channels as gc
 
 #
 #--- Define directory pathing
@@ -28,16 +34,16 @@ OUT_DATA_DIR = "/data/mta4/Space_Weather/GOES/Data"
 #
 PLINK = 'https://services.swpc.noaa.gov/json/goes/primary/differential-protons-7-day.json'
 #
-#--- protone energy designations and output file names
-#
-PROTON_LIST = ['1020-1860 keV',   '1900-2300 keV',   '2310-3340 keV',    '3400-6480 keV',\
-               '5840-11000 keV',  '11640-23270 keV', '25900-38100 keV',  '40300-73400 keV',\
-               '83700-98500 keV', '99900-118000 keV','115000-143000 keV','160000-242000 keV',\
-               '276000-404000 keV']
-#
 #--- current goes satellite #
 #
 SATELLITE = "Primary"
+#
+#--- columns of goes_data_r.txt kept in the store (with time in seconds from 1998.1.1)
+#
+STORE_COLS = [['date', 'text'], ['p1',  'real'], ['p2a', 'real'], ['p2b', 'real'],\
+              ['p3',   'real'], ['p4',  'real'], ['p5',  'real'], ['p6',  'real'],\
+              ['p7',   'real'], ['p8a', 'real'], ['p8b', 'real'], ['p8c', 'real'],\
+              ['p9',   'real'], ['p10', 'real'], ['hrc', 'real']]
 
 #----------------------------------------------------------------------------
 #-- collect_goes_long: collect data for the long term use                  --
@@ -50,26 +56,19 @@ def collect_goes_long():
         https://services.swpc.noaa.gov/json/goes/primary/differential-protons-7-day.json
     output: <data_dir>/goes_data_r.txt
                 Time P1  P2A P2B P3  P4  P5  P6  P7  P8A P8B P8C P9  P10 HRC Proxy
+            <data_dir>/goes_data_r.db   --- the store of the same data
+            <data_dir>/Monthly/goes_data_r_<yyyy>_<mm>.txt  --- the monthly files
     """
 #
 #--- find the last entry time
 #
     outfile = f"{GOES_DATA_DIR}/goes_data_r.txt"
-    with open(outfile, 'r') as f:
-        data = [line.strip() for line in f.readlines()]
-        data = [line for line in data if line != '']
-    cut     = 0
-    while cut == 0:
-        atemp = data[-1].split()
-        try:
-            cut     = Chandra.Time.DateTime(atemp[0]).secs
-            break
-        except:
-            data.pop(-1)
-#
-#--- extract proton data
-#
-    p_data = extract_goes_data(PLINK, PROTON_LIST)
+    store   = open_goes_store(outfile)
+    cut     = store.last_time()
+#
+#--- extract proton data newer than the last entry
+#
+    [s_list, p_data] = extract_goes_data(PLINK, gc.PROTON_LIST, cut)
 #
 #--- time list
 #
@@ -78,246 +77,158 @@ def collect_goes_long():
 #
 #--- banch up the fluxes (definition of p values are different from the older ones)
 #
-#    [p1, p2, p3, p4, p5, p6] = compute_p_vals(p_data)
+    flux = gc.channel_array(p_data)
+#    [p1, p2, p3, p4, p5, p6] = gc.compute_p_vals(flux)
 #
 #--- compute hrc proxy
 #
-    hrc_val = compute_hrc(p_data)
+    hrc_val = gc.compute_hrc(flux)
 #
 #--- aline will save the text output of the table which is used by CRM
 #
     line = ''
-
+    rows = []
     for k in range(0, d_len):
-        stime = Chandra.Time.DateTime(t_list[k]).secs
-        if stime <= cut:
-            #If the time is less or equal to this cutoff point, then it's not new data.
-            continue
-        line += f"{t_list[k]}\t\t"
-
+#
+#--- a missing entry has the invalid data marker (-1e5)
+#
+        row = [s_list[k], t_list[k]]
         for m in range(0, 13):
-            try:
-                line += f"{p_data[m][1][k]:1.3e}\t"
-            except:
-                line += "0.0\t"
+            row.append(float(flux[k, m]))
+        row.append(float(hrc_val[k]))
+
+        rows.append(row)
+        line += format_goes_row(row)
 
-        line += f"{hrc_val[k]:5.0f}\t\n"
+    store.append(rows)
+    store.close()
 #
 #---  print out data file for ACIS Rad use
 #
     appendout = f"{OUT_DATA_DIR}/{os.path.basename(outfile)}"
     with open(appendout, 'a') as fo:
         fo.write(line)
-
-#----------------------------------------------------------------------------
-#-- extract_goes_data: extract GOES satellite flux data                    --
-#----------------------------------------------------------------------------
-
-def extract_goes_data(dlink, energy_list):
-    """
-    extract GOES satellite flux data
-    input: dlink        --- json web address
-            energy_list --- a list of energy designation 
-    output: <data_dir>/<out file>
-    """
-#
-#--- read json file from the web
 #
-    try:
-        with urllib.request.urlopen(dlink) as url:
-            data = json.loads(url.read().decode())
-    except:
-        data = []
+#--- copy the new lines into the monthly files
 #
-#--- go through all energy ranges
+    mar.sync(appendout, f"{OUT_DATA_DIR}/Monthly", 'goes_data_r', mar.date_line_time)
 #
-    elen   = len(energy_list)
-    d_save = []
-    for k in range(0, elen):
-        t_list = []
-        f_list = []
-        energy = energy_list[k]
-        last_time = time.strptime(data[0]['time_tag'], '%Y-%m-%dT%H:%M:%SZ')
-        for ent in data:
+#--- and add them to the hourly/daily rollups of the radiation plots
 #
-#--- read time and flux of the given energy range
-#
-            if ent['energy'] == energy:
-                flux  = float(ent['flux']) * 1e3   #--- keV to MeV
-#
-#--- convert time into seconds from 1998.1.1
-#
-                otime = ent['time_tag']
-                #dtime = time.strftime('%Y:%j:%H:%M',    time.strptime(otime, '%Y-%m-%dT%H:%M:%SZ'))
-                otime =  time.strptime(otime, '%Y-%m-%dT%H:%M:%SZ')
+    rrl.update('goes_r', f"{OUT_DATA_DIR}/Monthly")
 
-                #If the otime is more than five minutes after the last_time
-                #then that means the data set is missing an entry for this energy band and zero values should be appened.
-                diff = time.mktime(otime) - time.mktime(last_time)
-                if diff > 300:
-                    #All times should be in divisions of 5 minutes/300 seconds.
-                    for i in range(300,int(diff),300):
-                        missing_time = time.localtime(time.mktime(last_time) + i)
-                        t_list.append(time.strftime('%Y:%j:%H:%M:%S',missing_time))
-                        #mark missing data with the invalid data marker (-1e5)
-                        f_list.append(-1e5)
+#----------------------------------------------------------------------------
+#-- open_goes_store: open the store of goes_data_r.txt                     --
+#----------------------------------------------------------------------------
 
-                #record time as string
-                t_list.append(time.strftime('%Y:%j:%H:%M:%S',otime))
-                f_list.append(flux)
-                last_time = otime
+def open_goes_store(outfile):
+    """
+    open the store of goes_data_r.txt. when the store is new, it is filled
+    from the text file
+    input:  outfile --- <data_dir>/goes_data_r.txt
+    output: store   --- ts_store.TimeSeriesStore of STORE_COLS
+    """
+    store = ts_store.TimeSeriesStore(f"{OUT_DATA_DIR}/goes_data_r.db", STORE_COLS)
 
-        d_save.append([t_list, f_list])
+    if store.last_time() is None:
+        store.import_text(outfile, parse_goes_line, incremental=False)
 
-    return d_save
+    return store
 
 #----------------------------------------------------------------------------
-#-- check_last_entry_time: check the last data entry time of the given data file 
+#-- parse_goes_line: read a line of goes_data_r.txt                        --
 #----------------------------------------------------------------------------
 
-def check_last_entry_time(data):
+def parse_goes_line(line):
     """
-    check the last data entry time of the given data file
-    input:  data    --- data
-    output: ltime   --- the last entry time in seconds from 1998.1.1
+    read a line of goes_data_r.txt
+    input:  line    --- data line
+    output: a row of [time, date, p1, ..., p10, hrc] or None if it is not a data line
     """
+    atemp = line.split()
+    if len(atemp) < 15:
+        return None
+    try:
+        stime = Chandra.Time.DateTime(atemp[0]).secs
+        vals  = [float(val) for val in atemp[1:15]]
+    except:
+        return None
 
-    ent = data[-1]
-    otime = ent['time_tag']
-    otime = time.strftime('%Y:%j:%H:%M:%S', time.strptime(otime, '%Y-%m-%dT%H:%M:%SZ'))
-    stime = int(Chandra.Time.DateTime(otime).secs)
-
-    return stime
+    return [stime, atemp[0]] + vals
 
 #----------------------------------------------------------------------------
-#-- compute_p_vals: create combined flux data for table displays           --
+#-- format_goes_row: create a line of goes_data_r.txt                      --
 #----------------------------------------------------------------------------
 
-def compute_p_vals(data):
+def format_goes_row(row):
     """
-    create combined flux data for table displays
-    input:  data    --- a list of lists of data: [[<time>, <data1>], [<time>, <data2>],...]
-    output: a list of lists of:
-            p1 :  1.0MeV - 3.3MeV
-            p2 :  3.4MeV - 11MeV
-            p3 :  11MeV  - 38MeV
-            p4 :  40MeV  - 98MeV
-            p5 :  99MeV  - 143MeV
-            p6 :  160MeV - 404MeV
+    create a line of goes_data_r.txt
+    input:  row     --- [time, date, p1, ..., p10, hrc]
+    output: line    --- data line
     """
-#
-#--- extract flux data parts
-#
-    c0  = data[0][1]
-    c1  = data[1][1]
-    c2  = data[2][1]
-    c3  = data[3][1]
-    c4  = data[4][1]
-    c5  = data[5][1]
-    c6  = data[6][1]
-    c7  = data[7][1]
-    c8  = data[8][1]
-    c9  = data[9][1]
-    c10 = data[10][1]
-    c11 = data[11][1]
-    c12 = data[12][1]
-#
-#--- combine the data
-#
-    p1 = []             #--- c0 + c1 + c2:  1.0MeV - 3.3MeV
-    p2 = []             #--- c3 + c4:       3.4MeV - 11MeV
-    p3 = []             #--- c5 + c6:       11MeV  - 38MeV
-    p4 = []             #--- c7 + c8:       40MeV  - 98MeV
-    p5 = []             #--- c9 + c10;      99MeV  - 143MeV
-    p6 = []             #--- c11 + c12:     160MeV - 404MeV
-    for  k in range(0, len(c0)):
-        val = (c0[k] *(1.85 - 1.02)  + c1[k] * (2.3 - 1.9) + c2[k]  * (3.3 - 2.3)) / (3.3 -1.0)
-        p1.append(val)
-
-        val = (c3[k] * (6.48 - 3.4) + c4[k] * (11.0 - 5.84)) / (11 - 3.4)
-        p2.append(val)
+    line = f"{row[1]}\t\t"
+    for val in row[2:15]:
+        if val is None:
+            line += "0.0\t"
+        else:
+            line += f"{val:1.3e}\t"
 
-        val = (c5[k] * (23.27-11.64) + c6[k] *(38.1 - 25.9)) / (38.1 - 11.64)
-        p3.append(val)
+    line += f"{row[15]:5.0f}\t\n"
 
-        val = (c7[k] * (73.4 - 40.3)+ c8[k] * (98.5 - 83.7)) / (98.5 - 40.3)
-        p4.append(val)
+    return line
 
-        val = (c9[k] * (118.0 - 99.9) + c10[k] * (143.0 - 115.0)) /( 115 - 99.9)
-        p5.append(val)
+#----------------------------------------------------------------------------
+#-- extract_goes_data: extract GOES satellite flux data                    --
+#----------------------------------------------------------------------------
 
-        val = (c11[k] * (242.0 - 160.0) + c12[k] * (404.0 - 276.0)) / (404. - 160.0)
-        p6.append(val)
+def extract_goes_data(dlink, energy_list, cut=None):
+    """
+    extract GOES satellite flux data
+    input:  dlink       --- json web address or file
+            energy_list --- a list of energy designation 
+            cut         --- if given, only the data after this time (seconds from 1998.1.1)
+    output: s_list      --- a list of time in seconds from 1998.1.1
+            d_save      --- a list of [<time list>, <flux list>] of each energy;
+                            time in <yyyy>:<ddd>:<hh>:<mm>:<ss> and a missing entry is -1e5
+    """
+    try:
+        [s_list, flux] = gi.read_goes_table(dlink, energy_list, factor=1.0e3,\
+                                            start=cut, inclusive=False)
+    except:
+        [s_list, flux] = [[], numpy.zeros((0, len(energy_list)))]
 
-    return [p1, p2, p3, p4, p5, p6]
+    return [list(s_list), gi.to_channel_lists(s_list, flux)]
 
 #----------------------------------------------------------------------------
-#-- compute_hrc: compute hrc proxy value                                   --
+#-- check_last_entry_time: check the last data entry time of the given data file 
 #----------------------------------------------------------------------------
 
-def compute_hrc(data):
+def check_last_entry_time(data):
     """
-    compute hrc proxy value
-
-    HRC_PROXY = 6000 x P4 + 270000 x P5 + 100000 x P6
-        P4 ~ 11640-23270 keV + 25900-38100 keV 
-        P5 ~ 40300-73400 keV, 
-        P6 ~ 83700-98500 keV + 99900-118000 keV + 115000-143000 keV + 160000-242000 keV.
-        and:
-        c0: '1020-1860 keV',
-        c1: '1900-2300 keV',
-        c2: '2310-3340 keV',
-        c3: '3400-6480 keV',
-        c4: '5840-11000 keV',
-        c5: '11640-23270 keV',
-        c6: '25900-38100 keV',
-        c7: '40300-73400 keV',
-        c8: '83700-98500 keV',
-        c9: '99900-118000 keV',
-        c10: '115000-143000 keV',
-        c11: '160000-242000 keV',
-        c12: '276000-404000 keV'
-    input:  data    --- a list of lists of data: [[<time>, <data1>], [<time>, <data2>],...]
-    output: hrc     --- hrc proxy list
+    check the last data entry time of the given data file
+    input:  data    --- data
+    output: ltime   --- the last entry time in seconds from 1998.1.1
     """
-    c5  = data[5][1]
-    c6  = data[6][1]
-    c7  = data[7][1]
-    c8  = data[8][1]
-    c9  = data[9][1]
-    c10 = data[10][1]
-    c11 = data[11][1]
 
-    hrc = []
-    for k in range(0, len(c5)):
-        try:
-#            val = 6000.0 *  (c5[k] * (23.27-11.64) + c6[k]* (38.1 - 25.9))/(38.1 - 11.64)\
-#             + 270000.0 * (c7[k])\
-#             + 100000.0 * (c8[k] *(98.5-83.7) + c9[k] * (118-99.9)\
-#             + c10[k]*(143.-115) + c11[k]*(242.-160.)) /(242.-83.7)
-#
-#--- after 2021:112:06:05:00
-#
-#            val = 143.0 * c5[k] + 64738.0 * c6[k] + 162505.0 * c7[k] + 16.1    #--- 16.1 = 4127.0 /256.0
-#
-#--- after 2021:125:06:05:00
-#
-            val = 143.0 * c5[k] + 64738.0 * c6[k] + 162505.0 * c7[k] + 4127    
-        except:
-            val = 0.0
+    ent = data[-1]
+    otime = ent['time_tag']
+    otime = time.strftime('%Y:%j:%H:%M:%S', time.strptime(otime, '%Y-%m-%dT%H:%M:%SZ'))
+    stime = int(Chandra.Time.DateTime(otime).secs)
 
-        hrc.append(val)
+    return stime
 
-    return hrc
-                                                                                           
 #----------------------------------------------------------------------------
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-m", "--mode", choices = ['flight','test'], required = True, help = "Determine running mode.")
     parser.add_argument("-p", "--path", required = False, help = "Directory path to determine output location of data file.")
+    parser.add_argument("-j", "--json", required = False, help = "Determine json data file source")
     args = parser.parse_args()
 
+    if args.json:
+        PLINK = args.json
+
     if args.mode == "test":
         #Change output pathing to int interfere with live running
         OUT_DATA_DIR = f"{os.getcwd()}/test/outTest"
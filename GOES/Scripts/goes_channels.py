@@ -0,0 +1,191 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#################################################################################
+#                                                                               #
+#       goes_channels.py: goes proton channel definitions and combinations      #
+#                                                                               #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                           #
+#           last update: Oct 18, 2026                                           #
+#                                                                               #
+#################################################################################
+#
+#   the combined values (p values, hrc proxy) are defined by the tables below and
+#   computed as a weighted matrix product over a (time x channel) flux array.
+#   if any channel used for a value is missing (the invalid data marker -1e5 or
+#   any negative value), the value is also marked missing (-1e5).
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/GOES/Scripts/')
+#       import goes_channels as gc
+#       flux = gc.channel_array(p_data)         #--- (time x 13) array
+#       hrc  = gc.compute_hrc(flux)
+#
+
+import numpy
+
+#
+#--- invalid data marker
+#
+MISSING = -1.0e5
+#
+#--- goes-16+ differential proton channels and the energy designations of the json feed
+#
+CHANNELS    = ['P1',  'P2A', 'P2B', 'P3',  'P4',  'P5',  'P6',\
+               'P7',  'P8A', 'P8B', 'P8C', 'P9',  'P10']
+
+PROTON_LIST = ['1020-1860 keV',   '1900-2300 keV',   '2310-3340 keV',    '3400-6480 keV',\
+               '5840-11000 keV',  '11640-23270 keV', '25900-38100 keV',  '40300-73400 keV',\
+               '83700-98500 keV', '99900-118000 keV','115000-143000 keV','160000-242000 keV',\
+               '276000-404000 keV']
+#
+#--- energy band limits of the channels in MeV
+#
+BAND_LIMITS = {'P1' : {'min' : 1.02, 'max' : 1.86},
+                'P2A' : {'min' : 1.9, 'max' : 2.3},
+                'P2B' : {'min' : 2.31, 'max' : 3.34},
+                'P3' : {'min' : 3.4, 'max' : 6.48},
+                'P4' : {'min' : 5.84, 'max' : 11.0},
+                'P5' : {'min' : 11.64, 'max' : 23.27},
+                'P6' : {'min' : 25.9, 'max' : 38.1},
+                'P7' : {'min' : 40.3, 'max' : 73.4},
+                'P8A' : {'min' : 83.7, 'max' : 98.5},
+                'P8B' : {'min' : 99.9, 'max' : 118.0},
+                'P8C' : {'min' : 115.0, 'max' : 143.0},
+                'P9' : {'min' : 160.0, 'max' : 242.0},
+                'P10' : {'min' : 276.0, 'max' : 404.0}}
+#
+#--- combined p values: band width weighted average of the channels over the group range
+#---     p1 :  1.0MeV - 3.3MeV      p2 :  3.4MeV - 11MeV       p3 :  11MeV  - 38MeV
+#---     p4 :  40MeV  - 98MeV       p5 :  99MeV  - 143MeV      p6 :  160MeV - 404MeV
+#
+P_VAL_TABLE = [[['P1', 'P2A', 'P2B'], 1.0],
+               [['P3', 'P4'],         1.0],
+               [['P5', 'P6'],         1.0],
+               [['P7', 'P8A'],        1.0],
+               [['P8B', 'P8C'],       1.0],
+               [['P9', 'P10'],        1.0]]
+#
+#--- hrc proxy (after 2021:125:06:05:00)
+#---     HRC Proxy  = 143 * P5 + 64738 * P6 + 162505 * P7 + 4127
+#
+HRC_TABLE  = [[['P5'], 143.0], [['P6'], 64738.0], [['P7'], 162505.0]]
+HRC_OFFSET = 4127.0
+#
+#--- legacy hrc proxy
+#---     HRC Proxy Legacy = 6000 * P5P6 + 270000 * P7 + 100000 * P8ABC
+#
+HRC_LEGACY_TABLE = [[['P5', 'P6'], 6000.0], [['P7'], 270000.0], [['P8A', 'P8B', 'P8C'], 100000.0]]
+
+#----------------------------------------------------------------------------
+#-- group_weights: give the channel weights of a group average             --
+#----------------------------------------------------------------------------
+
+def group_weights(group):
+    """
+    give the channel weights of the band width weighted average over the group range
+    input:  group   --- a list of channel names, e.g. ['P5', 'P6']
+    output: weight  --- a dictionary of <channel>: <weight>
+    """
+    gmin = min([BAND_LIMITS[ent]['min'] for ent in group])
+    gmax = max([BAND_LIMITS[ent]['max'] for ent in group])
+
+    weight = {}
+    for ent in group:
+        weight[ent] = (BAND_LIMITS[ent]['max'] - BAND_LIMITS[ent]['min']) / (gmax - gmin)
+
+    return weight
+
+#----------------------------------------------------------------------------
+#-- weight_matrix: create a (channel x value) weight matrix from a table   --
+#----------------------------------------------------------------------------
+
+def weight_matrix(table, separate=True):
+    """
+    create a (channel x value) weight matrix from a table
+    input:  table       --- a list of [<channel group>, <factor>]
+            separate    --- if True, each entry of the table is a separate value;
+                            otherwise the entries are summed into one value
+    output: weight      --- (len(CHANNELS), n) array
+    """
+    ncol   = len(table) if separate else 1
+    weight = numpy.zeros((len(CHANNELS), ncol))
+
+    for k in range(0, len(table)):
+        [group, factor] = table[k]
+        col = k if separate else 0
+        for [ent, val] in group_weights(group).items():
+            weight[CHANNELS.index(ent), col] += factor * val
+
+    return weight
+
+#----------------------------------------------------------------------------
+#-- combine: compute the weighted sums of the channels                     --
+#----------------------------------------------------------------------------
+
+def combine(flux, weight, offset=0.0):
+    """
+    compute the weighted sums of the channels; a value with a missing channel is missing
+    input:  flux    --- (time x channel) array of flux
+            weight  --- (channel x value) weight matrix
+            offset  --- a value added to the sums
+    output: out     --- (time x value) array
+    """
+    flux = numpy.asarray(flux, dtype=float).reshape((-1, len(CHANNELS)))
+    bad  = flux < 0
+    out  = numpy.where(bad, 0.0, flux) @ weight + offset
+#
+#--- count the missing channels used for each value
+#
+    nbad = bad.astype(float) @ (weight != 0).astype(float)
+
+    return numpy.where(nbad > 0, MISSING, out)
+
+#----------------------------------------------------------------------------
+#-- channel_array: convert the lists of channels into a (time x channel) array
+#----------------------------------------------------------------------------
+
+def channel_array(data):
+    """
+    convert the lists of channels into a (time x channel) array
+    input:  data    --- a list of lists of data: [[<time>, <data1>], [<time>, <data2>],...]
+    output: flux    --- (time x channel) array
+    """
+    return numpy.column_stack([numpy.asarray(ent[1], dtype=float) for ent in data])
+
+#----------------------------------------------------------------------------
+#-- compute_p_vals: create combined flux data for table displays           --
+#----------------------------------------------------------------------------
+
+def compute_p_vals(flux):
+    """
+    create combined flux data for table displays
+    input:  flux    --- (time x channel) array of flux
+    output: a list of arrays of p1, p2, ..., p6 (see P_VAL_TABLE)
+    """
+    out = combine(flux, weight_matrix(P_VAL_TABLE))
+
+    return [out[:,k] for k in range(0, out.shape[1])]
+
+#----------------------------------------------------------------------------
+#-- compute_hrc: compute hrc proxy value                                   --
+#----------------------------------------------------------------------------
+
+def compute_hrc(flux):
+    """
+    compute hrc proxy value (see HRC_TABLE)
+    input:  flux    --- (time x channel) array of flux
+    output: hrc     --- an array of hrc proxy
+    """
+    return combine(flux, weight_matrix(HRC_TABLE, separate=False), HRC_OFFSET)[:,0]
+
+#----------------------------------------------------------------------------
+#-- compute_pre2020_hrc: compute legacy hrc proxy value                    --
+#----------------------------------------------------------------------------
+
+def compute_pre2020_hrc(flux):
+    """
+    compute legacy hrc proxy value (see HRC_LEGACY_TABLE)
+    input:  flux    --- (time x channel) array of flux
+    output: hrc     --- an array of legacy hrc proxy
+    """
+    return combine(flux, weight_matrix(HRC_LEGACY_TABLE, separate=False))[:,0]
@@ -0,0 +1,244 @@
+#!/proj/sot/ska3/flight/bin/python
+
+#################################################################################
+#                                                                               #
+#       goes_ingest.py: read noaa goes json feed into a time x channel table    #
+#                                                                               #
+#           author: t. isobe (tisobe@cfa.harvard.edu)                           #
+#           last update: Oct 18, 2026                                           #
+#                                                                               #
+#################################################################################
+#
+#   the noaa json feed is a list of records of one channel at one time:
+#       {"time_tag": "2021-03-16T00:05:00Z", "satellite": 16, "flux": 0.12,
+#        "energy": "1020-1860 keV", ...}
+#   the feed is read record by record (not loaded at once) and the records of the
+#   given channels are put into a numpy (time x channel) table on a 5 min grid in
+#   one pass; a missing entry is filled with the invalid data marker (-1e5).
+#
+#   the source can be a web address or a saved json file, so that the scripts
+#   can be run/tested without the network.
+#
+#   usage:
+#       sys.path.append('/data/mta4/Space_Weather/GOES/Scripts/')
+#       import goes_ingest as gi
+#       [s_list, flux] = gi.read_goes_table(<link or file>, energy_list, factor=1.0e3)
+#
+#       goes_ingest.py -j <link or file> -e '1020-1860 keV' ...     --- print the table
+#
+
+import os
+import sys
+import json
+import codecs
+import argparse
+import numpy
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_convert as tcv
+import fetch_cache  as fc
+
+#
+#--- data interval (sec) and the invalid data marker
+#
+STEP  = 300
+FILL  = -1.0e5
+#
+#--- size of a block read from the feed
+#
+CHUNK = 65536
+
+#----------------------------------------------------------------------------
+#-- read_goes_table: read goes json feed into a time x channel table       --
+#----------------------------------------------------------------------------
+
+def read_goes_table(source, energy_list, factor=1.0, start=None, inclusive=True, fill=FILL):
+    """
+    read goes json feed into a time x channel table
+    input:  source      --- json web address or a saved json file
+            energy_list --- a list of energy designation (channels)
+            factor      --- a factor multiplied to flux (e.g. 1e3: keV to MeV)
+            start       --- if given, only records at/after this time (seconds from 1998.1.1)
+            inclusive   --- if False, only records after start
+            fill        --- value of the missing entry
+    output: s_list      --- an array of time in seconds from 1998.1.1 (every 5 min)
+            flux        --- (len(s_list), len(energy_list)) array of flux
+    """
+    return pivot_records(iter_records(source), energy_list, factor, start, inclusive, fill)
+
+#----------------------------------------------------------------------------
+#-- iter_records: read records of json feed one by one                     --
+#----------------------------------------------------------------------------
+
+def iter_records(source):
+    """
+    read records of json feed one by one, without loading the whole feed
+    input:  source  --- json web address or a saved json file
+    output: records (dict) of the json list
+    """
+    decoder = json.JSONDecoder()
+    udecode = codecs.getincrementaldecoder('utf-8')()
+
+    with open_source(source) as f:
+        buf = ''
+        eof = False
+        while not eof:
+            block = f.read(CHUNK)
+            eof   = (len(block) == 0)
+            buf   = buf + udecode.decode(block, final=eof)
+            pos   = 0
+            blen  = len(buf)
+            while True:
+#
+#--- skip the list brackets, separators and white spaces
+#
+                while pos < blen and buf[pos] in ' \t\r\n,[]':
+                    pos += 1
+                if pos >= blen:
+                    break
+                try:
+                    [rec, pos] = decoder.raw_decode(buf, pos)
+                except ValueError:
+#
+#--- the record continues to the next block
+#
+                    if eof:
+                        raise
+                    break
+
+                yield rec
+
+            buf = buf[pos:]
+
+#----------------------------------------------------------------------------
+#-- open_source: open json web address or a json file                      --
+#----------------------------------------------------------------------------
+
+def open_source(source):
+    """
+    open json web address (through the download cache) or a json file
+    input:  source  --- json web address or a saved json file
+    output: binary file object
+    """
+    if os.path.isfile(source):
+        return open(source, 'rb')
+
+    return fc.fetch_stream(source)
+
+#----------------------------------------------------------------------------
+#-- pivot_records: put records into a time x channel table                 --
+#----------------------------------------------------------------------------
+
+def pivot_records(records, energy_list, factor=1.0, start=None, inclusive=True, fill=FILL):
+    """
+    put records into a time x channel table on a 5 min grid in one pass
+    input:  records     --- records (dict) of the json feed
+            energy_list --- a list of energy designation (channels)
+            factor      --- a factor multiplied to flux
+            start       --- if given, only records at/after this time (seconds from 1998.1.1)
+            inclusive   --- if False, only records after start
+            fill        --- value of the missing entry (a record with null flux is missing)
+    output: s_list      --- an array of time in seconds from 1998.1.1
+            flux        --- (len(s_list), len(energy_list)) array of flux
+    """
+    chan = {}
+    for k in range(0, len(energy_list)):
+        chan[energy_list[k]] = k
+
+    tags = []
+    cpos = []
+    vals = []
+    for rec in records:
+        k = chan.get(rec.get('energy'))
+        if k is None:
+            continue
+
+        flux = rec.get('flux')
+        tags.append(rec['time_tag'])
+        cpos.append(k)
+        vals.append(numpy.nan if flux is None else float(flux))
+
+    if len(tags) == 0:
+        return [numpy.zeros(0), numpy.zeros((0, len(energy_list)))]
+#
+#--- all channels share the same time tags; convert each tag once
+#
+    [utag, tpos] = numpy.unique(tags, return_inverse=True)
+    uts  = numpy.array([ent.rstrip('Z') for ent in utag], dtype='datetime64[s]')
+    uts  = uts.astype('int64')[tpos.ravel()]
+    cpos = numpy.array(cpos)
+    vals = numpy.array(vals) * factor
+
+    if start is not None:
+        secs = tcv.uts_to_secs(uts.astype(float))
+        if inclusive:
+            mask = secs >= start
+        else:
+            mask = secs >  start
+        uts  = uts[mask]
+        cpos = cpos[mask]
+        vals = vals[mask]
+
+        if len(uts) == 0:
+            return [numpy.zeros(0), numpy.zeros((0, len(energy_list)))]
+#
+#--- put the values on the grid; a later record of the same time/channel replaces the earlier one
+#
+    t0   = uts.min()
+    tpos = numpy.round((uts - t0) / STEP).astype(int)
+    flux = numpy.full((tpos.max() + 1, len(energy_list)), fill, dtype=float)
+    flux[tpos, cpos] = numpy.where(numpy.isnan(vals), fill, vals)
+
+    s_list = tcv.uts_to_secs(t0 + numpy.arange(flux.shape[0]) * float(STEP))
+
+    return [s_list, flux]
+
+#----------------------------------------------------------------------------
+#-- select_last: select the last part of the table                         --
+#----------------------------------------------------------------------------
+
+def select_last(s_list, flux, period):
+    """
+    select the last part of the table
+    input:  s_list  --- an array of time in seconds from 1998.1.1
+            flux    --- (len(s_list), n) array of flux
+            period  --- length of the period in seconds
+    output: s_list  --- time in (the last time - period, the last time]
+            flux    --- flux of the period
+    """
+    if len(s_list) == 0:
+        return [s_list, flux]
+
+    mask = s_list > s_list[-1] - period
+
+    return [s_list[mask], flux[mask]]
+
+#----------------------------------------------------------------------------
+#-- to_channel_lists: convert the table into the lists of channels         --
+#----------------------------------------------------------------------------
+
+def to_channel_lists(s_list, flux, tfmt='%Y:%j:%H:%M:%S'):
+    """
+    convert the table into the lists of channels used by the page scripts
+    input:  s_list  --- an array of time in seconds from 1998.1.1
+            flux    --- (len(s_list), n) array of flux
+            tfmt    --- '%Y:%j:%H:%M:%S' or '%Y:%j:%H:%M'
+    output: [[<time list>, <flux list of channel 1>], [<time list>, <flux list of channel 2>], ...]
+    """
+    t_list = list(tcv.secs_to_date(s_list, decimal=0))
+    if tfmt == '%Y:%j:%H:%M':
+        t_list = [ent[:-3] for ent in t_list]
+
+    return [[t_list, list(flux[:,k])] for k in range(0, flux.shape[1])]
+
+#----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-j", "--json", required = True, help = "json web address or a saved json file")
+    parser.add_argument("-e", "--energy", nargs = '+', required = True, help = "energy designations")
+    args = parser.parse_args()
+
+    [s_list, flux] = read_goes_table(args.json, args.energy)
+    dates = tcv.secs_to_date(s_list, decimal=0)
+    for k in range(0, len(s_list)):
+        print(dates[k] + '\t' + '\t'.join(['%2.3e' % val for val in flux[k]]))
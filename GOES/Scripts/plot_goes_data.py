@@ -14,7 +14,6 @@ import sys
 import os
 import json
 import numpy as np
-import urllib.request
 from astropy.table import Table
 from datetime import datetime, timedelta
 
@@ -29,6 +28,10 @@ from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
 
 import argparse
 import traceback
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import fetch_cache as fc
+sys.path.append('/data/mta4/Space_Weather/GOES/Scripts/')
+import goes_channels as gc
 #
 #--- Defining Directory Pathing
 #
@@ -45,19 +48,7 @@ CLINK = 'https://services.swpc.noaa.gov/json/goes/primary/integral-protons-3-day
 #--- Band limits by GOES channel in MeV
 #
 
-BAND_LIMITS = {'P1' : {'min' : 1.02, 'max' : 1.86},
-                'P2A' : {'min' : 1.9, 'max' : 2.3},
-                'P2B' : {'min' : 2.31, 'max' : 3.34},
-                'P3' : {'min' : 3.4, 'max' : 6.48},
-                'P4' : {'min' : 5.84, 'max' : 11.0},
-                'P5' : {'min' : 11.64, 'max' : 23.27},
-                'P6' : {'min' : 25.9, 'max' : 38.1},
-                'P7' : {'min' : 40.3, 'max' : 73.4},
-                'P8A' : {'min' : 83.7, 'max' : 98.5},
-                'P8B' : {'min' : 99.9, 'max' : 118.0},
-                'P8C' : {'min' : 115.0, 'max' : 143.0},
-                'P9' : {'min' : 160.0, 'max' : 242.0},
-                'P10' : {'min' : 276.0, 'max' : 404.0}}
+BAND_LIMITS = gc.BAND_LIMITS
 
 
 class Group_Info():
@@ -198,8 +189,7 @@ def extract_goes_table(jlink):
             data = []
     else:
         try:
-            with urllib.request.urlopen(jlink) as url:
-                data = json.loads(url.read().decode())
+            data = fc.fetch_json(jlink)
         except:
             traceback.print_exc()
             data = []
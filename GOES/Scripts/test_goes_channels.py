@@ -0,0 +1,79 @@
+#####################################################################################
+#                                                                                   #
+#       test_goes_channels.py: test the goes proton channel combinations            #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import goes_channels as gc
+
+def make_flux(vals):
+    """
+    a (1 x 13) flux array from a dictionary of <channel>: <flux> (others are 0)
+    """
+    flux = numpy.zeros((1, len(gc.CHANNELS)))
+    for [ent, val] in vals.items():
+        flux[0, gc.CHANNELS.index(ent)] = val
+
+    return flux
+
+#-----------------------------------------------------------------------------
+
+def test_group_weights():
+    """
+    the band width of each channel over the range of the group
+    """
+    weight = gc.group_weights(['P1', 'P2A', 'P2B'])
+
+    assert weight['P1']  == pytest.approx((1.86 - 1.02) / (3.34 - 1.02))
+    assert weight['P2B'] == pytest.approx((3.34 - 2.31) / (3.34 - 1.02))
+    assert gc.group_weights(['P7']) == {'P7': 1.0}
+
+#-----------------------------------------------------------------------------
+
+def test_hrc_proxy():
+    """
+    hrc proxy = 143 * P5 + 64738 * P6 + 162505 * P7 + 4127
+    """
+    flux = make_flux({'P5': 1.0, 'P6': 2.0, 'P7': 3.0, 'P1': 100.0})
+
+    assert gc.compute_hrc(flux)[0] == pytest.approx(143.0 + 64738.0 * 2 + 162505.0 * 3 + 4127.0)
+
+    legacy = (6000.0 * (2.0 * (38.1 - 25.9) + (23.27 - 11.64)) / (38.1 - 11.64) + 270000.0 * 3.0)
+    assert gc.compute_pre2020_hrc(flux)[0] == pytest.approx(legacy)
+
+#-----------------------------------------------------------------------------
+
+def test_missing_channel_marks_only_its_values():
+    """
+    a negative channel makes the values using it missing; the others are computed
+    """
+    flux = numpy.vstack([make_flux({'P1': 1.0, 'P3': 2.0, 'P4': 2.0}),\
+                         make_flux({'P1': gc.MISSING, 'P3': 2.0, 'P4': 2.0, 'P7': -1.0})])
+
+    p_vals = gc.compute_p_vals(flux)
+    assert len(p_vals) == 6
+    assert p_vals[0].tolist() == pytest.approx([(1.86 - 1.02) / (3.34 - 1.02), gc.MISSING])
+    assert p_vals[1].tolist() == pytest.approx([2.0 * (3.08 + 5.16) / (11.0 - 3.4)] * 2)
+    assert p_vals[3][1] == gc.MISSING
+    assert gc.compute_hrc(flux)[1] == gc.MISSING
+
+#-----------------------------------------------------------------------------
+
+def test_channel_array():
+    """
+    the lists of channels become the columns
+    """
+    data = [[['t0', 't1'], [1.0, 2.0]], [['t0', 't1'], [3.0, 4.0]]]
+
+    assert gc.channel_array(data).tolist() == [[1.0, 3.0], [2.0, 4.0]]
@@ -0,0 +1,95 @@
+#####################################################################################
+#                                                                                   #
+#       test_goes_ingest.py: test reading the goes json feed into a table           #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#####################################################################################
+
+import os
+import sys
+import json
+import pytest
+
+numpy = pytest.importorskip('numpy')
+pytest.importorskip('Chandra.Time')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '..', 'Common', 'Scripts'))
+sys.path.insert(0, SCRIPT_DIR)
+
+import goes_ingest  as gi
+import time_convert as tcv
+
+ENERGY = ['1020-1860 keV', '1900-2300 keV']
+
+def record(tag, energy, flux):
+    return {'time_tag': tag, 'satellite': 16, 'flux': flux, 'energy': energy}
+
+#
+#--- 00:05 has no 1900-2300 keV record, 00:10 is missing and 00:15 has a null flux
+#
+RECORDS = [record('2024-03-01T00:00:00Z', ENERGY[0], 1.0),\
+           record('2024-03-01T00:00:00Z', ENERGY[1], 2.0),\
+           record('2024-03-01T00:00:00Z', '99900-118000 keV', 9.0),\
+           record('2024-03-01T00:05:00Z', ENERGY[0], 3.0),\
+           record('2024-03-01T00:15:00Z', ENERGY[0], None),\
+           record('2024-03-01T00:15:00Z', ENERGY[1], 4.0)]
+
+def write_feed(ifile, records):
+    with open(ifile, 'w', encoding='utf-8') as fo:
+        json.dump(records, fo, indent=1, ensure_ascii=False)
+
+#-----------------------------------------------------------------------------
+
+def test_pivot_on_the_5min_grid(tmp_path):
+    """
+    the records of the channels go on the 5 min grid; a gap or a null flux is filled
+    """
+    ifile = str(tmp_path / 'differential-protons-1-day.json')
+    write_feed(ifile, RECORDS)
+
+    [s_list, flux] = gi.read_goes_table(ifile, ENERGY, factor=1.0e3)
+
+    t0 = tcv.date_to_secs('2024:061:00:00:00')
+    assert s_list.tolist() == pytest.approx([t0, t0 + 300, t0 + 600, t0 + 900])
+    assert flux.tolist() == [[1.0e3, 2.0e3], [3.0e3, gi.FILL], [gi.FILL, gi.FILL], [gi.FILL, 4.0e3]]
+
+#-----------------------------------------------------------------------------
+
+def test_records_split_across_blocks(tmp_path, monkeypatch):
+    """
+    a record (and a multi-byte character) cut at the end of a block is read whole
+    """
+    records = RECORDS + [{'time_tag': '2024-03-01T00:20:00Z', 'energy': ENERGY[0],\
+                          'flux': 5.0, 'note': 'µ' * 7}]
+    ifile   = str(tmp_path / 'feed.json')
+    write_feed(ifile, records)
+    monkeypatch.setattr(gi, 'CHUNK', 7)
+
+    assert list(gi.iter_records(ifile)) == records
+
+#-----------------------------------------------------------------------------
+
+def test_start_and_select_last(tmp_path):
+    """
+    only the records at/after (or after) start; the last part of the table
+    """
+    t5 = tcv.date_to_secs('2024:061:00:05:00')
+
+    [s_list, flux] = gi.pivot_records(RECORDS, ENERGY, start=t5)
+    assert s_list.tolist() == pytest.approx([t5, t5 + 300, t5 + 600])
+
+    [s_list, flux] = gi.pivot_records(RECORDS, ENERGY, start=t5, inclusive=False)
+    assert s_list.tolist() == pytest.approx([t5 + 600])
+    assert flux.tolist()   == [[gi.FILL, 4.0]]
+
+    [s_list, flux] = gi.pivot_records(RECORDS, ENERGY, start=t5 + 1000)
+    assert flux.shape == (0, 2)
+
+    [s_list, flux] = gi.pivot_records(RECORDS, ENERGY)
+    [s_last, f_last] = gi.select_last(s_list, flux, 600)
+    assert len(s_last) == 2 and f_last[-1].tolist() == [gi.FILL, 4.0]
+
+    out = gi.to_channel_lists(s_last, f_last, tfmt='%Y:%j:%H:%M')
+    assert out[1] == [['2024:061:00:10', '2024:061:00:15'], [gi.FILL, 4.0]]
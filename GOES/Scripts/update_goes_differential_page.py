@@ -10,16 +10,17 @@
 #################################################################################
 
 import os
+import sys
 import signal
 import time
-import datetime
 import Chandra.Time
-import urllib.request
-import json
 import numpy as np
 import argparse
 import traceback
 import getpass
+sys.path.append('/data/mta4/Space_Weather/GOES/Scripts/')
+import goes_ingest as gi
+import goes_channels as gc
 #
 #--- Define Directory Pathing
 #
@@ -35,39 +36,10 @@ ADMIN = ['mtadude@cfa.harvard.edu']
 #
 PLINK = 'https://services.swpc.noaa.gov/json/goes/primary/differential-protons-1-day.json'
 #
-#--- protone energy designations and output file names
-#
-proton_list = ['1020-1860 keV',   '1900-2300 keV',   '2310-3340 keV',    '3400-6480 keV',\
-               '5840-11000 keV',  '11640-23270 keV', '25900-38100 keV',  '40300-73400 keV',\
-               '83700-98500 keV', '99900-118000 keV','115000-143000 keV','160000-242000 keV',\
-               '276000-404000 keV']
-#
 #--- current goes satellite #
 #
 satellite = "Primary"
 
-# GOES-16+ Energy bands (keV) and combinations
-DE = {'P1': [1860., 1020.],
-      'P2A': [2300., 1900.],
-      'P2B': [3340., 2310.],
-      'P3': [6480., 3400.],
-      'P4': [11000., 5840.],
-      'P5': [23270., 11640.],
-      'P6': [38100., 25900.],
-      'P7': [73400., 40300.],
-      'P8A': [98500., 83700.],
-      'P8B': [118000., 99900.],
-      'P8C': [143000., 115000.],
-      'P9': [242000., 160000.],
-      'P5P6': [23270., 11640.],
-      'P8ABC': [143000., 83700.],
-      'P8ABCP9': [242000., 83700.]}
-
-# Add delta_e to each list
-for key in DE.keys():
-    de = DE[key]
-    de.append(de[0] - de[1])
-
 #----------------------------------------------------------------------------
 #-- update_goes_differential_page: update goes differential html page      --
 #----------------------------------------------------------------------------
@@ -135,7 +107,7 @@ def make_two_hour_table():
 #
 #--- extract proton data
 #
-    p_data = extract_goes_data(PLINK, proton_list)
+    p_data = extract_goes_data(PLINK, gc.PROTON_LIST)
 #
 #--- time list
 #
@@ -144,12 +116,13 @@ def make_two_hour_table():
 #
 #--- banch up the fluxes (definition of p values are different from the older ones)
 #
-    [p1, p2, p3, p4, p5, p6] = compute_p_vals(p_data)
+    flux = gc.channel_array(p_data)
+    [p1, p2, p3, p4, p5, p6] = gc.compute_p_vals(flux)
 #
 #--- compute hrc proxy
 #
-    pre_hrc_val = compute_pre2020_hrc(p_data)
-    hrc_val = compute_hrc(p_data)
+    pre_hrc_val = gc.compute_pre2020_hrc(flux)
+    hrc_val = gc.compute_hrc(flux)
 #
 #---- create the main table
 #
@@ -281,274 +254,31 @@ def make_two_hour_table():
 
 def extract_goes_data(dlink, energy_list):
     """
-    extract GOES satellite flux data
-    input: dlink        --- json web address or file
+    extract GOES satellite flux data of the last two hours
+    input:  dlink       --- json web address or file
             energy_list --- a list of energy designation 
-    output: <data_dir>/<out file>
+    output: d_save      --- a list of [<time list>, <flux list>] of each energy;
+                            time in <yyyy>:<ddd>:<hh>:<mm> and a missing entry is -1e5
     """
 #
 #--- read json file from a file or the web
 #
-    if os.path.isfile(dlink):
-        try:
-            with open(dlink) as f:
-                data = json.load(f)
-        except:
-            traceback.print_exc()
-            data = []
-    else:
-        try:
-            with urllib.request.urlopen(dlink) as url:
-                data = json.loads(url.read().decode())
-        except:
-            traceback.print_exc()
-            data = []
-
-    if len(data) < 1:
+    try:
+        [s_list, flux] = gi.read_goes_table(dlink, energy_list, factor=1.0e3)
+    except:
+        traceback.print_exc()
         exit(1)
-#
-#--- go through all energy ranges
-#
-    elen   = len(energy_list)
-    d_save = []
-    ctime = datetime.datetime.strptime(data[-1]['time_tag'], '%Y-%m-%dT%H:%M:%SZ') - datetime.timedelta(hours=2)
-    for k in range(0, elen):
-        t_list = []
-        f_list = []
-        energy = energy_list[k]
-        last_time = datetime.datetime.strptime(data[0]['time_tag'], '%Y-%m-%dT%H:%M:%SZ')
-#
-#--- check the last entry time and select only last 2hrs
-#
-        for ent in data:
-#
-#--- read time and flux of the given energy range
-#
-            if ent['energy'] == energy:
-                flux  = float(ent['flux']) * 1e3   #--- keV to MeV
-                otime =  datetime.datetime.strptime(ent['time_tag'], '%Y-%m-%dT%H:%M:%SZ')
-                #If the otime is more than five minutes after the last_time
-                #then that means the data set is missing an entry for this energy band and zero values should be appened.
-                diff = (otime - last_time).seconds
-                if diff > 300:
-                    #All times should be in divisions of 5 minutes/300 seconds.
-                    for i in range(300,int(diff),300):
-                        missing_time = last_time + datetime.timedelta(seconds=i)
-                        if missing_time > ctime:
-                            t_list.append(missing_time.strftime('%Y:%j:%H:%M'))
-                            #Mark missing data with the invalid data marker (-1e5)
-                            f_list.append(-1e5)
-
-                if otime > ctime:
-                    t_list.append(otime.strftime('%Y:%j:%H:%M'))
-                    f_list.append(flux)
-                    last_time = otime
-
-        d_save.append([t_list, f_list])
-#
-#--- Check if there is a missing energy at the beginning or ending of a band.
-#
-    for i in range(len(d_save)):
-        #Find a channel with all 24 needed data points and use those time values
-        if len(d_save[i][0]) == 24:
-            start = d_save[i][0][0]
-            stop = d_save[i][0][-1]
-            break
-
-    for i in range(len(d_save)):
-        if len(d_save[i][0]) < 24:
-            #if there is still not 24 data points, then we are missing the start or end of this channel
-            if d_save[i][0][0] != start:
-                d_save[i][0].insert(0,start)
-                d_save[i][1].insert(0,-1e5)
-                
-            if d_save[i][0][-1] != stop:
-                d_save[i][0].append(stop)
-                d_save[i][1].append(-1e5)
-    return d_save
-
-
-#----------------------------------------------------------------------------
-#-- compute_p_vals: create combined flux data for table displays           --
-#----------------------------------------------------------------------------
-
-def compute_p_vals(data):
-    """
-    create combined flux data for table displays
-    input:  data    --- a list of lists of data: [[<time>, <data1>], [<time>, <data2>],...]
-    output: a list of lists of:
-            p1 :  1.0MeV - 3.3MeV
-            p2 :  3.4MeV - 11MeV
-            p3 :  11MeV  - 38MeV
-            p4 :  40MeV  - 98MeV
-            p5 :  99MeV  - 143MeV
-            p6 :  160MeV - 404MeV
-    """
-#
-#--- extract flux data parts
-#
-    c0  = data[0][1]
-    c1  = data[1][1]
-    c2  = data[2][1]
-    c3  = data[3][1]
-    c4  = data[4][1]
-    c5  = data[5][1]
-    c6  = data[6][1]
-    c7  = data[7][1]
-    c8  = data[8][1]
-    c9  = data[9][1]
-    c10 = data[10][1]
-    c11 = data[11][1]
-    c12 = data[12][1]
-#
-#--- combine the data
-#
-    p1 = []             #--- c0 + c1 + c2:  1.0MeV - 3.3MeV
-    p2 = []             #--- c3 + c4:       3.4MeV - 11MeV
-    p3 = []             #--- c5 + c6:       11MeV  - 38MeV
-    p4 = []             #--- c7 + c8:       40MeV  - 98MeV
-    p5 = []             #--- c9 + c10;      99MeV  - 143MeV
-    p6 = []             #--- c11 + c12:     160MeV - 404MeV
-    for  k in range(0, len(c0)):
-        try:
-            val = (c0[k] *(1.85 - 1.02)  + c1[k] * (2.3 - 1.9) + c2[k]  * (3.3 - 2.3)) / (3.3 -1.0)
-            p1.append(val)
-        except:
-            continue
-        try:
-            val = (c3[k] * (6.48 - 3.4) + c4[k] * (11.0 - 5.84)) / (11 - 3.4)
-            p2.append(val)
-        except:
-            continue
-        try:
-            val = (c5[k] * (23.27-11.64) + c6[k] *(38.1 - 25.9)) / (38.1 - 11.64)
-            p3.append(val)
-        except:
-            continue
-        try:
-            val = (c7[k] * (73.4 - 40.3)+ c8[k] * (98.5 - 83.7)) / (98.5 - 40.3)
-            p4.append(val)
-        except:
-            continue
-        try:
-            val = (c9[k] * (118.0 - 99.9) + c10[k] * (143.0 - 115.0)) /( 115 - 99.9)
-            p5.append(val)
-        except:
-            continue
-        try:
-            val = (c11[k] * (242.0 - 160.0) + c12[k] * (404.0 - 276.0)) / (404. - 160.0)
-            p6.append(val)
-        except:
-            continue
-
-    return [p1, p2, p3, p4, p5, p6]
-
-#----------------------------------------------------------------------------
-#-- compute_hrc: compute hrc proxy value                                   --
-#----------------------------------------------------------------------------
 
-def compute_hrc(data):
-    """
-    compute hrc proxy value
-
-    HRC_PROXY = 6000 x P4 + 270000 x P5 + 100000 x P6
-        P4 ~ 11640-23270 keV + 25900-38100 keV 
-        P5 ~ 40300-73400 keV, 
-        P6 ~ 83700-98500 keV + 99900-118000 keV + 115000-143000 keV + 160000-242000 keV.
-        and:
-        c0: '1020-1860 keV',
-        c1: '1900-2300 keV',
-        c2: '2310-3340 keV',
-        c3: '3400-6480 keV',
-        c4: '5840-11000 keV',
-        c5: '11640-23270 keV',
-        c6: '25900-38100 keV',
-        c7: '40300-73400 keV',
-        c8: '83700-98500 keV',
-        c9: '99900-118000 keV',
-        c10: '115000-143000 keV',
-        c11: '160000-242000 keV',
-        c12: '276000-404000 keV'
-    input:  data    --- a list of lists of data: [[<time>, <data1>], [<time>, <data2>],...]
-    output: hrc     --- hrc proxy list
-    """
-    c5  = data[5][1]
-    c6  = data[6][1]
-    c7  = data[7][1]
-    c8  = data[8][1]
-    c9  = data[9][1]
-    c10 = data[10][1]
-    c11 = data[11][1]
-
-    hrc = []
-
-    for k in range(0, len(c5)):
-        try:
-#            val = 6000.0 *  (c5[k] * (23.27-11.64) + c6[k]* (38.1 - 25.9))/(38.1 - 11.64)\
-#                + 270000.0 * (c7[k])\
-#                + 100000.0 * (c8[k] *(98.5-83.7) + c9[k] * (118-99.9)\
-#                + c10[k]*(143.-115) + c11[k]*(242.-160.)) /(242.-83.7)
-#
-#--- after 2021:112:06:05:00
-#
-#            val = 143.0 * c5[k] + 64738.0 * c6[k] + 162505.0 * c7[k] + 16.1    #--- 16.1 = 4127.0 /256.0
+    if len(s_list) < 1:
+        exit(1)
 #
-#--- after 2021:125:06:05:00 
+#--- select only last 2hrs; all channels share the same 5 min time grid
 #
-            val = 143.0 * c5[k] + 64738.0 * c6[k] + 162505.0 * c7[k] + 4127
-            if c5[k] < 0 or c6[k] < 0 or c7[k] < 0:
-                #Missing a channel value
-                val = -1e5
-
-        except:
-            val = -1e5
-
-        hrc.append(val)
-
-    return hrc
-
-#----------------------------------------------------------------------------
-#-- compute_pre2020_hrc: compute hrc proxy value                           --
-#----------------------------------------------------------------------------
-def compute_pre2020_hrc(data):
-    p5 = data[5][1]
-    p6 = data[6][1]
-    p7 = data[7][1]
-    p8a = data[8][1]
-    p8b = data[9][1]
-    p8c = data[10][1]
-
-    hrc = []
+    [s_list, flux] = gi.select_last(s_list, flux, 7200.0)
 
-    p5p6 = combine_rates([p5, p6], ('P5', 'P6'))
-    p8abc = combine_rates([p8a, p8b, p8c], ('P8A', 'P8B', 'P8C'))
+    return gi.to_channel_lists(s_list, flux, tfmt='%Y:%j:%H:%M')
 
-    for k in range(len(p5p6)):
-        try:
-            val = 6000 * p5p6[k] + 270000 * p7[k] + 100000 * p8abc[k]
-            if p5p6[k] < 0 or p7[k] < 0 or p8abc[k] < 0:
-                #Missing a channel value
-                val = -1e5
-        except:
-            val = -1e5
-        
-        hrc.append(val)
-    return hrc
 
-
-def combine_rates(data_list, channel_name):
-    """
-    Return combined rates for multiple channels
-    """
-    combined = np.zeros(len(data_list[0]))
-    for i, data in enumerate(data_list):
-        combined = combined + (np.array(data) * DE[channel_name[i]][2])
-    delta_e = DE[channel_name[-1]][0] - DE[channel_name[0]][1]
-    final = list(combined / delta_e)
-    for i in range(len(final)):
-        if final[i] < 0: #Computes with missing data value
-            final[i] = -1e5
-    return final
 #----------------------------------------------------------------------------
 #----------------------------------------------------------------------------
 #----------------------------------------------------------------------------
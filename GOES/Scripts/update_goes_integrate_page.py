@@ -12,12 +12,12 @@
 import os
 import sys
 import datetime
-import urllib.request
-import json
 import numpy
 import traceback
 import argparse
 
+sys.path.append('/data/mta4/Space_Weather/GOES/Scripts/')
+import goes_ingest as gi
 #
 #--- Define Directory Pathing
 #
@@ -200,90 +200,29 @@ def make_two_hour_table():
 
 def extract_goes_data(dlink, energy_list):
     """
-    extract GOES satellite flux data
-    input: dlink        --- json web address
+    extract GOES satellite flux data of the last two hours
+    input:  dlink       --- json web address or file
             energy_list --- a list of energy designation 
-    output: <data_dir>/<out file>
+    output: d_save      --- a list of [<time list>, <flux list>] of each energy;
+                            time in <yyyy>:<ddd>:<hh>:<mm> and a missing entry is -1e5
     """
 #
 #--- read json file from a file or the web
 #
-    if os.path.isfile(dlink):
-        try:
-            with open(dlink) as f:
-                data = json.load(f)
-        except:
-            traceback.print_exc()
-            data = []
-    else:
-        try:
-            with urllib.request.urlopen(dlink) as url:
-                data = json.loads(url.read().decode())
-        except:
-            traceback.print_exc()
-            data = []
-
-    if len(data) < 1:
+    try:
+        [s_list, flux] = gi.read_goes_table(dlink, energy_list, factor=1.0)
+    except:
+        traceback.print_exc()
         exit(1)
-#
-#--- go through all energy ranges
-#
-    elen   = len(energy_list)
-    d_save = []
-    ctime = datetime.datetime.strptime(data[-1]['time_tag'], '%Y-%m-%dT%H:%M:%SZ') - datetime.timedelta(hours=2)
-    for k in range(0, elen):
-        t_list = []
-        f_list = []
-        energy = energy_list[k]
-        last_time = datetime.datetime.strptime(data[0]['time_tag'], '%Y-%m-%dT%H:%M:%SZ')
-#
-#--- check the last entry time and select only last 2 hrs
-#
-        for ent in data:
-#
-#--- read time and flux of the given energy range
-#
-            if ent['energy'] == energy:
-                flux  = float(ent['flux'])
-                otime =  datetime.datetime.strptime(ent['time_tag'], '%Y-%m-%dT%H:%M:%SZ')
-                #If the otime is more than five minutes after the last_time
-                #then that means the data set is missing an entry for this energy band and zero values should be appened.
-                diff = (otime - last_time).seconds
-                if diff > 300:
-                    #All times should be in divisions of 5 minutes/300 seconds.
-                    for i in range(300,int(diff),300):
-                        missing_time = last_time + datetime.timedelta(seconds=i)
-                        if missing_time > ctime:
-                            t_list.append(missing_time.strftime('%Y:%j:%H:%M'))
-                            #Mark missing data with the invalid data marker (-1e5)
-                            f_list.append(-1e5)
-                if otime > ctime:
-                    t_list.append(otime.strftime('%Y:%j:%H:%M'))
-                    f_list.append(flux)
-                    last_time = otime
 
-        d_save.append([t_list, f_list])
+    if len(s_list) < 1:
+        exit(1)
 #
-#--- Check if there is a missing energy at the beginning or ending of a band.
+#--- select only last 2hrs; all channels share the same 5 min time grid
 #
-    for i in range(len(d_save)):
-        #Find a channel with all 24 needed data points and use those time values
-        if len(d_save[i][0]) == 24:
-            start = d_save[i][0][0]
-            stop = d_save[i][0][-1]
-            break
+    [s_list, flux] = gi.select_last(s_list, flux, 7200.0)
 
-    for i in range(len(d_save)):
-        if len(d_save[i][0]) < 24:
-            #if there is still not 24 data points, then we are missing the start or end of this channel
-            if d_save[i][0][0] != start:
-                d_save[i][0].insert(0,start)
-                d_save[i][1].insert(0,-1e5)
-                
-            if d_save[i][0][-1] != stop:
-                d_save[i][0].append(stop)
-                d_save[i][1].append(-1e5)
-    return d_save
+    return gi.to_channel_lists(s_list, flux, tfmt='%Y:%j:%H:%M')
 
 #----------------------------------------------------------------------------
 #----------------------------------------------------------------------------
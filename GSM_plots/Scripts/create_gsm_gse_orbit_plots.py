@@ -27,6 +27,8 @@ import matplotlib.pyplot       as plt
 import matplotlib.font_manager as font_manager
 import matplotlib.lines        as lines
 from mpl_toolkits.mplot3d import Axes3D
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_index as tix
 #
 #--- reading directory list
 #
@@ -102,6 +104,8 @@ def read_gsm_gse_data():
     with open(ifile, 'r') as f:
         data  = [line.strip() for line in f.readlines()]
     
+    t_list = [float(ent.split(None, 1)[0]) for ent in data]
+
     otime = []
     xgsm  = []
     ygsm  = []
@@ -109,25 +113,26 @@ def read_gsm_gse_data():
     xgse  = []
     ygse  = []
     zgse  = []
-    for ent in data:
+#
+#--- the data of start1 <= time < stop1
+#
+    [i0, i1] = tix.find_window(t_list, start1, stop1)
+    for ent in data[i0:i1]:
         atemp = re.split('\s+', ent)
-        atime = float(atemp[0])
-        if atime < start1:
-            continue
-        elif atime > stop2:
-            break
-        else:
-            if atime < stop1:
-                otime.append(atime)
-                xgsm.append(float(atemp[1]))
-                ygsm.append(float(atemp[2]))
-                zgsm.append(float(atemp[3]))
-                xgse.append(float(atemp[4]))
-                ygse.append(float(atemp[5]))
-                zgse.append(float(atemp[6]))
-
-            if atime >= start2:
-                line = ent + '\n'
+        otime.append(float(atemp[0]))
+        xgsm.append(float(atemp[1]))
+        ygsm.append(float(atemp[2]))
+        zgsm.append(float(atemp[3]))
+        xgse.append(float(atemp[4]))
+        ygse.append(float(atemp[5]))
+        zgse.append(float(atemp[6]))
+#
+#--- the last line of start2 <= time <= stop2
+#
+    line = ''
+    [i0, i1] = tix.find_window(t_list, start2, stop2, include_stop=True)
+    if i1 > i0:
+        line = data[i1-1] + '\n'
     
     out = data_dir + 'gs_data_2_day'
     #for writing out files in test directory
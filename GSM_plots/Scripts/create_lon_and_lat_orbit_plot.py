@@ -48,10 +48,14 @@ if (os.getenv('TEST') == 'TEST'):
 #--- append  pathes to private folders to a python directory
 #
 sys.path.append('/data/mta4/Script/Python3.10/MTA/')
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
 #
 #--- import several functions
 #
 import mta_common_functions as mcf
+import time_index           as tix
+sys.path.append('/data/mta4/Space_Weather/CRM3/Scripts/')
+import crm_grid             as cg
 #
 #--- temp writing file name
 #
@@ -216,7 +220,7 @@ def read_region_data(time_list):
     """
     read region data and assign color to correspoinding time list
     input:  time_list   --- a list of time
-            also read from: <crm3_dir>/Data/CRM3_p.dat30
+            also read from: <crm3_dir>/Data/CRM3_p.grid.npy (kp = 3.0)
     output: color       --- a list of color correspond to the time_list
                 region: 1   solar wind      color: aqua
                 region: 2   magnetoshearth  color: fuchsia
@@ -225,51 +229,33 @@ def read_region_data(time_list):
 #
 #--- read data 
 #
-    infile = crm3_dir + '/Data/CRM3_p.dat30'
-    data   = mcf.read_data_file(infile)
-    ctime  = []
-    region = []
-    for ent in data:
-        atemp = re.split('\s+', ent)
-        ctime.append(float(atemp[0]))
-        region.append(int(float(atemp[1])))
-#
-#--- compare two time list and find which region satellite is in
-#
-    color = []
-    start = 0
-    clen  = len(ctime)
-    chk   = 0
-    for otime in time_list:
-        for k in range(start, clen):
-            k1 = k + 1
-            if k1 >= clen:
-                chk = 1
-                break
+    grid   = cg.load_grid(oroot=crm3_dir + 'Data/CRM3_p')
+    ctime  = grid['time'].tolist()
+    region = grid['grid'][:, cg.kp_index('30'), cg.REGION].astype(int).tolist()
 #
-#--- if the region list could not cover the first part of the time list, use color "white"
+#--- compare two time list and find which region satellite is in;
+#--- the region of the interval ctime[k] <= time < ctime[k+1]
 #
-            if k == 0 and otime < ctime[k]:
-                color.append('white')
-                break
-
-            elif otime >=ctime[k] and otime < ctime[k1]:
-                if region[k] == 1:
-                    color.append('aqua')
-                elif region[k] == 2:
-                    color.append('fuchsia')
-                else:
-                    color.append('yellow')
-                start = k - 5
-                if start < 0:
-                    start = 0
-                break
-            else:
-                continue
-
-        if chk > 0:
+    color  = []
+    clen   = len(ctime)
+    for k in tix.asof_join(time_list, ctime)[1]:
+#
+#--- the time is after the region list covers; fill below
+#
+        if clen < 2 or k + 1 >= clen:
             break
 #
+#--- if the region list could not cover the first part of the time list, use color "white"
+#
+        if k < 0:
+            color.append('white')
+        elif region[k] == 1:
+            color.append('aqua')
+        elif region[k] == 2:
+            color.append('fuchsia')
+        else:
+            color.append('yellow')
+#
 #--- if the color list was not be filled, use the last region color to fill
 #
     if len(color) < len(time_list):
@@ -23,6 +23,9 @@ from datetime import datetime
 from time import gmtime, strftime, localtime
 import Chandra.Time
 import Ska.engarchive.fetch as fetch
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import ts_store
+import fetch_cache as fc
 #
 #--- reading directory list
 #
@@ -66,6 +69,7 @@ def update_k_index(hname=''):
             f_k_index   --- http address for the predicted kp indicies
     output: <data_dir>/k_index_data         --- observed + predictive kp list
             <data_dir>/k_index_data_past    --- observed kp list
+            <data_dir>/k_index.db           --- observed kp store (see open_kp_store)
     """
     if hname == '':
         hname = haddress
@@ -81,24 +85,28 @@ def update_k_index(hname=''):
 #
 #--- find the last entry time of the observed kp list
 #
-    try:
-        data   = read_data_file(d_file_p)
-        atemp  = re.split('\s+', data[-1])
-        l_time = int(atemp[0])
-    except:
+    store  = open_kp_store(d_file_p)
+    l_time = store.last_time()
+    if l_time is None:
         l_time = 0.0
 #
-#--- add the new part on the observed kp list
+#--- add the new part on the observed kp store and list
 #
+    rows = []
+    for k in range(0, len(t_list)):
+        if t_list[k] > l_time:
+            rows.append([t_list[k], k_list[k]])
+    store.append(rows)
+    store.close()
+
     appendfile = d_file_p
     #for writing out files in test directory
     if (os.getenv('TEST') == 'TEST'):
         appendfile = test_out + "/" + os.path.basename(appendfile)
     with open(appendfile, 'a') as fo:
-        for k in range(0, len(t_list)):
-            if t_list[k] > l_time:
-                line = str(t_list[k]) + '\t' + str(k_list[k]) + '\n'
-                fo.write(line)
+        for [stime, kval] in rows:
+            line = str(stime) + '\t' + str(kval) + '\n'
+            fo.write(line)
 #
 #--- replace a "predictive" list with the observed list
 #
@@ -131,6 +139,45 @@ def update_k_index(hname=''):
                 line = str(t_list3[k]) + '\t' + str(k_list3[k]) + '\n'
                 fo.write(line)
 
+#-----------------------------------------------------------------------------------
+#-- open_kp_store: open the observed kp store                                     --
+#-----------------------------------------------------------------------------------
+
+def open_kp_store(d_file_p):
+    """
+    open the observed kp store. when the store is new, it is filled from
+    the observed kp list
+    input:  d_file_p    --- the observed kp list: <data_dir>/k_index_data_past
+    output: store       --- ts_store.TimeSeriesStore of [time, kp]
+    """
+    dbfile = data_dir + 'k_index.db'
+    #for writing out files in test directory
+    if (os.getenv('TEST') == 'TEST'):
+        dbfile = test_out + "/" + os.path.basename(dbfile)
+
+    store = ts_store.TimeSeriesStore(dbfile, [['kp', 'real']], time_type='integer')
+
+    if store.last_time() is None:
+        store.import_text(d_file_p, parse_kp_line, incremental=False)
+
+    return store
+
+#-----------------------------------------------------------------------------------
+#-- parse_kp_line: read a line of the kp list                                     --
+#-----------------------------------------------------------------------------------
+
+def parse_kp_line(line):
+    """
+    read a line of the kp list
+    input:  line    --- <time in seconds from 1998.1.1>\t<kp>
+    output: [time, kp] or None if the line is not a data line
+    """
+    atemp = re.split('\s+', line.strip())
+    try:
+        return [int(atemp[0]), float(atemp[1])]
+    except:
+        return None
+
 #-----------------------------------------------------------------------------------
 #-- get_file: read the data from source and lists of time and k index             --
 #-----------------------------------------------------------------------------------
@@ -146,10 +193,10 @@ def get_file(hname):
 #--- read the web data; we assume the data is something like:
 #--- 80803  1- 1o 1o 2+  2o 1+ 0+ 1-    9+      5 0.2
 #
-    cmd = 'wget -q -O ' + zspace + ' ' + hname
-    os.system(cmd)
-
-    data = read_data_file(zspace, remove=1)
+    try:
+        data = fc.fetch_lines(hname)
+    except:
+        data = []
 
     t_list = []
     k_list = []
@@ -250,10 +297,10 @@ def futre_k_index(hname):
 #
 #--- download the file and read it
 #
-    cmd = 'wget -q -O ' + zspace + ' ' + hname
-    os.system(cmd)
-
-    data = read_data_file(zspace, remove=1)
+    try:
+        data = fc.fetch_lines(hname)
+    except:
+        data = []
 
     t_list = []
     k_list = []
@@ -348,10 +395,10 @@ def get_long_term_kp():
     """
 #--- download the file and read it
 #
-    cmd = 'wget -q -O ' + zspace + ' ' + l_k_index
-    os.system(cmd)
-
-    data = read_data_file(zspace, remove=1)
+    try:
+        data = fc.fetch_lines(l_k_index)
+    except:
+        data = []
 
     t_list  = []
     kp_list = []
@@ -13,12 +13,9 @@
 
 import sys
 import os
-import requests
 import zipfile
 import re
 import time
-import urllib.request
-import json
 import Chandra.Time
 from astropy.table import Table
 import astropy.units as u
@@ -55,6 +52,8 @@ sys.path.append('/data/mta/Script/Python3.10/MTA/')
 #--- import several functions
 #
 import mta_common_functions as mcf
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import fetch_cache          as fc
 #
 #--- temp writing file name
 #
@@ -129,8 +128,7 @@ def download_swepam():
 #
 #--- read soloar wind data from json site
 #
-    with urllib.request.urlopen(swepam) as url:
-        data = json.loads(url.read().decode())
+    data = fc.fetch_json(swepam)
 
     time_list = []
     density   = {}
@@ -178,8 +176,8 @@ def download_mtof():
             speed       --- dictionary of solar wind speed; key chandra time in hr unit
     """
 
-    r = requests.get(mtof, allow_redirects=True)
-    open('mtof.zip', 'wb').write(r.content)
+    with open('mtof.zip', 'wb') as fo:
+        fo.write(fc.fetch(mtof, max_age=3600))
 
     with zipfile.ZipFile('mtof.zip', 'r') as f:
         f.extractall('mtof')
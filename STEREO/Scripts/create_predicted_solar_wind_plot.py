@@ -18,8 +18,6 @@ import re
 import numpy
 import getopt
 import time
-import urllib.request
-import json
 import Chandra.Time
 #import copy 
 from copy  import deepcopy
@@ -52,6 +50,8 @@ sys.path.append('/data/mta/Script/Python3.10/MTA/')
 #--- import several functions
 #
 import mta_common_functions as mcf
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import fetch_cache          as fc
 #
 #--- temp writing file name
 #
@@ -127,8 +127,7 @@ def download_swepam():
 #
 #--- read soloar wind data from json site
 #
-    with urllib.request.urlopen(swepam) as url:
-        data = json.loads(url.read().decode())
+    data = fc.fetch_json(swepam)
 
     time_list = []
     density   = {}
@@ -178,8 +177,7 @@ def download_swepam_xx():
 #
 #--- find available data (_ace_swepam_1h.txt)
 #
-    with urllib.request.urlopen(swepam_f) as url:
-        bdata = url.read()
+    bdata = fc.fetch(swepam_f)
 #
 #--- downloaded data is in binary format; convert it into string
 #
@@ -208,8 +206,7 @@ def download_swepam_xx():
     for ent in swep_data[-6:]:
         durl = swepam_f + '/' + ent
         #print(durl)
-        with urllib.request.urlopen(durl) as url:
-            bdata = url.read()
+        bdata = fc.fetch(durl)
         sdata = bdata.decode('utf8')
         data  = re.split('\n+', sdata)
 
@@ -260,8 +257,7 @@ def download_mtof():
 #
 #--- find available data (CRN_*.USED)
 #
-    with urllib.request.urlopen(mtof) as url:
-        bdata = url.read()
+    bdata = fc.fetch(mtof)
 #
 #--- downloaded data is in binary format; convert it into string
 #
@@ -291,8 +287,7 @@ def download_mtof():
     for ent in crn_data[-6:]:
         #print(ent)
         durl = mtof + '/' + ent
-        with urllib.request.urlopen(durl) as url:
-            bdata = url.read()
+        bdata = fc.fetch(durl)
         sdata = bdata.decode('utf8')
         data  = re.split('\n+', sdata)
 
@@ -24,7 +24,6 @@ import argparse
 import getpass
 import signal
 import traceback
-import urllib.request
 #
 #--- Define Directory Pathing
 #
@@ -37,9 +36,13 @@ sys.path.append('/data/mta4/Script/Python3.11/lib/python3.11/site-packages')
 #
 #--- import several functions
 #
-from geopack  import geopack
-from sgp4.api import Satrec, jday
+from sgp4.api import Satrec
 from astLib import astCoords
+sys.path.append('/data/mta4/Space_Weather/EPHEM/Scripts/')
+import geopack_cache as gpc
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import time_convert  as tcv
+import fetch_cache   as fc
 
 #
 #--- a list of satellite names
@@ -66,6 +69,14 @@ TLE_URL = "http://www.celestrak.com/NORAD/elements/science.txt"
 #--- coordinate system
 #
 COORD_SYS = '2000'          #---- J2000
+#
+#--- julian date of 1970.1.1 00:00:00
+#
+JD_1970 = 2440587.5
+#
+#--- the number of the spctrk data lines formatted and written at once
+#
+WRITE_CHUNK = 10000
 
 #--------------------------------------------------------------------------
 #-- create_orbital_data_files: using the orbital elements data, create several orbital data files
@@ -181,18 +192,13 @@ def create_spctrk_file(sat, tle, day_before, day_after, interval):
 #
     satellite = Satrec.twoline2rv(s, t)
 #
-#--- create time lists in a few different format between <day_before>/<day_after> with an <interval> step
+#--- create time arrays in a few different format between <day_before>/<day_after> with an <interval> step
 #--- date_list  --- <yyyy>:<ddd>:<hh>:<mm>:<ss>
 #--- jd_list    --- julian date intger part
 #--- fr_list    --- julian date fraction part
 #--- uts_list   --- time in seconds from 1970.1.1
 #
-    date_list, jd_list, fr_list, uts_list = create_time_list(day_before, day_after, interval)
-#
-#--- convert to numpy array
-#
-    jd_array  = numpy.array(jd_list)
-    fr_array  = numpy.array(fr_list)
+    date_list, jd_array, fr_array, uts_array = create_time_list(day_before, day_after, interval)
 #
 #--- compute the satellite positions
 #
@@ -207,26 +213,44 @@ def create_spctrk_file(sat, tle, day_before, day_after, interval):
     line = line + 'SGP4    Time                      X (km)       Y (km)       Z (km)'
     line = line + '       VX (km/s)    VY (km/s)    VZ (km/s)\n'
 #
-#--- create the data table
+#--- print out the header and the data table
 #
-    for k in range(0, len(date_list)):
-        if e[k] != 0:
-            continue
+    ofile = f"{TLE_DATA_DIR}/{sat}.spctrk"
+    with open(ofile, 'w') as fo:
+        fo.write(line)
+        write_spctrk_table(fo, uts_array, e, r, v)
 
-        line = line + '%12d' % uts_list[k]
+#--------------------------------------------------------------------------
+#-- write_spctrk_table: write the data table part of the spctrk file     --
+#--------------------------------------------------------------------------
+
+def write_spctrk_table(fo, uts, e, r, v):
+    """
+    write the data table part of the spctrk file. the lines are formatted
+    and written WRITE_CHUNK lines at a time
+    input:  fo      --- file object to write
+            uts     --- array of time in seconds from 1970.1.1 (+ 1 day; see ut_in_secs)
+            e       --- array of sgp4 error codes; the rows with non-zero codes are skipped
+            r       --- (n, 3) array of the positions (km)
+            v       --- (n, 3) array of the velocities (km/s)
+    output: the data lines written in fo
+    """
+    fmt  = '%12d%5d%4d%3d%3d  0' + '%13.4f' * 6 + '\n'
 
-        at   = re.split(':', date_list[k])
-        line = line + '%5d%4d'             % (float(at[0]), float(at[1]))
-        line = line + '%3d%3d  0'          % (float(at[2]), float(at[3]))
-        line = line + '%13.4f%13.4f%13.4f' % (r[k][0], r[k][1], r[k][2])
-        line = line + '%13.4f%13.4f%13.4f' % (v[k][0], v[k][1], v[k][2])
-        line = line + '\n'
+    good = numpy.asarray(e) == 0
+    uts  = numpy.asarray(uts)[good]
+    r    = numpy.asarray(r)[good]
+    v    = numpy.asarray(v)[good]
 #
-#--- print out the result
+#--- year, day of year, hour and minute of each time
 #
-    ofile = f"{TLE_DATA_DIR}/{sat}.spctrk"
-    with open(ofile, 'w') as fo:
-        fo.write(line)
+    [year, yday, hh, mm, ss] = date_parts(uts)
+
+    for k in range(0, len(uts), WRITE_CHUNK):
+        sl   = slice(k, k + WRITE_CHUNK)
+        cols = zip(uts[sl], year[sl], yday[sl], hh[sl], mm[sl],\
+                   r[sl,0], r[sl,1], r[sl,2], v[sl,0], v[sl,1], v[sl,2])
+        fo.write(''.join([fmt % row for row in cols]))
 
 #--------------------------------------------------------------------------
 #-- print_out_element: print out two line orbital element data           --
@@ -256,51 +280,89 @@ def print_out_element(satellite, idata):
 
 def create_time_list(day_before, day_after, interval):
     """
-    create lists of time in a few different format
+    create arrays of time in a few different format
     input:  day_before  --- starting time in how many days before the current time
             day_after   --- stopping tine in how many days after the current time
             inteval     --- step interval in seconds
-    output: date_list   --- a list in <yyyy>:<ddd>:<hh>:<mm>:<ss>
-            jd_list     --- a list in integer part of julian date
-            fr_list     --- a list in fraction part of julian date
-            uts_list    --- a list in seconds from 1970.1.1
+    output: date_list   --- an array in <yyyy>:<ddd>:<hh>:<mm>:<ss>
+            jd_array    --- an array in integer part of julian date
+            fr_array    --- an array in fraction part of julian date
+            uts_array   --- an array in seconds from 1970.1.1 (+ 1 day; see ut_in_secs)
     """
 #
 #--- set starting and stopping time in seconds from 1998.1.1
 #
     start     = CURRENT_CHANDRA_TIME - day_before * 86400.0
     stop      = CURRENT_CHANDRA_TIME + day_after  * 86400.0
-    steps     = int((stop - start) / interval) + 1
-
-    jd_list   = []
-    fr_list   = []
-    uts_list  = []
-    date_list = []
-    for k in range(0, steps):
-        atime = start + interval * k
-        atime = Chandra.Time.DateTime(atime).date
-        atemp = re.split('\.', atime)       #--- remove fractional part of seconds
-        atime = atemp[0]
-        date_list.append(atime)
-
-        atime = time.strftime('%Y:%m:%d:%H:%M:%S', time.strptime(atime, '%Y:%j:%H:%M:%S'))
-        atime = re.split(':', atime)
-        year  = int(float(atime[0]))
-        mon   = int(float(atime[1]))
-        day   = int(float(atime[2]))
-        hh    = int(float(atime[3]))
-        mm    = int(float(atime[4]))
-        ss    = int(float(atime[5]))
-
-        jd,fr = jday(year, mon, day, hh, mm, ss)
-
-        jd_list.append(jd)
-        fr_list.append(fr)
-
-        uts   = ut_in_secs(year, mon, day, hh, mm, ss)
-        uts_list.append(uts)
-
-    return date_list, jd_list, fr_list, uts_list
+
+    return create_time_grid(start, stop, interval)
+
+#--------------------------------------------------------------------------
+#-- create_time_grid: create arrays of time between start and stop       --
+#--------------------------------------------------------------------------
+
+def create_time_grid(start, stop, interval):
+    """
+    create arrays of time in a few different format between start and stop.
+    only the starting time is converted to utc; the rest of the grid is 
+    computed in utc with numpy datetime64 (a leap second inside of the 
+    period is not counted; the grid is always on the whole seconds of utc)
+    input:  start       --- starting time in seconds from 1998.1.1
+            stop        --- stopping time in seconds from 1998.1.1
+            inteval     --- step interval in seconds
+    output: date_list   --- an array in <yyyy>:<ddd>:<hh>:<mm>:<ss>
+            jd_array    --- an array in integer part of julian date
+            fr_array    --- an array in fraction part of julian date
+            uts_array   --- an array in seconds from 1970.1.1 (+ 1 day; see ut_in_secs)
+    """
+    steps  = int((stop - start) / interval) + 1
+#
+#--- the starting time in utc; remove fractional part of seconds
+#
+    tstart = numpy.datetime64(int(math.floor(tcv.secs_to_uts(start))), 's')
+    offset = (numpy.arange(steps) * interval).astype('timedelta64[s]')
+    dtime  = tstart + offset
+#
+#--- seconds from 1970.1.1 and the julian date
+#
+    secs      = dtime.astype('int64')
+    days      = secs // 86400
+    jd_array  = days + JD_1970
+    fr_array  = (secs - days * 86400) / 86400.0
+    uts_array = secs + 86400.0
+#
+#--- <yyyy>:<ddd>:<hh>:<mm>:<ss>
+#
+    [year, yday, hh, mm, ss] = date_parts(uts_array)
+    date_list = numpy.array(['%4d:%03d:%02d:%02d:%02d' % ent \
+                                for ent in zip(year, yday, hh, mm, ss)])
+
+    return date_list, jd_array, fr_array, uts_array
+
+#--------------------------------------------------------------------------
+#-- date_parts: give year, day of year, hour, minute and second of times --
+#--------------------------------------------------------------------------
+
+def date_parts(uts):
+    """
+    give year, day of year, hour, minute and second of an array of time
+    input:  uts     --- array of time in seconds from 1970.1.1 (+ 1 day; see ut_in_secs)
+    output: year    --- int array of year
+            yday    --- int array of day of year
+            hh      --- int array of hour
+            mm      --- int array of minute
+            ss      --- int array of second
+    """
+    dtime = (numpy.asarray(uts) - 86400.0).astype('int64').astype('datetime64[s]')
+
+    year  = dtime.astype('datetime64[Y]').astype(int) + 1970
+    yday  = (dtime.astype('datetime64[D]') - dtime.astype('datetime64[Y]')).astype(int) + 1
+    secs  = (dtime - dtime.astype('datetime64[D]')).astype(int)
+    hh    = secs // 3600
+    mm    = (secs % 3600) // 60
+    ss    = secs % 60
+
+    return [year, yday, hh, mm, ss]
 
 #--------------------------------------------------------------------------
 #-- convert_igtime: convert epoch time into <yyy>:<ddd>:<hh>:<mm>:<ss>   --
@@ -349,8 +411,7 @@ def get_orbit_elements():
 #
 #--- download the data and read it
 #
-    with urllib.request.urlopen(TLE_URL) as f:
-        data = [line.strip().decode() for line in f.readlines()]
+    data = fc.fetch_lines(TLE_URL)
 #
 #--- find the data of cxo and xmm
 #
@@ -551,16 +612,13 @@ def convert_to_gsm(sat):
     with open(ifile) as f:
         data = [line.strip() for line in f.readlines()]
 #
-#--- there are two files to create
+#--- find time in seconds from 1970.1.1 and the satellite position in x, y, z (km)
 #
-    line1 = ''
-    line2 = ''
+    gtime = []
+    date  = []
+    pos   = []
     for ent in data:
-#
-#--- find time in seconds from 1970.1.1 to set the environment
-#
         atemp = re.split('\s+', ent)
-        gtime = float(atemp[0])
         year  = float(atemp[-6])
         mon   = float(atemp[-5])
         day   = float(atemp[-4])
@@ -568,55 +626,52 @@ def convert_to_gsm(sat):
         mm    = float(atemp[-2])
         ss    = float(atemp[-1])
 
-        uts = ut_in_secs(year, mon, day, hh, mm, ss)
-        psi = geopack.recalc(uts)
-#
-#--- get the satellite postion in x, y, z
-#
-        x     = float(atemp[1]) / 1.0e3
-        y     = float(atemp[2]) / 1.0e3
-        z     = float(atemp[3]) / 1.0e3
-#
-#--- converts equatorial inertial (gei) to geographical (geo) coords
+        gtime.append(float(atemp[0]))
+        date.append([year, mon, day, hh, mm, ss])
+        pos.append([float(atemp[1]) / 1.0e3, float(atemp[2]) / 1.0e3, float(atemp[3]) / 1.0e3])
 #
-        xgeo, ygeo, zgeo = geopack.geigeo(x, y, z, 1)
+#--- time in seconds from 1970.1.1 (+ 1 day; see ut_in_secs) of all rows at once
 #
-#--- converts geographic (geo) to geocentric solar magnetospheric (gsm) coordinates
+    tparts = numpy.trunc(numpy.array(date).reshape((-1, 6))).T
+    uts    = tcv.calendar_to_uts(*tparts) + 86400.0
 #
-        xgsm, ygsm, zgsm = geopack.geogsm(xgeo, ygeo, zgeo, 1)
+#--- converts equatorial inertial (gei) to geocentric solar magnetospheric (gsm)
+#--- and to gse coordinates; the geopack.recalc rotations are shared through the cache.
+#--- exact time: the values are written in the data files to 1.e-6 re, which the
+#--- interpolation error of the bucket cache would exceed
 #
-#--- convert magnetosperic (gsm) to gse
-#
-        xgse, ygse, zgse = geopack.gsmgse(xgsm, ygsm, zgsm, 1)
+    [gsm, gse] = gpc.gei_to_gsm(uts, pos)
 #
 #--- convert to spherical coordinates
 #
-        r, tgsm, pgsm    = geopack.sphcar(xgsm, ygsm, zgsm, -1)
-        tgsm  *= R2D
-        pgsm  *= R2D
-        if pgsm > 180.0:
-            pgsm -= 360.0
-
-        r, tgse, pgse    = geopack.sphcar(xgse, ygse, zgse, -1)
-        tgse  *= R2D
-        pgse  *= R2D
-        if pgse > 180.0:
-            pgse -= 360.0
+    [r, tgsm, pgsm] = gpc.sphcar_array(gsm[:,0], gsm[:,1], gsm[:,2])
+    [r, tgse, pgse] = gpc.sphcar_array(gse[:,0], gse[:,1], gse[:,2])
+    tgsm *= R2D
+    pgsm *= R2D
+    pgsm  = numpy.where(pgsm > 180.0, pgsm - 360.0, pgsm)
+    tgse *= R2D
+    pgse *= R2D
+    pgse  = numpy.where(pgse > 180.0, pgse - 360.0, pgse)
 #
 #--- convert them in the Earth radius unit
 #
-        xgsm /= EARTH
-        ygsm /= EARTH
-        zgsm /= EARTH
-        xgse /= EARTH
-        ygse /= EARTH
-        zgse /= EARTH
+    gsm /= EARTH
+    gse /= EARTH
+#
+#--- there are two files to create
+#
+    line1 = ''
+    line2 = ''
+    for k in range(0, len(gtime)):
+        [year, mon, day, hh, mm, ss] = date[k]
 
         line1 = line1 + '%12.1f%10.2f%8.2f%8.2f%8.2f%8.2f%12.6f%3d%3d%3d%3d%3d\n' \
-                        % (gtime, r, tgsm, pgsm, tgse, pgse, year, mon, day, hh, mm, ss)
+                        % (gtime[k], r[k], tgsm[k], pgsm[k], tgse[k], pgse[k],\
+                           year, mon, day, hh, mm, ss)
 
         line2 = line2 + '%12.1f%11.6f%11.6f%11.6f%11.6f%11.6f%11.6f%12.6f%3d%3d%3d%3d%3d\n' \
-                         % (gtime, xgsm, ygsm, zgsm, xgse, ygse, zgse, year, mon, day, hh, mm, ss)
+                         % (gtime[k], gsm[k,0], gsm[k,1], gsm[k,2], gse[k,0], gse[k,1],\
+                            gse[k,2], year, mon, day, hh, mm, ss)
 #
 #--- print out the results
 #
@@ -44,12 +44,13 @@ if (os.getenv('TEST') == 'TEST'):
 #--- append  pathes to private folders to a python directory
 #
 sys.path.append('/data/mta4/Script/Python3.10/MTA/')
-sys.path.append('/data/mta4/Space_Weather/EPHEM/Scripts/')
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
 #
 #--- import several functions
 #
 import mta_common_functions as mcf
-import convert_coord        as ecc
+import crm_region           as crr
+import time_index           as tix
 #
 #--- temp writing file name
 #
@@ -198,10 +199,14 @@ def write_region_data(xtime, utime,  nkps, xgsm, ygsm, zgsm, alt,  sat):
             sat             --- either xmm or cxo
     output: <xmm_dir>/Data/crmreg_<sat>.dat
     """
+#
+#--- find the regions of all rows at once; the region depends only on kp and gsm coords
+#
+    lids = crr.locreg_array(nkps, xgsm, ygsm, zgsm)[3]
+
     line = ''
     for k in range(0, len(xtime)):
-        psi = geopack.recalc(utime[k])
-        xtail, ytail, ztail, lid = ecc.locreg(nkps[k], xgsm[k], ygsm[k], zgsm[k])
+        lid  = lids[k]
         line = line + '%9d'   % xtime[k] + '\t' 
         line = line + '%3.3f' % alt[k]   + '\t'
         line = line + '%3.3f' % xgsm[k]  + '\t'
@@ -226,27 +231,17 @@ def match_kp(ktime, xtime, kps):
     input:  ktime   --- a list of time of corresponding kp value list
             xtime   --- a list of time 
             kps     --- a list of kp values
-    output: nkps    --- a list of kp values matched to xtime list
+    output: nkps    --- a list of kp values matched to xtime list; the kp value
+                        of the interval ktime[m] <= time < ktime[m+1]. outside of
+                        the kp time range, the last kp value is used
     """
     klen  = len(ktime)
-    nkps  = []
-    start = 0
-    for etime in xtime:
-        for m in range(start, klen):
-            if m + 1 >= klen:
-                nkps.append(kps[-1])
-                break
-
-            if ktime[m] < etime:
-                continue
-            elif etime >= ktime[m] and etime < ktime[m+1]:
-                nkps.append(kps[m])
-                start = m - 5
-                if start < 0:
-                    start = 0
-                break
-
-    return nkps
+    if klen == 0:
+        return []
+
+    [nkps, index] = tix.asof_join(xtime, ktime, kps, direction='backward', fill=kps[-1])
+
+    return list(nkps)
 
 #---------------------------------------------------------------------------------------
 #-- ut_in_secs: onvert calendar date into univarsal time in sec                       --
@@ -23,7 +23,6 @@ import numpy
 import matplotlib as mpl
 
 sys.path.append('/data/mta4/Script/Python3.10/lib/python3.10/site-packages')
-from geopack import geopack
 
 if __name__ == '__main__':
     mpl.use('Agg')
@@ -54,10 +53,12 @@ if (os.getenv('TEST') == 'TEST'):
 #--- append  pathes to private folders to a python directory
 #
 sys.path.append('/data/mta4/Script/Python3.10/MTA/')
+sys.path.append('/data/mta4/Space_Weather/EPHEM/Scripts/')
 #
 #--- import several functions
 #
 import mta_common_functions as mcf
+import geopack_cache        as gpc
 #
 #--- temp writing file name
 #
@@ -399,30 +400,23 @@ def ut_in_secs(year, mon, day, hh, mm, ss):
 def compute_gsm(t, x, y, z):
     """
     convert x, y, z coordinates to that of gsm
-    input:  x   --- x coordinates
+    input:  t   --- time in seconds from 1970.1.1
+            x   --- x coordinates
             y   --- y coordinates
             z   --- z coordinates
     output: gx  --- gsm x 
             gy  --- gsm y
             gz  --- gsm z
     """
-    gx = []
-    gy = []
-    gz = []
-    for k in range(0, len(t)):
-        psi = geopack.recalc(t[k])
-        xgeo, ygeo, zgeo = geopack.geigeo(x[k], y[k], z[k], 1)
-        xgsm, ygsm, zgsm = geopack.geogsm(xgeo, ygeo, zgeo, 1)
-        xgm = xgsm / earth
-        ygm = ygsm / earth
-        zgm = zgsm / earth
-        gx.append(xgm)
-        gy.append(ygm)
-        gz.append(zgm)
-
-    gx = numpy.array(gx)
-    gy = numpy.array(gy)
-    gz = numpy.array(gz)
+#
+#--- for the plot, the interpolated rotations of the 30 min buckets are close enough
+#
+    [gsm, gse] = gpc.gei_to_gsm(t, numpy.array([x, y, z], dtype=float).T,\
+                                gpc.RECALC_BUCKET_CACHE)
+
+    gx = gsm[:,0] / earth
+    gy = gsm[:,1] / earth
+    gz = gsm[:,2] / earth
 
     return [gx, gy, gz]
 
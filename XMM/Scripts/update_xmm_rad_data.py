@@ -46,6 +46,12 @@ sys.path.append('/data/mta4/Script/Python3.10/MTA/')
 #--- import several functions
 #
 import mta_common_functions as mcf
+sys.path.append('/data/mta4/Space_Weather/Common/Scripts/')
+import ts_store
+import time_index           as tix
+import time_convert         as tcv
+import month_archive        as mar
+import rad_rollups          as rrl
 #
 #--- temp writing file name
 #
@@ -63,6 +69,11 @@ m_list = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct',
 #--- xmm data html
 #
 xmm_file = 'https://xmm-tools.cosmos.esa.int/external/xmm_obs_info/radmon/plots/radmon_02h.dat'
+#
+#--- columns of the xmm radiation data (with time in seconds from 1998.1.1)
+#
+xmm_cols = [['le0', 'real'], ['le1', 'real'], ['le2', 'real'], ['hes0', 'real'],\
+            ['hes1', 'real'], ['hes2', 'real'], ['hec', 'real']]
 
 #--------------------------------------------------------------------------
 #-- update_xmm_rad_data: update xmm radiation flux database              --
@@ -74,6 +85,7 @@ def update_xmm_rad_data():
     input: none, but read from:
            <xmm_file>
     output: <xmm_dir>/Data/xmm_7day.archive2
+            <xmm_dir>/Data/xmm_rad.db   --- the store of the data (see open_xmm_store)
     """
 #
 #--- current time and 7 day ago boundary in Chandra Time
@@ -91,16 +103,13 @@ def update_xmm_rad_data():
     cmd   = 'cp ' + ifile + ' ' + ofile
     os.system(cmd)
 #
-#--- read the data set and remove older data
+#--- the last entry time of the data
 #
-    data  = mcf.read_data_file(ifile)
-    line  = ''
-    for ent in data:
-        atemp = re.split('\s+', ent)
-        stime = float(atemp[0])
-        if stime < d7ago:
-            continue
-        line = line + ent + '\n'
+    store = open_xmm_store()
+    stime = store.last_time()
+    if stime is None:
+        stime = d7ago
+    rows  = []
 #
 #--- read the current data and append the data
 #
@@ -115,10 +124,10 @@ def update_xmm_rad_data():
     save = [0, 0, 0, 0, 0, 0, 0, 0]
     chk  = 0
     dcnt = 0
-    for ent in data:
-        atemp = re.split('\s+', ent)
-        ltime = atemp[0].replace('-', ':')
-        ctime = Chandra.Time.DateTime(ltime).secs
+    t_list = tcv.date_to_secs([re.split('\s+', ent)[0].replace('-', ':') for ent in data])
+    for m in range(0, len(data)):
+        atemp = re.split('\s+', data[m])
+        ctime = t_list[m]
         if ctime <= stime:
             continue
 
@@ -131,14 +140,13 @@ def update_xmm_rad_data():
                 save[k] += float(atemp[k+1])
             dcnt += 1
         else:
-            line  = line + '%1.8e'  % (ctime - 0.5 * diff)
-            line  = line + '%13.3f' % (save[0] / dcnt)
-            line  = line + '%13.3f' % (save[1] / dcnt)
-            line  = line + '%13.3f' % (save[2] / dcnt)
-            line  = line + '%13.3f' % (save[3] / dcnt)
-            line  = line + '%13.3f' % (save[4] / dcnt)
-            line  = line + '%13.3f' % (save[5] / dcnt)
-            line  = line + '%13.3f' % (save[6] / dcnt) + '\n'
+#
+#--- keep the values at the precision written in the data files
+#
+            row   = [float('%1.8e' % (ctime - 0.5 * diff))]
+            for k in range(0, 7):
+                row.append(round(save[k] / dcnt, 3))
+            rows.append(row)
 
             start = ctime
             save  = [0, 0, 0, 0, 0, 0, 0, 0]
@@ -146,15 +154,74 @@ def update_xmm_rad_data():
                 save[k] += float(atemp[k+1])
             dcnt  = 1
 #
-#--- update the data
+#--- update the data; the 7 day data file is recreated from the store
 #
-    if line != '':
-        ofile = ifile
-        #for writing out files in test directory
-        if (os.getenv('TEST') == 'TEST'):
-            ofile = test_out + "/" + os.path.basename(ofile)
-        with open(ofile, 'w') as fo:
-            fo.write(line)
+    store.append(rows)
+    ofile = ifile
+    #for writing out files in test directory
+    if (os.getenv('TEST') == 'TEST'):
+        ofile = test_out + "/" + os.path.basename(ofile)
+    if len(store.rows(d7ago)) > 0:
+        store.export_text(ofile, format_xmm_row, start=d7ago)
+    store.close()
+
+#--------------------------------------------------------------------------
+#-- open_xmm_store: open the store of xmm radiation data                 --
+#--------------------------------------------------------------------------
+
+def open_xmm_store():
+    """
+    open the store of xmm radiation data. when the store is new, it is filled
+    from xmm.archive and xmm_7day.archive2
+    input:  none
+    output: store   --- ts_store.TimeSeriesStore of [time, le0, le1, le2, hes0, hes1, hes2, hec]
+    """
+    dbfile = xmm_dir + 'Data/xmm_rad.db'
+    #for writing out files in test directory
+    if (os.getenv('TEST') == 'TEST'):
+        dbfile = test_out + "/" + os.path.basename(dbfile)
+
+    store = ts_store.TimeSeriesStore(dbfile, xmm_cols)
+
+    if store.last_time() is None:
+        store.import_text(xmm_dir + 'Data/xmm.archive',        parse_xmm_line, incremental=False)
+        store.import_text(xmm_dir + 'Data/xmm_7day.archive2',  parse_xmm_line, incremental=False)
+
+    return store
+
+#--------------------------------------------------------------------------
+#-- parse_xmm_line: read a line of xmm radiation data                    --
+#--------------------------------------------------------------------------
+
+def parse_xmm_line(line):
+    """
+    read a line of xmm radiation data
+    input:  line    --- data line
+    output: a row of [time, le0, le1, le2, hes0, hes1, hes2, hec] or None
+    """
+    atemp = re.split('\s+', line.strip())
+    if len(atemp) < 8:
+        return None
+    try:
+        return [float(val) for val in atemp[:8]]
+    except:
+        return None
+
+#--------------------------------------------------------------------------
+#-- format_xmm_row: create a line of xmm radiation data                  --
+#--------------------------------------------------------------------------
+
+def format_xmm_row(row):
+    """
+    create a line of xmm radiation data
+    input:  row     --- [time, le0, le1, le2, hes0, hes1, hes2, hec]
+    output: line    --- data line
+    """
+    line = '%1.8e' % row[0]
+    for val in row[1:8]:
+        line = line + '%13.3f' % val
+
+    return line + '\n'
 
 #--------------------------------------------------------------------------
 #--------------------------------------------------------------------------
@@ -177,37 +244,32 @@ def update_mta_xmm_db():
 
     flen  = len(ftime)
     olen  = len(otime)
-    start = 0
     line  = ''
-    bchk  = 0
 #
 #--- skip the data till the new data part of the flux data
 #
-    for k in range(0, flen):
-        if ftime[k] <= ltime:
-            continue
-
-        if bchk > 0:
-            line = line + '\n'
-            break
-        line = line + flines[k] + ' ' 
-
-        for m in range(start, olen):
+    kstart = tix.find_next(ftime, ltime, inclusive=False)
 #
-#--- if there is more flex data than orbital data, stop there
+#--- match the orbital data of otime[m] <= ftime[k] < otime[m+1] to the flux data
 #
-            if m+1 >= olen:
-                bchk = 1
-                break
+    [ovals, index] = tix.asof_join(ftime[kstart:], otime, olines, fill='')
+#
+#--- all new flux data with the orbital info are added. (the older version added only
+#--- one line in each run, since its search loop did not stop at the match, and fell
+#--- behind whenever more than one flux line came in between the runs)
+#
+    for k in range(kstart, flen):
+        m = index[k - kstart]
+#
+#--- if there is more flex data than orbital data, stop there; the rest is added
+#--- in the next run after the orbital data are updated
+#
+        if m < 0 or m + 1 >= olen:
+            break
 #
 #--- flex time and orbital time are about same; append the orbital info to the flux data
 #
-            if ftime[k] >= otime[m] and ftime[k] < otime[m+1]:
-                line = line + olines[m] + '\n'
-
-                start = m - 5
-                if start < 0:
-                    start = 0
+        line = line + flines[k] + ' ' + ovals[k - kstart] + '\n'
 #
 #--- write out the data
 #
@@ -250,19 +312,19 @@ def find_the_last_entry_time(ifile):
 def read_xmm_flux():
     """
     read xmm flux data
-    input:  none, but read from <xmm_dir>/Data/xmm_7day.archive2'
+    input:  none, but read from <xmm_dir>/Data/xmm_rad.db (the last 7 days)
     output: atime   --- a list of time in seconds from 1998.1.1
             fdata   --- a list of data
     """
-    ifile = xmm_dir + 'Data/xmm_7day.archive2'
-    data  = mcf.read_data_file(ifile)
+    store = open_xmm_store()
+    rows  = store.rows(current_chandra_time - 7 * 86400.0)
+    store.close()
 
     atime = []
     fdata = []
-    for ent in data:
-        atemp = re.split('\s+', ent)
-        atime.append(float(atemp[0]))
-        fdata.append(ent)
+    for row in rows:
+        atime.append(row[0])
+        fdata.append(format_xmm_row(row).strip())
 
     return [atime, fdata]
 
@@ -284,20 +346,14 @@ def read_xmm_orbit():
     xtime = []
     xdata = []
 
+    tparts = []
     for ent in data[5:]:
         atemp = re.split('\s+', ent)
         try:
-            year  = atemp[1]
-            yday  = mcf.add_leading_zero(atemp[2], 3)
-            hh    = mcf.add_leading_zero(atemp[3])
-            mm    = mcf.add_leading_zero(atemp[4])
-            ltime = year + ':' + yday + ':' + hh + ':' + mm + ':00'
-            stime = Chandra.Time.DateTime(ltime).secs
+            tparts.append([int(atemp[1]), int(atemp[2]), int(atemp[3]), int(atemp[4])])
         except:
             continue
 
-        xtime.append(stime)
-
         x     = float(atemp[6])
         y     = float(atemp[7])
         z     = float(atemp[8])
@@ -313,6 +369,12 @@ def read_xmm_orbit():
         line  = line + '%16.4f' % vy 
         line  = line + '%16.4f' % vz
         xdata.append(line)
+#
+#--- convert all times at once
+#
+    if len(tparts) > 0:
+        tparts = numpy.array(tparts)
+        xtime  = list(tcv.yday_to_secs(tparts[:,0], tparts[:,1], tparts[:,2], tparts[:,3]))
 
     return [xtime, xdata]
 
@@ -325,8 +387,9 @@ def update_xmm_archive():
     update xmm_archive data file
     input: none, but read from:
             <xmm_dir>/Data/xmm.archive
-            <xmm_dir>/Data/xmm_7day.archive2
+            <xmm_dir>/Data/xmm_rad.db
     output: <xmm_dir>/Data/xmm.archive
+            <xmm_dir>/Data/Monthly/xmm_archive_<yyyy>_<mm>.txt
     """
 #
 #--- copy the old data file
@@ -341,25 +404,31 @@ def update_xmm_archive():
 #
     stime = find_the_last_entry_time(ifile)
 #
-#--- read xmm_7day data
-#
-    sfile = xmm_dir + 'Data/xmm_7day.archive2'
-    data  = mcf.read_data_file(sfile)
-#
 #--- append the new part 
 #
+    store = open_xmm_store()
+    rows  = store.rows(stime)
+    store.close()
+
     line  = ''
-    for ent in data:
-        atemp = re.split('\s+', ent)
-        atime = float(atemp[0])
-        if atime > stime:
-            line = line + ent + '\n'
+    for row in rows:
+        if row[0] > stime:
+            line = line + format_xmm_row(row)
     ofile = ifile
     #for writing out files in test directory
     if (os.getenv('TEST') == 'TEST'):
         ofile = test_out + "/" + os.path.basename(ofile)
     with open(ofile , 'a') as fo:
         fo.write(line)
+#
+#--- copy the new lines into the monthly files
+#
+    part_dir = os.path.dirname(ofile) + '/Monthly'
+    mar.sync(ofile, part_dir, 'xmm_archive', mar.secs_line_time)
+#
+#--- and add them to the hourly/daily rollups of the radiation plots
+#
+    rrl.update('xmm', part_dir)
 
 #--------------------------------------------------------------------------
 #-- create_data_table_for_html: create a table for xmm html page         --
@@ -369,20 +438,21 @@ def create_data_table_for_html():
     """
     create a table for xmm html page
     input: none but read from:
-            <xmm_dir>/Data/xmm_7day.archive2
+            <xmm_dir>/Data/xmm_rad.db
     output: <html_dir>/XMM/xmm_2day.dat
     """
 #
-#--- read xmm flux data
-#
-    ifile = xmm_dir + 'Data/xmm_7day.archive2'
-    data  = mcf.read_data_file(ifile)
-#
 #--- make the last one hour interval time table for the last 24 hours.
 #--- disp_time cnotains time in a display format at 30 min mark
 #
     [disp_time, cstart, cstop] = make_time_interval()
 #
+#--- read xmm flux data of the period (and the first data after the period)
+#
+    store = open_xmm_store()
+    data  = store.rows(cstart[0])
+    store.close()
+#
 #--- now make one hour average data in that intervals
 #
     line   = ''
@@ -395,16 +465,16 @@ def create_data_table_for_html():
     dcnt   = 0
     for k in range(0, len(cstart)):
         for m in range(dstart,len(data)):
-            atemp = re.split('\s+',data[m])
-            dtime = float(atemp[0])
+            atemp = data[m]
+            dtime = atemp[0]
             if dtime < cstart[k]:
                 continue
             elif dtime >= cstart[k] and dtime < cstop[k]:
-                le1  += float(atemp[2])
-                le2  += float(atemp[3])
-                hes1 += float(atemp[5])
-                hes2 += float(atemp[6])
-                hesc += float(atemp[7])
+                le1  += atemp[2]
+                le2  += atemp[3]
+                hes1 += atemp[5]
+                hes2 += atemp[6]
+                hesc += atemp[7]
                 dcnt += 1
             else:
 #
@@ -516,7 +586,7 @@ def make_time_interval():
 #
 #--- in Chandra Time
 #
-        start = int(Chandra.Time.DateTime(start).secs)
+        start = int(tcv.date_to_secs(start))
         cstart.append(start)
         stop  = start + 3600.0
         cstop.append(stop)